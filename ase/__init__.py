@@ -14,10 +14,12 @@ __all__ = ['Atoms', 'Atom']
 __version__ = '3.22.0'
 
 
-from ase.atom import Atom
-from ase.atoms import Atoms
-
 # import ase.parallel early to avoid circular import problems when
 # ase.parallel does "from gpaw.mpi import world":
 import ase.parallel  # noqa
 ase.parallel  # silence pyflakes
+
+# Atom, Atoms and the submodules are imported on first use:
+from ase.utils.lazy import lazy_attributes  # noqa
+__getattr__, __dir__ = lazy_attributes(__name__, {'Atom': 'ase.atom',
+                                                  'Atoms': 'ase.atoms'})
@@ -18,7 +18,7 @@ from ase.cell import Cell
 from ase.stress import voigt_6_to_full_3x3_stress, full_3x3_to_voigt_6_stress
 from ase.data import atomic_masses, atomic_masses_common
 from ase.geometry import (wrap_positions, find_mic, get_angles, get_distances,
-                          get_dihedrals)
+                          get_dihedrals, get_pair_distances)
 from ase.symbols import Symbols, symbols2numbers
 from ase.utils import deprecated
 
@@ -1758,10 +1758,14 @@ class Atoms:
             D_len.shape = (-1,)
             return D_len
 
-    def get_all_distances(self, mic=False, vector=False):
+    def get_all_distances(self, mic=False, vector=False, cutoff=None):
         """Return distances of all of the atoms with all of the atoms.
 
         Use mic=True to use the Minimum Image Convention.
+
+        If a cutoff is given, only distances smaller than the cutoff are
+        computed and returned as a symmetric scipy.sparse.csr_matrix.
+        This scales linearly with the number of atoms.
         """
         R = self.arrays['positions']
 
@@ -1772,6 +1776,17 @@ class Atoms:
             cell = self.cell
             pbc = self.pbc
 
+        if cutoff is not None:
+            if vector:
+                raise ValueError('vector=True can not be combined '
+                                 'with a cutoff')
+            from scipy.sparse import csr_matrix
+            i, j, _, d = get_pair_distances(R, cutoff, cell=cell, pbc=pbc)
+            n = len(self)
+            return csr_matrix((np.concatenate([d, d]),
+                               (np.concatenate([i, j]),
+                                np.concatenate([j, i]))), shape=(n, n))
+
         D, D_len = get_distances(R, cell=cell, pbc=pbc)
 
         if vector:
@@ -1,3 +1,9 @@
+"""Functions for building atomic structures: bulk crystals, surfaces,
+molecules, supercells, nanotubes and more."""
+# The functions with the same name as a submodule (bulk, molecule,
+# rotate and surface) are imported right away, so that importing the
+# submodule later does not replace them.  The rest are imported on
+# first use.
 from ase.build.rotate import minimize_rotation_and_translation
 from ase.build.surface import (
     add_adsorbate, add_vacuum,
@@ -8,18 +14,9 @@ from ase.build.surface import (
 from ase.build.bulk import bulk
 from ase.build.general_surface import surface
 from ase.build.molecule import molecule
-from ase.build.root import (hcp0001_root, fcc111_root, bcc111_root,
-                            root_surface, root_surface_analysis)
-from ase.build.tube import nanotube
-from ase.build.ribbon import graphene_nanoribbon
 from ase.build.tools import (cut, stack, sort, minimize_tilt, niggli_reduce,
                              rotate)
-from ase.build.connected import (connected_atoms, connected_indices,
-                                 separate, split_bond)
-from ase.build.supercells import (
-    get_deviation_from_optimal_cell_shape,
-    find_optimal_cell_shape,
-    make_supercell)
+from ase.utils.lazy import lazy_attributes
 
 __all__ = ['minimize_rotation_and_translation',
            'add_adsorbate', 'add_vacuum',
@@ -39,3 +36,20 @@ __all__ = ['minimize_rotation_and_translation',
            'find_optimal_cell_shape',
            'find_optimal_cell_shape_pure_python',
            'make_supercell']
+
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'hcp0001_root': 'ase.build.root',
+    'fcc111_root': 'ase.build.root',
+    'bcc111_root': 'ase.build.root',
+    'root_surface': 'ase.build.root',
+    'root_surface_analysis': 'ase.build.root',
+    'nanotube': 'ase.build.tube',
+    'graphene_nanoribbon': 'ase.build.ribbon',
+    'connected_atoms': 'ase.build.connected',
+    'connected_indices': 'ase.build.connected',
+    'separate': 'ase.build.connected',
+    'split_bond': 'ase.build.connected',
+    'get_deviation_from_optimal_cell_shape': 'ase.build.supercells',
+    'find_optimal_cell_shape': 'ase.build.supercells',
+    'make_supercell': 'ase.build.supercells'})
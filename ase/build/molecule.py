@@ -1,5 +1,4 @@
 from ase.atoms import Atoms
-from ase.collections import g2
 
 
 def molecule(name, vacuum=None, **kwargs):
@@ -41,6 +40,7 @@ def molecule(name, vacuum=None, **kwargs):
         kwargs.update(extra[name])
         mol = Atoms(**kwargs)
     else:
+        from ase.collections import g2
         mol = g2[name]
         if kwargs:
             mol = Atoms(mol, **kwargs)
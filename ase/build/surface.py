@@ -13,7 +13,6 @@ import numpy as np
 from ase.atom import Atom
 from ase.atoms import Atoms
 from ase.data import reference_states, atomic_numbers
-from ase.lattice.cubic import FaceCenteredCubic
 
 
 def fcc100(symbol, size, a=None, vacuum=None, orthogonal=True,
@@ -437,6 +436,7 @@ def fcc211(symbol, size, a=None, vacuum=None, orthogonal=True):
     if size[0] % 3 != 0:
         raise NotImplementedError('First dimension of size must be '
                                   'divisible by 3.')
+    from ase.lattice.cubic import FaceCenteredCubic
     atoms = FaceCenteredCubic(symbol,
                               directions=[[1, -1, -1],
                                           [0, 2, -2],
@@ -1 +1,5 @@
 """Interfaces to different ASE compatible force-calculators."""
+from ase.utils.lazy import lazy_attributes
+
+# The calculator modules are imported on first use, e.g. ase.calculators.emt
+__getattr__, __dir__ = lazy_attributes(__name__, {})
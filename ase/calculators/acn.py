@@ -2,8 +2,9 @@ import numpy as np
 
 import ase.units as units
 from ase.calculators.calculator import Calculator, all_changes
+from ase.calculators.pairpotential import (molecule_cutoff,
+                                           rigid_molecule_interactions)
 from ase.data import atomic_masses
-from ase.geometry import find_mic
 
 # Electrostatic constant
 k_c = units.Hartree * units.Bohr
@@ -94,55 +95,17 @@ class ACN(Calculator):
         assert (masses[me::3] == m_me).all(), 'incorrect masses'
 
         R = self.atoms.positions.reshape((-1, 3, 3))
-        pbc = self.atoms.pbc
-        cd = self.atoms.cell.diagonal()
         nm = len(R)
 
-        assert (self.atoms.cell == np.diag(cd)).all(), 'not orthorhombic'
-        assert ((cd >= 2 * self.rc) | ~pbc).all(), 'cutoff too large'
-
         charges = self.get_virtual_charges(atoms[:3])
 
         # LJ parameters
         sigma_co, epsilon_co = combine_lj_lorenz_berthelot(sigma, epsilon)
 
-        energy = 0.0
-        self.forces = np.zeros((3 * nm, 3))
-
-        for m in range(nm - 1):
-            Dmm = R[m + 1:, 1] - R[m, 1]
-            # MIC PBCs
-            Dmm_min, Dmm_min_len = find_mic(Dmm, atoms.cell, pbc)
-            shift = Dmm_min - Dmm
-
-            # Smooth cutoff
-            cut, dcut = self.cutoff(Dmm_min_len)
-
-            for j in range(3):
-                D = R[m + 1:] - R[m, j] + shift[:, np.newaxis]
-                D_len2 = (D**2).sum(axis=2)
-                D_len = D_len2**0.5
-                # Coulomb interactions
-                e = charges[j] * charges / D_len * k_c
-                energy += np.dot(cut, e).sum()
-                F = (e / D_len2 * cut[:, np.newaxis])[:, :, np.newaxis] * D
-                Fmm = -(e.sum(1) * dcut / Dmm_min_len)[:, np.newaxis] * Dmm_min
-                self.forces[(m + 1) * 3:] += F.reshape((-1, 3))
-                self.forces[m * 3 + j] -= F.sum(axis=0).sum(axis=0)
-                self.forces[(m + 1) * 3 + 1::3] += Fmm
-                self.forces[m * 3 + 1] -= Fmm.sum(0)
-                # LJ interactions
-                c6 = (sigma_co[:, j]**2 / D_len2)**3
-                c12 = c6**2
-                e = 4 * epsilon_co[:, j] * (c12 - c6)
-                energy += np.dot(cut, e).sum()
-                F = (24 * epsilon_co[:, j] * (2 * c12 -
-                     c6) / D_len2 * cut[:, np.newaxis])[:, :, np.newaxis] * D
-                Fmm = -(e.sum(1) * dcut / Dmm_min_len)[:, np.newaxis] * Dmm_min
-                self.forces[(m + 1) * 3:] += F.reshape((-1, 3))
-                self.forces[m * 3 + j] -= F.sum(axis=0).sum(axis=0)
-                self.forces[(m + 1) * 3 + 1::3] += Fmm
-                self.forces[m * 3 + 1] -= Fmm.sum(0)
+        # The cutoff is based on the distance between the C atoms:
+        energy, self.forces = rigid_molecule_interactions(
+            R, charges, sigma_co, epsilon_co, self.atoms.pbc,
+            self.atoms.cell, self.rc, self.width, center=1)
 
         if self.pcpot:
             e, f = self.pcpot.calculate(np.tile(charges, nm),
@@ -163,16 +126,7 @@ class ACN(Calculator):
         return molcoms
 
     def cutoff(self, d):
-        x1 = d > self.rc - self.width
-        x2 = d < self.rc
-        x12 = np.logical_and(x1, x2)
-        y = (d[x12] - self.rc + self.width) / self.width
-        cut = np.zeros(len(d))  # cutoff function
-        cut[x2] = 1.0
-        cut[x12] -= y**2 * (3.0 - 2.0 * y)
-        dtdd = np.zeros(len(d))
-        dtdd[x12] -= 6.0 / self.width * y * (1.0 - y)
-        return cut, dtdd
+        return molecule_cutoff(d, self.rc, self.width)
 
     def embed(self, charges):
         """Embed atoms in point-charges."""
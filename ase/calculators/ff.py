@@ -5,6 +5,16 @@ from ase.utils import ff
 
 
 class ForceField(Calculator):
+    """Force field made of Morse, bond, angle, dihedral, van der Waals and
+    Coulomb terms from :mod:`ase.utils.ff`.
+
+    The terms are collected into index and parameter arrays (the
+    *topology*), so that all terms of one type are evaluated at once.
+    The topology is rebuilt, and the results recalculated, when terms
+    are added to, removed from or replaced in the lists of terms.  After
+    changing the parameters of existing term objects, set the *topology*
+    attribute to None and call :meth:`reset`."""
+
     implemented_properties = ['energy', 'forces']
     nolabel = True
 
@@ -43,69 +53,46 @@ class ForceField(Calculator):
             self.coulombs = []
         else:
             self.coulombs = coulombs
+        self.topology = None
+        self._topology_terms = None
 
     def calculate(self, atoms, properties, system_changes):
         Calculator.calculate(self, atoms, properties, system_changes)
         if system_changes:
             for name in ['energy', 'forces', 'hessian']:
                 self.results.pop(name, None)
-        if 'energy' not in self.results:
+        if self.topology is None or self._terms_changed():
+            self._topology_terms = self._terms()
+            self.topology = [
+                (ff.compile_morses(self.morses),
+                 ff.get_morse_potential_values_and_gradients),
+                (ff.compile_bonds(self.bonds),
+                 ff.get_bond_potential_values_and_gradients),
+                (ff.compile_angles(self.angles),
+                 ff.get_angle_potential_values_and_gradients),
+                (ff.compile_dihedrals(self.dihedrals),
+                 ff.get_dihedral_potential_values_and_gradients),
+                (ff.compile_vdws(self.vdws),
+                 ff.get_vdw_potential_values_and_gradients),
+                (ff.compile_coulombs(self.coulombs),
+                 ff.get_coulomb_potential_values_and_gradients)]
+        if 'energy' not in self.results or 'forces' not in self.results:
+            natoms = len(atoms)
             energy = 0.0
-            for morse in self.morses:
-                i, j, e = ff.get_morse_potential_value(atoms, morse)
-                energy += e
-            for bond in self.bonds:
-                i, j, e = ff.get_bond_potential_value(atoms, bond)
-                energy += e
-            for angle in self.angles:
-                i, j, k, e = ff.get_angle_potential_value(atoms, angle)
-                energy += e
-            for dihedral in self.dihedrals:
-                i, j, k, l, e = ff.get_dihedral_potential_value(
-                    atoms, dihedral)
-                energy += e
-            for vdw in self.vdws:
-                i, j, e = ff.get_vdw_potential_value(atoms, vdw)
-                energy += e
-            for coulomb in self.coulombs:
-                i, j, e = ff.get_coulomb_potential_value(atoms, coulomb)
-                energy += e
+            forces = np.zeros((natoms, 3))
+            for terms, evaluate in self.topology:
+                if len(terms['indices']) == 0:
+                    continue
+                e, g = evaluate(atoms, terms)
+                energy += e.sum()
+                indices = terms['indices'].ravel()
+                g = g.reshape(-1, 3)
+                for c in range(3):
+                    forces[:, c] -= np.bincount(indices, g[:, c],
+                                                minlength=natoms)
             self.results['energy'] = energy
-        if 'forces' not in self.results:
-            forces = np.zeros(3 * len(atoms))
-            for morse in self.morses:
-                i, j, g = ff.get_morse_potential_gradient(atoms, morse)
-                limits = get_limits([i, j])
-                for gb, ge, lb, le in limits:
-                    forces[gb:ge] -= g[lb:le]
-            for bond in self.bonds:
-                i, j, g = ff.get_bond_potential_gradient(atoms, bond)
-                limits = get_limits([i, j])
-                for gb, ge, lb, le in limits:
-                    forces[gb:ge] -= g[lb:le]
-            for angle in self.angles:
-                i, j, k, g = ff.get_angle_potential_gradient(atoms, angle)
-                limits = get_limits([i, j, k])
-                for gb, ge, lb, le in limits:
-                    forces[gb:ge] -= g[lb:le]
-            for dihedral in self.dihedrals:
-                i, j, k, l, g = ff.get_dihedral_potential_gradient(
-                    atoms, dihedral)
-                limits = get_limits([i, j, k, l])
-                for gb, ge, lb, le in limits:
-                    forces[gb:ge] -= g[lb:le]
-            for vdw in self.vdws:
-                i, j, g = ff.get_vdw_potential_gradient(atoms, vdw)
-                limits = get_limits([i, j])
-                for gb, ge, lb, le in limits:
-                    forces[gb:ge] -= g[lb:le]
-            for coulomb in self.coulombs:
-                i, j, g = ff.get_coulomb_potential_gradient(atoms, coulomb)
-                limits = get_limits([i, j])
-                for gb, ge, lb, le in limits:
-                    forces[gb:ge] -= g[lb:le]
-            self.results['forces'] = np.reshape(forces, (len(atoms), 3))
-        if 'hessian' not in self.results:
+            self.results['forces'] = forces
+        if 'hessian' in properties and 'hessian' not in self.results:
             hessian = np.zeros((3 * len(atoms), 3 * len(atoms)))
             for morse in self.morses:
                 i, j, h = ff.get_morse_potential_hessian(atoms, morse)
@@ -146,8 +133,34 @@ class ForceField(Calculator):
                         hessian[gb1:ge1, gb2:ge2] += h[lb1:le1, lb2:le2]
             self.results['hessian'] = hessian
 
+    def check_state(self, atoms, tol=1e-15):
+        system_changes = Calculator.check_state(self, atoms, tol)
+        if self._topology_terms is not None and self._terms_changed():
+            system_changes.append('terms')
+        return system_changes
+
+    def _terms(self):
+        """All term objects, to notice changed lists."""
+        return tuple(map(tuple, [self.morses, self.bonds, self.angles,
+                                 self.dihedrals, self.vdws, self.coulombs]))
+
+    def _terms_changed(self):
+        """Whether terms were added, removed or replaced since the
+        topology was built."""
+        if self._topology_terms is None:
+            return True
+        for old, new in zip(self._topology_terms, self._terms()):
+            if len(old) != len(new) or any(
+                    a is not b for a, b in zip(old, new)):
+                return True
+        return False
+
     def get_hessian(self, atoms=None):
-        return self.get_property('hessian', atoms)
+        if atoms is None:
+            atoms = self.atoms
+        if self.calculation_required(atoms, ['hessian']):
+            self.calculate(atoms, ['hessian'], self.check_state(atoms))
+        return self.results['hessian'].copy()
 
 
 def get_limits(indices):
@@ -161,4 +174,4 @@ def get_limits(indices):
         gstops.append(g3 + 3)
         lstarts.append(l3)
         lstops.append(l3 + 3)
-    return zip(gstarts, gstops, lstarts, lstops)
+    return list(zip(gstarts, gstops, lstarts, lstops))
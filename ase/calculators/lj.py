@@ -1,8 +1,9 @@
 import numpy as np
 
-from ase.neighborlist import NeighborList
+from ase.neighborlist import NeighborList, NewPrimitiveNeighborList
 from ase.calculators.calculator import Calculator, all_changes
-from ase.stress import full_3x3_to_voigt_6_stress
+from ase.calculators.pairpotential import pair_sums, pair_vectors
+from ase.utils.cext import cextension
 
 
 class LennardJones(Calculator):
@@ -162,6 +163,13 @@ class LennardJones(Calculator):
 
         self.nl = None
 
+    def set(self, **kwargs):
+        changed_parameters = Calculator.set(self, **kwargs)
+        if changed_parameters:
+            # The cutoff may have changed:
+            self.nl = None
+        return changed_parameters
+
     def calculate(
         self,
         atoms=None,
@@ -183,61 +191,20 @@ class LennardJones(Calculator):
 
         if self.nl is None or 'numbers' in system_changes:
             self.nl = NeighborList(
-                [rc / 2] * natoms, self_interaction=False, bothways=True
+                [rc / 2] * natoms, self_interaction=False, bothways=True,
+                primitive=NewPrimitiveNeighborList
             )
 
         self.nl.update(self.atoms)
 
-        positions = self.atoms.positions
-        cell = self.atoms.cell
-
-        # potential value at rc
-        e0 = 4 * epsilon * ((sigma / rc) ** 12 - (sigma / rc) ** 6)
-
-        energies = np.zeros(natoms)
-        forces = np.zeros((natoms, 3))
-        stresses = np.zeros((natoms, 3, 3))
-
-        for ii in range(natoms):
-            neighbors, offsets = self.nl.get_neighbors(ii)
-            cells = np.dot(offsets, cell)
-
-            # pointing *towards* neighbours
-            distance_vectors = positions[neighbors] + cells - positions[ii]
-
-            r2 = (distance_vectors ** 2).sum(1)
-            c6 = (sigma ** 2 / r2) ** 3
-            c6[r2 > rc ** 2] = 0.0
-            c12 = c6 ** 2
-
-            if smooth:
-                cutoff_fn = cutoff_function(r2, rc**2, ro**2)
-                d_cutoff_fn = d_cutoff_function(r2, rc**2, ro**2)
-
-            pairwise_energies = 4 * epsilon * (c12 - c6)
-            pairwise_forces = -24 * epsilon * (2 * c12 - c6) / r2  # du_ij
-
-            if smooth:
-                # order matters, otherwise the pairwise energy is already modified
-                pairwise_forces = (
-                    cutoff_fn * pairwise_forces + 2 * d_cutoff_fn * pairwise_energies
-                )
-                pairwise_energies *= cutoff_fn
-            else:
-                pairwise_energies -= e0 * (c6 != 0.0)
-
-            pairwise_forces = pairwise_forces[:, np.newaxis] * distance_vectors
-
-            energies[ii] += 0.5 * pairwise_energies.sum()  # atomic energies
-            forces[ii] += pairwise_forces.sum(axis=0)
-
-            stresses[ii] += 0.5 * np.dot(
-                pairwise_forces.T, distance_vectors
-            )  # equivalent to outer product
+        # The pair list is 'bothways', see above:
+        i, D = pair_vectors(self.nl, self.atoms)
+        energies, forces, stresses = lj_kernel(
+            i, D, natoms, sigma, epsilon, rc, ro, smooth,
+            virial=self.atoms.cell.rank == 3)
 
         # no lattice, no stress
         if self.atoms.cell.rank == 3:
-            stresses = full_3x3_to_voigt_6_stress(stresses)
             self.results['stress'] = stresses.sum(axis=0) / self.atoms.get_volume()
             self.results['stresses'] = stresses / self.atoms.get_volume()
 
@@ -250,6 +217,44 @@ class LennardJones(Calculator):
         self.results['forces'] = forces
 
 
+@cextension
+def lj_kernel(i, D, natoms, sigma, epsilon, rc, ro, smooth, virial=True):
+    """Lennard-Jones energies, forces and virials from a pair list.
+
+    i and D are the first atoms and distance vectors of the pairs, with
+    every pair listed in both directions.  Pairs beyond rc are ignored.
+    Returns the atomic energies, forces and virials (see
+    :func:`ase.calculators.pairpotential.pair_sums`).
+
+    A compiled version from ase_ext is used if available."""
+    # potential value at rc
+    e0 = 4 * epsilon * ((sigma / rc) ** 12 - (sigma / rc) ** 6)
+
+    r2 = (D ** 2).sum(1)
+    c6 = (sigma ** 2 / r2) ** 3
+    c6[r2 > rc ** 2] = 0.0
+    c12 = c6 ** 2
+
+    pairwise_energies = 4 * epsilon * (c12 - c6)
+    pairwise_forces = -24 * epsilon * (2 * c12 - c6) / r2  # du_ij
+
+    if smooth:
+        cutoff_fn = cutoff_function(r2, rc**2, ro**2)
+        d_cutoff_fn = d_cutoff_function(r2, rc**2, ro**2)
+        # order matters, otherwise the pairwise energy is already modified
+        pairwise_forces = (
+            cutoff_fn * pairwise_forces + 2 * d_cutoff_fn * pairwise_energies
+        )
+        pairwise_energies *= cutoff_fn
+    else:
+        pairwise_energies -= e0 * (c6 != 0.0)
+
+    # D points *towards* the neighbours
+    pairwise_forces = pairwise_forces[:, np.newaxis] * D
+    return pair_sums(i, natoms, pairwise_energies, pairwise_forces, D,
+                     virial=virial)
+
+
 def cutoff_function(r, rc, ro):
     """Smooth cutoff function.
 
@@ -1,7 +1,9 @@
 import numpy as np
 
 from ase.calculators.calculator import Calculator
-from ase.neighborlist import neighbor_list
+from ase.calculators.pairpotential import pair_sums, pair_vectors
+from ase.neighborlist import NeighborList, NewPrimitiveNeighborList
+from ase.utils.cext import cextension
 
 
 def fcut(r, r0, r1):
@@ -28,13 +30,37 @@ def fcut_d(r, r0, r1):
              ((30 * s**4 - 60 * s**3 + 30 * s**2) / (r1 - r0)))
 
 
+@cextension
+def morse_kernel(i, D, natoms, epsilon, rho0, r0, rcut1, rcut2,
+                 virial=True):
+    """Morse energies, forces and virials from a pair list.
+
+    i and D are the first atoms and distance vectors of the pairs, with
+    every pair listed in both directions.  Pairs beyond rcut2 are
+    ignored.  Returns the atomic energies, forces and virials (see
+    :func:`ase.calculators.pairpotential.pair_sums`).
+
+    A compiled version from ase_ext is used if available."""
+    d = np.sqrt((D**2).sum(1))
+    dhat = D / d[:, None]
+
+    expf = np.exp(rho0 * (1.0 - d / r0))
+    fc = fcut(d, rcut1, rcut2)
+
+    E = epsilon * expf * (expf - 2)
+    dE = -2 * epsilon * rho0 / r0 * expf * (expf - 1)
+    F = (dE * fc + E * fcut_d(d, rcut1, rcut2))[:, None] * dhat
+    return pair_sums(i, natoms, E * fc, F, D, virial=virial)
+
+
 class MorsePotential(Calculator):
     """Morse potential.
 
     Default values chosen to be similar as Lennard-Jones.
     """
 
-    implemented_properties = ['energy', 'forces']
+    implemented_properties = ['energy', 'energies', 'free_energy', 'forces',
+                              'stress', 'stresses']
     default_parameters = {'epsilon': 1.0,
                           'rho0': 6.0,
                           'r0': 1.0,
@@ -55,6 +81,14 @@ class MorsePotential(Calculator):
           is k = 2 * epsilon * (rho0 / r0)**2, default 6.0
         """
         Calculator.__init__(self, **kwargs)
+        self.nl = None
+
+    def set(self, **kwargs):
+        changed_parameters = Calculator.set(self, **kwargs)
+        if changed_parameters:
+            # The cutoff may have changed:
+            self.nl = None
+        return changed_parameters
 
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=['positions', 'numbers', 'cell',
@@ -66,23 +100,23 @@ class MorsePotential(Calculator):
         rcut1 = self.parameters.rcut1 * r0
         rcut2 = self.parameters.rcut2 * r0
 
-        forces = np.zeros((len(self.atoms), 3))
-        preF = - 2 * epsilon * rho0 / r0
-
-        i, j, d, D = neighbor_list('ijdD', atoms, rcut2)
-        dhat = (D / d[:, None]).T
-
-        expf = np.exp(rho0 * (1.0 - d / r0))
-        fc = fcut(d, rcut1, rcut2)
-
-        E = epsilon * expf * (expf - 2)
-        dE = preF * expf * (expf - 1) * dhat
-        energy = 0.5 * (E * fc).sum()
+        if self.nl is None or 'numbers' in system_changes:
+            self.nl = NeighborList([rcut2 / 2] * len(self.atoms),
+                                   self_interaction=False, bothways=True,
+                                   primitive=NewPrimitiveNeighborList)
+        self.nl.update(self.atoms)
 
-        F = (dE * fc + E * fcut_d(d, rcut1, rcut2) * dhat).T
-        for dim in range(3):
-            forces[:, dim] = np.bincount(i, weights=F[:, dim],
-                                         minlength=len(atoms))
+        i, D = pair_vectors(self.nl, self.atoms)
+        energies, forces, stresses = morse_kernel(
+            i, D, len(self.atoms), epsilon, rho0, r0, rcut1, rcut2,
+            virial=self.atoms.cell.rank == 3)
 
+        energy = energies.sum()
         self.results['energy'] = energy
+        self.results['energies'] = energies
+        self.results['free_energy'] = energy
         self.results['forces'] = forces
+        if self.atoms.cell.rank == 3:
+            volume = self.atoms.get_volume()
+            self.results['stress'] = stresses.sum(axis=0) / volume
+            self.results['stresses'] = stresses / volume
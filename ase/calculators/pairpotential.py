@@ -0,0 +1,181 @@
+"""Pair lists and per-atom sums for pair potentials.
+
+Also contains the molecule pair search and site-site interactions of
+the rigid molecule force fields (TIP3P, TIP4P and ACN)."""
+
+import numpy as np
+
+import ase.units as units
+from ase.geometry.cell import complete_cell
+
+
+def pair_vectors(nl, atoms):
+    """Return first atoms and distance vectors of all pairs in nl.
+
+    nl must be an up-to-date :class:`~ase.neighborlist.NeighborList`
+    with bothways=True and the
+    :class:`~ase.neighborlist.NewPrimitiveNeighborList`, whose pair
+    arrays are used directly.  The list may contain pairs beyond the
+    cutoff (by up to twice the skin)."""
+    pnl = nl.nl
+    D = atoms.positions[pnl.pair_second] - atoms.positions[pnl.pair_first]
+    D += pnl.offset_vec @ atoms.cell
+    return pnl.pair_first, D
+
+
+# Voigt order of the virial components:
+voigt_pairs = [(0, 0), (1, 1), (2, 2), (1, 2), (0, 2), (0, 1)]
+
+
+def pair_sums(i, natoms, pair_energies, pair_forces, D, virial=True):
+    """Sum pair contributions into atomic energies, forces and virials.
+
+    The pair list must contain every pair twice, i.e. both i-j and j-i,
+    as returned by :func:`ase.neighborlist.neighbor_list`.
+
+    i: int ndarray
+        First atom of each pair.  Contributions are added to this atom.
+    natoms: int
+        Number of atoms.
+    pair_energies: ndarray
+        Pair energies u_ij.  Half of each goes to atom i.
+    pair_forces: ndarray of shape (npairs, 3)
+        Force f_ij on atom i from atom j.
+    D: ndarray of shape (npairs, 3)
+        Distance vectors pointing from atom i to atom j.
+    virial: bool
+        Whether to calculate the atomic virials.
+
+    Returns energies, forces and virials.  The atomic virials
+    1/2 sum_j f_ij (x) d_ij are in Voigt order with shape (natoms, 6),
+    or None if virial is False."""
+    energies = 0.5 * np.bincount(i, weights=pair_energies, minlength=natoms)
+    forces = np.empty((natoms, 3))
+    for c in range(3):
+        forces[:, c] = np.bincount(i, weights=pair_forces[:, c],
+                                   minlength=natoms)
+    if not virial:
+        return energies, forces, None
+
+    virials = np.empty((natoms, 6))
+    for v, (a, b) in enumerate(voigt_pairs):
+        virials[:, v] = 0.5 * np.bincount(
+            i, weights=pair_forces[:, a] * D[:, b], minlength=natoms)
+    return energies, forces, virials
+
+
+def molecule_pairs(centers, cell, pbc, rc):
+    """Find all pairs of molecules with centers closer than rc.
+
+    The pairs are found with a cell list, so the cost is linear in the
+    number of molecules.  Any cell can be used, but periodic directions
+    must be at least 2 * rc wide, so that only one image of each pair is
+    within the cutoff.
+
+    Returns the indices i < j of the molecules and the shift vectors to
+    be added to the positions of molecule j."""
+    from ase.neighborlist import primitive_neighbor_list
+
+    cell = complete_cell(cell)
+    pbc = np.asarray(pbc, bool)
+    heights = 1 / np.linalg.norm(np.linalg.inv(cell), axis=0)
+    assert ((heights >= 2 * rc) | ~pbc).all(), 'cutoff too large'
+
+    if len(centers) < 2:
+        return np.empty(0, int), np.empty(0, int), np.empty((0, 3))
+
+    i, j, S = primitive_neighbor_list('ijS', pbc, cell, centers, rc)
+    mask = i < j
+    return i[mask], j[mask], S[mask] @ cell
+
+
+def molecule_cutoff(d, rc, width):
+    """Cutoff function of the molecule center distances and its derivative.
+
+    Goes smoothly from 1 to 0 between rc - width and rc."""
+    x1 = d > rc - width
+    x2 = d < rc
+    x12 = np.logical_and(x1, x2)
+    y = (d[x12] - rc + width) / width
+    t = np.zeros(len(d))  # cutoff function
+    t[x2] = 1.0
+    t[x12] -= y**2 * (3.0 - 2.0 * y)
+    dtdd = np.zeros(len(d))
+    dtdd[x12] -= 6.0 / width * y * (1.0 - y)
+    return t, dtdd
+
+
+def rigid_molecule_interactions(positions, charges, sigma, epsilon, pbc,
+                                cell, rc, width, center, blocksize=10000):
+    """Coulomb and Lennard-Jones interactions between rigid molecules.
+
+    All molecules have the same sites, and all sites of two molecules
+    interact if their centers are closer than rc.  The interactions are
+    multiplied by :func:`molecule_cutoff` of the center distance.  The
+    molecule pairs are evaluated in vectorized blocks of blocksize
+    pairs.
+
+    positions: ndarray of shape (nmol, nsites, 3)
+        Positions of the sites.
+    charges: ndarray of shape (nsites,)
+        Charges of the sites.
+    sigma, epsilon: ndarrays of shape (nsites, nsites)
+        Lennard-Jones parameters of each pair of sites.  Pairs of sites
+        with zero epsilon have no Lennard-Jones interaction.
+    center: int
+        The site used as molecule center for the cutoff.
+
+    Returns the energy and the forces on the sites with shape
+    (nmol * nsites, 3)."""
+    nmol, nsites = positions.shape[:2]
+    k_c = units.Hartree * units.Bohr
+    qq = k_c * np.outer(charges, charges)
+    lj_k, lj_l = np.nonzero(epsilon)
+    lj_sigma6 = sigma[lj_k, lj_l]**6
+    lj_epsilon = epsilon[lj_k, lj_l]
+    sites = np.arange(nsites)
+
+    i, j, shift = molecule_pairs(positions[:, center], cell, pbc, rc)
+
+    energy = 0.0
+    forces = np.zeros((nmol * nsites, 3))
+    for start in range(0, len(i), blocksize):
+        bi = i[start:start + blocksize]
+        bj = j[start:start + blocksize]
+        Ri = positions[bi]
+        Rj = positions[bj] + shift[start:start + blocksize, np.newaxis]
+
+        Dc = Rj[:, center] - Ri[:, center]
+        dc = np.sqrt((Dc**2).sum(1))
+        t, dtdd = molecule_cutoff(dc, rc, width)
+
+        # Vectors from site k of molecule i to site l of molecule j:
+        D = Rj[:, np.newaxis] - Ri[:, :, np.newaxis]
+        r2 = (D**2).sum(3)
+        e = qq / np.sqrt(r2)
+        f = e / r2
+        if len(lj_k):
+            r2lj = r2[:, lj_k, lj_l]
+            c6 = lj_sigma6 / r2lj**3
+            c12 = c6**2
+            e[:, lj_k, lj_l] += 4 * lj_epsilon * (c12 - c6)
+            f[:, lj_k, lj_l] += 24 * lj_epsilon * (2 * c12 - c6) / r2lj
+
+        epair = e.sum(axis=(1, 2))
+        energy += np.dot(t, epair)
+
+        # Forces on the sites of molecule j (and minus on molecule i):
+        F = (f * t[:, np.newaxis, np.newaxis])[..., np.newaxis] * D
+        Fcut = -(epair * dtdd / dc)[:, np.newaxis] * Dc
+        Fj = F.sum(axis=1)
+        Fj[:, center] += Fcut
+        Fi = -F.sum(axis=2)
+        Fi[:, center] -= Fcut
+
+        index = np.concatenate([(bj[:, np.newaxis] * nsites + sites).ravel(),
+                                (bi[:, np.newaxis] * nsites + sites).ravel()])
+        weights = np.concatenate([Fj.reshape(-1, 3), Fi.reshape(-1, 3)])
+        for c in range(3):
+            forces[:, c] += np.bincount(index, weights=weights[:, c],
+                                        minlength=nmol * nsites)
+    return energy, forces
@@ -1,5 +1,8 @@
 import os
+import selectors
 import socket
+import time
+from collections import deque
 from subprocess import Popen, PIPE
 from contextlib import contextmanager
 
@@ -20,6 +23,18 @@ class SocketClosed(OSError):
     pass
 
 
+def convert_results(atoms, results):
+    """Convert results from IPIProtocol.calculate() to calculator results.
+
+    The virial is replaced by the stress for periodic systems."""
+    results['free_energy'] = results['energy']
+    virial = results.pop('virial')
+    if atoms.cell.rank == 3 and any(atoms.pbc):
+        vol = atoms.get_volume()
+        results['stress'] = -full_3x3_to_voigt_6_stress(virial) / vol
+    return results
+
+
 class IPIProtocol:
     """Communication using IPI protocol."""
 
@@ -38,25 +53,32 @@ class IPIProtocol:
     def sendmsg(self, msg):
         self.log('  sendmsg', repr(msg))
         # assert msg in self.statements, msg
-        msg = msg.encode('ascii').ljust(12)
-        self.socket.sendall(msg)
+        self.socket.sendall(self._header(msg))
+
+    @staticmethod
+    def _header(msg):
+        return msg.encode('ascii').ljust(12)
 
     def _recvall(self, nbytes):
         """Repeatedly read chunks until we have nbytes.
 
         Normally we get all bytes in one read, but that is not guaranteed."""
-        remaining = nbytes
-        chunks = []
-        while remaining > 0:
-            chunk = self.socket.recv(remaining)
-            if len(chunk) == 0:
+        buf = bytearray(nbytes)
+        self._recv_into(buf)
+        return bytes(buf)
+
+    def _recv_into(self, buf):
+        """Fill the writable buffer buf with bytes from the socket.
+
+        The bytes are received directly into buf without creating
+        intermediate bytes objects."""
+        view = memoryview(buf).cast('B')
+        while len(view) > 0:
+            nbytes = self.socket.recv_into(view)
+            if nbytes == 0:
                 # (If socket is still open, recv returns at least one byte)
                 raise SocketClosed()
-            chunks.append(chunk)
-            remaining -= len(chunk)
-        msg = b''.join(chunks)
-        assert len(msg) == nbytes and remaining == 0
-        return msg
+            view = view[nbytes:]
 
     def recvmsg(self):
         msg = self._recvall(12)
@@ -69,35 +91,60 @@ class IPIProtocol:
         self.log('  recvmsg', repr(msg))
         return msg
 
+    def _sendall(self, *items):
+        """Send messages and arrays with a single write.
+
+        Items are message strings or (array, dtype) pairs.  Writing
+        everything at once avoids a packet per array, which together
+        with Nagle's algorithm can stall INET sockets for tens of
+        milliseconds.  The arrays are sent from memoryviews with
+        sendmsg() without being copied."""
+        buffers = []
+        for item in items:
+            if isinstance(item, str):
+                self.log('  sendmsg', repr(item))
+                buffers.append(self._header(item))
+            else:
+                a = np.ascontiguousarray(item[0], item[1])
+                self.log('  send {} bytes of {}'.format(a.nbytes, a.dtype))
+                buffers.append(memoryview(a).cast('B'))
+        if len(buffers) == 1:
+            self.socket.sendall(buffers[0])
+        elif not hasattr(self.socket, 'sendmsg'):  # Windows
+            self.socket.sendall(b''.join(buffers))
+        else:
+            while buffers:
+                nbytes = self.socket.sendmsg(buffers)
+                # Drop what was sent and send the rest:
+                while buffers and nbytes >= len(buffers[0]):
+                    nbytes -= len(buffers.pop(0))
+                if nbytes:
+                    buffers[0] = memoryview(buffers[0])[nbytes:]
+
     def send(self, a, dtype):
-        buf = np.asarray(a, dtype).tobytes()
-        # self.log('  send {}'.format(np.array(a).ravel().tolist()))
-        self.log('  send {} bytes of {}'.format(len(buf), dtype))
-        self.socket.sendall(buf)
+        self._sendall((a, dtype))
 
     def recv(self, shape, dtype):
         a = np.empty(shape, dtype)
-        nbytes = np.dtype(dtype).itemsize * np.prod(shape)
-        buf = self._recvall(nbytes)
-        assert len(buf) == nbytes, (len(buf), nbytes)
-        self.log('  recv {} bytes of {}'.format(len(buf), dtype))
-        # print(np.frombuffer(buf, dtype=dtype))
-        a.flat[:] = np.frombuffer(buf, dtype=dtype)
+        self._recv_into(a)
+        self.log('  recv {} bytes of {}'.format(a.nbytes, dtype))
         # self.log('  recv {}'.format(a.ravel().tolist()))
         assert np.isfinite(a).all()
         return a
 
-    def sendposdata(self, cell, icell, positions):
+    def _posdata(self, cell, icell, positions):
         assert cell.size == 9
         assert icell.size == 9
         assert positions.size % 3 == 0
+        return ['POSDATA',
+                (cell.T / units.Bohr, np.float64),
+                (icell.T * units.Bohr, np.float64),
+                (len(positions), np.int32),
+                (positions / units.Bohr, np.float64)]
 
+    def sendposdata(self, cell, icell, positions):
         self.log(' sendposdata')
-        self.sendmsg('POSDATA')
-        self.send(cell.T / units.Bohr, np.float64)
-        self.send(icell.T * units.Bohr, np.float64)
-        self.send(len(positions), np.int32)
-        self.send(positions / units.Bohr, np.float64)
+        self._sendall(*self._posdata(cell, icell, positions))
 
     def recvposdata(self):
         cell = self.recv((3, 3), np.float64).T.copy()
@@ -134,17 +181,16 @@ class IPIProtocol:
         assert virial.shape == (3, 3)
 
         self.log(' sendforce')
-        self.sendmsg('FORCEREADY')  # mind the units
-        self.send(np.array([energy / units.Ha]), np.float64)
-        natoms = len(forces)
-        self.send(np.array([natoms]), np.int32)
-        self.send(units.Bohr / units.Ha * forces, np.float64)
-        self.send(1.0 / units.Ha * virial.T, np.float64)
         # We prefer to always send at least one byte due to trouble with
         # empty messages.  Reading a closed socket yields 0 bytes
         # and thus can be confused with a 0-length bytestring.
-        self.send(np.array([len(morebytes)]), np.int32)
-        self.send(morebytes, np.byte)
+        self._sendall('FORCEREADY',  # mind the units
+                      (energy / units.Ha, np.float64),
+                      (len(forces), np.int32),
+                      (units.Bohr / units.Ha * forces, np.float64),
+                      (1.0 / units.Ha * virial.T, np.float64),
+                      (len(morebytes), np.int32),
+                      (morebytes, np.byte))
 
     def status(self):
         self.log(' status')
@@ -163,30 +209,44 @@ class IPIProtocol:
         initbytes = self.recv(nbytes, np.byte)
         return bead_index, initbytes
 
+    def _init(self):
+        # 'bead index' always zero for now.
+        # We send one byte, which is zero, since things may not work
+        # with 0 bytes.  Apparently implementations ignore the
+        # initialization string anyway.
+        return ['INIT', (0, np.int32), (1, np.int32),
+                (np.zeros(1), np.byte)]  # initialization string
+
     def sendinit(self):
         # XXX Not sure what this function is supposed to send.
         # It 'works' with QE, but for now we try not to call it.
         self.log(' sendinit')
-        self.sendmsg('INIT')
-        self.send(0, np.int32)  # 'bead index' always zero for now
-        # We send one byte, which is zero, since things may not work
-        # with 0 bytes.  Apparently implementations ignore the
-        # initialization string anyway.
-        self.send(1, np.int32)
-        self.send(np.zeros(1), np.byte)  # initialization string
+        self._sendall(*self._init())
 
-    def calculate(self, positions, cell):
-        self.log('calculate')
+    def submit(self, positions, cell):
+        """Send positions and cell to the client without waiting for it.
+
+        The client starts calculating right away.  Call collect() to
+        wait for the results.  Between the two calls the server is free
+        to talk to other clients."""
+        self.log('submit')
         msg = self.status()
         # We don't know how NEEDINIT is supposed to work, but some codes
         # seem to be okay if we skip it and send the positions instead.
         if msg == 'NEEDINIT':
-            self.sendinit()
-            msg = self.status()
+            self.log(' sendinit')
+            self._sendall(*self._init(), 'STATUS')
+            msg = self.recvmsg()
         assert msg == 'READY', msg
         icell = np.linalg.pinv(cell).transpose()
-        self.sendposdata(cell, icell, positions)
-        msg = self.status()
+        # The client answers the STATUS once it has the forces:
+        self.log(' sendposdata')
+        self._sendall(*self._posdata(cell, icell, positions), 'STATUS')
+
+    def collect(self):
+        """Wait for the calculation started by submit() to finish."""
+        self.log('collect')
+        msg = self.recvmsg()
         assert msg == 'HAVEDATA', msg
         e, forces, virial, morebytes = self.sendrecv_force()
         r = dict(energy=e,
@@ -196,6 +256,11 @@ class IPIProtocol:
             r['morebytes'] = morebytes
         return r
 
+    def calculate(self, positions, cell):
+        self.log('calculate')
+        self.submit(positions, cell)
+        return self.collect()
+
 
 @contextmanager
 def bind_unixsocket(socketfile):
@@ -242,7 +307,7 @@ class SocketServer(IOContext):
 
     def __init__(self,  # launch_client=None,
                  port=None, unixsocket=None, timeout=None,
-                 log=None):
+                 log=None, nclients=1, tcp_nodelay=True):
         """Create server and listen for connections.
 
         Parameters:
@@ -263,7 +328,14 @@ class SocketServer(IOContext):
             This parameter is passed to the Python socket object; see
             documentation therof
         log: file object or None
-            useful debug messages are written to this."""
+            useful debug messages are written to this.
+        nclients: int
+            Number of clients to accept.  calculate_images() distributes
+            the images over the clients, which calculate them
+            concurrently.
+        tcp_nodelay: bool
+            Disable Nagle's algorithm on INET connections, so that
+            small messages are sent without delay."""
 
         if unixsocket is None and port is None:
             port = self.default_port
@@ -273,6 +345,8 @@ class SocketServer(IOContext):
         self.port = port
         self.unixsocket = unixsocket
         self.timeout = timeout
+        self.nclients = nclients
+        self.tcp_nodelay = tcp_nodelay
         self._closed = False
 
         if unixsocket is not None:
@@ -290,12 +364,15 @@ class SocketServer(IOContext):
 
         self.serversocket.settimeout(timeout)
 
-        self.serversocket.listen(1)
+        self.serversocket.listen(nclients)
 
         self.log = log
 
-        self.proc = None
+        self.procs = []
 
+        # All connected clients.  The first one is also available as
+        # self.protocol, self.clientsocket and self.address:
+        self.protocols = []
         self.protocol = None
         self.clientsocket = None
         self.address = None
@@ -303,8 +380,21 @@ class SocketServer(IOContext):
         #if launch_client is not None:
         #    self.proc = launch_client(port=port, unixsocket=unixsocket)
 
-    def _accept(self):
-        """Wait for client and establish connection."""
+    @property
+    def proc(self):
+        """Client process launched for the server (or the first one)."""
+        return self.procs[0] if self.procs else None
+
+    @proc.setter
+    def proc(self, proc):
+        self.procs = [] if proc is None else [proc]
+
+    def _accept(self, keep=True):
+        """Wait for client and establish connection.
+
+        If keep is False, the connection is neither recorded in
+        self.protocols nor closed together with the server; the caller
+        then owns the socket."""
         # It should perhaps be possible for process to be launched by user
         log = self.log
         if log:
@@ -313,16 +403,15 @@ class SocketServer(IOContext):
         # If we launched the subprocess, the process may crash.
         # We want to detect this, using loop with timeouts, and
         # raise an error rather than blocking forever.
-        if self.proc is not None:
+        if self.procs:
             self.serversocket.settimeout(1.0)
 
         while True:
             try:
-                self.clientsocket, self.address = self.serversocket.accept()
-                self.closelater(self.clientsocket)
+                clientsocket, address = self.serversocket.accept()
             except socket.timeout:
-                if self.proc is not None:
-                    status = self.proc.poll()
+                for proc in self.procs:
+                    status = proc.poll()
                     if status is not None:
                         raise OSError('Subprocess terminated unexpectedly'
                                       ' with status {}'.format(status))
@@ -330,14 +419,26 @@ class SocketServer(IOContext):
                 break
 
         self.serversocket.settimeout(self.timeout)
-        self.clientsocket.settimeout(self.timeout)
+        clientsocket.settimeout(self.timeout)
+        if self.tcp_nodelay and clientsocket.family == socket.AF_INET:
+            clientsocket.setsockopt(socket.IPPROTO_TCP,
+                                    socket.TCP_NODELAY, 1)
 
         if log:
             # For unix sockets, address is b''.
-            source = ('client' if self.address == b'' else self.address)
+            source = ('client' if address == b'' else address)
             print('Accepted connection from {}'.format(source), file=log)
 
-        self.protocol = IPIProtocol(self.clientsocket, txt=log)
+        protocol = IPIProtocol(clientsocket, txt=log)
+        if not keep:
+            return protocol
+        self.closelater(clientsocket)
+        self.protocols.append(protocol)
+        if self.protocol is None:
+            self.protocol = protocol
+            self.clientsocket = clientsocket
+            self.address = address
+        return protocol
 
     def close(self):
         if self._closed:
@@ -354,8 +455,9 @@ class SocketServer(IOContext):
         # if self.protocol is not None:
         #     self.protocol.end()  # Send end-of-communication string
         self.protocol = None
-        if self.proc is not None:
-            exitcode = self.proc.wait()
+        self.protocols = []
+        for proc in self.procs:
+            exitcode = proc.wait()
             if exitcode != 0:
                 import warnings
                 # Quantum Espresso seems to always exit with status 128,
@@ -378,10 +480,49 @@ class SocketServer(IOContext):
             self._accept()
         return self.protocol.calculate(atoms.positions, atoms.cell)
 
+    def calculate_images(self, images):
+        """Calculate several configurations concurrently.
+
+        The images are distributed over up to nclients clients, each
+        getting a new image as soon as it has finished the previous
+        one.  Returns a list with a dict of results for each image.
+        This blocks until enough clients have connected."""
+        assert not self._closed
+
+        while len(self.protocols) < min(self.nclients, len(images)):
+            self._accept()
+
+        results = [None] * len(images)
+        queue = list(enumerate(images))[::-1]
+        with selectors.DefaultSelector() as selector:
+            for protocol in self.protocols[:len(images)]:
+                i, atoms = queue.pop()
+                protocol.submit(atoms.positions, atoms.cell)
+                selector.register(protocol.socket, selectors.EVENT_READ,
+                                  (protocol, i))
+
+            while selector.get_map():
+                ready = selector.select(self.timeout)
+                if not ready:
+                    raise socket.timeout('No results from clients within '
+                                         '{} s'.format(self.timeout))
+                for key, _ in ready:
+                    protocol, i = key.data
+                    results[i] = protocol.collect()
+                    if queue:
+                        i, atoms = queue.pop()
+                        protocol.submit(atoms.positions, atoms.cell)
+                        selector.modify(key.fileobj, selectors.EVENT_READ,
+                                        (protocol, i))
+                    else:
+                        selector.unregister(key.fileobj)
+        return results
+
 
 class SocketClient:
     def __init__(self, host='localhost', port=None,
-                 unixsocket=None, timeout=None, log=None, comm=None):
+                 unixsocket=None, timeout=None, log=None, comm=None,
+                 tcp_nodelay=True):
         """Create client and connect to server.
 
         Parameters:
@@ -403,7 +544,9 @@ class SocketClient:
             will communicate over the socket.  The received information
             will then be broadcast on the communicator.  The SocketClient
             must be created on all ranks of world, and will see the same
-            Atoms objects."""
+            Atoms objects.
+        tcp_nodelay: bool
+            See documentation of tcp_nodelay for SocketServer."""
         if comm is None:
             from ase.parallel import world
             comm = world
@@ -425,6 +568,9 @@ class SocketClient:
                     port = SocketServer.default_port
                 sock = socket.socket(socket.AF_INET)
                 sock.connect((host, port))
+                if tcp_nodelay:
+                    sock.setsockopt(socket.IPPROTO_TCP,
+                                    socket.TCP_NODELAY, 1)
             sock.settimeout(timeout)
             self.host = host
             self.port = port
@@ -542,7 +688,7 @@ class SocketIOCalculator(Calculator, IOContext):
 
     def __init__(self, calc=None, port=None,
                  unixsocket=None, timeout=None, log=None, *,
-                 launch_client=None):
+                 launch_client=None, nclients=1, tcp_nodelay=True):
         """Initialize socket I/O calculator.
 
         This calculator launches a server which passes atomic
@@ -586,6 +732,18 @@ class SocketIOCalculator(Calculator, IOContext):
             logfile for communication over socket.  For debugging or
             the curious.
 
+        nclients: int
+
+            number of clients.  With more than one client,
+            :meth:`calculate_images` calculates several configurations
+            concurrently, e.g. the images of a NEB band.  If
+            launch_client is given, that many clients are launched.
+
+        tcp_nodelay: bool
+
+            disable Nagle's algorithm on INET sockets (default).  This
+            avoids delays of tens of milliseconds per step.
+
         In order to correctly close the sockets, it is
         recommended to use this class within a with-block:
 
@@ -603,10 +761,15 @@ class SocketIOCalculator(Calculator, IOContext):
         if calc is not None:
             if launch_client is not None:
                 raise ValueError('Cannot pass both calc and launch_client')
+            if nclients != 1:
+                raise ValueError('Clients launched from calc would share '
+                                 'their files; use launch_client instead')
             launch_client = FileIOSocketClientLauncher(calc)
         self.launch_client = launch_client
         #self.calc = calc
         self.timeout = timeout
+        self.nclients = nclients
+        self.tcp_nodelay = tcp_nodelay
         self.server = None
 
         self.log = self.openfile(log)
@@ -636,8 +799,17 @@ class SocketIOCalculator(Calculator, IOContext):
             port=self._port,
             unixsocket=self._unixsocket,
             timeout=self.timeout, log=self.log,
+            nclients=self.nclients, tcp_nodelay=self.tcp_nodelay,
         ))
 
+    def _launch(self, atoms, properties):
+        self.server = self.launch_server()
+        for _ in range(self.nclients):
+            proc = self.launch_client(atoms, properties,
+                                      port=self._port,
+                                      unixsocket=self._unixsocket)
+            self.server.procs.append(proc)  # XXX nasty hack
+
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=all_changes):
         bad = [change for change in system_changes
@@ -654,19 +826,25 @@ class SocketIOCalculator(Calculator, IOContext):
         self.atoms = atoms.copy()
 
         if self.server is None:
-            self.server = self.launch_server()
-            proc = self.launch_client(atoms, properties,
-                                      port=self._port,
-                                      unixsocket=self._unixsocket)
-            self.server.proc = proc  # XXX nasty hack
+            self._launch(atoms, properties)
 
         results = self.server.calculate(atoms)
-        results['free_energy'] = results['energy']
-        virial = results.pop('virial')
-        if self.atoms.cell.rank == 3 and any(self.atoms.pbc):
-            vol = atoms.get_volume()
-            results['stress'] = -full_3x3_to_voigt_6_stress(virial) / vol
-        self.results.update(results)
+        self.results.update(convert_results(self.atoms, results))
+
+    def calculate_images(self, images, properties=['energy']):
+        """Calculate several configurations concurrently.
+
+        The images are distributed over the connected clients (see
+        nclients), and a list with a dict of results (energy,
+        free_energy, forces and, for periodic systems, stress) is
+        returned for each image.  The images must have the same atoms
+        as the system the clients were started with.  The results are
+        not stored on the calculator."""
+        if self.server is None:
+            self._launch(images[0], properties)
+        results = self.server.calculate_images(images)
+        return [convert_results(atoms, r)
+                for atoms, r in zip(images, results)]
 
     def close(self):
         self.server = None
@@ -712,5 +890,405 @@ class PySocketIOClient:
         client.run(atoms, use_stress=True)
 
 
+class SocketBroker(IOContext):
+    def __init__(self, unixsocket, launch_client=None, atoms=None,
+                 nworkers=1, port=None, engine_unixsocket=None,
+                 timeout=None, client_timeout=10.0, log=None,
+                 max_calculations=None, max_failures=3, max_retries=1,
+                 poll_interval=1.0):
+        """Share persistent engine clients between many ASE processes.
+
+        The broker keeps nworkers i-PI clients (engines) running and
+        listens for ASE processes on a unix socket.  These connect using
+        :class:`SocketBrokerCalculator`.  Their configurations are queued
+        and each is sent to the next idle engine, so the engines are
+        started only once, however many processes use them.
+
+        Towards the ASE processes the broker behaves like an i-PI
+        client, so they drive it with the usual :class:`IPIProtocol`.
+
+        Parameters:
+
+        unixsocket: str
+            Name of the unix socket on which ASE processes connect (see
+            SocketIOCalculator).
+        launch_client: callable or None
+            Launches an engine, e.g. :class:`PySocketIOClient`.  Called
+            like launch_client of SocketIOCalculator.  If None, the
+            engines must be started by the user and connect themselves.
+        atoms: Atoms or None
+            System that the engines are started with.  Required with
+            launch_client.  Requests with another number of atoms are
+            refused.
+        nworkers: int
+            Number of engines.
+        port, engine_unixsocket: int or str
+            Socket on which the engines connect.  By default the unix
+            socket ``<unixsocket>-engine``.
+        timeout: float or None
+            Timeout of the engine sockets, see SocketServer.
+        client_timeout: float or None
+            Timeout of the sockets of the ASE processes.
+        log: file object, str or None
+            Connections, restarts and statistics are written to this.
+            Use '-' for stdout.
+        max_calculations: int or None
+            Restart an engine gracefully after this many calculations,
+            e.g. to limit the effect of memory leaks.
+        max_failures: int
+            Give up when more engine processes than this have crashed.
+        max_retries: int
+            How many times a configuration is resubmitted when its
+            engine fails.  After that the ASE process is disconnected.
+        poll_interval: float
+            Interval in seconds for checking engine processes and
+            :meth:`stop`.
+
+        All connections are served by a single thread.  A message is
+        read only once its socket is readable, but then the broker
+        blocks until the message is complete.  A connection that stops
+        in the middle of a message therefore stalls every other
+        connection for up to client_timeout (ASE processes) or timeout
+        (engines) seconds, after which it is dropped.  With a timeout of
+        None it stalls the broker indefinitely.
+
+        Serve until interrupted::
+
+            with SocketBroker('dftb', PySocketIOClient(DFTB), atoms,
+                              nworkers=4) as broker:
+                broker.serve()
+        """
+        if launch_client is not None and atoms is None:
+            raise ValueError('Engines launched by the broker need atoms')
+        if port is None and engine_unixsocket is None:
+            engine_unixsocket = '{}-engine'.format(unixsocket)
+
+        self.launch_client = launch_client
+        self.atoms = atoms
+        self.nworkers = nworkers
+        self.timeout = timeout
+        self.client_timeout = client_timeout
+        self.log = self.openfile(log)
+        self.max_calculations = max_calculations
+        self.max_failures = max_failures
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+
+        self.server = self.closelater(SocketServer(
+            port=port, unixsocket=engine_unixsocket, timeout=timeout,
+            log=self.log, nclients=nworkers))
+        self.serversocket = self.closelater(
+            bind_unixsocket(actualunixsocketname(unixsocket)))
+        self.serversocket.listen()
+
+        self.selector = self.closelater(selectors.DefaultSelector())
+        self.selector.register(self.server.serversocket,
+                               selectors.EVENT_READ, self._accept_worker)
+        self.selector.register(self.serversocket, selectors.EVENT_READ,
+                               self._accept_client)
+
+        self.queue = deque()
+        self.workers = []
+        self.clients = []
+        self.nfailures = 0
+        self._nclients = 0
+        self._stop = False
+
+        # Statistics for each client and engine connection ever made:
+        self.client_statistics = {}
+        self.worker_statistics = []
+
+    def _print(self, *args):
+        print('Broker:', *args, file=self.log)
+        self.log.flush()
+
+    def stop(self):
+        """Make serve() return.  May be called from another thread."""
+        self._stop = True
+
+    def serve(self):
+        """Serve requests until stop() is called."""
+        self._stop = False
+        while not self._stop:
+            self._check_procs()
+            self._dispatch()
+            registered = self.selector.get_map().values()
+            for key, _ in self.selector.select(self.poll_interval):
+                # A handler may have closed another socket of this batch:
+                if key in registered:
+                    key.data(key.fileobj)
+
+    def _check_procs(self):
+        """Relaunch engine processes that have exited."""
+        for proc in list(self.server.procs):
+            status = proc.poll()
+            if status is None:
+                continue
+            self.server.procs.remove(proc)
+            if status != 0:
+                self.nfailures += 1
+                self._print('Engine process exited with status {}'
+                            .format(status))
+
+        if self.launch_client is None:
+            return
+
+        while len(self.server.procs) < self.nworkers:
+            if self.nfailures > self.max_failures:
+                raise RuntimeError('{} engine processes failed'
+                                   .format(self.nfailures))
+            self._print('Launching engine')
+            proc = self.launch_client(self.atoms, port=self.server.port,
+                                      unixsocket=self.server.unixsocket)
+            self.server.procs.append(proc)
+
+    def _accept_worker(self, sock):
+        # The broker keeps track of its engines itself:
+        protocol = self.server._accept(keep=False)
+        worker = _BrokerWorker(protocol)
+        self.workers.append(worker)
+        self.worker_statistics.append(worker.statistics)
+        self.selector.register(protocol.socket, selectors.EVENT_READ,
+                               self._collect)
+
+    def _accept_client(self, sock):
+        clientsocket, _ = sock.accept()
+        clientsocket.settimeout(self.client_timeout)
+        self._nclients += 1
+        client = _BrokerClient(self._nclients,
+                               IPIProtocol(clientsocket, txt=self.log))
+        self.clients.append(client)
+        self.client_statistics[client.id] = client.statistics
+        self.selector.register(clientsocket, selectors.EVENT_READ,
+                               self._serve_client)
+        self._print('Client {} connected'.format(client.id))
+
+    def _find(self, objs, sock):
+        return next(obj for obj in objs if obj.protocol.socket is sock)
+
+    def _serve_client(self, sock):
+        """Answer the next message from an ASE process."""
+        client = self._find(self.clients, sock)
+        protocol = client.protocol
+        try:
+            msg = protocol.recvmsg()
+            if msg == 'STATUS':
+                if client.job is None:
+                    protocol.sendmsg(client.state)
+                else:
+                    # Answered when the result is there, like a
+                    # client that is busy calculating:
+                    client.status_pending = True
+            elif msg == 'POSDATA':
+                cell, icell, positions = protocol.recvposdata()
+                if self.atoms is not None and len(positions) != len(
+                        self.atoms):
+                    raise ValueError('Expected {} atoms, got {}'.format(
+                        len(self.atoms), len(positions)))
+                client.job = _BrokerJob(client, positions, cell)
+                self.queue.append(client.job)
+            elif msg == 'GETFORCE':
+                assert client.state == 'HAVEDATA', client.state
+                protocol.sendforce(**client.results)
+                client.results = None
+                client.state = 'READY'
+            elif msg == 'INIT':
+                protocol.recvinit()
+            elif msg == 'EXIT':
+                raise SocketClosed()
+            else:
+                raise KeyError('Bad message', msg)
+        except (OSError, KeyError, ValueError, AssertionError) as err:
+            self._disconnect(client, err)
+
+    def _disconnect(self, client, err=None):
+        self.selector.unregister(client.protocol.socket)
+        client.protocol.socket.close()
+        self.clients.remove(client)
+        if client.job is not None:
+            if client.job in self.queue:
+                self.queue.remove(client.job)
+            client.job.client = None
+        stats = client.statistics
+        self._print('Client {} disconnected{}: {} calculations, '
+                    '{:.3f} s queued, {:.3f} s calculating'
+                    .format(client.id,
+                            '' if isinstance(err, SocketClosed) or err is None
+                            else ' ({!r})'.format(err),
+                            stats['ncalculations'], stats['queue_time'],
+                            stats['calculation_time']))
+
+    def _dispatch(self):
+        """Submit queued configurations to idle engines."""
+        for worker in self.workers:
+            if not self.queue:
+                break
+            if worker.job is not None:
+                continue
+            job = self.queue.popleft()
+            job.started = time.perf_counter()
+            job.ntries += 1
+            worker.job = job
+            try:
+                worker.protocol.submit(job.positions, job.cell)
+            except OSError as err:
+                self._fail(worker, err)
+
+    def _collect(self, sock):
+        worker = self._find(self.workers, sock)
+        job = worker.job
+        if job is None:
+            # Idle engines only become readable when they close:
+            self._remove_worker(worker, 'closed the connection')
+            return
+
+        try:
+            results = worker.protocol.collect()
+        except OSError as err:
+            self._fail(worker, err)
+            return
+
+        worker.job = None
+        now = time.perf_counter()
+        worker.statistics['ncalculations'] += 1
+        worker.statistics['busy_time'] += now - job.started
+
+        client = job.client
+        if client is not None:
+            stats = client.statistics
+            stats['ncalculations'] += 1
+            stats['queue_time'] += job.started - job.submitted
+            stats['calculation_time'] += now - job.started
+            client.job = None
+            client.results = dict(
+                energy=results['energy'], forces=results['forces'],
+                virial=results['virial'])
+            if 'morebytes' in results:
+                client.results['morebytes'] = results['morebytes']
+            client.state = 'HAVEDATA'
+            if client.status_pending:
+                client.status_pending = False
+                try:
+                    client.protocol.sendmsg('HAVEDATA')
+                except OSError as err:
+                    self._disconnect(client, err)
+
+        if (self.max_calculations is not None and
+                worker.statistics['ncalculations'] >= self.max_calculations):
+            try:
+                worker.protocol.end()
+            except OSError:
+                pass
+            self._remove_worker(worker, 'retired')
+
+    def _fail(self, worker, err):
+        """Remove a broken engine and resubmit its configuration."""
+        job = worker.job
+        worker.job = None
+        self._remove_worker(worker, 'failed ({!r})'.format(err))
+        if job.client is None:
+            return
+        if job.ntries > self.max_retries:
+            self._disconnect(job.client, err)
+        else:
+            self.queue.appendleft(job)
+
+    def _remove_worker(self, worker, reason):
+        self.selector.unregister(worker.protocol.socket)
+        worker.protocol.socket.close()
+        self.workers.remove(worker)
+        stats = worker.statistics
+        stats['status'] = reason
+        self._print('Engine {}: {} calculations, {:.3f} s busy'
+                    .format(reason, stats['ncalculations'],
+                            stats['busy_time']))
+
+    def close(self):
+        for client in list(self.clients):
+            self._disconnect(client)
+        # Ask the engines to quit so the server can wait for them:
+        for worker in list(self.workers):
+            try:
+                worker.protocol.end()
+            except OSError:
+                pass
+            self._remove_worker(worker, 'stopped')
+        super().close()
+
+
+class _BrokerJob:
+    def __init__(self, client, positions, cell):
+        self.client = client
+        self.positions = positions
+        self.cell = cell
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.ntries = 0
+
+
+class _BrokerClient:
+    def __init__(self, id, protocol):
+        self.id = id
+        self.protocol = protocol
+        self.state = 'READY'
+        self.status_pending = False
+        self.job = None
+        self.results = None
+        self.statistics = dict(ncalculations=0, queue_time=0.0,
+                               calculation_time=0.0)
+
+
+class _BrokerWorker:
+    def __init__(self, protocol):
+        self.protocol = protocol
+        self.job = None
+        self.statistics = dict(ncalculations=0, busy_time=0.0,
+                               status='running')
+
+
+class SocketBrokerCalculator(Calculator, IOContext):
+    implemented_properties = ['energy', 'free_energy', 'forces', 'stress']
+    supported_changes = {'positions', 'cell'}
+
+    def __init__(self, unixsocket, timeout=None, log=None):
+        """Calculate through the engines of a running SocketBroker.
+
+        unixsocket is the name of the unix socket of the broker.  The
+        atoms must have the same number of atoms (and normally the same
+        species) as the system the engines were started with."""
+        Calculator.__init__(self)
+        self.log = self.openfile(log)
+        sock = socket.socket(socket.AF_UNIX)
+        sock.connect(actualunixsocketname(unixsocket))
+        sock.settimeout(timeout)
+        self.protocol = IPIProtocol(self.closelater(sock), txt=self.log)
+
+    def todict(self):
+        return {'type': 'calculator',
+                'name': 'socket-broker'}
+
+    def calculate(self, atoms=None, properties=['energy'],
+                  system_changes=all_changes):
+        bad = [change for change in system_changes
+               if change not in self.supported_changes]
+        if self.atoms is not None and any(bad):
+            raise PropertyNotImplementedError(
+                'Cannot change {} through IPI protocol.  '
+                'Please create new socket calculator.'
+                .format(bad if len(bad) > 1 else bad[0]))
+
+        self.atoms = atoms.copy()
+        results = self.protocol.calculate(atoms.positions, atoms.cell)
+        results.pop('morebytes', None)
+        self.results.update(convert_results(self.atoms, results))
+
+    def close(self):
+        try:
+            self.protocol.end()
+        except OSError:
+            pass
+        super().close()
+
+
 if __name__ == '__main__':
     PySocketIOClient.main()
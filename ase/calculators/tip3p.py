@@ -4,6 +4,7 @@ import numpy as np
 
 import ase.units as units
 from ase.calculators.calculator import Calculator, all_changes
+from ase.calculators.pairpotential import rigid_molecule_interactions
 
 qH = 0.417
 sigma0 = 3.15061
@@ -38,12 +39,8 @@ class TIP3P(Calculator):
 
         R = self.atoms.positions.reshape((-1, 3, 3))
         Z = self.atoms.numbers
-        pbc = self.atoms.pbc
-        cell = self.atoms.cell.diagonal()
         nh2o = len(R)
 
-        assert (self.atoms.cell == np.diag(cell)).all(), 'not orthorhombic'
-        assert ((cell >= 2 * self.rc) | ~pbc).all(), 'cutoff too large'  # ???
         if Z[0] == 8:
             o = 0
         else:
@@ -55,49 +52,15 @@ class TIP3P(Calculator):
         charges = np.array([qH, qH, qH])
         charges[o] *= -2
 
-        energy = 0.0
-        forces = np.zeros((3 * nh2o, 3))
-
-        for m in range(nh2o - 1):
-            DOO = R[m + 1:, o] - R[m, o]
-            shift = np.zeros_like(DOO)
-            for i, periodic in enumerate(pbc):
-                if periodic:
-                    L = cell[i]
-                    shift[:, i] = (DOO[:, i] + L / 2) % L - L / 2 - DOO[:, i]
-            DOO += shift
-            d2 = (DOO**2).sum(1)
-            d = d2**0.5
-            x1 = d > self.rc - self.width
-            x2 = d < self.rc
-            x12 = np.logical_and(x1, x2)
-            y = (d[x12] - self.rc + self.width) / self.width
-            t = np.zeros(len(d))  # cutoff function
-            t[x2] = 1.0
-            t[x12] -= y**2 * (3.0 - 2.0 * y)
-            dtdd = np.zeros(len(d))
-            dtdd[x12] -= 6.0 / self.width * y * (1.0 - y)
-            c6 = (sigma0**2 / d2)**3
-            c12 = c6**2
-            e = 4 * epsilon0 * (c12 - c6)
-            energy += np.dot(t, e)
-            F = (24 * epsilon0 * (2 * c12 - c6) / d2 * t -
-                 e * dtdd / d)[:, np.newaxis] * DOO
-            forces[m * 3 + o] -= F.sum(0)
-            forces[m * 3 + 3 + o::3] += F
-
-            for j in range(3):
-                D = R[m + 1:] - R[m, j] + shift[:, np.newaxis]
-                r2 = (D**2).sum(axis=2)
-                r = r2**0.5
-                e = charges[j] * charges / r * units.Hartree * units.Bohr
-                energy += np.dot(t, e).sum()
-                F = (e / r2 * t[:, np.newaxis])[:, :, np.newaxis] * D
-                FOO = -(e.sum(1) * dtdd / d)[:, np.newaxis] * DOO
-                forces[(m + 1) * 3 + o::3] += FOO
-                forces[m * 3 + o] -= FOO.sum(0)
-                forces[(m + 1) * 3:] += F.reshape((-1, 3))
-                forces[m * 3 + j] -= F.sum(axis=0).sum(axis=0)
+        # Lennard-Jones only between oxygens:
+        sigma = np.zeros((3, 3))
+        epsilon = np.zeros((3, 3))
+        sigma[o, o] = sigma0
+        epsilon[o, o] = epsilon0
+
+        energy, forces = rigid_molecule_interactions(
+            R, charges, sigma, epsilon, self.atoms.pbc, self.atoms.cell,
+            self.rc, self.width, center=o)
 
         if self.pcpot:
             e, f = self.pcpot.calculate(np.tile(charges, nh2o),
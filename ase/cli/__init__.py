@@ -0,0 +1,4 @@
+from ase.utils.lazy import lazy_attributes
+
+# The sub-command modules are imported on first use, e.g. ase.cli.info
+__getattr__, __dir__ = lazy_attributes(__name__, {})
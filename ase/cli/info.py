@@ -3,8 +3,6 @@ import sys
 
 from ase.dependencies import all_dependencies
 from ase.io.formats import filetype, ioformats, UnknownFileTypeError
-from ase.io.ulm import print_ulm_info
-from ase.io.bundletrajectory import print_bundletrajectory_info
 
 
 class CLICommand:
@@ -69,8 +67,11 @@ class CLICommand:
                                         description, format))
             if args.verbose:
                 if format == 'traj':
+                    from ase.io.ulm import print_ulm_info
                     print_ulm_info(filename)
                 elif format == 'bundletrajectory':
+                    from ase.io.bundletrajectory import (
+                        print_bundletrajectory_info)
                     print_bundletrajectory_info(filename)
 
         raise SystemExit(nfiles_not_found)
@@ -58,6 +58,14 @@ def main(prog='ase', description='ASE command line tool.',
                            metavar='sub-command',
                            help='Provide help for sub-command.')
 
+    if hook is None:
+        # Only import the module of the sub-command that is run:
+        command = next((arg for arg in (sys.argv[1:] if args is None
+                                        else args)
+                        if not arg.startswith('-')), None)
+        if command in dict(commands):
+            commands = [(command, dict(commands)[command])]
+
     functions = {}
     parsers = {}
     for command, module_name in commands:
@@ -103,7 +103,8 @@ class DOS:
 
 
 def linear_tetrahedron_integration(cell, eigs, energies,
-                                   weights=None, comm=world):
+                                   weights=None, comm=world,
+                                   processes=None, total=False):
     """DOS from linear tetrahedron interpolation.
 
     cell: 3x3 ndarray-like
@@ -118,11 +119,17 @@ def linear_tetrahedron_integration(cell, eigs, energies,
         nw weights.
     comm: communicator object
             MPI communicator for lti_dos
+    processes: int
+        Number of local processes to use for each MPI rank.
+    total: bool
+        Also return the total DOS, calculated in the same pass as the
+        weighted DOS.
 
     Returns:
 
         DOS as an ndarray of same length as energies or as an
-        ndarray of shape (nw, len(energies)).
+        ndarray of shape (nw, len(energies)).  With total=True, a tuple
+        with the total DOS and the weighted DOS is returned.
 
     See:
 
@@ -143,6 +150,12 @@ def linear_tetrahedron_integration(cell, eigs, energies,
     dt = Delaunay(np.dot(indices, B))
 
     if weights is None:
+        if total:
+            # The weighted DOS is the total DOS:
+            dos = linear_tetrahedron_integration(cell, eigs, energies,
+                                                 comm=comm,
+                                                 processes=processes)
+            return dos, dos.copy()
         weights = np.ones_like(eigs)
 
     if weights.ndim == 4:
@@ -151,38 +164,187 @@ def linear_tetrahedron_integration(cell, eigs, energies,
     else:
         extra_dimension_added = False
 
+    if total:
+        weights = np.concatenate([np.ones_like(weights[..., :1]), weights],
+                                 axis=4)
+
     nweights = weights.shape[4]
     dos = np.empty((nweights, len(energies)))
 
-    lti_dos(indices[dt.simplices], eigs, weights, energies, dos, comm)
+    if processes is None:
+        lti_dos(indices[dt.simplices], eigs, weights, energies, dos, comm)
+    else:
+        lti_dos_processes(indices[dt.simplices], eigs, weights, energies,
+                          dos, comm, processes)
 
     dos /= np.prod(size)
 
+    if total:
+        totaldos, dos = dos[0], dos[1:]
     if extra_dimension_added:
-        return dos[0]
+        dos = dos[0]
+    if total:
+        return totaldos, dos
     return dos
 
 
 @cextension
 def lti_dos(simplices, eigs, weights, energies, dos, world):
+    """Sum the DOS contributions of all tetrahedra.
+
+    The k-points are done in chunks of 1000 points (all bands and
+    simplices at once), which are distributed over the ranks of
+    world."""
+    _lti_dos(simplices, eigs, weights, energies, dos, world)
+
+
+def lti_dos_processes(simplices, eigs, weights, energies, dos, world,
+                      processes, chunksize=1000):
+    """Same as lti_dos(), but the chunks of chunksize k-points of each
+    rank are also distributed over a local pool of processes."""
+    _lti_dos(simplices, eigs, weights, energies, dos, world, chunksize,
+             processes)
+
+
+def _lti_dos(simplices, eigs, weights, energies, dos, world,
+             chunksize=1000, processes=None):
     shape = eigs.shape[:3]
-    nweights = weights.shape[-1]
+    npoints = np.prod(shape)
     dos[:] = 0.0
-    n = -1
-    for index in np.indices(shape).reshape((3, -1)).T:
-        n += 1
-        if n % world.size != world.rank:
-            continue
-        i = ((index + simplices) % shape).T
-        E = eigs[i[0], i[1], i[2]].reshape((4, -1))
-        W = weights[i[0], i[1], i[2]].reshape((4, -1, nweights))
-        for e, w in zip(E.T, W.transpose((1, 0, 2))):
-            lti_dos1(e, w, energies, dos)
+    chunks = [np.arange(start, min(start + chunksize, npoints))
+              for start in range(0, npoints, chunksize)]
+    chunks = chunks[world.rank::world.size]
+    args = (simplices, eigs, weights, np.asarray(energies))
+
+    if processes is None or len(chunks) < 2:
+        for points in chunks:
+            dos += lti_dos_points(points, *args)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processes,
+                                 initializer=_set_lti_arguments,
+                                 initargs=args) as executor:
+            for result in executor.map(_lti_dos_points, chunks):
+                dos += result
 
     dos /= 6.0
     world.sum(dos)
 
 
+_lti_arguments = None
+
+
+def _set_lti_arguments(*args):
+    # Sent once to each worker of the process pool:
+    global _lti_arguments
+    _lti_arguments = args
+
+
+def _lti_dos_points(points):
+    return lti_dos_points(points, *_lti_arguments)
+
+
+def lti_dos_points(points, simplices, eigs, weights, energies):
+    """DOS contribution of the tetrahedra of the given k-points.
+
+    points are indices into the flattened k-point grid.  Returns an
+    array of shape (nweights, len(energies))."""
+    shape = eigs.shape[:3]
+    nweights = weights.shape[-1]
+    index_pd = np.array(np.unravel_index(points, shape)).T
+    # Corners of all tetrahedra (point, simplex, corner, direction):
+    i = (index_pd[:, np.newaxis, np.newaxis] + simplices) % shape
+    i = i.transpose((3, 0, 1, 2))
+    E = eigs[i[0], i[1], i[2]]
+    W = weights[i[0], i[1], i[2]]
+    # Put the 4 corners last:
+    E = E.transpose((0, 1, 3, 2)).reshape((-1, 4))
+    W = W.transpose((0, 1, 3, 2, 4)).reshape((-1, 4, nweights))
+    dos = np.zeros((nweights, len(energies)))
+    lti_dos_tetrahedra(E, W, energies, dos)
+    return dos
+
+
+def lti_dos_tetrahedra(E, W, energies, dos, maxpoints=2**20):
+    """Vectorized version of lti_dos1() for many tetrahedra.
+
+    E: (ntetrahedra, 4) ndarray
+        Eigenvalues at the corners.
+    W: (ntetrahedra, 4, nweights) ndarray
+        Weights at the corners.
+
+    The contributions are added to dos (shape (nweights, len(energies)))
+    for at most maxpoints (tetrahedron, energy) pairs at a time."""
+    i = E.argsort(axis=1)
+    E = np.take_along_axis(E, i, axis=1)
+    W = np.take_along_axis(W, i[:, :, np.newaxis], axis=1)
+
+    zero = energies[0]
+    nenergies = len(energies)
+    if nenergies > 1:
+        de = energies[1] - zero
+        nn = (np.floor((E - zero) / de).astype(int) + 1).clip(0, nenergies)
+    else:
+        nn = (E > zero).astype(int)
+
+    for case in range(3):
+        for t, n in _ranges(nn[:, case], nn[:, case + 1], maxpoints):
+            e0, e1, e2, e3 = E[t].T
+            if case == 0:
+                x = energies[n] - e0
+                f10 = x / (e1 - e0)
+                f20 = x / (e2 - e0)
+                f30 = x / (e3 - e0)
+                g = f20 * f30 / (e1 - e0)
+                f = [(3 - f10 - f20 - f30) * g, f10 * g, f20 * g, f30 * g]
+            elif case == 1:
+                delta = e3 - e0
+                x = energies[n]
+                f20 = (x - e0) / (e2 - e0)
+                f30 = (x - e0) / (e3 - e0)
+                f21 = (x - e1) / (e2 - e1)
+                f31 = (x - e1) / (e3 - e1)
+                f02 = 1 - f20
+                f03 = 1 - f30
+                f12 = 1 - f21
+                f13 = 1 - f31
+                g = 3 / delta * (f12 * f20 + f21 * f13)
+                f = [g * f03 / 3 + f02 * f20 * f12 / delta,
+                     g * f12 / 3 + f13 * f13 * f21 / delta,
+                     g * f21 / 3 + f20 * f20 * f12 / delta,
+                     g * f30 / 3 + f31 * f13 * f21 / delta]
+            else:
+                x = energies[n] - e3
+                f03 = x / (e0 - e3)
+                f13 = x / (e1 - e3)
+                f23 = x / (e2 - e3)
+                g = f03 * f13 / (e3 - e2)
+                f = [f03 * g, f13 * g, f23 * g, (3 - f03 - f13 - f23) * g]
+            contribution = np.einsum('cp,pcw->wp', f, W[t])
+            for w in range(len(dos)):
+                dos[w] += np.bincount(n, contribution[w],
+                                      minlength=nenergies)
+
+
+def _ranges(start, stop, maxpoints):
+    """Yield (t, n) index pairs for all t and start[t] <= n < stop[t].
+
+    At most about maxpoints pairs are yielded at a time."""
+    lengths = stop - start
+    t = np.nonzero(lengths > 0)[0]
+    if len(t) == 0:
+        return
+    end = np.cumsum(lengths[t])
+    blocks = np.searchsorted(end, np.arange(maxpoints, end[-1], maxpoints))
+    for tb in np.split(t, np.unique(blocks + 1)):
+        if len(tb) == 0:
+            continue
+        lb = lengths[tb]
+        offsets = np.repeat(np.cumsum(lb) - lb, lb)
+        n = np.arange(lb.sum()) - offsets + np.repeat(start[tb], lb)
+        yield np.repeat(tb, lb), n
+
+
 def lti_dos1(e, w, energies, dos):
     i = e.argsort()
     e0, e1, e2, e3 = en = e[i]
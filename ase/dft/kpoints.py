@@ -1,5 +1,6 @@
 import re
 import warnings
+from collections import OrderedDict
 from typing import Dict
 
 import numpy as np
@@ -738,6 +739,149 @@ def monkhorst_pack_interpolate(path, values, icell, bz2ibz,
     return interpolated_points
 
 
+def get_symmetry_rotations(atoms, symprec=1e-5):
+    """Find the rotations of the point group of a crystal.
+
+    atoms: Atoms object or (3, 3) cell
+        If only a cell is given, the rotations of the lattice are
+        returned.
+    symprec: float
+        Tolerance (in Cartesian coordinates) for lattice vectors and
+        atomic positions.
+
+    Returns an (nrot, 3, 3) integer array of rotations in scaled
+    coordinates, i.e. a position x is mapped to R @ x (plus a
+    translation).  This does not require spglib."""
+    if isinstance(atoms, ase.Atoms):
+        cell = atoms.cell.complete()
+        scaled = atoms.get_scaled_positions()
+        numbers = atoms.numbers
+    else:
+        cell = Cell.new(atoms).complete()
+        scaled = None
+
+    # Search integer matrices with entries -1, 0 and 1 in a Minkowski
+    # reduced basis, which contains all lattice symmetries:
+    rcell, op = cell.minkowski_reduce()
+    metric = rcell.array @ rcell.array.T
+    values = np.array([-1, 0, 1])
+    R_ncc = np.array(np.meshgrid(*[values] * 9, indexing='ij'))
+    R_ncc = R_ncc.reshape((9, -1)).T.reshape((-1, 3, 3))
+    dmetric = np.einsum('nij,ik,nkl->njl', R_ncc, metric, R_ncc) - metric
+    tol = 2 * symprec * np.sqrt(metric.diagonal().max()) + symprec**2
+    R_ncc = R_ncc[abs(dmetric).reshape((-1, 9)).max(axis=1) < tol]
+    # Back to the original basis: x = op^T x', so R = op^T R' op^-T:
+    opT = op.T
+    R_ncc = np.round(opT @ R_ncc @ np.linalg.inv(opT)).astype(int)
+
+    if scaled is None:
+        return R_ncc
+
+    # Keep the rotations that map the atoms onto themselves for some
+    # translation:
+    symbols, counts = np.unique(numbers, return_counts=True)
+    ref = np.nonzero(numbers == symbols[counts.argmin()])[0]
+    rotations = []
+    for R_cc in R_ncc:
+        rotated = scaled @ R_cc.T
+        for a in ref:
+            t_c = scaled[a] - rotated[ref[0]]
+            d = rotated[:, np.newaxis] + t_c - scaled
+            d -= np.round(d)
+            dist = np.linalg.norm(d @ cell.array, axis=2)
+            match = (dist < symprec) & (numbers[:, np.newaxis] == numbers)
+            if match.any(axis=1).all():
+                rotations.append(R_cc)
+                break
+    return np.array(rotations)
+
+
+_ibz_cache = OrderedDict()  # type: OrderedDict
+
+
+def get_ibz_kpoints(atoms, size, offset=(0, 0, 0), symprec=1e-5,
+                    time_reversal=True, rotations=None, cache=True):
+    """Irreducible k-points of a Monkhorst-Pack grid.
+
+    atoms: Atoms object or (3, 3) cell
+        Crystal whose symmetry is used.  With only a cell, the full
+        lattice symmetry is used.
+    size: (3,) sequence of int
+        Size of the Monkhorst-Pack grid.
+    offset: (3,) sequence of float
+        Offset of the grid (in units of the reciprocal lattice vectors).
+    symprec: float
+        Tolerance for finding the symmetry operations.
+    time_reversal: bool
+        Use time-reversal symmetry (k and -k are equivalent).
+    rotations: (nrot, 3, 3) array-like of int
+        Rotations to use instead of get_symmetry_rotations(), e.g.
+        ``Spacegroup(225).get_rotations()`` if atoms has the standard
+        cell of that space group.
+    cache: bool
+        Results are kept for the most recent combinations of cell,
+        atoms, grid and tolerances.
+
+    Returns (ibzkpts, weights, bz2ibz), where ibzkpts are the
+    irreducible k-points (scaled), weights their weights (summing to
+    one), and bz2ibz maps each point of
+    ``monkhorst_pack(size) + offset`` to its irreducible point.
+    Rotations that do not map the grid onto itself are not used.
+
+    >>> from ase.build import bulk
+    >>> ibzk, w, bz2ibz = get_ibz_kpoints(bulk('Cu'), (4, 4, 4))
+    >>> len(ibzk), len(bz2ibz)
+    (10, 64)
+    """
+    size = np.asarray(size, int)
+    offset = np.asarray(offset, float)
+    key = None
+    if cache:
+        if isinstance(atoms, ase.Atoms):
+            arrays = [atoms.cell.array, atoms.get_scaled_positions(),
+                      atoms.numbers]
+        else:
+            arrays = [np.asarray(atoms, float)]
+        if rotations is not None:
+            arrays.append(np.asarray(rotations, int))
+        key = (tuple(np.asarray(a).round(8).tobytes() for a in arrays),
+               tuple(size), tuple(offset.round(8)), symprec,
+               bool(time_reversal))
+        if key in _ibz_cache:
+            _ibz_cache.move_to_end(key)
+            return tuple(a.copy() for a in _ibz_cache[key])
+
+    if rotations is None:
+        rotations = get_symmetry_rotations(atoms, symprec)
+    rotations = np.asarray(rotations, int).reshape((-1, 3, 3))
+    if time_reversal:
+        rotations = np.concatenate([rotations, -rotations])
+
+    kpts_kc = monkhorst_pack(size) + offset
+    nbz = len(kpts_kc)
+    # Image of each k-point under each rotation (k -> R^T k):
+    maps = [np.arange(nbz)]
+    for R_cc in rotations:
+        i_kc = ((kpts_kc @ R_cc - offset + 0.5) * size - 0.5)
+        if abs(i_kc - np.round(i_kc)).max() > 1e-6:
+            continue  # grid not invariant under this rotation
+        i_kc = np.round(i_kc).astype(int) % size
+        maps.append(np.ravel_multi_index(i_kc.T, size))
+
+    # The smallest index in each orbit represents the orbit:
+    representative_k = np.min(maps, axis=0)
+    ibz_i, bz2ibz, counts = np.unique(representative_k, return_inverse=True,
+                                      return_counts=True)
+    result = (kpts_kc[ibz_i], counts / nbz, bz2ibz)
+
+    if cache:
+        _ibz_cache[key] = result
+        if len(_ibz_cache) > 32:
+            _ibz_cache.popitem(last=False)
+        result = tuple(a.copy() for a in result)
+    return result
+
+
 # ChadiCohen k point grids. The k point grids are given in units of the
 # reciprocal unit cell. The variables are named after the following
 # convention: cc+'<Nkpoints>'+_+'shape'. For example an 18 k point
@@ -1,9 +1,12 @@
+from collections import OrderedDict
+
 import numpy as np
 from ase.io.jsonio import read_json, write_json
 
 
 class STM:
-    def __init__(self, atoms, symmetries=None, use_density=False):
+    def __init__(self, atoms, symmetries=None, use_density=False,
+                 cache_size=256.0):
         """Scanning tunneling microscope.
 
         atoms: Atoms object or filename
@@ -19,15 +22,21 @@ class STM:
 
         use_density: bool
             Use the electron density instead of the LDOS.
+        cache_size: float
+            Maximum memory in MB used for keeping the LDOS of recently
+            used biases, so that they need not be recalculated.
         """
 
         self.use_density = use_density
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
 
         if isinstance(atoms, str):
             with open(atoms, 'r') as fd:
                 self.ldos, self.bias, self.cell = read_json(fd,
                                                             always_array=False)
             self.atoms = None
+            self.cache[self.bias] = self.ldos
         else:
             self.atoms = atoms
             self.cell = atoms.cell
@@ -42,20 +51,67 @@ class STM:
         if self.ldos is not None and bias == self.bias:
             return
 
+        self.ldos = self.get_ldos([bias])[0]
         self.bias = bias
 
+    def get_ldos(self, biases):
+        """Return list of local densities of states for several biases.
+
+        Cached LDOS arrays are reused, and the LDOS for all other
+        biases are calculated in as few passes over the wave functions
+        as cache_size allows."""
+        result = {}
+        for bias in biases:
+            if bias in self.cache:
+                self.cache.move_to_end(bias)
+                result[bias] = self.cache[bias]
+
+        todo = [bias for bias in OrderedDict.fromkeys(biases)
+                if bias not in result]
+        if todo:
+            if self.atoms is None:
+                raise ValueError('LDOS for bias {} not available'
+                                 .format(todo[0]))
+            batchsize = self._batch_size(len(todo))
+            for i in range(0, len(todo), batchsize):
+                batch = todo[i:i + batchsize]
+                for bias, ldos in zip(batch, self._calculate_ldos(batch)):
+                    result[bias] = ldos
+                    self._add_to_cache(bias, ldos)
+
+        return [result[bias] for bias in biases]
+
+    def _iter_ldos(self, biases):
+        """Yield (bias, ldos) pairs, calculating only as many LDOS arrays
+        at a time as fit in the cache."""
+        batchsize = self._batch_size(len(biases))
+        for i in range(0, len(biases), batchsize):
+            batch = biases[i:i + batchsize]
+            yield from zip(batch, self.get_ldos(batch))
+
+    def _batch_size(self, n):
+        """Number of the n LDOS arrays to calculate together, so that
+        they fit in cache_size."""
+        if self.atoms is None or self.use_density:
+            return max(n, 1)
+        shape = self.atoms.calc.get_pseudo_wave_function(0, 0, 0).shape
+        return max(1, int(self.cache_size * 1024**2 / (8 * np.prod(shape))))
+
+    def _add_to_cache(self, bias, ldos):
+        self.cache[bias] = ldos
+        nbytes = sum(a.nbytes for a in self.cache.values())
+        while nbytes > self.cache_size * 1024**2 and self.cache:
+            nbytes -= self.cache.popitem(last=False)[1].nbytes
+
+    def _calculate_ldos(self, biases):
         calc = self.atoms.calc
 
         if self.use_density:
-            self.ldos = calc.get_pseudo_density()
-            return
+            density = calc.get_pseudo_density()
+            return [density] * len(biases)
 
-        if bias < 0:
-            emin = bias
-            emax = 0.0
-        else:
-            emin = 0
-            emax = bias
+        windows = [(bias, 0.0) if bias < 0 else (0.0, bias)
+                   for bias in biases]
 
         nbands = calc.get_number_of_bands()
         weights = calc.get_k_point_weights()
@@ -65,16 +121,24 @@ class STM:
                           for k in range(nkpts)]
                          for s in range(nspins)])
         eigs -= calc.get_fermi_level()
-        ldos = np.zeros(calc.get_pseudo_wave_function(0, 0, 0).shape)
+        shape = calc.get_pseudo_wave_function(0, 0, 0).shape
+        ldos_list = [np.zeros(shape) for bias in biases]
 
         for s in range(nspins):
             for k in range(nkpts):
                 for n in range(nbands):
                     e = eigs[s, k, n]
-                    if emin < e < emax:
+                    inside = [emin < e < emax for emin, emax in windows]
+                    if any(inside):
                         psi = calc.get_pseudo_wave_function(n, k, s)
-                        ldos += weights[k] * (psi * np.conj(psi)).real
+                        density = weights[k] * (psi * np.conj(psi)).real
+                        for ldos, add in zip(ldos_list, inside):
+                            if add:
+                                ldos += density
+
+        return [self._symmetrize(ldos) for ldos in ldos_list]
 
+    def _symmetrize(self, ldos):
         if 0 in self.symmetries:
             # (x,y) -> (-x,y)
             ldos[1:] += ldos[:0:-1].copy()
@@ -90,7 +154,7 @@ class STM:
             ldos += ldos.transpose((1, 0, 2)).copy()
             ldos *= 0.5
 
-        self.ldos = ldos
+        return ldos
 
     def write(self, filename):
         """Write local density of states to JSON file."""
@@ -126,21 +190,46 @@ class STM:
 
         """
 
-        self.calculate_ldos(bias)
+        x, y, heights = self.scan_many([bias], [current], z0, repeat)
+        return x, y, heights[0, 0]
+
+    def scan_many(self, biases, currents, z0=None, repeat=(1, 1),
+                  processes=None):
+        """Constant current 2-d scans for several biases and currents.
+
+        Returns three arrays (x, y, z) like scan(), except that z has
+        the shape (len(biases), len(currents), nx, ny).  The heights
+        for all grid columns and currents are found in one vectorized
+        pass over the LDOS of each bias.  If processes is given, the
+        biases are distributed over a pool of that many processes.
+        """
+
+        currents = np.asarray(currents, float)
+        ldos_list = self.get_ldos(biases)
+        self.ldos = ldos_list[-1]
+        self.bias = biases[-1]
 
         L = self.cell[2, 2]
         nz = self.ldos.shape[2]
         h = L / nz
 
-        ldos = self.ldos.reshape((-1, nz))
-
-        heights = np.empty(ldos.shape[0])
-        for i, a in enumerate(ldos):
-            heights[i] = find_height(a, current, h, z0)
-
-        s0 = heights.shape = self.ldos.shape[:2]
-        heights = np.tile(heights, repeat)
-        s = heights.shape
+        if processes is None or processes == 1:
+            heights = [find_heights(ldos.reshape((-1, nz)), currents, h, z0)
+                       for ldos in ldos_list]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(processes) as executor:
+                futures = [executor.submit(find_heights,
+                                           ldos.reshape((-1, nz)),
+                                           currents, h, z0)
+                           for ldos in ldos_list]
+                heights = [future.result() for future in futures]
+
+        s0 = self.ldos.shape[:2]
+        heights = np.array(heights).reshape((len(ldos_list), len(currents))
+                                            + s0)
+        heights = np.tile(heights, (1, 1) + tuple(repeat))
+        s = heights.shape[2:]
 
         ij = np.indices(s, dtype=float).reshape((2, -1)).T
         x, y = np.dot(ij / s0, self.cell[:2, :2]).T.reshape((2,) + s)
@@ -165,13 +254,10 @@ class STM:
         nz = self.ldos.shape[2]
         ldos = self.ldos.reshape((-1, nz))
 
-        I = np.empty(ldos.shape[0])
-
         zp = z / self.cell[2, 2] * nz
         zp = int(zp) % nz
 
-        for i, a in enumerate(ldos):
-            I[i] = self.find_current(a, zp)
+        I = self.find_current(ldos.T, zp)
 
         s0 = I.shape = self.ldos.shape[:2]
         I = np.tile(I, repeat)
@@ -204,53 +290,58 @@ class STM:
         cell = self.cell[:2, :2]
         shape = np.array(heights.shape, float)
         M = np.linalg.inv(cell)
-        line = np.empty(npoints)
-        for i in range(npoints):
-            p = p1 + i * d / (npoints - 1)
-            q = np.dot(p, M) * shape
-            line[i] = interpolate(q, heights)
+        p = p1 + np.outer(np.arange(npoints), d / (npoints - 1))
+        q = np.dot(p, M) * shape
+        line = interpolate(q.T, heights)
         return np.linspace(0, s, npoints), line
 
     def pointcurrent(self, bias, x, y, z):
         """Current for a single x, y, z position for a given bias."""
 
         self.calculate_ldos(bias)
+        return dos2current(bias, self._interpolate_ldos(self.ldos, x, y, z))
 
-        nx = self.ldos.shape[0]
-        ny = self.ldos.shape[1]
-        nz = self.ldos.shape[2]
+    def pointcurrents(self, biases, positions):
+        """Currents for many x, y, z positions and biases.
+
+        Returns an array of shape (len(biases), len(positions))."""
+        x, y, z = np.asarray(positions, float).T
+        return np.array([dos2current(bias,
+                                     self._interpolate_ldos(ldos, x, y, z))
+                         for bias, ldos in self._iter_ldos(list(biases))])
+
+    def _interpolate_ldos(self, ldos, x, y, z):
+        nx = ldos.shape[0]
+        ny = ldos.shape[1]
+        nz = ldos.shape[2]
 
         # Find grid point:
         xp = x / np.linalg.norm(self.cell[0]) * nx
         dx = xp - np.floor(xp)
-        xp = int(xp) % nx
+        xp = np.asarray(xp).astype(int) % nx
 
         yp = y / np.linalg.norm(self.cell[1]) * ny
         dy = yp - np.floor(yp)
-        yp = int(yp) % ny
+        yp = np.asarray(yp).astype(int) % ny
 
         zp = z / np.linalg.norm(self.cell[2]) * nz
         dz = zp - np.floor(zp)
-        zp = int(zp) % nz
+        zp = np.asarray(zp).astype(int) % nz
 
         # 3D interpolation of the LDOS at point (x,y,z) at given bias.
-        xyzldos = (((1 - dx) + (1 - dy) + (1 - dz)) * self.ldos[xp, yp, zp] +
-                   dx * self.ldos[(xp + 1) % nx, yp, zp] +
-                   dy * self.ldos[xp, (yp + 1) % ny, zp] +
-                   dz * self.ldos[xp, yp, (zp + 1) % nz])
+        xyzldos = (((1 - dx) + (1 - dy) + (1 - dz)) * ldos[xp, yp, zp] +
+                   dx * ldos[(xp + 1) % nx, yp, zp] +
+                   dy * ldos[xp, (yp + 1) % ny, zp] +
+                   dz * ldos[xp, yp, (zp + 1) % nz])
 
-        return dos2current(bias, xyzldos)
+        return xyzldos
 
     def sts(self, x, y, z, bias0, bias1, biasstep):
         """Returns the dI/dV curve for position x, y at height z (in Angstrom),
         for bias from bias0 to bias1 with step biasstep."""
 
         biases = np.arange(bias0, bias1+biasstep, biasstep)
-        I = np.zeros(biases.shape)
-
-        for b in np.arange(len(biases)):
-            print(b, biases[b])
-            I[b] = self.pointcurrent(biases[b], x, y, z)
+        I = self.pointcurrents(biases, [(x, y, z)])[:, 0]
 
         dIdV = np.gradient(I, biasstep)
 
@@ -278,12 +369,16 @@ def dos2current(bias, dos):
 
 
 def interpolate(q, heights):
+    """Bilinear interpolation of heights at the grid coordinates q.
+
+    q can be a single point (shape (2,)) or an array of shape (2, n)."""
     qi = q.astype(int)
     f = q - qi
     g = 1 - f
-    qi %= heights.shape
+    shape = np.reshape(heights.shape, (2,) + (1,) * (q.ndim - 1))
+    qi %= shape
     n0, m0 = qi
-    n1, m1 = (qi + 1) % heights.shape
+    n1, m1 = (qi + 1) % shape
     z = (g[0] * g[1] * heights[n0, m0] +
          f[0] * g[1] * heights[n1, m0] +
          g[0] * f[1] * heights[n0, m1] +
@@ -291,6 +386,35 @@ def interpolate(q, heights):
     return z
 
 
+def find_heights(ldos, currents, h, z0=None):
+    """Vectorized version of find_height().
+
+    ldos is an array of shape (ncolumns, nz) and the result has the
+    shape (len(currents), ncolumns)."""
+    ldos = np.asarray(ldos)
+    ncolumns, nz = ldos.shape
+    if z0 is None:
+        n0 = nz - 2
+    else:
+        n0 = int(z0 / h)
+    columns = np.arange(ncolumns)
+    heights = np.zeros((len(currents), ncolumns))
+    if n0 < 0:
+        return heights
+    below = ldos[:, :n0 + 1]
+    for i, current in enumerate(currents):
+        # Highest grid point at or below n0 with a larger LDOS:
+        above = below[:, ::-1] > current
+        found = above.any(axis=1)
+        n = n0 - above.argmax(axis=1)
+        c2 = ldos[columns, n]
+        c1 = ldos[columns, (n + 1) % nz]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (n + 1 - (current - c1) / (c2 - c1)) * h
+        heights[i] = np.where(found, z, 0.0)
+    return heights
+
+
 def find_height(ldos, current, h, z0=None):
     if z0 is None:
         n = len(ldos) - 2
@@ -17,6 +17,11 @@ from ase.io.jsonio import read_json, write_json
 dag = dagger
 
 
+def dag_knw(a):
+    """Hermitian conjugate of a stack of matrices."""
+    return a.conj().swapaxes(-1, -2)
+
+
 def gram_schmidt(U):
     """Orthonormalize columns of U according to the Gram-Schmidt procedure."""
     for i, col in enumerate(U.T):
@@ -52,6 +57,38 @@ def neighbor_k_search(k_c, G_c, kpt_kc, tol=1e-4):
     raise NotImplementedError
 
 
+def neighbor_k_table(kpt_kc, G_c, tol=1e-4):
+    """Vectorized neighbor_k_search() for all k-points.
+
+    Returns the arrays k1_k and k0_kc, such that
+    kpt_kc[k1_k[k]] - kpt_kc[k] - G_c + k0_kc[k] = 0."""
+    alldir_dc = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1],
+                          [1, 1, 0], [1, 0, 1], [0, 1, 1]], dtype=int)
+    kpt_kc = np.asarray(kpt_kc)
+    Nk = len(kpt_kc)
+    lookup = {tuple(key): k for k, key in
+              reversed(list(enumerate(np.round(kpt_kc / tol).astype(int))))}
+    k1_k = np.full(Nk, -1)
+    k0_kc = np.zeros((Nk, 3), int)
+    for k0_c in alldir_dc:
+        missing = np.nonzero(k1_k < 0)[0]
+        if len(missing) == 0:
+            break
+        keys = np.round((kpt_kc[missing] + G_c - k0_c) / tol).astype(int)
+        for k, key in zip(missing, keys):
+            k1 = lookup.get(tuple(key))
+            if k1 is not None and np.linalg.norm(
+                    kpt_kc[k1] - kpt_kc[k] - G_c + k0_c) < tol:
+                k1_k[k] = k1
+                k0_kc[k] = k0_c
+
+    missing = np.nonzero(k1_k < 0)[0]
+    for k in missing:
+        # Rounding can put nearly equal k-points in different bins:
+        k1_k[k], k0_kc[k] = neighbor_k_search(kpt_kc[k], G_c, kpt_kc, tol)
+    return k1_k, k0_kc
+
+
 def calculate_weights(cell_cc, normalize=True):
     """ Weights are used for non-cubic cells, see PRB **61**, 10040"""
     alldirs_dc = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1],
@@ -133,6 +170,66 @@ def md_min(func, step=.25, tolerance=1e-6, verbose=False, **kwargs):
             count, t, t * 1000. / count, step))
 
 
+def conjugate_gradient(func, step=.25, tolerance=1e-6, verbose=False,
+                       **kwargs):
+    """Maximize func with the Polak-Ribiere conjugate gradient method.
+
+    func.step(dX) must move along dX on the manifold of the variables
+    (like Wannier.step(), which rotates U by exp(-A)), such that
+    func.step(t * func.get_gradients()) increases the functional for
+    small t. The line search takes a trial step along the search
+    direction and then a secant step on the directional derivative.
+    step is the initial trial step; later trial steps are the
+    previous optimal step."""
+    if verbose:
+        print('Localize with conjugate gradients, step =', step,
+              'and tolerance =', tolerance)
+        t = -time()
+    fvalueold = 0.
+    fvalue = func.get_functional_value()
+    G = func.get_gradients()
+    D = G
+    slope = np.vdot(G, D).real
+    count = 0
+    while abs((fvalue - fvalueold) / fvalue) > tolerance:
+        fvalueold = fvalue
+        func.step(step * D, **kwargs)
+        ftrial = func.get_functional_value()
+        slope_trial = np.vdot(func.get_gradients(), D).real
+        if slope_trial < slope:
+            alpha = step * slope / (slope - slope_trial)
+            alpha = min(alpha, 4 * step)
+        else:
+            alpha = 4 * step
+        func.step((alpha - step) * D, **kwargs)
+        fvalue = func.get_functional_value()
+        if fvalue < ftrial:
+            # The secant step was worse than the trial step:
+            func.step((step - alpha) * D, **kwargs)
+            fvalue = ftrial
+            alpha = step
+        if fvalue >= fvalueold:
+            step = alpha
+        else:
+            step *= 0.5
+
+        Gold = G
+        G = func.get_gradients()
+        beta = max(0., np.vdot(G - Gold, G).real / np.vdot(Gold, Gold).real)
+        D = G + beta * D
+        slope = np.vdot(G, D).real
+        if slope <= 0:
+            D = G
+            slope = np.vdot(G, D).real
+        count += 1
+        if verbose:
+            print('CG: iter=%s, step=%s, value=%s' % (count, step, fvalue))
+    if verbose:
+        t += time()
+        print('%d iterations in %0.2f seconds (%0.2f ms/iter), '
+              'endstep = %s' % (count, t, t * 1000. / count, step))
+
+
 def rotation_from_projection(proj_nw, fixed, ortho=True):
     """Determine rotation and coefficient matrices from projections
 
@@ -300,21 +397,17 @@ class Wannier:
                                   for n in range(self.Nk - 1)])
 
             for d, Gdir_c in enumerate(self.Gdir_dc):
-                for k, k_c in enumerate(self.kpt_kc):
-                    # setup dist vector to next kpoint
-                    G_c = np.where(Gdir_c > 0, kdist_c, 0)
-                    if max(G_c) < 1e-4:
-                        self.kklst_dk[d, k] = k
-                        k0_dkc[d, k] = Gdir_c
-                    else:
-                        self.kklst_dk[d, k], k0_dkc[d, k] = \
-                            neighbor_k_search(k_c, G_c, self.kpt_kc)
+                # setup dist vector to next kpoint
+                G_c = np.where(Gdir_c > 0, kdist_c, 0)
+                if max(G_c) < 1e-4:
+                    self.kklst_dk[d] = np.arange(self.Nk)
+                    k0_dkc[d] = Gdir_c
+                else:
+                    self.kklst_dk[d], k0_dkc[d] = \
+                        neighbor_k_table(self.kpt_kc, G_c)
 
         # Set the inverse list of neighboring k-points
-        self.invkklst_dk = np.empty((self.Ndir, self.Nk), int)
-        for d in range(self.Ndir):
-            for k1 in range(self.Nk):
-                self.invkklst_dk[d, k1] = self.kklst_dk[d].tolist().index(k1)
+        self.invkklst_dk = np.argsort(self.kklst_dk, axis=1)
 
         Nw = self.nwannier
         Nb = self.nbands
@@ -387,11 +480,9 @@ class Wannier:
 
         # Calculate the Zk matrix from the large rotation matrix:
         # Zk = V^d[k] Zbloch V[k1]
-        for d in range(self.Ndir):
-            for k in range(self.Nk):
-                k1 = self.kklst_dk[d, k]
-                self.Z_dkww[d, k] = np.dot(dag(self.V_knw[k]), np.dot(
-                    self.Z_dknn[d, k], self.V_knw[k1]))
+        # (for all directions and k-points at once)
+        self.ZV_dknw = self.Z_dknn @ self.V_knw[self.kklst_dk]
+        self.Z_dkww[:] = dag_knw(self.V_knw) @ self.ZV_dknw
 
         # Update the new Z matrix
         self.Z_dww = self.Z_dkww.sum(axis=1) / self.Nk
@@ -639,10 +730,19 @@ class Wannier:
         write(fname, atoms, data=func, format='cube')
 
     def localize(self, step=0.25, tolerance=1e-08,
-                 updaterot=True, updatecoeff=True):
-        """Optimize rotation to give maximal localization"""
-        md_min(self, step, tolerance, verbose=self.verbose,
-               updaterot=updaterot, updatecoeff=updatecoeff)
+                 updaterot=True, updatecoeff=True, optimizer='md_min'):
+        """Optimize rotation to give maximal localization
+
+        ``optimizer`` can be 'md_min', 'steepest_descent' or
+        'conjugate_gradient'; the latter usually needs far fewer
+        iterations."""
+        optimizers = {'md_min': md_min,
+                      'steepest_descent': steepest_descent,
+                      'conjugate_gradient': conjugate_gradient}
+        if optimizer not in optimizers:
+            raise ValueError('Unknown optimizer: {}'.format(optimizer))
+        optimizers[optimizer](self, step, tolerance, verbose=self.verbose,
+                              updaterot=updaterot, updatecoeff=updatecoeff)
 
     def get_functional_value(self):
         """Calculate the value of the spread functional.
@@ -681,48 +781,41 @@ class Wannier:
         # for this reason the coefficient gradients should be multiplied
         # by (1 - c c^d).
 
-        Nb = self.nbands
-        Nw = self.nwannier
+        # The sums over directions and k-points are done for all k-points
+        # at once, with k2 = invkklst_dk[d, k] (the k-point for which k is
+        # the neighbor).
+        Nk = self.Nk
+        weight_d = np.where(abs(self.weight_d) < 1.0e-6, 0.0, self.weight_d)
+        diagZ_dw = self.Z_dww.diagonal(0, 1, 2)
+        Z2_dkww = np.take_along_axis(
+            self.Z_dkww, self.invkklst_dk[:, :, None, None], axis=1)
+        temp_dkww = (diagZ_dw[:, None, None, :] * self.Z_dkww.conj() -
+                     diagZ_dw[:, None, :, None] * Z2_dkww.conj())
+        temp_kww = np.einsum('d,dkij->kij', weight_d, temp_dkww)
+        dU = [(temp_kww - dag_knw(temp_kww)).reshape(Nk, -1)]
 
-        dU = []
         dC = []
-        for k in range(self.Nk):
-            M = self.fixedstates_k[k]
-            L = self.edf_k[k]
-            U_ww = self.U_kww[k]
-            C_ul = self.C_kul[k]
-            Utemp_ww = np.zeros((Nw, Nw), complex)
-            Ctemp_nw = np.zeros((Nb, Nw), complex)
-
-            for d, weight in enumerate(self.weight_d):
-                if abs(weight) < 1.0e-6:
-                    continue
-
-                Z_knn = self.Z_dknn[d]
-                diagZ_w = self.Z_dww[d].diagonal()
-                Zii_ww = np.repeat(diagZ_w, Nw).reshape(Nw, Nw)
-                k1 = self.kklst_dk[d, k]
-                k2 = self.invkklst_dk[d, k]
-                V_knw = self.V_knw
-                Z_kww = self.Z_dkww[d]
-
-                if L > 0:
-                    Ctemp_nw += weight * np.dot(
-                        np.dot(Z_knn[k], V_knw[k1]) * diagZ_w.conj() +
-                        np.dot(dag(Z_knn[k2]), V_knw[k2]) * diagZ_w,
-                        dag(U_ww))
-
-                temp = Zii_ww.T * Z_kww[k].conj() - Zii_ww * Z_kww[k2].conj()
-                Utemp_ww += weight * (temp - dag(temp))
-            dU.append(Utemp_ww.ravel())
-            if L > 0:
-                # Ctemp now has same dimension as V, the gradient is in the
-                # lower-right (Nb-M) x L block
-                Ctemp_ul = Ctemp_nw[M:, M:]
-                G_ul = Ctemp_ul - np.dot(np.dot(C_ul, dag(C_ul)), Ctemp_ul)
-                dC.append(G_ul.ravel())
-
-        return np.concatenate(dU + dC)
+        if (self.edf_k > 0).any():
+            Z2_dknn = np.take_along_axis(
+                self.Z_dknn, self.invkklst_dk[:, :, None, None], axis=1)
+            V2_dknw = self.V_knw[self.invkklst_dk]
+            Ctemp_knw = np.einsum(
+                'd,dknw->knw', weight_d,
+                self.ZV_dknw * diagZ_dw.conj()[:, None, None] +
+                (dag_knw(Z2_dknn) @ V2_dknw) * diagZ_dw[:, None, None])
+            Ctemp_knw = Ctemp_knw @ dag_knw(np.asarray(self.U_kww))
+            for k in range(Nk):
+                M = self.fixedstates_k[k]
+                if self.edf_k[k] > 0:
+                    # Ctemp now has same dimension as V, the gradient is
+                    # in the lower-right (Nb-M) x L block
+                    C_ul = self.C_kul[k]
+                    Ctemp_ul = Ctemp_knw[k, M:, M:]
+                    G_ul = Ctemp_ul - np.dot(np.dot(C_ul, dag(C_ul)),
+                                             Ctemp_ul)
+                    dC.append(G_ul.ravel())
+
+        return np.concatenate(dU + dC, axis=None)
 
     def step(self, dX, updaterot=True, updatecoeff=True):
         # dX is (A, dC) where U->Uexp(-A) and C->C+dC
@@ -732,12 +825,13 @@ class Wannier:
         L_k = self.edf_k
         if updaterot:
             A_kww = dX[:Nk * Nw**2].reshape(Nk, Nw, Nw)
-            for U, A in zip(self.U_kww, A_kww):
-                H = -1.j * A.conj()
-                epsilon, Z = np.linalg.eigh(H)
-                # Z contains the eigenvectors as COLUMNS.
-                # Since H = iA, dU = exp(-A) = exp(iH) = ZDZ^d
-                dU = np.dot(Z * np.exp(1.j * epsilon), dag(Z))
+            H_kww = -1.j * A_kww.conj()
+            epsilon_kw, Z_kww = np.linalg.eigh(H_kww)
+            # Z contains the eigenvectors as COLUMNS.
+            # Since H = iA, dU = exp(-A) = exp(iH) = ZDZ^d
+            dU_kww = ((Z_kww * np.exp(1.j * epsilon_kw)[:, None]) @
+                      dag_knw(Z_kww))
+            for U, dU in zip(self.U_kww, dU_kww):
                 if U.dtype == float:
                     U[:] = np.dot(U, dU).real
                 else:
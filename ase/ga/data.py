@@ -2,6 +2,7 @@
     Objects which handle all communication with the SQLite database.
 """
 import os
+import numpy as np
 from ase import Atoms
 from ase.ga import get_raw_score
 from ase.ga import set_parametrization, set_neighbor_list
@@ -399,6 +400,25 @@ class DataConnection:
         """Check if the key-value pair is already present in the database"""
         return len(list(self.c.select(**kwargs))) > 0
 
+    def save_fingerprints(self, name, fingerprints):
+        """Store fingerprints of relaxed candidates in the database.
+
+        Parameters:
+
+        name: str
+            Name under which the fingerprints are stored, normally
+            identifying the comparator and its settings.
+
+        fingerprints: dict
+            Fingerprint arrays keyed by the relax_id of the candidates.
+        """
+        with self.c as con:
+            for relax_id, fp in fingerprints.items():
+                row = con.get(id=relax_id)
+                stored = dict(row.data.get('fingerprints', {}))
+                stored[name] = fp
+                con.update(relax_id, data={'fingerprints': stored})
+
     def kill_candidate(self, confid):
         """Sets extinct=1 in the key_value_pairs of the candidate
         with gaid=confid. This could be used in the
@@ -407,6 +427,92 @@ class DataConnection:
             self.c.update(dct.id, extinct=1)
 
 
+class FingerprintStore:
+    """Cache of structure fingerprints keyed by confid.
+
+    Comparators use the store to avoid recalculating the fingerprint of
+    a candidate every time it is compared to another one. Only relaxed
+    candidates (those with a relax_id in atoms.info) are cached, since
+    unrelaxed steps share the confid of the structure they evolve into.
+    Other structures are recalculated on every request.
+
+    Parameters:
+
+    name: str
+        Name identifying the kind of fingerprint (and the settings
+        used to calculate it).
+
+    data_connection: DataConnection or None
+        If given, new fingerprints are saved in the data of the
+        relaxed candidates in the database, and fingerprints found in
+        atoms.info['data'] of candidates read from the database are
+        reused. Default None means an in-memory cache only.
+    """
+
+    def __init__(self, name, data_connection=None):
+        self.name = name
+        self.data_connection = data_connection
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.cache)
+
+    def clear(self):
+        self.cache.clear()
+
+    def get(self, atoms, calculate):
+        """Return the fingerprint of atoms.
+
+        calculate is a function taking the atoms object and returning
+        its fingerprint as an array; it is only called on a cache miss."""
+        return self.get_many([atoms], calculate)[0]
+
+    def get_many(self, images, calculate):
+        """Return a list with the fingerprints of all images.
+
+        Missing fingerprints are calculated and written to the
+        database in a single transaction."""
+        fingerprints = []
+        new = {}
+        for atoms in images:
+            key = self._key(atoms)
+            fp = self.cache.get(key)
+            if fp is None and key is not None:
+                fp = self._from_info(atoms)
+            if fp is None:
+                fp = np.asarray(calculate(atoms), dtype=float)
+                if key is not None:
+                    self._to_info(atoms, fp)
+                    new[atoms.info['relax_id']] = fp
+            if key is not None:
+                self.cache[key] = fp
+            fingerprints.append(fp)
+
+        if new and self.data_connection is not None:
+            self.data_connection.save_fingerprints(self.name, new)
+        return fingerprints
+
+    def _key(self, atoms):
+        if 'confid' not in atoms.info or 'relax_id' not in atoms.info:
+            return None
+        return atoms.info['confid']
+
+    def _from_info(self, atoms):
+        if self.data_connection is None:
+            return None
+        stored = atoms.info.get('data', {}).get('fingerprints', {})
+        fp = stored.get(self.name)
+        if fp is None:
+            return None
+        return np.asarray(fp, dtype=float)
+
+    def _to_info(self, atoms, fp):
+        if self.data_connection is None:
+            return
+        data = atoms.info.setdefault('data', {})
+        data.setdefault('fingerprints', {})[self.name] = fp
+
+
 class PrepareDB:
     """ Class used to initialize a database.
 
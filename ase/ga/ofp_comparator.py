@@ -2,6 +2,7 @@ import numpy as np
 from itertools import combinations_with_replacement
 from math import erf
 from scipy.spatial.distance import cdist
+from ase.ga.data import FingerprintStore
 from ase.neighborlist import NeighborList
 from ase.utils import pbc2pbc
 
@@ -76,11 +77,23 @@ class OFPComparator:
                  If True, ignores the fingerprints stored in
                  atoms.info and recalculates them. (Default False)
 
+    data_connection: DataConnection object or None
+                     If given, the fingerprints of relaxed candidates
+                     are stored in the database, so they do not need
+                     to be recalculated when the GA is restarted.
+                     In any case they are cached in memory, keyed by
+                     the confid of the candidates. (Default None)
+
+    chunksize: int
+               Number of rows of the cosine distance matrix calculated
+               at a time in looks_like_matrix. (Default 256)
+
     """
 
     def __init__(self, n_top=None, dE=1.0, cos_dist_max=5e-3, rcut=20.,
                  binwidth=0.05, sigma=0.02, nsigma=4, pbc=True,
-                 maxdims=None, recalculate=False):
+                 maxdims=None, recalculate=False, data_connection=None,
+                 chunksize=256):
         self.n_top = n_top or 0
         self.dE = dE
         self.cos_dist_max = cos_dist_max
@@ -96,8 +109,14 @@ class OFPComparator:
         self.sigma = sigma
         self.nsigma = nsigma
         self.recalculate = recalculate
+        self.chunksize = chunksize
         self.dimensions = self.pbc.sum()
 
+        name = 'ofp_{}_{}_{}_{}_{}_{}'.format(
+            self.n_top, rcut, binwidth, sigma, nsigma,
+            ''.join(str(int(p)) for p in self.pbc))
+        self.fingerprints = FingerprintStore(name, data_connection)
+
         if self.dimensions == 1 or self.dimensions == 2:
             for direction in range(3):
                 if not self.pbc[direction]:
@@ -124,6 +143,87 @@ class OFPComparator:
         verdict = cos_dist < self.cos_dist_max
         return verdict
 
+    def get_fingerprint_vector(self, a):
+        """ Returns the fingerprints of a as a single normalized
+        vector. The element-element fingerprints are concatenated with
+        the square root of their weights, so that the cosine distance
+        between a1 and a2 equals 0.5 * (1 - np.dot(v1, v2)). """
+        fp, typedic = self._get_fingerprints(a)
+        keys = sorted(fp)
+        w = np.array([len(typedic[key[0]]) * len(typedic[key[1]])
+                      for key in keys], dtype=float)
+        w /= w.sum()
+        v = np.concatenate([np.sqrt(wi) * fp[key]
+                            for wi, key in zip(w, keys)])
+        return v / np.linalg.norm(v)
+
+    def get_fingerprint_vectors(self, images):
+        """ Returns the array of fingerprint vectors of all images,
+        using (and filling) the fingerprint store. """
+        numbers = set(a[-self.n_top:].numbers.tobytes() for a in images)
+        if len(numbers) > 1:
+            raise AssertionError('The structures have a different '
+                                 'stoichiometry or ordering!')
+        if self.recalculate:
+            V = [self.get_fingerprint_vector(a) for a in images]
+        else:
+            V = self.fingerprints.get_many(images,
+                                           self.get_fingerprint_vector)
+        return np.array(V)
+
+    def get_distance_matrix(self, images, others=None):
+        """ Returns the matrix of cosine distances between all images
+        and others (default: the images themselves). """
+        images = list(images)
+        if others is None:
+            V = W = self.get_fingerprint_vectors(images)
+        else:
+            V = self.get_fingerprint_vectors(images + list(others))
+            V, W = V[:len(images)], V[len(images):]
+        return 0.5 * (1 - np.dot(V, W.T))
+
+    def looks_like_matrix(self, images, others=None):
+        """ Returns the boolean matrix M with
+        M[i, j] = self.looks_like(images[i], others[j]).
+
+        If others is None the images are compared among themselves.
+        The energy criterion is only applied to pairs where both
+        structures have a calculator attached. """
+        images = list(images)
+        others = images if others is None else list(others)
+        M = np.zeros((len(images), len(others)), dtype=bool)
+        if len(images) == 0 or len(others) == 0:
+            return M
+        if len(set(len(a) for a in images + others)) != 1:
+            raise Exception('The configurations are not the same size.')
+
+        e1 = self._get_energies(images)
+        e2 = self._get_energies(others)
+        V = self.get_fingerprint_vectors(images + others)
+        V, W = V[:len(images)], V[len(images):]
+        for i in range(0, len(images), self.chunksize):
+            cos_dist = 0.5 * (1 - np.dot(V[i:i + self.chunksize], W.T))
+            dE = np.abs(e1[i:i + self.chunksize, np.newaxis] - e2)
+            # NaN (no calculator) compares False, i.e. is not excluded:
+            M[i:i + len(cos_dist)] = ((cos_dist < self.cos_dist_max)
+                                      & ~(dE >= self.dE))
+        return M
+
+    def _get_energies(self, images):
+        return np.array([np.nan if a.calc is None
+                         else a.get_potential_energy() for a in images])
+
+    def _get_fingerprints(self, a):
+        """ Returns the fingerprints and typedic of a, using those
+        stored in a.info unless self.recalculate is True. """
+        if 'fingerprints' in a.info and not self.recalculate:
+            fp, typedic = a.info['fingerprints']
+            fp, typedic = self._json_decode(fp, typedic)
+        else:
+            fp, typedic = self._take_fingerprints(a[-self.n_top:])
+            a.info['fingerprints'] = self._json_encode(fp, typedic)
+        return fp, typedic
+
     def _json_encode(self, fingerprints, typedic):
         """ json does not accept tuples nor integers as dict keys,
         so in order to write the fingerprints to atoms.info, we need
@@ -175,22 +275,8 @@ class OFPComparator:
         if len(a1) != len(a2):
             raise Exception('The two configurations are not the same size.')
 
-        a1top = a1[-self.n_top:]
-        a2top = a2[-self.n_top:]
-
-        if 'fingerprints' in a1.info and not self.recalculate:
-            fp1, typedic1 = a1.info['fingerprints']
-            fp1, typedic1 = self._json_decode(fp1, typedic1)
-        else:
-            fp1, typedic1 = self._take_fingerprints(a1top)
-            a1.info['fingerprints'] = self._json_encode(fp1, typedic1)
-
-        if 'fingerprints' in a2.info and not self.recalculate:
-            fp2, typedic2 = a2.info['fingerprints']
-            fp2, typedic2 = self._json_decode(fp2, typedic2)
-        else:
-            fp2, typedic2 = self._take_fingerprints(a2top)
-            a2.info['fingerprints'] = self._json_encode(fp2, typedic2)
+        fp1, typedic1 = self._get_fingerprints(a1)
+        fp2, typedic2 = self._get_fingerprints(a2)
 
         if sorted(fp1) != sorted(fp2):
             raise AssertionError('The two structures have fingerprints '
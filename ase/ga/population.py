@@ -10,6 +10,10 @@ from ase.ga import get_raw_score
 
 def count_looks_like(a, all_cand, comp):
     """Utility method for counting occurrences."""
+    if hasattr(comp, 'looks_like_matrix'):
+        others = [b for b in all_cand
+                  if a.info['confid'] != b.info['confid']]
+        return int(comp.looks_like_matrix([a], others).sum())
     n = 0
     for b in all_cand:
         if a.info['confid'] == b.info['confid']:
@@ -79,27 +83,51 @@ class Population:
                       reverse=True)
         # all_cand.sort(key=lambda x: x.get_potential_energy())
 
-        # Fill up the population with the self.pop_size most stable
-        # unique candidates.
-        i = 0
-        while i < len(all_cand) and len(self.pop) < self.pop_size:
-            c = all_cand[i]
-            i += 1
-            eq = False
-            for a in self.pop:
-                if self.comparator.looks_like(a, c):
-                    eq = True
-                    break
-            if not eq:
-                self.pop.append(c)
+        if hasattr(self.comparator, 'looks_like_matrix'):
+            self.__initialize_pop_from_matrix__(all_cand)
+        else:
+            # Fill up the population with the self.pop_size most stable
+            # unique candidates.
+            i = 0
+            while i < len(all_cand) and len(self.pop) < self.pop_size:
+                c = all_cand[i]
+                i += 1
+                eq = False
+                for a in self.pop:
+                    if self.comparator.looks_like(a, c):
+                        eq = True
+                        break
+                if not eq:
+                    self.pop.append(c)
 
-        for a in self.pop:
-            a.info['looks_like'] = count_looks_like(a, all_cand,
-                                                    self.comparator)
+            for a in self.pop:
+                a.info['looks_like'] = count_looks_like(a, all_cand,
+                                                        self.comparator)
 
         self.all_cand = all_cand
         self.__calc_participation__()
 
+    def __initialize_pop_from_matrix__(self, all_cand):
+        """ Same as the loop in __initialize_pop__, but with all
+            comparisons done at once with the looks_like_matrix
+            method of the comparator. """
+        if len(all_cand) == 0:
+            return
+        M = self.comparator.looks_like_matrix(all_cand)
+        confids = np.array([c.info['confid'] for c in all_cand])
+        selected = []
+        for i in range(len(all_cand)):
+            if len(selected) == self.pop_size:
+                break
+            if not M[selected, i].any():
+                selected.append(i)
+
+        for i in selected:
+            a = all_cand[i]
+            a.info['looks_like'] = int(
+                M[i, confids != a.info['confid']].sum())
+            self.pop.append(a)
+
     def __calc_participation__(self):
         """ Determines, from the database, how many times each
             candidate has been used to generate new candidates. """
@@ -174,8 +202,12 @@ class Population:
 
         # check if the new candidate should
         # replace a similar structure in the population
-        for (i, b) in enumerate(self.pop):
-            if self.comparator.looks_like(a, b):
+        if hasattr(self.comparator, 'looks_like_matrix'):
+            similar = self.comparator.looks_like_matrix([a], self.pop)[0]
+        else:
+            similar = (self.comparator.looks_like(a, b) for b in self.pop)
+        for (i, b), eq in zip(enumerate(self.pop), similar):
+            if eq:
                 if get_raw_score(b) < raw_score_a:
                     del self.pop[i]
                     a.info['looks_like'] = count_looks_like(a,
@@ -1,5 +1,8 @@
 import numpy as np
+from scipy.spatial.distance import cdist
 from ase.ga import get_raw_score
+from ase.ga.data import FingerprintStore
+from ase.geometry import get_distances
 
 
 def get_sorted_dist_list(atoms, mic=False):
@@ -7,18 +10,46 @@ def get_sorted_dist_list(atoms, mic=False):
         describing the cluster in atoms. """
     numbers = atoms.numbers
     unique_types = set(numbers)
+    cell = atoms.cell if mic else None
+    pbc = atoms.pbc if mic else None
     pair_cor = dict()
     for n in unique_types:
-        i_un = [i for i in range(len(atoms)) if atoms[i].number == n]
-        d = []
-        for i, n1 in enumerate(i_un):
-            for n2 in i_un[i + 1:]:
-                d.append(atoms.get_distance(n1, n2, mic))
-        d.sort()
-        pair_cor[n] = np.array(d)
+        p = atoms.positions[numbers == n]
+        d = get_distances(p, cell=cell, pbc=pbc)[1]
+        pair_cor[n] = np.sort(d[np.triu_indices(len(p), 1)])
     return pair_cor
 
 
+def get_looks_like_matrix(comparator, images, others=None):
+    """Return the boolean matrix M with
+    M[i, j] = comparator.looks_like(images[i], others[j]).
+
+    The batched looks_like_matrix method of the comparator is used if
+    it has one, otherwise looks_like is called for every pair.
+    If others is None the images are compared among themselves."""
+    if hasattr(comparator, 'looks_like_matrix'):
+        return comparator.looks_like_matrix(images, others)
+    if others is None:
+        others = images
+    M = np.zeros((len(images), len(others)), dtype=bool)
+    for i, a in enumerate(images):
+        for j, b in enumerate(others):
+            M[i, j] = comparator.looks_like(a, b)
+    return M
+
+
+def _get_energies(images, require=True):
+    """Potential energies of the images. NaN is used for structures
+    without a calculator if require is False."""
+    energies = np.empty(len(images))
+    for i, a in enumerate(images):
+        if a.calc is None and not require:
+            energies[i] = np.nan
+        else:
+            energies[i] = a.get_potential_energy()
+    return energies
+
+
 class InteratomicDistanceComparator:
 
     """ An implementation of the comparison criteria described in
@@ -34,14 +65,23 @@ class InteratomicDistanceComparator:
         dE: The limit of eq. 1 of the letter
         mic: Determines if distances are calculated
         using the minimum image convention
+        data_connection: DataConnection object in which the sorted
+        distance lists of relaxed candidates are stored.
+        Default None - meaning they are only cached in memory.
+        chunksize: Number of rows of the looks-like matrix
+        calculated at a time.
     """
     def __init__(self, n_top=None, pair_cor_cum_diff=0.015,
-                 pair_cor_max=0.7, dE=0.02, mic=False):
+                 pair_cor_max=0.7, dE=0.02, mic=False,
+                 data_connection=None, chunksize=256):
         self.pair_cor_cum_diff = pair_cor_cum_diff
         self.pair_cor_max = pair_cor_max
         self.dE = dE
         self.n_top = n_top or 0
         self.mic = mic
+        self.chunksize = chunksize
+        name = 'interatomic_distances_{}_{}'.format(self.n_top, int(mic))
+        self.fingerprints = FingerprintStore(name, data_connection)
 
     def looks_like(self, a1, a2):
         """ Return if structure a1 or a2 are similar or not. """
@@ -83,6 +123,71 @@ class InteratomicDistanceComparator:
             total_cum_diff += cum_diff / t_size * ntype / float(len(numbers))
         return (total_cum_diff, max_diff)
 
+    def _get_fingerprint(self, atoms):
+        p = get_sorted_dist_list(atoms[-self.n_top:], mic=self.mic)
+        return np.concatenate([p[n] for n in p])
+
+    def _get_segments(self, atoms):
+        """Slices of the fingerprint belonging to each element, in the
+        order used by get_sorted_dist_list, and their weights."""
+        numbers = atoms[-self.n_top:].numbers
+        segments = []
+        start = 0
+        for n in set(numbers):
+            ntype = np.sum(numbers == n)
+            stop = start + ntype * (ntype - 1) // 2
+            segments.append((slice(start, stop), ntype / len(numbers)))
+            start = stop
+        return segments
+
+    def get_distance_matrix(self, images, others=None):
+        """Return the (cum_diff, max_diff) matrices of eqs. 2 and 3 of
+        the letter for all pairs of images and others
+        (default: the images themselves)."""
+        if others is None:
+            others = images
+        P = np.array(self.fingerprints.get_many(images, self._get_fingerprint))
+        Q = np.array(self.fingerprints.get_many(others, self._get_fingerprint))
+        if P.ndim != 2 or Q.ndim != 2 or P.shape[1] != Q.shape[1]:
+            raise Exception('The configurations are not the same size')
+
+        cum_diff = np.zeros((len(P), len(Q)))
+        max_diff = np.zeros((len(P), len(Q)))
+        for s, weight in self._get_segments(images[0]):
+            if s.stop == s.start:
+                continue
+            c1 = P[:, s]
+            c2 = Q[:, s]
+            t_size = c1.sum(axis=1)[:, np.newaxis]
+            cum_diff += cdist(c1, c2, 'cityblock') / t_size * weight
+            max_diff = cdist(c1, c2, 'chebyshev')
+        return cum_diff, max_diff
+
+    def looks_like_matrix(self, images, others=None):
+        """Return the boolean matrix M with
+        M[i, j] = self.looks_like(images[i], others[j]).
+
+        Fingerprints are taken from (or added to) the fingerprint
+        store, and the comparison is done chunkwise with NumPy."""
+        images = list(images)
+        others = images if others is None else list(others)
+        M = np.zeros((len(images), len(others)), dtype=bool)
+        if len(images) == 0 or len(others) == 0:
+            return M
+        if len(set(len(a) for a in images + others)) != 1:
+            raise Exception('The configurations are not the same size')
+
+        e1 = _get_energies(images)
+        e2 = _get_energies(others)
+        for i in range(0, len(images), self.chunksize):
+            chunk = images[i:i + self.chunksize]
+            cum_diff, max_diff = self.get_distance_matrix(chunk, others)
+            dE = np.abs(e1[i:i + self.chunksize, np.newaxis] - e2)
+            M[i:i + len(chunk)] = ((dE < self.dE)
+                                   & (cum_diff < self.pair_cor_cum_diff)
+                                   & (max_diff < self.pair_cor_max))
+        return M
+
 
 class SequentialComparator:
     """Use more than one comparison class and test them all in sequence.
@@ -124,6 +229,21 @@ class SequentialComparator:
                 return True
         return False
 
+    def looks_like_matrix(self, images, others=None):
+        if others is None:
+            others = images
+        mdct = dict((l, []) for l in self.logics)
+        for m, l in zip(self.methods, self.logics):
+            mdct[l].append(m)
+
+        M = np.zeros((len(images), len(others)), dtype=bool)
+        for methods in mdct.values():
+            group = np.ones_like(M)
+            for m in methods:
+                group &= get_looks_like_matrix(m, images, others)
+            M |= group
+        return M
+
 
 class StringComparator:
     """Compares the calculated hash strings. These strings should be stored
@@ -161,6 +281,12 @@ class EnergyComparator:
         else:
             return True
 
+    def looks_like_matrix(self, images, others=None):
+        if others is None:
+            others = images
+        dE = np.subtract.outer(_get_energies(images), _get_energies(others))
+        return np.abs(dE) < self.dE
+
 
 class RawScoreComparator:
     """Compares the raw_score of the supplied individuals
@@ -181,6 +307,13 @@ class RawScoreComparator:
         else:
             return True
 
+    def looks_like_matrix(self, images, others=None):
+        if others is None:
+            others = images
+        s1 = np.array([get_raw_score(a) for a in images], dtype=float)
+        s2 = np.array([get_raw_score(a) for a in others], dtype=float)
+        return np.abs(np.subtract.outer(s1, s2)) < self.dist
+
 
 class NoComparator:
     """Returns False always. If you don't want any comparator."""
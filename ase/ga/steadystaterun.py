@@ -0,0 +1,205 @@
+""" Class for running a steady-state GA with a pool of workers.
+Structures are passed to and from the workers in memory.
+"""
+import time
+from concurrent.futures import (ProcessPoolExecutor, FIRST_COMPLETED,
+                                wait)
+
+from ase.calculators.singlepoint import SinglePointCalculator
+
+
+def _relax(relax_function, atoms):
+    """Run relax_function in a worker and time it.
+
+    The calculator of the relaxed structure is replaced by a
+    SinglePointCalculator holding its results, so that the structure
+    can be sent back to the main process."""
+    start = time.perf_counter()
+    a = relax_function(atoms)
+    if a is None:
+        a = atoms
+    if a.calc is not None:
+        results = dict(a.calc.results)
+        a.calc = SinglePointCalculator(a, **results)
+    return a, time.perf_counter() - start
+
+
+class SteadyStateRun:
+    """Steady-state GA driver which keeps a fixed number of
+    relaxations running.
+
+    Whenever a relaxation finishes the relaxed structure is added to
+    the database, the population is updated and a new candidate is
+    generated and submitted right away, so the workers never wait for
+    a whole generation to finish. Candidates are passed to the workers
+    as Atoms objects instead of through trajectory files.
+
+    Parameters:
+
+    data_connection: DataConnection object.
+
+    relax_function: Function that takes an unrelaxed Atoms object,
+    relaxes it and returns the relaxed Atoms object with the raw score
+    set (see ase.ga.set_raw_score). It is called in the workers, so it
+    must be picklable when a process pool is used, i.e. defined at
+    module level.
+
+    generate_candidate: Function without arguments returning a new
+    candidate which has been added to the database with
+    add_unrelaxed_candidate (or add_unrelaxed_step). It may return
+    None if no candidate could be made, in which case it is called
+    again.
+
+    population: Population object (optional), which is updated every
+    time a candidate has been relaxed.
+
+    n_simul: The number of simultaneous relaxations.
+
+    executor: concurrent.futures.Executor (optional). The default is a
+    ProcessPoolExecutor with n_simul processes, which is shut down by
+    close(). Any other executor (threads, MPI, dask, ...) can be used
+    and is left running.
+
+    max_attempts: The number of consecutive times generate_candidate
+    may return None before giving up.
+    """
+
+    def __init__(self, data_connection, relax_function,
+                 generate_candidate, population=None, n_simul=4,
+                 executor=None, max_attempts=100):
+        self.dc = data_connection
+        self.relax_function = relax_function
+        self.generate_candidate = generate_candidate
+        self.population = population
+        self.n_simul = n_simul
+        self.max_attempts = max_attempts
+        self.own_executor = executor is None
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=n_simul)
+        self.executor = executor
+
+        self.running = {}
+        self.pending = []
+        self.n_relaxed = 0
+        self.n_failed = 0
+        self.errors = []
+        self.busy_time = 0.
+        self.generate_time = 0.
+        self.elapsed = 0.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Wait for running relaxations and shut down the executor if
+        it was created by this object."""
+        self.finish_all()
+        if self.own_executor:
+            self.executor.shutdown()
+
+    def relax(self, a):
+        """Submit the relaxation of the candidate a to the workers."""
+        self.dc.mark_as_queued(a)
+        future = self.executor.submit(_relax, self.relax_function, a)
+        self.running[future] = a
+
+    def run(self, n_candidates):
+        """Relax n_candidates structures (failed relaxations included),
+        keeping n_simul relaxations running all the time.
+
+        Unrelaxed candidates already in the database (for instance
+        the starting population) are relaxed first."""
+        pending = set(a.info['confid'] for a in self.pending)
+        self.pending.extend(a for a in self.dc.get_all_unrelaxed_candidates()
+                            if a.info['confid'] not in pending)
+        start = time.perf_counter()
+        n_submitted = 0
+        try:
+            while n_submitted < n_candidates or self.running:
+                while (len(self.running) < self.n_simul
+                       and n_submitted < n_candidates):
+                    self.relax(self._get_next_candidate())
+                    n_submitted += 1
+                done, _ = wait(self.running, return_when=FIRST_COMPLETED)
+                self._collect(done)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def finish_all(self):
+        """Wait until all submitted relaxations have finished and add
+        the results to the database."""
+        start = time.perf_counter()
+        while self.running:
+            done, _ = wait(self.running, return_when=FIRST_COMPLETED)
+            self._collect(done)
+        self.elapsed += time.perf_counter() - start
+
+    def get_number_of_jobs_running(self):
+        """Returns the number of relaxations running."""
+        return len(self.running)
+
+    def get_statistics(self):
+        """Returns a dictionary with throughput metrics:
+
+        relaxed: number of candidates relaxed.
+        failed: number of relaxations that raised an exception.
+        elapsed: wall time (s) spent in run() and finish_all().
+        candidates_per_hour: relaxed candidates per hour.
+        mean_relax_time: average time (s) of the successful
+        relaxations in the workers.
+        idle_fraction: fraction of the available worker time not
+        spent relaxing.
+        generate_fraction: fraction of the wall time spent making
+        new candidates in the main process.
+        """
+        stats = {'relaxed': self.n_relaxed,
+                 'failed': self.n_failed,
+                 'elapsed': self.elapsed,
+                 'candidates_per_hour': 0.,
+                 'mean_relax_time': 0.,
+                 'idle_fraction': 1.,
+                 'generate_fraction': 0.}
+        if self.n_relaxed > 0:
+            stats['mean_relax_time'] = self.busy_time / self.n_relaxed
+        if self.elapsed > 0:
+            stats['candidates_per_hour'] = 3600 * self.n_relaxed / self.elapsed
+            available = self.n_simul * self.elapsed
+            stats['idle_fraction'] = max(0., 1 - self.busy_time / available)
+            stats['generate_fraction'] = self.generate_time / self.elapsed
+        return stats
+
+    def _get_next_candidate(self):
+        if self.pending:
+            return self.pending.pop(0)
+        start = time.perf_counter()
+        try:
+            for _ in range(self.max_attempts):
+                a = self.generate_candidate()
+                if a is not None:
+                    return a
+        finally:
+            self.generate_time += time.perf_counter() - start
+        raise RuntimeError('No new candidate could be generated in {0} '
+                           'attempts'.format(self.max_attempts))
+
+    def _collect(self, done):
+        """Add the finished relaxations to the database."""
+        for future in done:
+            candidate = self.running.pop(future)
+            try:
+                a, duration = future.result()
+            except Exception as e:
+                self.n_failed += 1
+                self.errors.append((candidate.info['confid'], e))
+                continue
+            self.busy_time += duration
+            for key in ['confid', 'key_value_pairs', 'data']:
+                if key not in a.info:
+                    a.info[key] = candidate.info.get(key, {})
+            self.dc.add_relaxed_step(a)
+            self.n_relaxed += 1
+            if self.population is not None:
+                self.population.update()
@@ -9,6 +9,7 @@ from ase.io import write, read
 from ase.geometry.cell import cell_to_cellpar
 from ase.data import covalent_radii
 from ase.ga import get_neighbor_list
+from ase.neighborlist import neighbor_list
 
 
 def closest_distances_generator(atom_numbers, ratio_of_covalent_radii):
@@ -217,22 +218,15 @@ def get_all_atom_types(slab, atom_numbers_to_optimize):
 
 
 def get_distance_matrix(atoms, self_distance=1000):
-    """NB: This function is way slower than atoms.get_all_distances()
-
-    Returns a numpy matrix with the distances between the atoms
+    """Returns a numpy matrix with the distances between the atoms
     in the supplied atoms object, with the indices of the matrix
     corresponding to the indices in the atoms object.
 
     The parameter self_distance will be put in the diagonal
     elements ([i][i])
     """
-    dm = np.zeros([len(atoms), len(atoms)])
-    for i in range(len(atoms)):
-        dm[i][i] = self_distance
-        for j in range(i + 1, len(atoms)):
-            rij = atoms.get_distance(i, j)
-            dm[i][j] = rij
-            dm[j][i] = rij
+    dm = atoms.get_all_distances()
+    np.fill_diagonal(dm, self_distance)
     return dm
 
 
@@ -249,10 +243,14 @@ def get_rdf(atoms, rmax, nbins, distance_matrix=None,
 
     Parameters:
 
+    atoms : Atoms object or list of Atoms objects
+        If a list is given, the rdf is averaged over all images.
+
     rmax : float
         The maximum distance that will contribute to the rdf.
-        The unit cell should be large enough so that it encloses a
-        sphere with radius rmax in the periodic directions.
+        Pairs are found with :func:`ase.neighborlist.neighbor_list`,
+        so all periodic images within rmax are counted and rmax may
+        exceed half the cell width.
 
     nbins : int
         Number of bins to divide the rdf into.
@@ -260,7 +258,9 @@ def get_rdf(atoms, rmax, nbins, distance_matrix=None,
     distance_matrix : numpy.array
         An array of distances between atoms, typically
         obtained by atoms.get_all_distances().
-        Default None meaning that it will be calculated.
+        Default None meaning that pairs are found with a neighbor list.
+        If given, the unit cell should be large enough so that it
+        encloses a sphere with radius rmax in the periodic directions.
 
     elements : list or tuple
         List of two atomic numbers. If elements is not None the partial
@@ -269,56 +269,69 @@ def get_rdf(atoms, rmax, nbins, distance_matrix=None,
     no_dists : bool
         If True then the second array with rdf distances will not be returned
     """
-    # First check whether the cell is sufficiently large
-    cell = atoms.get_cell()
+    dr = float(rmax / nbins)
+    dists = (np.arange(1, nbins + 1) - 0.5) * dr
+
+    if isinstance(atoms, (list, tuple)):
+        rdf = np.zeros(nbins)
+        for image in atoms:
+            rdf += get_rdf(image, rmax, nbins, distance_matrix,
+                           elements, no_dists=True)
+        rdf /= len(atoms)
+    else:
+        counts, norm = _get_rdf_counts(atoms, rmax, nbins,
+                                       distance_matrix, elements)
+        rdf = counts / (norm * (dists**2 + dr**2 / 12.))
+
+    if no_dists:
+        return rdf
+    return rdf, dists
+
+
+def _get_rdf_counts(atoms, rmax, nbins, distance_matrix, elements):
+    """Pair counts per rdf bin and the normalization constant."""
     vol = atoms.get_volume()
-    pbc = atoms.get_pbc()
-    for i in range(3):
-        if pbc[i]:
-            axb = np.cross(cell[(i + 1) % 3, :], cell[(i + 2) % 3, :])
-            h = vol / np.linalg.norm(axb)
-            assert h > 2 * rmax, 'The cell is not large enough in ' \
-                 'direction %d: %.3f < 2*rmax=%.3f' % (i, h, 2 * rmax)
+    dr = float(rmax / nbins)
+    numbers = atoms.numbers
 
     dm = distance_matrix
     if dm is None:
-        dm = atoms.get_all_distances(mic=True)
-    rdf = np.zeros(nbins + 1)
-    dr = float(rmax / nbins)
+        i, j, d = neighbor_list('ijd', atoms, rmax)
+        if elements is None:
+            # Every pair is found in both directions
+            weight = 0.5
+        else:
+            d = d[(numbers[i] == elements[0]) & (numbers[j] == elements[1])]
+            weight = 1.0
+    else:
+        # First check whether the cell is sufficiently large
+        cell = atoms.get_cell()
+        pbc = atoms.get_pbc()
+        for k in range(3):
+            if pbc[k]:
+                axb = np.cross(cell[(k + 1) % 3, :], cell[(k + 2) % 3, :])
+                h = vol / np.linalg.norm(axb)
+                assert h > 2 * rmax, 'The cell is not large enough in ' \
+                    'direction %d: %.3f < 2*rmax=%.3f' % (k, h, 2 * rmax)
+
+        dm = np.asarray(dm)
+        if elements is None:
+            d = dm[np.triu_indices(len(atoms), 1)]
+        else:
+            d = dm[np.ix_(numbers == elements[0],
+                          numbers == elements[1])].ravel()
+        weight = 1.0
 
     if elements is None:
-        # Coefficients to use for normalization
         phi = len(atoms) / vol
         norm = 2.0 * math.pi * dr * phi * len(atoms)
-
-        for i in range(len(atoms)):
-            for j in range(i + 1, len(atoms)):
-                rij = dm[i][j]
-                index = int(math.ceil(rij / dr))
-                if index <= nbins:
-                    rdf[index] += 1
     else:
-        i_indices = np.where(atoms.numbers == elements[0])[0]
-        phi = len(i_indices) / vol
+        phi = (numbers == elements[0]).sum() / vol
         norm = 4.0 * math.pi * dr * phi * len(atoms)
 
-        for i in i_indices:
-            for j in np.where(atoms.numbers == elements[1])[0]:
-                rij = dm[i][j]
-                index = int(math.ceil(rij / dr))
-                if index <= nbins:
-                    rdf[index] += 1
-
-    dists = []
-    for i in range(1, nbins + 1):
-        rrr = (i - 0.5) * dr
-        dists.append(rrr)
-        # Normalize
-        rdf[i] /= (norm * ((rrr**2) + (dr**2) / 12.))
-
-    if no_dists:
-        return rdf[1:]
-    return rdf[1:], np.array(dists)
+    index = np.ceil(d / dr).astype(int)
+    counts = np.bincount(index[index <= nbins], minlength=nbins + 1)[1:]
+    return counts * weight, norm
 
 
 def get_nndist(atoms, distance_matrix):
@@ -353,23 +366,16 @@ def get_nnmat(atoms, mic=False):
     """
     if 'data' in atoms.info and 'nnmat' in atoms.info['data']:
         return atoms.info['data']['nnmat']
-    elements = sorted(set(atoms.get_chemical_symbols()))
+    symbols = atoms.get_chemical_symbols()
+    elements = sorted(set(symbols))
+    types = np.array([elements.index(sym) for sym in symbols])
     nnmat = np.zeros((len(elements), len(elements)))
-    # dm = get_distance_matrix(atoms)
     dm = atoms.get_all_distances(mic=mic)
     nndist = get_nndist(atoms, dm) + 0.2
-    for i in range(len(atoms)):
-        row = [j for j in range(len(elements))
-               if atoms[i].symbol == elements[j]][0]
-        neighbors = [j for j in range(len(dm[i])) if dm[i][j] < nndist]
-        for n in neighbors:
-            column = [j for j in range(len(elements))
-                      if atoms[n].symbol == elements[j]][0]
-            nnmat[row][column] += 1
+    rows, columns = np.nonzero(dm < nndist)
+    np.add.at(nnmat, (types[rows], types[columns]), 1)
     # divide by the number of that type of atoms in the structure
-    for i, el in enumerate(elements):
-        nnmat[i] /= len([j for j in range(len(atoms))
-                         if atoms[int(j)].symbol == el])
+    nnmat /= np.bincount(types)[:, np.newaxis]
     # makes a single list out of a list of lists
     nnlist = np.reshape(nnmat, (len(nnmat)**2))
     return nnlist
@@ -3,11 +3,12 @@ from ase.geometry.cell import (cell_to_cellpar, cellpar_to_cell,
                                complete_cell,
                                is_orthorhombic, orthorhombic,)
 from ase.geometry.geometry import (wrap_positions,
-                                   get_layers, find_mic,
+                                   get_layers, find_mic, MIC,
                                    conditional_find_mic,
                                    get_duplicate_atoms,
                                    get_angles, get_angles_derivatives,
                                    get_distances, get_distances_derivatives,
+                                   get_pair_distances,
                                    get_dihedrals, get_dihedrals_derivatives,
                                    permute_axes)
 from ase.geometry.distance import distance
@@ -16,9 +17,10 @@ from ase.geometry.minkowski_reduction import (minkowski_reduce,
 
 __all__ = ['Cell', 'wrap_positions', 'complete_cell',
            'is_orthorhombic', 'orthorhombic',
-           'get_layers', 'find_mic', 'get_duplicate_atoms',
+           'get_layers', 'find_mic', 'MIC', 'get_duplicate_atoms',
            'cell_to_cellpar', 'cellpar_to_cell', 'distance',
            'get_angles', 'get_distances', 'get_dihedrals',
+           'get_pair_distances',
            'get_angles_derivatives', 'get_distances_derivatives',
            'get_dihedrals_derivatives', 'conditional_find_mic',
            'permute_axes', 'minkowski_reduce', 'is_minkowski_reduced']
@@ -2,9 +2,11 @@
 """Tools for analyzing instances of :class:`~ase.Atoms`
 """
 
+import numpy as np
+
 from ase.neighborlist import build_neighbor_list, get_distance_matrix, get_distance_indices
 from ase.ga.utilities import get_rdf
-from ase import Atoms
+from ase.data import atomic_numbers
 
 
 __all__ = ['Analysis']
@@ -291,9 +293,8 @@ class Analysis:
     def _get_symbol_idxs(self, imI, sym):
         """Get list of indices of element *sym*"""
         if isinstance(imI, int):
-            return [ idx for idx in range(len(self.images[imI])) if self.images[imI][idx].symbol == sym  ]
-        else:
-            return [ idx for idx in range(len(imI)) if imI[idx].symbol == sym ]
+            imI = self.images[imI]
+        return [ int(idx) for idx in np.where(imI.numbers == atomic_numbers[sym])[0] ]
 
 
     def _idxTuple2SymbolTuple(self, imI, tup):
@@ -582,13 +583,10 @@ class Analysis:
                 tmpImage = image
             #integers
             elif isinstance(elements, int):
-                tmpImage = Atoms(cell=image.get_cell(), pbc=image.get_pbc())
-                tmpImage.append(image[elements])
+                tmpImage = image[[elements]]
             #strings
             elif isinstance(elements, str):
-                tmpImage = Atoms(cell=image.get_cell(), pbc=image.get_pbc())
-                for idx in self._get_symbol_idxs(image, elements):
-                    tmpImage.append(image[idx])
+                tmpImage = image[self._get_symbol_idxs(image, elements)]
             #lists
             elif isinstance(elements, list) or isinstance(elements, tuple):
                 #list of ints
@@ -599,15 +597,13 @@ class Analysis:
                         tmpImage = image
                     else:
                         #create dummy image
-                        tmpImage = Atoms(cell=image.get_cell(), pbc=image.get_pbc())
-                        for idx in elements:
-                            tmpImage.append(image[idx])
+                        tmpImage = image[list(elements)]
                 #list of strings
                 elif all(isinstance(x, str) for x in elements):
-                    tmpImage = Atoms(cell=image.get_cell(), pbc=image.get_pbc())
+                    idxs = []
                     for element in elements:
-                        for idx in self._get_symbol_idxs(image, element):
-                            tmpImage.append(image[idx])
+                        idxs.extend(self._get_symbol_idxs(image, element))
+                    tmpImage = image[idxs]
                 else:
                     raise ValueError("Unsupported type of elements given in ase.geometry.analysis.Analysis.get_rdf!")
             else:
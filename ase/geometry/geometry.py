@@ -195,35 +195,112 @@ def general_find_mic(v, cell, pbc=True):
     return vmin, vlen
 
 
+class MIC:
+    """Minimum image convention for a fixed cell.
+
+    The Minkowski-reduced cell and the lattice translations that have to
+    be tested are computed once (when first needed) and reused for every
+    call, which makes repeated minimum image searches with the same cell,
+    e.g. in NEB or constraints, much cheaper than :func:`find_mic`.
+    Vectors are processed in chunks of *chunksize* to keep the temporary
+    arrays small.
+
+    A MIC object can be passed instead of a cell to :func:`find_mic`,
+    :func:`get_distances` and the other functions that take *cell* and
+    *pbc* arguments; *pbc* is then ignored.
+
+    Example:
+
+    >>> import numpy as np
+    >>> from ase.geometry import MIC
+    >>> mic = MIC([[4.0, 0.0, 0.0], [2.0, 4.0, 0.0], [0.0, 0.0, 5.0]])
+    >>> vmin, vlen = mic(np.array([[3.5, 0.0, 0.0], [0.5, 3.5, 4.5]]))
+    >>> vlen.round(3).tolist()
+    [0.5, 1.658]
+    """
+
+    def __init__(self, cell, pbc=True, chunksize=4096):
+        self.cell = Cell(np.array(cell, dtype=float))
+        self.pbc = pbc2pbc(pbc)
+        self.chunksize = chunksize
+        self._pbc = self.cell.any(1) & self.pbc
+        self.dim = int(np.sum(self._pbc))
+        self._naive = None
+        self._reduced = None
+
+    def _naive_basis(self):
+        if self._naive is None:
+            cell = np.array(self.cell)
+            self._naive = (cell, np.linalg.inv(cell),
+                           0.5 * min(self.cell.lengths()))
+        return self._naive
+
+    def _reduced_basis(self):
+        if self._reduced is None:
+            rcell, _ = minkowski_reduce(complete_cell(self.cell),
+                                        pbc=self._pbc)
+            # In a Minkowski-reduced cell we only need to test nearest
+            # neighbors, or "Voronoi-relevant" vectors.  These are a
+            # subset of combinations of [-1, 0, 1] of the reduced cell
+            # vectors ([0] for aperiodic directions).  Pre-pend (0, 0, 0)
+            # to resolve issue #772.
+            ranges = [np.arange(-1 * p, p + 1) for p in self._pbc]
+            hkls = np.array([(0, 0, 0)] + list(itertools.product(*ranges)))
+            self._reduced = (rcell, np.linalg.inv(rcell), hkls @ rcell)
+        return self._reduced
+
+    def _find_chunk(self, v):
+        if self.dim == 3:
+            # The naive algorithm is safe only for short vectors:
+            cell, icell, limit = self._naive_basis()
+            f = v @ icell
+            f -= np.floor(f + 0.5)
+            vmin = f @ cell
+            vlen = np.linalg.norm(vmin, axis=1)
+            if (vlen < limit).all():
+                return vmin, vlen
+
+        rcell, ircell, vrvecs = self._reduced_basis()
+        f = v @ ircell
+        f[:, self._pbc] %= 1.0
+        x = f @ rcell + vrvecs[:, None]
+        lengths = np.linalg.norm(x, axis=2)
+        indices = np.argmin(lengths, axis=0)
+        n = np.arange(len(v))
+        return x[indices, n, :], lengths[indices, n]
+
+    def __call__(self, v):
+        """Return minimum image vectors and their lengths."""
+        v = np.asarray(v)
+        single = v.ndim == 1
+        v = np.atleast_2d(v)
+
+        if self.dim == 0:
+            vmin = v.copy()
+            vlen = np.linalg.norm(vmin, axis=1)
+        else:
+            vmin = np.empty(v.shape)
+            vlen = np.empty(len(v))
+            for start in range(0, len(v), self.chunksize):
+                end = start + self.chunksize
+                vmin[start:end], vlen[start:end] = self._find_chunk(
+                    v[start:end])
+
+        if single:
+            return vmin[0], vlen[0]
+        return vmin, vlen
+
+
 def find_mic(v, cell, pbc=True):
     """Finds the minimum-image representation of vector(s) v using either one
-    of two find mic algorithms depending on the given cell, v and pbc."""
-
-    cell = Cell(cell)
-    pbc = cell.any(1) & pbc2pbc(pbc)
-    dim = np.sum(pbc)
-    v = np.asarray(v)
-    single = v.ndim == 1
-    v = np.atleast_2d(v)
-
-    if dim > 0:
-        naive_find_mic_is_safe = False
-        if dim == 3:
-            vmin, vlen = naive_find_mic(v, cell)
-            # naive find mic is safe only for the following condition
-            if (vlen < 0.5 * min(cell.lengths())).all():
-                naive_find_mic_is_safe = True  # hence skip Minkowski reduction
-
-        if not naive_find_mic_is_safe:
-            vmin, vlen = general_find_mic(v, cell, pbc=pbc)
-    else:
-        vmin = v.copy()
-        vlen = np.linalg.norm(vmin, axis=1)
+    of two find mic algorithms depending on the given cell, v and pbc.
 
-    if single:
-        return vmin[0], vlen[0]
-    else:
-        return vmin, vlen
+    *cell* can also be a :class:`MIC` object, which reuses the reduced
+    cell of previous calls."""
+
+    if not isinstance(cell, MIC):
+        cell = MIC(cell, pbc)
+    return cell(v)
 
 
 def conditional_find_mic(vectors, cell, pbc):
@@ -231,10 +308,14 @@ def conditional_find_mic(vectors, cell, pbc):
     for a given list of vector arrays. The minimum image convention is applied
     if cell and pbc are set. Can be used like a simple version of get_distances.
     """
+    if isinstance(cell, MIC):
+        pbc = cell.pbc
     if (cell is None) != (pbc is None):
         raise ValueError("cell or pbc must be both set or both be None")
     if cell is not None:
-        mics = [find_mic(v, cell, pbc) for v in vectors]
+        if not isinstance(cell, MIC):
+            cell = MIC(cell, pbc)
+        mics = [cell(v) for v in vectors]
         vectors, vector_lengths = zip(*mics)
     else:
         vector_lengths = np.linalg.norm(vectors, axis=2)
@@ -363,6 +444,11 @@ def get_distances(p1, p2=None, cell=None, pbc=None):
     are desired. p2 will be set to p1 in this case.
 
     Use set cell and pbc to use the minimum image convention.
+
+    The minimum image search is done in chunks of vectors so that the
+    temporary memory does not grow beyond the size of the result.  For
+    distances up to a cutoff, :func:`get_pair_distances` scales much
+    better with the number of positions.
     """
     p1 = np.atleast_2d(p1)
     if p2 is None:
@@ -373,7 +459,7 @@ def get_distances(p1, p2=None, cell=None, pbc=None):
         p2 = np.atleast_2d(p2)
         D = (p2[np.newaxis, :, :] - p1[:, np.newaxis, :]).reshape((-1, 3))
 
-    (D, ), (D_len, ) = conditional_find_mic([D], cell=cell, pbc=pbc)
+    D, D_len = _chunked_find_mic(D, cell, pbc)
 
     if p2 is None:
         Dout = np.zeros((np1, np1, 3))
@@ -392,6 +478,67 @@ def get_distances(p1, p2=None, cell=None, pbc=None):
     return D, D_len
 
 
+def _chunked_find_mic(D, cell, pbc, chunksize=2**15):
+    """Apply conditional_find_mic() to chunks of an (M, 3) vector array."""
+    if cell is None or len(D) <= chunksize:
+        (D, ), (D_len, ) = conditional_find_mic([D], cell=cell, pbc=pbc)
+        return D, np.asarray(D_len)
+
+    if not isinstance(cell, MIC):
+        cell = MIC(cell, pbc)
+    D = D.copy()
+    D_len = np.empty(len(D))
+    for start in range(0, len(D), chunksize):
+        end = start + chunksize
+        D[start:end], D_len[start:end] = cell(D[start:end])
+    return D, D_len
+
+
+def get_pair_distances(positions, cutoff, cell=None, pbc=None):
+    """Return all pairs of positions closer than cutoff.
+
+    Returns the indices i and j with i < j (sorted by i, then j), the
+    distance vectors D from position i to position j and the distances d.
+    Use cell and pbc to apply the minimum image convention.  Pairs are
+    found with a KD-tree or a neighbor list, so the cost scales as
+    O(N log N) instead of O(N^2) for N positions.
+    """
+    if isinstance(cell, MIC):
+        cell, pbc = cell.cell, cell.pbc
+    if (cell is None) != (pbc is None):
+        raise ValueError("cell or pbc must be both set or both be None")
+
+    positions = np.atleast_2d(np.asarray(positions, dtype=float))
+    if cell is not None:
+        cell = Cell.new(cell)
+        pbc = cell.any(1) & pbc2pbc(pbc)
+
+    if cell is None or not pbc.any():
+        from scipy.spatial import cKDTree
+        pairs = cKDTree(positions).query_pairs(cutoff,
+                                               output_type='ndarray')
+        i, j = pairs.reshape(-1, 2).T
+        D = positions[j] - positions[i]
+        d = np.linalg.norm(D, axis=1)
+        mask = d < cutoff
+        i, j, D, d = i[mask], j[mask], D[mask], d[mask]
+        order = np.lexsort((j, i))
+        return i[order], j[order], D[order], d[order]
+
+    from ase.neighborlist import primitive_neighbor_list
+    i, j, D, d = primitive_neighbor_list('ijDd', pbc, cell.complete(),
+                                         positions, cutoff)
+    mask = i < j
+    i, j, D, d = i[mask], j[mask], D[mask], d[mask]
+
+    # Large cutoffs find several images of a pair: keep the shortest one
+    order = np.lexsort((d, j, i))
+    i, j, D, d = i[order], j[order], D[order], d[order]
+    first = np.ones(len(i), bool)
+    first[1:] = (i[1:] != i[:-1]) | (j[1:] != j[:-1])
+    return i[first], j[first], D[first], d[first]
+
+
 def get_distances_derivatives(v0, cell=None, pbc=None):
     """Get derivatives of distances for all vectors in v0 w.r.t. Cartesian
     coordinates in Angstrom.
@@ -419,10 +566,8 @@ def get_duplicate_atoms(atoms, cutoff=0.1, delete=False):
     Identify all atoms which lie within the cutoff radius of each other.
     Delete one set of them if delete == True.
     """
-    from scipy.spatial.distance import pdist
-    dists = pdist(atoms.get_positions(), 'sqeuclidean')
-    dup = np.nonzero(dists < cutoff**2)
-    rem = np.array(_row_col_from_pdist(len(atoms), dup[0]))
+    i, j, _, _ = get_pair_distances(atoms.get_positions(), cutoff)
+    rem = np.array(list(zip(i, j)))
     if delete:
         if rem.size != 0:
             del atoms[rem[:, 0]]
@@ -430,20 +575,6 @@ def get_duplicate_atoms(atoms, cutoff=0.1, delete=False):
         return rem
 
 
-def _row_col_from_pdist(dim, i):
-    """Calculate the i,j index in the square matrix for an index in a
-    condensed (triangular) matrix.
-    """
-    i = np.array(i)
-    b = 1 - 2 * dim
-    x = (np.floor((-b - np.sqrt(b**2 - 8 * i)) / 2)).astype(int)
-    y = (i + x * (b + x + 2) / 2 + 1).astype(int)
-    if i.shape:
-        return list(zip(x, y))
-    else:
-        return [(x, y)]
-
-
 def permute_axes(atoms, permutation):
     """Permute axes of unit cell and atom positions. Considers only cell and
     atomic positions. Other vector quantities such as momenta are not
@@ -1,7 +1,4 @@
-from ase.io.trajectory import Trajectory, PickleTrajectory
-from ase.io.bundletrajectory import BundleTrajectory
-from ase.io.netcdftrajectory import NetCDFTrajectory
-from ase.io.formats import read, iread, write, string2index
+from ase.utils.lazy import lazy_attributes
 
 
 class ParseError(Exception):
@@ -12,3 +9,15 @@ __all__ = [
     'Trajectory', 'PickleTrajectory', 'BundleTrajectory', 'NetCDFTrajectory',
     'read', 'iread', 'write', 'string2index'
 ]
+
+# The objects are imported on first use (e.g. "from ase.io import read"),
+# which keeps "import ase.io" cheap:
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'Trajectory': 'ase.io.trajectory',
+    'PickleTrajectory': 'ase.io.trajectory',
+    'BundleTrajectory': 'ase.io.bundletrajectory',
+    'NetCDFTrajectory': 'ase.io.netcdftrajectory',
+    'read': 'ase.io.formats',
+    'iread': 'ase.io.formats',
+    'write': 'ase.io.formats',
+    'string2index': 'ase.io.formats'})
@@ -3,14 +3,20 @@ The key idea is that all function accept or return  atoms objects.
 CASTEP specific parameters will be returned through the <atoms>.calc
 attribute.
 """
+import functools
+import io
 import os
 import re
 import warnings
 import numpy as np
 from copy import deepcopy
+from itertools import islice
 
 import ase
 
+from ase.io.formats import string2index
+from ase.io.utils import (find_line_start, get_seekable_buffer,
+                          is_tail_slice, read_lines, reverse_find)
 from ase.parallel import paropen
 from ase.spacegroup import Spacegroup
 from ase.geometry.cell import cellpar_to_cell
@@ -849,7 +855,10 @@ def read_castep_geom(fd, index=None, units=units_CODATA2002):
     Note that everything in the .geom file is in atomic units, which has
     been conversed to commonly used unit angstrom(length) and eV (energy).
 
-    Note that the index argument has no effect as of now.
+    The file is read one step at a time: an integer index returns a
+    single atoms object, a slice an iterator and None a list of all
+    steps.  The last steps of a seekable file are found by searching
+    backwards from its end.
 
     Contribution by Wei-Bing Zhang. Thanks!
 
@@ -857,50 +866,56 @@ def read_castep_geom(fd, index=None, units=units_CODATA2002):
     bz2 handling to formats.py. Note that there is a fallback routine
     read_geom() that behaves like previous versions did.
     """
-    from ase.calculators.singlepoint import SinglePointCalculator
+    def complete(lines):
+        return lines if _is_complete_geom_step(lines) else None
 
-    # fd is closed by embracing read() routine
-    txt = fd.readlines()
+    images = _iread_castep_steps(fd, index, _iread_geom_blocks, complete,
+                                 functools.partial(_read_geom_step,
+                                                   units=units))
+    return _castep_images(images, index)
+
+
+def _iread_geom_blocks(fd):
+    """Yield the lines of each step of a .geom file.
+
+    A step starts with the line holding its energy ('<-- E')."""
+    lines = None
+    for line in fd:
+        if '<-- E' in line:
+            if lines is not None:
+                yield lines
+            lines = [line]
+        elif lines is not None:
+            lines.append(line)
+    if lines is not None and _is_complete_geom_step(lines):
+        yield lines
 
-    traj = []
+
+def _is_complete_geom_step(lines):
+    # The last step is skipped if the forces were not all written yet
+    nforces = sum('<-- F' in line for line in lines)
+    return nforces > 0 and nforces == sum('<-- R' in line for line in lines)
+
+
+def _read_geom_step(lines, units):
+    """Build the atoms object of one step of a .geom file."""
+    from ase.calculators.singlepoint import SinglePointCalculator
 
     Hartree = units['Eh']
     Bohr = units['a0']
 
-    # Yeah, we know that...
-    # print('N.B.: Energy in .geom file is not 0K extrapolated.')
-    for i, line in enumerate(txt):
-        if line.find('<-- E') > 0:
-            start_found = True
-            energy = float(line.split()[0]) * Hartree
-            cell = [x.split()[0:3] for x in txt[i + 1:i + 4]]
-            cell = np.array([[float(col) * Bohr for col in row] for row in
-                             cell])
-        if line.find('<-- R') > 0 and start_found:
-            start_found = False
-            geom_start = i
-            for i, line in enumerate(txt[geom_start:]):
-                if line.find('<-- F') > 0:
-                    geom_stop = i + geom_start
-                    break
-            species = [line.split()[0] for line in
-                       txt[geom_start:geom_stop]]
-            geom = np.array([[float(col) * Bohr for col in
-                              line.split()[2:5]] for line in
-                             txt[geom_start:geom_stop]])
-            forces = np.array([[float(col) * Hartree / Bohr for col in
-                                line.split()[2:5]] for line in
-                               txt[geom_stop:geom_stop
-                                   + (geom_stop - geom_start)]])
-            image = ase.Atoms(species, geom, cell=cell, pbc=True)
-            image.calc = SinglePointCalculator(
-                atoms=image, energy=energy, forces=forces)
-            traj.append(image)
-
-    if index is None:
-        return traj
-    else:
-        return traj[index]
+    energy = float(lines[0].split()[0]) * Hartree
+    cell = np.array([line.split()[0:3] for line in lines[1:4]],
+                    dtype=float) * Bohr
+    geom = [line.split() for line in lines if '<-- R' in line]
+    species = [fields[0] for fields in geom]
+    positions = np.array([fields[2:5] for fields in geom], dtype=float)
+    forces = np.array([line.split()[2:5] for line in lines
+                       if '<-- F' in line], dtype=float)
+    image = ase.Atoms(species, positions * Bohr, cell=cell, pbc=True)
+    image.calc = SinglePointCalculator(
+        atoms=image, energy=energy, forces=forces * Hartree / Bohr)
+    return image
 
 
 def read_phonon(filename, index=None, read_vib_data=False,
@@ -1055,8 +1070,55 @@ def read_castep_md(fd, index=None, return_scalars=False,
     """Reads a .md file written by a CASTEP MolecularDynamics task
     and returns the trajectory stored therein as a list of atoms object.
 
-    Note that the index argument has no effect as of now."""
+    The file is read one step at a time: an integer index returns a
+    single atoms object, a slice an iterator and None a list of all
+    steps.  The last steps of a seekable file are found by searching
+    backwards from its end.  With return_scalars, the scalars of all
+    steps are returned as well, so the whole file is read."""
+
+    if return_scalars:
+        steps = [_read_md_step(lines, units)
+                 for lines in _iread_md_blocks(fd)]
+        traj = [atoms for atoms, scalars in steps]
+        data = [[scalars[i] for atoms, scalars in steps] for i in range(4)]
+        if index is not None:
+            traj = traj[index]
+        return data, traj
+
+    def complete(lines):
+        # A step ends with an empty line
+        for i, line in enumerate(lines):
+            if not line.split():
+                return lines[:i]
+        return None
+
+    images = _iread_castep_steps(
+        fd, index, _iread_md_blocks, complete,
+        lambda lines: _read_md_step(lines, units)[0], nbefore=1)
+    return _castep_images(images, index)
+
+
+def _iread_md_blocks(fd):
+    """Yield the lines of each step of a .md file.
 
+    Steps are separated by empty lines after the header."""
+    for line in fd:
+        if 'END header' in line:
+            break
+    lines = []
+    for line in fd:
+        if line.split():
+            lines.append(line)
+        elif lines:
+            yield lines
+            lines = []
+
+
+def _read_md_step(lines, units):
+    """Build the atoms object of one step of a .md file.
+
+    Returns the atoms and the time, energies, temperature and
+    pressure of the step."""
     from ase.calculators.singlepoint import SinglePointCalculator
 
     factors = {
@@ -1071,67 +1133,22 @@ def read_castep_md(fd, index=None, return_scalars=False,
         'V': np.sqrt(units['Eh'] / units['me']),
         'F': units['Eh'] / units['a0']}
 
-    # fd is closed by embracing read() routine
-    lines = fd.readlines()
-
-    L = 0
-    while 'END header' not in lines[L]:
-        L += 1
-    l_end_header = L
-    lines = lines[l_end_header + 1:]
-    times = []
-    energies = []
-    temperatures = []
-    pressures = []
-    traj = []
-
-    # Initialization
     time = None
     Epot = None
     Ekin = None
     EH = None
     temperature = None
     pressure = None
-    symbols = None
-    positions = None
-    cell = None
-    velocities = None
     symbols = []
     positions = []
     velocities = []
     forces = []
-    cell = np.eye(3)
+    cell = []
     cell_velocities = []
     stress = []
 
-    for (L, line) in enumerate(lines):
+    for line in lines:
         fields = line.split()
-        if len(fields) == 0:
-            if L != 0:
-                times.append(time)
-                energies.append([Epot, EH, Ekin])
-                temperatures.append(temperature)
-                pressures.append(pressure)
-                atoms = ase.Atoms(symbols=symbols,
-                                  positions=positions,
-                                  cell=cell)
-                atoms.set_velocities(velocities)
-                if len(stress) == 0:
-                    atoms.calc = SinglePointCalculator(
-                        atoms=atoms, energy=Epot, forces=forces)
-                else:
-                    atoms.calc = SinglePointCalculator(
-                        atoms=atoms, energy=Epot,
-                        forces=forces, stress=stress)
-                traj.append(atoms)
-            symbols = []
-            positions = []
-            velocities = []
-            forces = []
-            cell = []
-            cell_velocities = []
-            stress = []
-            continue
         if len(fields) == 1:
             time = factors['t'] * float(fields[0])
             continue
@@ -1180,16 +1197,84 @@ def read_castep_md(fd, index=None, return_scalars=False,
             forces.append([factors['F'] * Fi for Fi in F])
             continue
 
-    if index is None:
-        pass
+    atoms = ase.Atoms(symbols=symbols,
+                      positions=positions,
+                      cell=cell)
+    atoms.set_velocities(velocities)
+    if len(stress) == 0:
+        atoms.calc = SinglePointCalculator(
+            atoms=atoms, energy=Epot, forces=forces)
     else:
-        traj = traj[index]
-
-    if return_scalars:
-        data = [times, energies, temperatures, pressures]
-        return data, traj
+        atoms.calc = SinglePointCalculator(
+            atoms=atoms, energy=Epot,
+            forces=forces, stress=stress)
+    return atoms, (time, [Epot, EH, Ekin], temperature, pressure)
+
+
+def _iread_castep_steps(fd, index, iblocks, complete, build, nbefore=0):
+    """Build the images selected by index from the steps of a .geom or
+    .md file.
+
+    iblocks(fd) yields the lines of each step.  The last steps of a
+    seekable file are instead found by searching backwards for their
+    energy lines ('<-- E'), which are the first lines of the steps
+    after nbefore lines; complete(lines) cuts the lines from there to
+    the next step down to the step, or returns None if the step was not
+    fully written."""
+    if isinstance(index, str):
+        index = string2index(index)
+    elif index is None:
+        index = slice(None)
+    elif not isinstance(index, slice):
+        index = slice(index, (index + 1) or None)
+
+    buffer = get_seekable_buffer(fd)
+    if buffer is not None and is_tail_slice(index):
+        blocks = _read_last_castep_blocks(fd, buffer, -index.start,
+                                          complete, nbefore)[index]
     else:
-        return traj
+        try:
+            blocks = islice(iblocks(fd), index.start, index.stop,
+                            index.step)
+        except ValueError:
+            # Negative indices
+            blocks = list(iblocks(fd))[index]
+    for lines in blocks:
+        yield build(lines)
+
+
+def _read_last_castep_blocks(fd, buffer, count, complete, nbefore=0):
+    """Return (up to) the last count steps, searching backwards through
+    the seekable binary buffer of fd."""
+    encoding = getattr(fd, 'encoding', None) or 'utf-8'
+    first = fd.tell()
+    end = buffer.seek(0, io.SEEK_END)
+    blocks = []
+    while len(blocks) < count:
+        pos = reverse_find(buffer, [b'<-- E'], first, end)
+        if pos is None:
+            break
+        pos = find_line_start(buffer, pos, first)
+        for _ in range(nbefore):
+            pos = find_line_start(buffer, max(first, pos - 1), first)
+        lines = complete(read_lines(buffer, pos, end, encoding))
+        end = pos
+        if lines is not None:
+            blocks.append(lines)
+    return blocks[::-1]
+
+
+def _castep_images(images, index):
+    """Return the images as the .geom and .md readers always have:
+    a list for index None, a single atoms object for an integer index
+    and (now) an iterator for slices."""
+    if index is None:
+        return list(images)
+    if isinstance(index, (slice, str)):
+        return images
+    for atoms in images:
+        return atoms
+    raise IndexError('list index out of range')
 
 
 # Routines that only the calculator requires
@@ -6,14 +6,17 @@ http://local.wasp.uwa.edu.au/~pbourke/dataformats/cube/
 """
 
 
-import numpy as np
 import time
+import warnings
+
+import numpy as np
 from ase.atoms import Atoms
 from ase.io import read
 from ase.units import Bohr
 
 
-def write_cube(fileobj, atoms, data=None, origin=None, comment=None):
+def write_cube(fileobj, atoms, data=None, origin=None, comment=None,
+               chunksize=2**16):
     """
     Function to write a cube file.
 
@@ -27,15 +30,14 @@ def write_cube(fileobj, atoms, data=None, origin=None, comment=None):
         Origin of the volumetric data (units: Angstrom)
     comment : str, optional (default = None)
         Comment for the first line of the cube file.
+    chunksize : int
+        Number of values formatted at a time.
     """
 
     if data is None:
         data = np.ones((2, 2, 2))
     data = np.asarray(data)
 
-    if data.dtype == complex:
-        data = np.abs(data)
-
     if comment is None:
         comment = 'Cube file from ASE, written on ' + time.strftime('%c')
     else:
@@ -63,10 +65,18 @@ def write_cube(fileobj, atoms, data=None, origin=None, comment=None):
         fileobj.write('{0:5}{1:12.6f}{2:12.6f}{3:12.6f}{4:12.6f}\n'
                       .format(Z, 0.0, x, y, z))
 
-    data.tofile(fileobj, sep='\n', format='%e')
+    # Write the data a block at a time so that large (possibly
+    # memory-mapped or complex) arrays are never converted as a whole:
+    data = data.reshape(-1)
+    for start in range(0, len(data), chunksize):
+        block = data[start:start + chunksize]
+        if block.dtype == complex:
+            block = np.abs(block)
+        fileobj.write(('%e\n' * len(block)) % tuple(block))
 
 
-def read_cube(fileobj, read_data=True, program=None, verbose=False):
+def read_cube(fileobj, read_data=True, program=None, verbose=False,
+              out=None):
     """Read atoms and data from CUBE file.
 
     fileobj : str or file
@@ -82,6 +92,11 @@ def read_cube(fileobj, read_data=True, program=None, verbose=False):
         to catch castep files from the comment lines.
     verbose : bool
         Print some more information to stdout.
+    out : ndarray, optional
+        C-contiguous float array with the shape of the grid in the file
+        to read the data into, for example a memory-mapped array
+        (``numpy.lib.format.open_memmap()``).  The returned data is
+        then a view of out.
 
     Returns a dict with the following keys:
     
@@ -149,10 +164,11 @@ def read_cube(fileobj, read_data=True, program=None, verbose=False):
     dct = {'atoms': atoms}
 
     if read_data:
-        data = np.array([float(s)
-                         for s in fileobj.read().split()]).reshape(shape)
+        data = read_cube_values(fileobj, shape, out=out)
         if axes != [0, 1, 2]:
-            data = data.transpose(axes).copy()
+            data = data.transpose(axes)
+            if out is None:
+                data = data.copy()
 
         if program == 'castep':
             # Due to the PBC applied in castep2cube, the last entry along each
@@ -165,9 +181,57 @@ def read_cube(fileobj, read_data=True, program=None, verbose=False):
     return dct
 
 
-def read_cube_data(filename):
+def read_cube_values(fileobj, shape, out=None, chunksize=2**22):
+    """Read the volumetric data following the header of a cube file.
+
+    The text is read and converted in chunks of about chunksize
+    characters, so that only out (or the returned array) has to fit
+    in memory.
+    """
+    if out is None:
+        out = np.empty(shape)
+    elif tuple(out.shape) != tuple(shape) or not out.flags.c_contiguous:
+        raise ValueError('out must be a C-contiguous array of shape {}'
+                         .format(tuple(shape)))
+    flat = out.reshape(-1)
+    n = 0
+    rest = ''
+    eof = False
+    while not eof:
+        text = fileobj.read(chunksize)
+        if text:
+            # Keep a number that may continue in the next chunk:
+            text = rest + text
+            cut = max(text.rfind('\n'), text.rfind(' ')) + 1
+            text, rest = text[:cut], text[cut:]
+        else:
+            text = rest
+            eof = True
+        if not text.strip():
+            continue
+        with warnings.catch_warnings():
+            # Raised by numpy for text that is not a number:
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                values = np.fromstring(text, sep=' ')
+            except DeprecationWarning:
+                raise ValueError('Could not read data from cube file')
+        if n + len(values) > len(flat):
+            raise ValueError('Too many values in cube file')
+        flat[n:n + len(values)] = values
+        n += len(values)
+    if n != len(flat):
+        raise ValueError('Expected {} values in cube file, found {}'
+                         .format(len(flat), n))
+    return out
+
+
+def read_cube_data(filename, out=None):
     """Wrapper function to read not only the atoms information from a cube file
     but also the contained volumetric data.
+
+    See read_cube() for out.
     """
-    dct = read(filename, format='cube', read_data=True, full_output=True)
+    dct = read(filename, format='cube', read_data=True, full_output=True,
+               out=out)
     return dct['data'], dct['atoms']
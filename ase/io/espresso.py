@@ -11,6 +11,8 @@ Units are converted using CODATA 2006, as used internally by Quantum
 ESPRESSO.
 """
 
+import functools
+import io
 import os
 import operator as op
 import re
@@ -27,6 +29,10 @@ from ase.calculators.calculator import kpts2ndarray, kpts2sizeandoffsets
 from ase.dft.kpoints import kpoint_convert
 from ase.constraints import FixAtoms, FixCartesian
 from ase.data import chemical_symbols, atomic_numbers
+from ase.io.formats import string2index
+from ase.io.utils import (ImageChunk, ImageIterator, find_line_start,
+                          get_seekable_buffer, is_tail_slice, read_lines,
+                          reverse_find)
 from ase.units import create_units
 from ase.utils import iofunction
 
@@ -77,6 +83,11 @@ def read_espresso_out(fileobj, index=-1, results_required=True):
     magnetic moments) of the calculation are read for all configurations
     within the output file.
 
+    The file is read one configuration at a time.  The last
+    configurations (e.g. the default ``index=-1``) of a seekable file are
+    found by searching backwards from the end of the file, so the
+    earlier steps of a long relaxation are not parsed.
+
     Will probably raise errors for broken or incomplete files.
 
     Parameters
@@ -100,16 +111,189 @@ def read_espresso_out(fileobj, index=-1, results_required=True):
 
 
     """
-    # work with a copy in memory for faster random access
-    pwo_lines = fileobj.readlines()
-
-    # TODO: index -1 special case?
-    # Index all the interesting points
+    if isinstance(index, str):
+        index = string2index(index)
+    elif isinstance(index, int):
+        index = slice(index, (index + 1) or None)
+
+    buffer = get_seekable_buffer(fileobj)
+    if buffer is not None and index is not None and is_tail_slice(index):
+        # Only the last -index.start configurations are needed
+        chunks = _read_last_pwo_chunks(fileobj, buffer, -index.start,
+                                       results_required)
+        for chunk in chunks[index]:
+            yield chunk.build()
+        return
+
+    ichunks = functools.partial(_iread_pwo_chunks,
+                                results_required=results_required)
+    yield from ImageIterator(ichunks)(fileobj, index)
+
+
+class PWOChunk(ImageChunk):
+    """The lines of one configuration in a pw.x output file.
+
+    ``start`` is a dictionary shared by all configurations of a run,
+    holding the lines printed when PWSCF starts.  They are parsed (once)
+    only when a structure is built."""
+
+    def __init__(self, lines, start, cell_lines, kpts_lines):
+        self.lines = lines
+        self.start = start
+        self.cell_lines = cell_lines
+        self.kpts_lines = kpts_lines
+
+    def build(self):
+        if 'info' not in self.start:
+            self.start['info'] = parse_pwo_start(self.start['lines'])
+        return _build_pwo_structure(self.lines, self.start['info'],
+                                    self.cell_lines, self.kpts_lines)
+
+
+def _iter_pwo_configurations(fileobj):
+    """Yield the lines of each configuration in a pw.x output file.
+
+    Configurations are either at the start, or defined in ATOMIC_POSITIONS
+    in a subsequent step.  Each configuration is yielded together with
+    the five lines before it, where CELL_PARAMETERS would be printed."""
+    before = []
+    lines = None
+    for line in fileobj:
+        if _PW_START in line or _PW_POS in line:
+            if lines is not None:
+                yield before[-5:], lines
+                before = lines
+            lines = [line]
+        elif lines is None:
+            before.append(line)
+        else:
+            lines.append(line)
+    if lines is not None:
+        yield before[-5:], lines
+
+
+def _iread_pwo_chunks(fileobj, results_required=True):
+    """Yield a PWOChunk for each configuration of a pw.x output file.
+
+    Can deal with concatenated output files."""
+    start = None
+    kpts_lines = None
+    for cell_lines, lines in _iter_pwo_configurations(fileobj):
+        if _PW_START in lines[0]:
+            start = {'lines': lines}
+        text = ''.join(lines)
+        if _PW_KPTS in text:
+            kpts_lines = _get_kpts_lines(lines) or kpts_lines
+        if start is None:
+            continue
+        if results_required and not _has_results(text, lines[0]):
+            continue
+        yield PWOChunk(lines, start, cell_lines, kpts_lines)
+
+
+def _read_last_pwo_chunks(fileobj, buffer, count, results_required=True):
+    """Return (up to) the last count configurations of a pw.x output file.
+
+    The seekable binary buffer of fileobj is searched backwards for the
+    configurations, and then for the start of the run they belong to
+    and the last printed k-points."""
+    encoding = getattr(fileobj, 'encoding', None) or 'utf-8'
+    start_marker = _PW_START.encode()
+    config_markers = [start_marker, _PW_POS.encode()]
+    first = fileobj.tell()
+    end = buffer.seek(0, io.SEEK_END)
+    starts = {}
+    chunks = []
+    while len(chunks) < count:
+        pos = reverse_find(buffer, config_markers, first, end)
+        if pos is None:
+            break
+        pos = find_line_start(buffer, pos, first)
+        lines = read_lines(buffer, pos, end, encoding)
+        config_end, end = end, pos
+        if results_required and not _has_results(''.join(lines), lines[0]):
+            continue
+
+        if _PW_START in lines[0]:
+            start_pos = pos
+        else:
+            start_pos = reverse_find(buffer, [start_marker], first, pos)
+            if start_pos is None:
+                continue
+            start_pos = find_line_start(buffer, start_pos, first)
+        if start_pos not in starts:
+            if start_pos == pos:
+                starts[start_pos] = {'lines': lines}
+            else:
+                starts[start_pos] = {'lines': _read_pwo_start_lines(
+                    buffer, start_pos, config_markers, encoding)}
+
+        cell_lines = read_lines(buffer, max(first, pos - 4096), pos,
+                                encoding)[-5:]
+        kpts_lines = _find_kpts_lines(buffer, first, config_end, encoding)
+        chunks.append(PWOChunk(lines, starts[start_pos], cell_lines,
+                               kpts_lines))
+    return chunks[::-1]
+
+
+def _read_pwo_start_lines(buffer, pos, markers, encoding):
+    """Read the lines from pos up to the next configuration."""
+    buffer.seek(pos)
+    lines = [buffer.readline().decode(encoding)]
+    for line in buffer:
+        if any(marker in line for marker in markers):
+            break
+        lines.append(line.decode(encoding))
+    return lines
+
+
+def _has_results(text, first_line):
+    """Whether results are printed after the first line of text."""
+    text = text[len(first_line):]
+    return any(identifier in text for identifier in
+               [_PW_TOTEN, _PW_FORCE, _PW_STRESS, _PW_MAGMOM, _PW_BANDS,
+                _PW_BANDSTRUCTURE])
+
+
+_PW_KPTS_WARNING = ("Number of k-points >= 100: "
+                    "set verbosity='high' to print them.")
+
+
+def _get_kpts_lines(lines):
+    """Return the lines of the last printed list of k-points in lines.
+
+    Returns None if there is no such list, e.g. when there are too many
+    k-points to be printed."""
+    kpts_lines = None
+    for idx, line in enumerate(lines):
+        if _PW_KPTS in line:
+            nkpts = int(line.split()[4])
+            if lines[idx + 2].strip() != _PW_KPTS_WARNING:
+                kpts_lines = lines[idx + 2:idx + 2 + nkpts]
+    return kpts_lines
+
+
+def _find_kpts_lines(buffer, start, end, encoding):
+    """Search backwards from end for the last printed list of k-points."""
+    while True:
+        pos = reverse_find(buffer, [_PW_KPTS.encode()], start, end)
+        if pos is None:
+            return None
+        pos = find_line_start(buffer, pos, start)
+        buffer.seek(pos)
+        lines = [buffer.readline().decode(encoding) for _ in range(3)]
+        nkpts = int(lines[0].split()[4])
+        lines += [buffer.readline().decode(encoding)
+                  for _ in range(nkpts - 1)]
+        kpts_lines = _get_kpts_lines(lines)
+        if kpts_lines is not None:
+            return kpts_lines
+        end = pos
+
+
+def _build_pwo_structure(pwo_lines, start_info, cell_lines, kpts_lines):
+    """Build the Atoms with results from the lines of one configuration."""
     indexes = {
-        _PW_START: [],
-        _PW_END: [],
-        _PW_CELL: [],
-        _PW_POS: [],
         _PW_MAGMOM: [],
         _PW_FORCE: [],
         _PW_TOTEN: [],
@@ -117,261 +301,176 @@ def read_espresso_out(fileobj, index=-1, results_required=True):
         _PW_FERMI: [],
         _PW_HIGHEST_OCCUPIED: [],
         _PW_HIGHEST_OCCUPIED_LOWEST_FREE: [],
-        _PW_KPTS: [],
         _PW_BANDS: [],
         _PW_BANDSTRUCTURE: [],
     }
 
-    for idx, line in enumerate(pwo_lines):
+    for idx, line in enumerate(pwo_lines[1:], start=1):
         for identifier in indexes:
             if identifier in line:
                 indexes[identifier].append(idx)
 
-    # Configurations are either at the start, or defined in ATOMIC_POSITIONS
-    # in a subsequent step. Can deal with concatenated output files.
-    all_config_indexes = sorted(indexes[_PW_START] +
-                                indexes[_PW_POS])
-
-    # Slice only requested indexes
-    # setting results_required argument stops configuration-only
-    # structures from being returned. This ensures the [-1] structure
-    # is one that has results. Two cases:
-    # - SCF of last configuration is not converged, job terminated
-    #   abnormally.
-    # - 'relax' and 'vc-relax' re-prints the final configuration but
-    #   only 'vc-relax' recalculates.
-    if results_required:
-        results_indexes = sorted(indexes[_PW_TOTEN] + indexes[_PW_FORCE] +
-                                 indexes[_PW_STRESS] + indexes[_PW_MAGMOM] +
-                                 indexes[_PW_BANDS] +
-                                 indexes[_PW_BANDSTRUCTURE])
-
-        # Prune to only configurations with results data before the next
-        # configuration
-        results_config_indexes = []
-        for config_index, config_index_next in zip(
-                all_config_indexes,
-                all_config_indexes[1:] + [len(pwo_lines)]):
-            if any([config_index < results_index < config_index_next
-                    for results_index in results_indexes]):
-                results_config_indexes.append(config_index)
-
-        # slice from the subset
-        image_indexes = results_config_indexes[index]
+    # Get the structure
+    # Use this for any missing data
+    prev_structure = start_info['atoms']
+    if _PW_START in pwo_lines[0]:
+        structure = prev_structure.copy()  # parsed from start info
     else:
-        image_indexes = all_config_indexes[index]
-
-    # Extract initialisation information each time PWSCF starts
-    # to add to subsequent configurations. Use None so slices know
-    # when to fill in the blanks.
-    pwscf_start_info = dict((idx, None) for idx in indexes[_PW_START])
-
-    for image_index in image_indexes:
-        # Find the nearest calculation start to parse info. Needed in,
-        # for example, relaxation where cell is only printed at the
-        # start.
-        if image_index in indexes[_PW_START]:
-            prev_start_index = image_index
-        else:
-            # The greatest start index before this structure
-            prev_start_index = [idx for idx in indexes[_PW_START]
-                                if idx < image_index][-1]
-
-        # add structure to reference if not there
-        if pwscf_start_info[prev_start_index] is None:
-            pwscf_start_info[prev_start_index] = parse_pwo_start(
-                pwo_lines, prev_start_index)
-
-        # Get the bounds for information for this structure. Any associated
-        # values will be between the image_index and the following one,
-        # EXCEPT for cell, which will be 4 lines before if it exists.
-        for next_index in all_config_indexes:
-            if next_index > image_index:
-                break
+        if len(cell_lines) == 5 and _PW_CELL in cell_lines[0]:
+            # CELL_PARAMETERS would be just before positions if present
+            cell, cell_alat = get_cell_parameters(cell_lines)
         else:
-            # right to the end of the file
-            next_index = len(pwo_lines)
-
-        # Get the structure
-        # Use this for any missing data
-        prev_structure = pwscf_start_info[prev_start_index]['atoms']
-        if image_index in indexes[_PW_START]:
-            structure = prev_structure.copy()  # parsed from start info
+            cell = prev_structure.cell
+            cell_alat = start_info['alat']
+
+        # give at least enough lines to parse the positions
+        # should be same format as input card
+        n_atoms = len(prev_structure)
+        positions_card = get_atomic_positions(
+            pwo_lines[:n_atoms + 1],
+            n_atoms=n_atoms, cell=cell, alat=cell_alat)
+
+        # convert to Atoms object
+        symbols = [label_to_symbol(position[0]) for position in
+                   positions_card]
+        positions = [position[1] for position in positions_card]
+        structure = Atoms(symbols=symbols, positions=positions, cell=cell,
+                          pbc=True)
+
+    # Extract calculation results
+    # Energy
+    energy = None
+    for energy_index in indexes[_PW_TOTEN]:
+        energy = float(pwo_lines[energy_index].split()[-2]) * units['Ry']
+
+    # Forces
+    forces = None
+    for force_index in indexes[_PW_FORCE]:
+        # Before QE 5.3 'negative rho' added 2 lines before forces
+        # Use exact lines to stop before 'non-local' forces
+        # in high verbosity
+        if not pwo_lines[force_index + 2].strip():
+            force_index += 4
         else:
-            if _PW_CELL in pwo_lines[image_index - 5]:
-                # CELL_PARAMETERS would be just before positions if present
-                cell, cell_alat = get_cell_parameters(
-                    pwo_lines[image_index - 5:image_index])
+            force_index += 2
+        # assume contiguous
+        forces = [
+            [float(x) for x in force_line.split()[-3:]] for force_line
+            in pwo_lines[force_index:force_index + len(structure)]]
+        forces = np.array(forces) * units['Ry'] / units['Bohr']
+
+    # Stress
+    stress = None
+    for stress_index in indexes[_PW_STRESS]:
+        sxx, sxy, sxz = pwo_lines[stress_index + 1].split()[:3]
+        _, syy, syz = pwo_lines[stress_index + 2].split()[:3]
+        _, _, szz = pwo_lines[stress_index + 3].split()[:3]
+        stress = np.array([sxx, syy, szz, syz, sxz, sxy], dtype=float)
+        # sign convention is opposite of ase
+        stress *= -1 * units['Ry'] / (units['Bohr'] ** 3)
+
+    # Magmoms
+    magmoms = None
+    for magmoms_index in indexes[_PW_MAGMOM]:
+        magmoms = [
+            float(mag_line.split()[5]) for mag_line
+            in pwo_lines[magmoms_index + 1:
+                         magmoms_index + 1 + len(structure)]]
+
+    # Fermi level / highest occupied level
+    efermi = None
+    for fermi_index in indexes[_PW_FERMI]:
+        efermi = float(pwo_lines[fermi_index].split()[-2])
+
+    if efermi is None:
+        for ho_index in indexes[_PW_HIGHEST_OCCUPIED]:
+            efermi = float(pwo_lines[ho_index].split()[-1])
+
+    if efermi is None:
+        for holf_index in indexes[_PW_HIGHEST_OCCUPIED_LOWEST_FREE]:
+            efermi = float(pwo_lines[holf_index].split()[-2])
+
+    # K-points
+    ibzkpts = None
+    weights = None
+    if kpts_lines is not None:
+        # QE prints the k-points in units of 2*pi/alat
+        # with alat defined as the length of the first
+        # cell vector
+        cell = structure.get_cell()
+        alat = np.linalg.norm(cell[0])
+        ibzkpts = []
+        weights = []
+        for line in kpts_lines:
+            L = line.split()
+            weights.append(float(L[-1]))
+            coord = np.array([L[-6], L[-5], L[-4].strip('),')],
+                             dtype=float)
+            coord *= 2 * np.pi / alat
+            coord = kpoint_convert(cell, ckpts_kv=coord)
+            ibzkpts.append(coord)
+        ibzkpts = np.array(ibzkpts)
+        weights = np.array(weights)
+
+    # Bands
+    kpts = None
+    kpoints_warning = "Number of k-points >= 100: " + \
+                      "set verbosity='high' to print the bands."
+
+    for bands_index in indexes[_PW_BANDS] + indexes[_PW_BANDSTRUCTURE]:
+        bands_index += 2
+
+        if pwo_lines[bands_index].strip() == kpoints_warning:
+            continue
+
+        assert ibzkpts is not None
+        spin, bands, eigenvalues = 0, [], [[], []]
+
+        while True:
+            L = pwo_lines[bands_index].replace('-', ' -').split()
+            if len(L) == 0:
+                if len(bands) > 0:
+                    eigenvalues[spin].append(bands)
+                    bands = []
+            elif L == ['occupation', 'numbers']:
+                # Skip the lines with the occupation numbers
+                bands_index += len(eigenvalues[spin][0]) // 8 + 1
+            elif L[0] == 'k' and L[1].startswith('='):
+                pass
+            elif 'SPIN' in L:
+                if 'DOWN' in L:
+                    spin += 1
             else:
-                cell = prev_structure.cell
-                cell_alat = pwscf_start_info[prev_start_index]['alat']
-
-            # give at least enough lines to parse the positions
-            # should be same format as input card
-            n_atoms = len(prev_structure)
-            positions_card = get_atomic_positions(
-                pwo_lines[image_index:image_index + n_atoms + 1],
-                n_atoms=n_atoms, cell=cell, alat=cell_alat)
-
-            # convert to Atoms object
-            symbols = [label_to_symbol(position[0]) for position in
-                       positions_card]
-            positions = [position[1] for position in positions_card]
-            structure = Atoms(symbols=symbols, positions=positions, cell=cell,
-                              pbc=True)
-
-        # Extract calculation results
-        # Energy
-        energy = None
-        for energy_index in indexes[_PW_TOTEN]:
-            if image_index < energy_index < next_index:
-                energy = float(
-                    pwo_lines[energy_index].split()[-2]) * units['Ry']
-
-        # Forces
-        forces = None
-        for force_index in indexes[_PW_FORCE]:
-            if image_index < force_index < next_index:
-                # Before QE 5.3 'negative rho' added 2 lines before forces
-                # Use exact lines to stop before 'non-local' forces
-                # in high verbosity
-                if not pwo_lines[force_index + 2].strip():
-                    force_index += 4
-                else:
-                    force_index += 2
-                # assume contiguous
-                forces = [
-                    [float(x) for x in force_line.split()[-3:]] for force_line
-                    in pwo_lines[force_index:force_index + len(structure)]]
-                forces = np.array(forces) * units['Ry'] / units['Bohr']
-
-        # Stress
-        stress = None
-        for stress_index in indexes[_PW_STRESS]:
-            if image_index < stress_index < next_index:
-                sxx, sxy, sxz = pwo_lines[stress_index + 1].split()[:3]
-                _, syy, syz = pwo_lines[stress_index + 2].split()[:3]
-                _, _, szz = pwo_lines[stress_index + 3].split()[:3]
-                stress = np.array([sxx, syy, szz, syz, sxz, sxy], dtype=float)
-                # sign convention is opposite of ase
-                stress *= -1 * units['Ry'] / (units['Bohr'] ** 3)
-
-        # Magmoms
-        magmoms = None
-        for magmoms_index in indexes[_PW_MAGMOM]:
-            if image_index < magmoms_index < next_index:
-                magmoms = [
-                    float(mag_line.split()[5]) for mag_line
-                    in pwo_lines[magmoms_index + 1:
-                                 magmoms_index + 1 + len(structure)]]
-
-        # Fermi level / highest occupied level
-        efermi = None
-        for fermi_index in indexes[_PW_FERMI]:
-            if image_index < fermi_index < next_index:
-                efermi = float(pwo_lines[fermi_index].split()[-2])
-
-        if efermi is None:
-            for ho_index in indexes[_PW_HIGHEST_OCCUPIED]:
-                if image_index < ho_index < next_index:
-                    efermi = float(pwo_lines[ho_index].split()[-1])
-
-        if efermi is None:
-            for holf_index in indexes[_PW_HIGHEST_OCCUPIED_LOWEST_FREE]:
-                if image_index < holf_index < next_index:
-                    efermi = float(pwo_lines[holf_index].split()[-2])
-
-        # K-points
-        ibzkpts = None
-        weights = None
-        kpoints_warning = "Number of k-points >= 100: " + \
-                          "set verbosity='high' to print them."
-
-        for kpts_index in indexes[_PW_KPTS]:
-            nkpts = int(pwo_lines[kpts_index].split()[4])
-            kpts_index += 2
-
-            if pwo_lines[kpts_index].strip() == kpoints_warning:
-                continue
-
-            # QE prints the k-points in units of 2*pi/alat
-            # with alat defined as the length of the first
-            # cell vector
-            cell = structure.get_cell()
-            alat = np.linalg.norm(cell[0])
-            ibzkpts = []
-            weights = []
-            for i in range(nkpts):
-                L = pwo_lines[kpts_index + i].split()
-                weights.append(float(L[-1]))
-                coord = np.array([L[-6], L[-5], L[-4].strip('),')],
-                                 dtype=float)
-                coord *= 2 * np.pi / alat
-                coord = kpoint_convert(cell, ckpts_kv=coord)
-                ibzkpts.append(coord)
-            ibzkpts = np.array(ibzkpts)
-            weights = np.array(weights)
-
-        # Bands
-        kpts = None
-        kpoints_warning = "Number of k-points >= 100: " + \
-                          "set verbosity='high' to print the bands."
-
-        for bands_index in indexes[_PW_BANDS] + indexes[_PW_BANDSTRUCTURE]:
-            if image_index < bands_index < next_index:
-                bands_index += 2
-
-                if pwo_lines[bands_index].strip() == kpoints_warning:
-                    continue
-
-                assert ibzkpts is not None
-                spin, bands, eigenvalues = 0, [], [[], []]
-
-                while True:
-                    L = pwo_lines[bands_index].replace('-', ' -').split()
-                    if len(L) == 0:
-                        if len(bands) > 0:
-                            eigenvalues[spin].append(bands)
-                            bands = []
-                    elif L == ['occupation', 'numbers']:
-                        # Skip the lines with the occupation numbers
-                        bands_index += len(eigenvalues[spin][0]) // 8 + 1
-                    elif L[0] == 'k' and L[1].startswith('='):
-                        pass
-                    elif 'SPIN' in L:
-                        if 'DOWN' in L:
-                            spin += 1
-                    else:
-                        try:
-                            bands.extend(map(float, L))
-                        except ValueError:
-                            break
-                    bands_index += 1
-
-                if spin == 1:
-                    assert len(eigenvalues[0]) == len(eigenvalues[1])
-                assert len(eigenvalues[0]) == len(ibzkpts), \
-                    (np.shape(eigenvalues), len(ibzkpts))
-
-                kpts = []
-                for s in range(spin + 1):
-                    for w, k, e in zip(weights, ibzkpts, eigenvalues[s]):
-                        kpt = SinglePointKPoint(w, s, k, eps_n=e)
-                        kpts.append(kpt)
-
-        # Put everything together
-        #
-        # I have added free_energy.  Can and should we distinguish
-        # energy and free_energy?  --askhl
-        calc = SinglePointDFTCalculator(structure, energy=energy,
-                                        free_energy=energy,
-                                        forces=forces, stress=stress,
-                                        magmoms=magmoms, efermi=efermi,
-                                        ibzkpts=ibzkpts)
-        calc.kpts = kpts
-        structure.calc = calc
-
-        yield structure
+                try:
+                    bands.extend(map(float, L))
+                except ValueError:
+                    break
+            bands_index += 1
+
+        if spin == 1:
+            assert len(eigenvalues[0]) == len(eigenvalues[1])
+        assert len(eigenvalues[0]) == len(ibzkpts), \
+            (np.shape(eigenvalues), len(ibzkpts))
+
+        kpts = []
+        for s in range(spin + 1):
+            for w, k, e in zip(weights, ibzkpts, eigenvalues[s]):
+                kpt = SinglePointKPoint(w, s, k, eps_n=e)
+                kpts.append(kpt)
+
+    # Put everything together
+    #
+    # I have added free_energy.  Can and should we distinguish
+    # energy and free_energy?  --askhl
+    calc = SinglePointDFTCalculator(structure, energy=energy,
+                                    free_energy=energy,
+                                    forces=forces, stress=stress,
+                                    magmoms=magmoms, efermi=efermi,
+                                    ibzkpts=ibzkpts)
+    calc.kpts = kpts
+    structure.calc = calc
+
+    return structure
 
 
 def parse_pwo_start(lines, index=0):
@@ -1,3 +1,4 @@
+import functools
 import gzip
 import struct
 from collections import deque
@@ -8,6 +9,7 @@ import numpy as np
 from ase.atoms import Atoms
 from ase.calculators.lammps import convert
 from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io.formats import string2index
 from ase.parallel import paropen
 from ase.quaternions import Quaternions
 
@@ -45,13 +47,12 @@ def read_lammps_dump(infileobj, **kwargs):
 
     if suffix == ".bin":
         out = read_lammps_dump_binary(fileobj, **kwargs)
-        if opened:
-            fileobj.close()
-        return out
-
-    out = read_lammps_dump_text(fileobj, **kwargs)
+    else:
+        out = read_lammps_dump_text(fileobj, **kwargs)
 
     if opened:
+        if not isinstance(out, Atoms):
+            out = list(out)
         fileobj.close()
 
     return out
@@ -239,49 +240,110 @@ def construct_cell(diagdisp, offdiag):
     return cell, celldisp
 
 
-def get_max_index(index):
-    if np.isscalar(index):
-        return index
-    elif isinstance(index, slice):
-        return index.stop if (index.stop is not None) else float("inf")
-
-
-def read_lammps_dump_text(fileobj, index=-1, **kwargs):
-    """Process cleartext lammps dumpfiles
-
-    :param fileobj: filestream providing the trajectory data
-    :param index: integer or slice object (default: get the last timestep)
-    :returns: list of Atoms objects
-    :rtype: list
-    """
-    # Load all dumped timesteps into memory simultaneously
-    lines = deque(fileobj.readlines())
-    index_end = get_max_index(index)
-
+def _iread_dump(fileobj, index, offsets, read_frame, skip_frame):
+    """Yield the requested timesteps of a dump file one at a time.
+
+    read_frame(fileobj) parses the timestep at the current position and
+    skip_frame(fileobj) moves past it without parsing the per-atom data.
+    Both return None at the end of the file.  With offsets (see
+    index_lammps_dump_text()) the timesteps are read by seeking to them
+    directly.  Negative indices of seekable files are handled by
+    scanning the file for the offsets first."""
+    if isinstance(index, str):
+        index = string2index(index)
+    if not isinstance(index, slice):
+        index = slice(index, (index + 1) or None)
+    start, stop, step = index.start, index.stop, index.step
+
+    if offsets is None and ((start or 0) < 0 or (stop or 0) < 0
+                            or (step or 1) < 0):
+        if not fileobj.seekable():
+            frames = iter(lambda: read_frame(fileobj), None)
+            # If the selection is counted from the end, keep only as
+            # many of the last timesteps as it can reach:
+            if (step or 1) > 0:
+                first, last = start, stop
+            else:
+                first, last = stop, start
+            if (first is not None and first < 0
+                    and (last is None or last <= 0)):
+                images = list(deque(frames, maxlen=-first))
+            else:
+                images = list(frames)
+            yield from images[index]
+            return
+        offsets = _get_offsets(fileobj, skip_frame)
+
+    if offsets is not None:
+        for i in range(*index.indices(len(offsets))):
+            fileobj.seek(offsets[i])
+            atoms = read_frame(fileobj)
+            if atoms is None:
+                return
+            yield atoms
+        return
+
+    start = start or 0
+    step = step or 1
+    i = 0
+    while stop is None or i < stop:
+        if i >= start and (i - start) % step == 0:
+            atoms = read_frame(fileobj)
+            if atoms is None:
+                return
+            yield atoms
+        elif skip_frame(fileobj) is None:
+            return
+        i += 1
+
+
+def _get_offsets(fileobj, skip_frame):
+    """Offsets of the timesteps from the current position onwards.
+
+    The file is left at its original position."""
+    startpos = fileobj.tell()
+    offsets = []
+    pos = startpos
+    while skip_frame(fileobj) is not None:
+        offsets.append(pos)
+        pos = fileobj.tell()
+    fileobj.seek(startpos)
+    return offsets
+
+
+def _images(images, index):
+    """Return the images iterator for a slice and otherwise the Atoms."""
+    if isinstance(index, (slice, str)):
+        return images
+    for atoms in images:
+        return atoms
+    raise IndexError('Timestep {} not found in LAMMPS dump'.format(index))
+
+
+def _read_dump_text_header(fileobj):
+    """Read a text dump up to and including the next ITEM: ATOMS line.
+
+    Returns the number of atoms and the cell, celldisp, pbc and
+    colnames arguments of lammps_data_to_ase_atoms(), or None at the
+    end of the file."""
     n_atoms = 0
-    images = []
-
     # avoid references before assignment in case of incorrect file structure
     cell, celldisp, pbc = None, None, False
 
-    while len(lines) > n_atoms:
-        line = lines.popleft()
-
-        if "ITEM: TIMESTEP" in line:
-            n_atoms = 0
-            line = lines.popleft()
-            # !TODO: pyflakes complains about this line -> do something
-            # ntimestep = int(line.split()[0])  # NOQA
+    while True:
+        line = fileobj.readline()
+        if not line:
+            return None
 
         if "ITEM: NUMBER OF ATOMS" in line:
-            line = lines.popleft()
+            line = fileobj.readline()
             n_atoms = int(line.split()[0])
 
-        if "ITEM: BOX BOUNDS" in line:
+        elif "ITEM: BOX BOUNDS" in line:
             # save labels behind "ITEM: BOX BOUNDS" in triclinic case
             # (>=lammps-7Jul09)
             tilt_items = line.split()[3:]
-            celldatarows = [lines.popleft() for _ in range(3)]
+            celldatarows = [fileobj.readline() for _ in range(3)]
             celldata = np.loadtxt(celldatarows)
             diagdisp = celldata[:, :2].reshape(6, 1).flatten()
 
@@ -310,40 +372,104 @@ def read_lammps_dump_text(fileobj, index=-1, **kwargs):
                 pbc_items = ["f", "f", "f"]
             pbc = ["p" in d.lower() for d in pbc_items]
 
-        if "ITEM: ATOMS" in line:
+        elif "ITEM: ATOMS" in line:
             colnames = line.split()[2:]
-            datarows = [lines.popleft() for _ in range(n_atoms)]
-            data = np.loadtxt(datarows, dtype=str)
-            out_atoms = lammps_data_to_ase_atoms(
-                data=data,
-                colnames=colnames,
-                cell=cell,
-                celldisp=celldisp,
-                atomsobj=Atoms,
-                pbc=pbc,
-                **kwargs
-            )
-            images.append(out_atoms)
+            return n_atoms, dict(colnames=colnames, cell=cell,
+                                 celldisp=celldisp, pbc=pbc)
+
+
+def _skip_dump_text_frame(fileobj):
+    header = _read_dump_text_header(fileobj)
+    if header is None:
+        return None
+    n_atoms, frame = header
+    line = "\n"
+    for _ in range(n_atoms):
+        line = fileobj.readline()
+    if (not line.endswith("\n")
+            and len(line.split()) < len(frame["colnames"])):
+        return None  # incomplete timestep at the end of the file
+    return header
+
+
+def _read_dump_text_frame(fileobj, **kwargs):
+    header = _read_dump_text_header(fileobj)
+    if header is None:
+        return None
+    n_atoms, frame = header
+    colnames = frame["colnames"]
+
+    # Convert the whole block of per-atom data at once:
+    datarows = [fileobj.readline() for _ in range(n_atoms)]
+    values = "".join(datarows).split()
+    if (len(values) < n_atoms * len(colnames)
+            and not datarows[-1].endswith("\n")):
+        return None  # incomplete timestep at the end of the file
+
+    data = None
+    if "element" not in colnames:
+        try:
+            data = np.array(values, dtype=float)
+        except ValueError:
+            pass
+    if data is None:
+        data = np.array(values, dtype=str)
+    data = data.reshape((n_atoms, len(colnames)))
 
-        if len(images) > index_end >= 0:
-            break
+    return lammps_data_to_ase_atoms(data=data, atomsobj=Atoms,
+                                    **frame, **kwargs)
 
-    return images[index]
 
+def index_lammps_dump_text(fileobj):
+    """Find the positions of the timesteps in a text dump file.
 
-def read_lammps_dump_binary(
-    fileobj, index=-1, colnames=None, intformat="SMALLBIG", **kwargs
-):
-    """Read binary dump-files (after binary2txt.cpp from lammps/tools)
+    The per-atom data is skipped without parsing it.  The returned
+    offsets can be passed to read_lammps_dump_text() and
+    iread_lammps_dump_text() for the same file (opened in the same
+    mode) to jump directly to any timestep.
 
-    :param fileobj: file-stream containing the binary lammps data
-    :param index: integer or slice object (default: get the last timestep)
-    :param colnames: data is columns and identified by a header
-    :param intformat: lammps support different integer size.  Parameter set \
-    at compile-time and can unfortunately not derived from data file
-    :returns: list of Atoms-objects
+    :param fileobj: seekable filestream of the trajectory
+    :returns: offsets (in units of fileobj.tell()) of the timesteps
     :rtype: list
     """
+    return _get_offsets(fileobj, _skip_dump_text_frame)
+
+
+def iread_lammps_dump_text(fileobj, index=slice(None), offsets=None,
+                           **kwargs):
+    """Iterate over the timesteps of a cleartext lammps dumpfile
+
+    Only one timestep is held in memory at a time and the per-atom data
+    of the timesteps not requested is not parsed.
+
+    :param fileobj: filestream providing the trajectory data
+    :param index: integer, slice object or string (default: all)
+    :param offsets: timestep positions from index_lammps_dump_text()
+    :returns: generator of Atoms objects
+    """
+    return _iread_dump(fileobj, index, offsets,
+                       functools.partial(_read_dump_text_frame, **kwargs),
+                       _skip_dump_text_frame)
+
+
+def read_lammps_dump_text(fileobj, index=-1, offsets=None, **kwargs):
+    """Process cleartext lammps dumpfiles
+
+    :param fileobj: filestream providing the trajectory data
+    :param index: integer or slice object (default: get the last timestep)
+    :param offsets: timestep positions from index_lammps_dump_text()
+    :returns: Atoms object, or generator of Atoms objects if index is a
+              slice
+    """
+    return _images(iread_lammps_dump_text(fileobj, index, offsets, **kwargs),
+                   index)
+
+
+def _read_dump_binary_header(fileobj, colnames, intformat):
+    """Read the header of the next timestep in a binary dump file.
+
+    Returns the number of per-atom data chunks and the cell, celldisp,
+    pbc and colnames arguments of lammps_data_to_ase_atoms()."""
     # depending on the chosen compilation flag lammps uses either normal
     # integers or long long for its id or timestep numbering
     # !TODO: tags are cast to double -> missing/double ids (add check?)
@@ -351,15 +477,11 @@ def read_lammps_dump_binary(
         SMALLSMALL=("i", "i"), SMALLBIG=("i", "q"), BIGBIG=("q", "q")
     )[intformat]
 
-    index_end = get_max_index(index)
-
     # Standard columns layout from lammpsrun
     if not colnames:
         colnames = ["id", "type", "x", "y", "z",
                     "vx", "vy", "vz", "fx", "fy", "fz"]
 
-    images = []
-
     # wrap struct.unpack to raise EOFError
     def read_variables(string):
         obj_len = struct.calcsize(string)
@@ -368,112 +490,184 @@ def read_lammps_dump_binary(
             raise EOFError
         return struct.unpack(string, data_obj)
 
-    while True:
-        try:
-            # Assume that the binary dump file is in the old (pre-29Oct2020)
-            # format
-            magic_string = None
-
-            # read header
-            ntimestep, = read_variables("=" + bigformat)
-
-            # In the new LAMMPS binary dump format (version 29Oct2020 and
-            # onward), a negative timestep is used to indicate that the next
-            # few bytes will contain certain metadata
-            if ntimestep < 0:
-                # First bigint was actually encoding the negative of the format
-                # name string length (we call this 'magic_string' to
-                magic_string_len = -ntimestep
-
-                # The next `magic_string_len` bytes will hold a string
-                # indicating the format of the dump file
-                magic_string = b''.join(read_variables(
-                    "=" + str(magic_string_len) + "c"))
-
-                # Read endianness (integer). For now, we'll disregard the value
-                # and simply use the host machine's endianness (via '='
-                # character used with struct.calcsize).
-                #
-                # TODO: Use the endianness of the dump file in subsequent
-                #       read_variables rather than just assuming it will match
-                #       that of the host
-                endian, = read_variables("=i")
-
-                # Read revision number (integer)
-                revision, = read_variables("=i")
-
-                # Finally, read the actual timestep (bigint)
-                ntimestep, = read_variables("=" + bigformat)
-
-            n_atoms, triclinic = read_variables("=" + bigformat + "i")
-            boundary = read_variables("=6i")
-            diagdisp = read_variables("=6d")
-            if triclinic != 0:
-                offdiag = read_variables("=3d")
-            else:
-                offdiag = (0.0,) * 3
-            size_one, = read_variables("=i")
-
-            if len(colnames) != size_one:
-                raise ValueError("Provided columns do not match binary file")
-
-            if magic_string and revision > 1:
-                # New binary dump format includes units string, columns string, and
-                # time
-                units_str_len, = read_variables("=i")
-
-                if units_str_len > 0:
-                    # Read lammps units style
-                    _ = b''.join(
-                        read_variables("=" + str(units_str_len) + "c"))
+    # Assume that the binary dump file is in the old (pre-29Oct2020)
+    # format
+    magic_string = None
+
+    # read header
+    ntimestep, = read_variables("=" + bigformat)
+
+    # In the new LAMMPS binary dump format (version 29Oct2020 and
+    # onward), a negative timestep is used to indicate that the next
+    # few bytes will contain certain metadata
+    if ntimestep < 0:
+        # First bigint was actually encoding the negative of the format
+        # name string length (we call this 'magic_string' to
+        magic_string_len = -ntimestep
+
+        # The next `magic_string_len` bytes will hold a string
+        # indicating the format of the dump file
+        magic_string = b''.join(read_variables(
+            "=" + str(magic_string_len) + "c"))
+
+        # Read endianness (integer). For now, we'll disregard the value
+        # and simply use the host machine's endianness (via '='
+        # character used with struct.calcsize).
+        #
+        # TODO: Use the endianness of the dump file in subsequent
+        #       read_variables rather than just assuming it will match
+        #       that of the host
+        endian, = read_variables("=i")
+
+        # Read revision number (integer)
+        revision, = read_variables("=i")
+
+        # Finally, read the actual timestep (bigint)
+        ntimestep, = read_variables("=" + bigformat)
+
+    n_atoms, triclinic = read_variables("=" + bigformat + "i")
+    boundary = read_variables("=6i")
+    diagdisp = read_variables("=6d")
+    if triclinic != 0:
+        offdiag = read_variables("=3d")
+    else:
+        offdiag = (0.0,) * 3
+    size_one, = read_variables("=i")
+
+    if len(colnames) != size_one:
+        raise ValueError("Provided columns do not match binary file")
+
+    if magic_string and revision > 1:
+        # New binary dump format includes units string, columns string, and
+        # time
+        units_str_len, = read_variables("=i")
+
+        if units_str_len > 0:
+            # Read lammps units style
+            _ = b''.join(
+                read_variables("=" + str(units_str_len) + "c"))
+
+        flag, = read_variables("=c")
+        if flag != b'\x00':
+            # Flag was non-empty string
+            time, = read_variables("=d")
+
+        # Length of column string
+        columns_str_len, = read_variables("=i")
+
+        # Read column string (e.g., "id type x y z vx vy vz fx fy fz")
+        _ = b''.join(read_variables("=" + str(columns_str_len) + "c"))
+
+    nchunk, = read_variables("=i")
+
+    # lammps cells/boxes can have different boundary conditions on each
+    # sides (makes mainly sense for different non-periodic conditions
+    # (e.g. [f]ixed and [s]hrink for a irradiation simulation))
+    # periodic case: b 0 = 'p'
+    # non-peridic cases 1: 'f', 2 : 's', 3: 'm'
+    pbc = np.sum(np.array(boundary).reshape((3, 2)), axis=1) == 0
+
+    cell, celldisp = construct_cell(diagdisp, offdiag)
+
+    return nchunk, dict(colnames=colnames, cell=cell, celldisp=celldisp,
+                        pbc=pbc)
+
+
+def _read_chunk_size(fileobj):
+    """Number of doubles in the next per-atom data chunk."""
+    data = fileobj.read(4)
+    if len(data) != 4:
+        raise EOFError
+    return struct.unpack("=i", data)[0]
+
+
+def _skip_dump_binary_frame(fileobj, colnames=None, intformat="SMALLBIG"):
+    try:
+        nchunk, frame = _read_dump_binary_header(fileobj, colnames,
+                                                 intformat)
+        for _ in range(nchunk):
+            nbytes = 8 * _read_chunk_size(fileobj)
+            if nbytes == 0:
+                continue
+            if fileobj.seekable():
+                # Check that the chunk is complete by reading its last byte
+                fileobj.seek(nbytes - 1, 1)
+                nbytes = 1
+            if len(fileobj.read(nbytes)) != nbytes:
+                raise EOFError
+    except EOFError:
+        return None
+    return frame
+
+
+def _read_dump_binary_frame(fileobj, colnames=None, intformat="SMALLBIG",
+                            **kwargs):
+    try:
+        nchunk, frame = _read_dump_binary_header(fileobj, colnames,
+                                                 intformat)
+        chunks = []
+        for _ in range(nchunk):
+            # number-of-data-entries
+            nbytes = 8 * _read_chunk_size(fileobj)
+            # retrieve per atom data
+            buf = fileobj.read(nbytes)
+            if len(buf) != nbytes:
+                raise EOFError
+            chunks.append(np.frombuffer(buf, dtype="=f8"))
+    except EOFError:
+        return None
+    data = np.concatenate(chunks) if chunks else np.empty(0)
+    data = data.reshape((-1, len(frame["colnames"])))
+
+    # map data-chunk to ase atoms
+    return lammps_data_to_ase_atoms(data=data, **frame, **kwargs)
+
+
+def index_lammps_dump_binary(fileobj, colnames=None, intformat="SMALLBIG"):
+    """Find the positions of the timesteps in a binary dump file.
+
+    See index_lammps_dump_text().  colnames and intformat are as for
+    read_lammps_dump_binary().
+
+    :param fileobj: seekable file-stream containing the binary lammps data
+    :returns: byte offsets of the timesteps
+    :rtype: list
+    """
+    return _get_offsets(fileobj, functools.partial(
+        _skip_dump_binary_frame, colnames=colnames, intformat=intformat))
 
-                flag, = read_variables("=c")
-                if flag != b'\x00':
-                    # Flag was non-empty string
-                    time, = read_variables("=d")
 
-                # Length of column string
-                columns_str_len, = read_variables("=i")
+def iread_lammps_dump_binary(fileobj, index=slice(None), offsets=None,
+                             colnames=None, intformat="SMALLBIG", **kwargs):
+    """Iterate over the timesteps of a binary dump file
 
-                # Read column string (e.g., "id type x y z vx vy vz fx fy fz")
-                _ = b''.join(read_variables("=" + str(columns_str_len) + "c"))
+    See read_lammps_dump_binary() and iread_lammps_dump_text().
 
-            nchunk, = read_variables("=i")
+    :returns: generator of Atoms objects
+    """
+    read_frame = functools.partial(_read_dump_binary_frame,
+                                   colnames=colnames, intformat=intformat,
+                                   **kwargs)
+    skip_frame = functools.partial(_skip_dump_binary_frame,
+                                   colnames=colnames, intformat=intformat)
+    return _iread_dump(fileobj, index, offsets, read_frame, skip_frame)
 
-            # lammps cells/boxes can have different boundary conditions on each
-            # sides (makes mainly sense for different non-periodic conditions
-            # (e.g. [f]ixed and [s]hrink for a irradiation simulation))
-            # periodic case: b 0 = 'p'
-            # non-peridic cases 1: 'f', 2 : 's', 3: 'm'
-            pbc = np.sum(np.array(boundary).reshape((3, 2)), axis=1) == 0
 
-            cell, celldisp = construct_cell(diagdisp, offdiag)
+def read_lammps_dump_binary(
+    fileobj, index=-1, colnames=None, intformat="SMALLBIG", offsets=None,
+    **kwargs
+):
+    """Read binary dump-files (after binary2txt.cpp from lammps/tools)
 
-            data = []
-            for _ in range(nchunk):
-                # number-of-data-entries
-                n_data, = read_variables("=i")
-                # retrieve per atom data
-                data += read_variables("=" + str(n_data) + "d")
-            data = np.array(data).reshape((-1, size_one))
-
-            # map data-chunk to ase atoms
-            out_atoms = lammps_data_to_ase_atoms(
-                data=data,
-                colnames=colnames,
-                cell=cell,
-                celldisp=celldisp,
-                pbc=pbc,
-                **kwargs
-            )
-
-            images.append(out_atoms)
-
-            # stop if requested index has been found
-            if len(images) > index_end >= 0:
-                break
-
-        except EOFError:
-            break
-
-    return images[index]
+    :param fileobj: file-stream containing the binary lammps data
+    :param index: integer or slice object (default: get the last timestep)
+    :param colnames: data is columns and identified by a header
+    :param intformat: lammps support different integer size.  Parameter set \
+    at compile-time and can unfortunately not derived from data file
+    :param offsets: timestep positions from index_lammps_dump_binary()
+    :returns: Atoms object, or generator of Atoms objects if index is a
+              slice
+    """
+    return _images(iread_lammps_dump_binary(fileobj, index, offsets,
+                                            colnames, intformat, **kwargs),
+                   index)
@@ -1,3 +1,4 @@
+import io
 import numpy as np
 from math import sqrt
 from itertools import islice
@@ -262,11 +263,75 @@ class ImageIterator:
             for chunk in self.ichunks(fd):
                 nchunks += 1
             fd.seek(startpos)
-            indices_tuple = indices.indices(nchunks)
-            iterator = islice(self.ichunks(fd), *indices_tuple)
+            indices_range = range(*indices.indices(nchunks))
+            reverse = indices_range.step < 0
+            if reverse:
+                indices_range = indices_range[::-1]
+            if len(indices_range) == 0:
+                return iter([])
+            iterator = islice(self.ichunks(fd), indices_range[0],
+                              indices_range[-1] + 1, indices_range.step)
+            if reverse:
+                iterator = reversed(list(iterator))
         return iterator
 
 
+def is_tail_slice(index):
+    """Whether the slice only selects images counted from the end."""
+    return (index.start is not None and index.start < 0
+            and (index.stop is None or index.stop < 0)
+            and (index.step is None or index.step > 0))
+
+
+def get_seekable_buffer(fileobj):
+    """Return the seekable binary file underlying fileobj, or None.
+
+    Compressed files are not considered seekable here, since every
+    backwards seek decompresses them from the beginning."""
+    buffer = getattr(fileobj, 'buffer', fileobj)
+    if isinstance(buffer, io.BytesIO):
+        return buffer
+    if isinstance(getattr(buffer, 'raw', None), io.FileIO):
+        return buffer
+    return None
+
+
+def reverse_find(fd, patterns, start=0, end=None, chunksize=2**16):
+    """Find the last occurrence of any of the patterns in a binary file.
+
+    The file is searched backwards from end to start one chunk at a
+    time, so only the tail of a large file is read when the match is
+    close to its end.  Returns the offset of the match or None."""
+    if end is None:
+        end = fd.seek(0, io.SEEK_END)
+    overlap = max(len(pattern) for pattern in patterns) - 1
+    tail = b''
+    pos = end
+    while pos > start:
+        size = min(chunksize, pos - start)
+        pos -= size
+        fd.seek(pos)
+        buf = fd.read(size) + tail
+        i = max(buf.rfind(pattern) for pattern in patterns)
+        if i >= 0:
+            return pos + i
+        tail = buf[:overlap]
+    return None
+
+
+def find_line_start(fd, offset, start=0):
+    """Return the offset of the beginning of the line containing offset."""
+    newline = reverse_find(fd, [b'\n'], start, offset, chunksize=4096)
+    return start if newline is None else newline + 1
+
+
+def read_lines(fd, start, end, encoding='utf-8'):
+    """Read the bytes between start and end of fd as a list of lines."""
+    fd.seek(start)
+    text = fd.read(end - start).decode(encoding)
+    return io.StringIO(text, newline=None).readlines()
+
+
 def verify_cell_for_export(cell, check_orthorhombric=True):
     """Function to verify if the cell size is defined and if the cell is
 
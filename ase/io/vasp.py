@@ -4,7 +4,9 @@ Atoms object in VASP POSCAR format.
 
 """
 
+import functools
 import re
+from pathlib import Path, PurePath
 
 import numpy as np
 
@@ -13,11 +15,11 @@ from ase.utils import reader, writer
 from ase.io.utils import ImageIterator
 from ase.io import ParseError
 from .vasp_parsers import vasp_outcar_parsers as vop
-from pathlib import Path
 
 __all__ = [
-    'read_vasp', 'read_vasp_out', 'iread_vasp_out', 'read_vasp_xdatcar',
-    'read_vasp_xml', 'write_vasp', 'write_vasp_xdatcar'
+    'read_vasp', 'read_vasp_out', 'iread_vasp_out', 'index_vasp_out',
+    'read_vasp_xdatcar', 'read_vasp_xml', 'index_vasp_xml', 'write_vasp',
+    'write_vasp_xdatcar'
 ]
 
 
@@ -249,21 +251,36 @@ def read_vasp(filename='CONTCAR'):
     return atoms
 
 
-def iread_vasp_out(filename, index=-1):
-    """Import OUTCAR type file, as a generator."""
-    it = ImageIterator(vop.outcarchunks)
+def iread_vasp_out(filename, index=-1, properties=None, offset=None):
+    """Import OUTCAR type file, as a generator.
+
+    See read_vasp_out() for properties and offset."""
+    chunk_parser = vop.OutcarChunkParser(properties=properties)
+    it = ImageIterator(functools.partial(vop.outcarchunks,
+                                         chunk_parser=chunk_parser,
+                                         offset=offset))
     return it(filename, index=index)
 
 
 @reader
-def read_vasp_out(filename='OUTCAR', index=-1):
+def read_vasp_out(filename='OUTCAR', index=-1, properties=None, offset=None):
     """Import OUTCAR type file.
 
     Reads unitcell, atom positions, energies, and forces from the OUTCAR file
     and attempts to read constraints (if any) from CONTCAR/POSCAR, if present.
+
+    properties: list of str
+        Only parse these properties, e.g. ['energy', 'forces'], which
+        skips the parsers of the others ('free_energy', 'stress',
+        'magmom', 'magmoms', 'efermi' and 'kpts').  Default is to read
+        everything.
+    offset: int
+        Byte offset of the ionic step to start reading from, as found
+        by index_vasp_out().  The header of the file is read first.
     """
     # "filename" is actually a file-descriptor thanks to @reader
-    g = iread_vasp_out(filename, index=index)
+    g = iread_vasp_out(filename, index=index, properties=properties,
+                       offset=offset)
     # Code borrowed from formats.py:read
     if isinstance(index, (slice, str)):
         # Return list of atoms
@@ -273,6 +290,17 @@ def read_vasp_out(filename='OUTCAR', index=-1):
         return next(g)
 
 
+def index_vasp_out(filename='OUTCAR'):
+    """Find the byte offsets of the ionic steps in an OUTCAR file.
+
+    The offsets can be passed to read_vasp_out() and iread_vasp_out()
+    to start reading from any ionic step."""
+    if isinstance(filename, (str, PurePath)):
+        with open(filename, 'rb') as fd:
+            return vop.index_outcar(fd)
+    return vop.index_outcar(filename)
+
+
 @reader
 def read_vasp_xdatcar(filename='XDATCAR', index=-1):
     """Import XDATCAR file
@@ -358,33 +386,150 @@ def __get_xml_parameter(par):
         return None
 
 
-def read_vasp_xml(filename='vasprun.xml', index=-1):
+def read_vasp_xml(filename='vasprun.xml', index=-1, properties=None,
+                  offset=None):
     """Parse vasprun.xml file.
 
     Reads unit cell, atom positions, energies, forces, and constraints
     from vasprun.xml file
+
+    The file is parsed incrementally: ionic steps that are not
+    requested are discarded as soon as they have been read, so the
+    memory use does not grow with the number of steps.
+
+    properties: list of str
+        Only read these properties: 'energy', 'free_energy', 'forces',
+        'stress', 'dipole', 'efermi' and 'kpts' (eigenvalues and
+        occupation numbers).  Default is to read everything.
+    offset: int
+        Byte offset of the ionic step to start reading from, as found
+        by index_vasp_xml().  The header of the file is read first.
     """
 
-    import xml.etree.ElementTree as ET
-    from ase.constraints import FixAtoms, FixScaled
-    from ase.calculators.singlepoint import (SinglePointDFTCalculator,
-                                             SinglePointKPoint)
-    from ase.units import GPa
-    from collections import OrderedDict
+    from collections import OrderedDict, deque
+    from itertools import islice
+
+    if not isinstance(index, slice):
+        index = slice(index, (index + 1) or None)
+    start, stop, step = index.start, index.stop, index.step
+
+    skip = {'projected', 'partial', 'total'}
+    if properties is not None and 'kpts' not in properties:
+        skip.add('eigenvalues')
+
+    header = {'atoms': None, 'ibz_kpts': None, 'kpt_weights': None,
+              'parameters': OrderedDict(), 'truncated': False}
+    calculations = _iread_vasp_xml_calculations(filename, header, offset,
+                                                skip)
+
+    if (start or 0) >= 0 and (stop or 0) >= 0 and (step or 1) > 0:
+        # Build the requested steps as they are read
+        start = start or 0
+        step = step or 1
+        nsteps = 0
+        for i, calculation in enumerate(islice(calculations, stop)):
+            nsteps += 1
+            if i >= start and (i - start) % step == 0:
+                yield _build_vasp_xml_step(calculation, header, properties)
+        if stop is not None and nsteps == stop:
+            calculations.close()
+            return
+    else:
+        # Negative indices: if the selection is counted from the end,
+        # keep only as many of the last steps as it can reach
+        if (step or 1) > 0:
+            first, last = start, stop
+        else:
+            first, last = stop, start
+        if (first is not None and first < 0
+                and (last is None or last <= 0)):
+            steps = list(deque(calculations, maxlen=-first))[index]
+        else:
+            steps = list(calculations)[index]
+        nsteps = len(steps)
+        for calculation in steps:
+            yield _build_vasp_xml_step(calculation, header, properties)
+
+    if nsteps == 0 and header['truncated']:
+        yield header['atoms']
 
-    tree = ET.iterparse(filename, events=['start', 'end'])
 
-    atoms_init = None
-    calculation = []
-    ibz_kpts = None
-    kpt_weights = None
-    parameters = OrderedDict()
+def _read_vasp_xml_data(filename, offset=None, chunksize=2**16):
+    """Read a vasprun.xml file in chunks for the XML parser.
 
+    With offset, the data before the first <calculation> element is
+    followed directly by the data from offset onwards."""
+    openandclose = isinstance(filename, (str, PurePath))
+    fd = open(filename, 'rb') if openandclose else filename
     try:
-        for event, elem in tree:
+        if offset is not None:
+            data = buf = fd.read(chunksize)
+            marker = '<calculation>'
+            if isinstance(buf, bytes):
+                marker = marker.encode()
+            while data and marker not in buf:
+                data = fd.read(chunksize)
+                buf += data
+            if marker not in buf:
+                raise ParseError('No ionic steps found in vasprun.xml')
+            yield buf[:buf.index(marker)]
+            fd.seek(offset)
+
+        while True:
+            data = fd.read(chunksize)
+            if not data:
+                return
+            yield data
+    finally:
+        if openandclose:
+            fd.close()
+
+
+def _iread_vasp_xml_calculations(filename, header, offset=None, skip=()):
+    """Parse vasprun.xml and yield the complete <calculation> elements.
+
+    The header dict is filled with the initial atoms, k-points and
+    parameters as they are found.  The elements with a tag in skip are
+    cleared as soon as they have been read within each calculation, and
+    every calculation is removed from the tree once it is complete.
+    If the file is truncated, the calculations not yet completed are
+    yielded at the end."""
 
-            if event == 'end':
-                if elem.tag == 'kpoints':
+    import xml.etree.ElementTree as ET
+    from collections import OrderedDict, deque
+    from ase.constraints import FixAtoms, FixScaled
+
+    parser = ET.XMLPullParser(events=['start', 'end'])
+    parameters = header['parameters']
+    stack = []  # the elements being read
+    calculations = deque()  # the calculations not yielded yet
+    complete = set()
+
+    try:
+        for data in _read_vasp_xml_data(filename, offset):
+            parser.feed(data)
+            for event, elem in parser.read_events():
+
+                if event == 'start':
+                    stack.append(elem)
+                    if elem.tag == 'calculation':
+                        calculations.append(elem)
+                    continue
+
+                stack.pop()
+                if elem.tag == 'calculation':
+                    if stack:
+                        stack[-1].remove(elem)
+                    complete.add(elem)
+                    while calculations and calculations[0] in complete:
+                        calculation = calculations.popleft()
+                        complete.remove(calculation)
+                        yield calculation
+
+                elif calculations and elem.tag in skip:
+                    elem.clear()
+
+                elif elem.tag == 'kpoints':
                     for subelem in elem.iter(tag='generation'):
                         kpts_params = OrderedDict()
                         parameters['kpoints_generation'] = kpts_params
@@ -393,14 +538,12 @@ def read_vasp_xml(filename='vasprun.xml', index=-1):
                                 parname = par.attrib['name'].lower()
                                 kpts_params[parname] = __get_xml_parameter(par)
 
-                    kpts = elem.findall("varray[@name='kpointlist']/v")
-                    ibz_kpts = np.zeros((len(kpts), 3))
-
-                    for i, kpt in enumerate(kpts):
-                        ibz_kpts[i] = [float(val) for val in kpt.text.split()]
+                    header['ibz_kpts'] = _read_xml_array(
+                        elem.findall("varray[@name='kpointlist']/v"))
 
                     kpt_weights = elem.findall('varray[@name="weights"]/v')
-                    kpt_weights = [float(val.text) for val in kpt_weights]
+                    header['kpt_weights'] = [float(val.text)
+                                             for val in kpt_weights]
 
                 elif elem.tag == 'parameters':
                     for par in elem.iter():
@@ -414,23 +557,14 @@ def read_vasp_xml(filename='vasprun.xml', index=-1):
                     for entry in elem.find("array[@name='atoms']/set"):
                         species.append(entry[0].text.strip())
 
-                    natoms = len(species)
+                    header['species'] = species
 
                 elif (elem.tag == 'structure'
                       and elem.attrib.get('name') == 'initialpos'):
-                    cell_init = np.zeros((3, 3), dtype=float)
-
-                    for i, v in enumerate(
-                            elem.find("crystal/varray[@name='basis']")):
-                        cell_init[i] = np.array(
-                            [float(val) for val in v.text.split()])
-
-                    scpos_init = np.zeros((natoms, 3), dtype=float)
-
-                    for i, v in enumerate(
-                            elem.find("varray[@name='positions']")):
-                        scpos_init[i] = np.array(
-                            [float(val) for val in v.text.split()])
+                    cell_init = _read_xml_array(
+                        elem.find("crystal/varray[@name='basis']"))
+                    scpos_init = _read_xml_array(
+                        elem.find("varray[@name='positions']"))
 
                     constraints = []
                     fixed_indices = []
@@ -447,136 +581,149 @@ def read_vasp_xml(filename='vasprun.xml', index=-1):
                     if fixed_indices:
                         constraints.append(FixAtoms(fixed_indices))
 
-                    atoms_init = Atoms(species,
-                                       cell=cell_init,
-                                       scaled_positions=scpos_init,
-                                       constraint=constraints,
-                                       pbc=True)
-
-                elif elem.tag == 'dipole':
-                    dblock = elem.find('v[@name="dipole"]')
-                    if dblock is not None:
-                        dipole = np.array(
-                            [float(val) for val in dblock.text.split()])
-
-            elif event == 'start' and elem.tag == 'calculation':
-                calculation.append(elem)
+                    header['atoms'] = Atoms(header['species'],
+                                            cell=cell_init,
+                                            scaled_positions=scpos_init,
+                                            constraint=constraints,
+                                            pbc=True)
+        parser.close()
 
     except ET.ParseError as parse_error:
-        if atoms_init is None:
+        if header['atoms'] is None:
             raise parse_error
-        if calculation and calculation[-1].find("energy") is None:
-            calculation = calculation[:-1]
-        if not calculation:
-            yield atoms_init
-
-    if calculation:
-        if isinstance(index, int):
-            steps = [calculation[index]]
-        else:
-            steps = calculation[index]
-    else:
-        steps = []
+        header['truncated'] = True
+        # Use the incomplete last step only if its energy was written:
+        if calculations and calculations[-1].find('energy') is None:
+            calculations.pop()
+        yield from calculations
+
+
+def _read_xml_array(rows):
+    """Convert the text of a sequence of <v> or <r> elements to a 2D
+    array."""
+    return np.array(' '.join([row.text for row in rows]).split(),
+                    dtype=float).reshape(len(rows), -1)
 
-    for step in steps:
+
+def _build_vasp_xml_step(step, header, properties=None):
+    """Build the Atoms object of a <calculation> element."""
+
+    from ase.calculators.singlepoint import (SinglePointDFTCalculator,
+                                             SinglePointKPoint)
+    from ase.units import GPa
+
+    def wanted(name):
+        return properties is None or name in properties
+
+    results = {}
+
+    if wanted('energy') or wanted('free_energy'):
         # Workaround for VASP bug, e_0_energy contains the wrong value
         # in calculation/energy, but calculation/scstep/energy does not
         # include classical VDW corrections. So, first calculate
         # e_0_energy - e_fr_energy from calculation/scstep/energy, then
         # apply that correction to e_fr_energy from calculation/energy.
         lastscf = step.findall('scstep/energy')[-1]
-        dipoles = step.findall('scstep/dipole')
-        if dipoles:
-            lastdipole = dipoles[-1]
-        else:
-            lastdipole = None
 
         de = (float(lastscf.find('i[@name="e_0_energy"]').text) -
               float(lastscf.find('i[@name="e_fr_energy"]').text))
 
         free_energy = float(step.find('energy/i[@name="e_fr_energy"]').text)
-        energy = free_energy + de
-
-        cell = np.zeros((3, 3), dtype=float)
-        for i, vector in enumerate(
-                step.find('structure/crystal/varray[@name="basis"]')):
-            cell[i] = np.array([float(val) for val in vector.text.split()])
-
-        scpos = np.zeros((natoms, 3), dtype=float)
-        for i, vector in enumerate(
-                step.find('structure/varray[@name="positions"]')):
-            scpos[i] = np.array([float(val) for val in vector.text.split()])
-
-        forces = None
-        fblocks = step.find('varray[@name="forces"]')
-        if fblocks is not None:
-            forces = np.zeros((natoms, 3), dtype=float)
-            for i, vector in enumerate(fblocks):
-                forces[i] = np.array(
-                    [float(val) for val in vector.text.split()])
-
-        stress = None
-        sblocks = step.find('varray[@name="stress"]')
-        if sblocks is not None:
-            stress = np.zeros((3, 3), dtype=float)
-            for i, vector in enumerate(sblocks):
-                stress[i] = np.array(
-                    [float(val) for val in vector.text.split()])
-            stress *= -0.1 * GPa
-            stress = stress.reshape(9)[[0, 4, 8, 5, 2, 1]]
+        results['free_energy'] = free_energy
+        results['energy'] = free_energy + de
+
+    cell = _read_xml_array(
+        step.find('structure/crystal/varray[@name="basis"]'))
+    scpos = _read_xml_array(step.find('structure/varray[@name="positions"]'))
+
+    fblocks = step.find('varray[@name="forces"]')
+    if fblocks is not None and wanted('forces'):
+        results['forces'] = _read_xml_array(fblocks)
 
+    sblocks = step.find('varray[@name="stress"]')
+    if sblocks is not None and wanted('stress'):
+        stress = _read_xml_array(sblocks) * (-0.1 * GPa)
+        results['stress'] = stress.reshape(9)[[0, 4, 8, 5, 2, 1]]
+
+    if wanted('dipole'):
         dipole = None
-        if lastdipole is not None:
-            dblock = lastdipole.find('v[@name="dipole"]')
+        dipoles = step.findall('scstep/dipole')
+        if dipoles:
+            dblock = dipoles[-1].find('v[@name="dipole"]')
             if dblock is not None:
-                dipole = np.zeros((1, 3), dtype=float)
                 dipole = np.array([float(val) for val in dblock.text.split()])
 
         dblock = step.find('dipole/v[@name="dipole"]')
         if dblock is not None:
-            dipole = np.zeros((1, 3), dtype=float)
             dipole = np.array([float(val) for val in dblock.text.split()])
+        results['dipole'] = dipole
+
+    efermi = step.find('dos/i[@name="efermi"]')
+    if efermi is not None and wanted('efermi'):
+        results['efermi'] = float(efermi.text)
+
+    ibz_kpts = header['ibz_kpts']
+    kpoints = []
+    if ibz_kpts is not None and wanted('kpts'):
+        kpt_weights = header['kpt_weights']
+        kblocks = {}
+        for spinblock in step.findall('eigenvalues/array/set/set'):
+            for kpoint in spinblock.findall('set'):
+                ikpt = int(kpoint.attrib['comment'].split()[-1])
+                kblocks.setdefault(ikpt, []).append(kpoint)
 
-        efermi = step.find('dos/i[@name="efermi"]')
-        if efermi is not None:
-            efermi = float(efermi.text)
-
-        kpoints = []
         for ikpt in range(1, len(ibz_kpts) + 1):
-            kblocks = step.findall(
-                'eigenvalues/array/set/set/set[@comment="kpoint %d"]' % ikpt)
-            if kblocks is not None:
-                for spin, kpoint in enumerate(kblocks):
-                    eigenvals = kpoint.findall('r')
-                    eps_n = np.zeros(len(eigenvals))
-                    f_n = np.zeros(len(eigenvals))
-                    for j, val in enumerate(eigenvals):
-                        val = val.text.split()
-                        eps_n[j] = float(val[0])
-                        f_n[j] = float(val[1])
-                    if len(kblocks) == 1:
-                        f_n *= 2
-                    kpoints.append(
-                        SinglePointKPoint(kpt_weights[ikpt - 1], spin, ikpt,
-                                          eps_n, f_n))
-        if len(kpoints) == 0:
-            kpoints = None
-
-        atoms = atoms_init.copy()
-        atoms.set_cell(cell)
-        atoms.set_scaled_positions(scpos)
-        atoms.calc = SinglePointDFTCalculator(atoms,
-                                              energy=energy,
-                                              forces=forces,
-                                              stress=stress,
-                                              free_energy=free_energy,
-                                              ibzkpts=ibz_kpts,
-                                              efermi=efermi,
-                                              dipole=dipole)
-        atoms.calc.name = 'vasp'
-        atoms.calc.kpts = kpoints
-        atoms.calc.parameters = parameters
-        yield atoms
+            nspins = len(kblocks.get(ikpt, []))
+            for spin, kpoint in enumerate(kblocks.get(ikpt, [])):
+                values = _read_xml_array(kpoint.findall('r'))
+                eps_n = values[:, 0].copy()
+                f_n = values[:, 1].copy()
+                if nspins == 1:
+                    f_n *= 2
+                kpoints.append(
+                    SinglePointKPoint(kpt_weights[ikpt - 1], spin, ikpt,
+                                      eps_n, f_n))
+    if len(kpoints) == 0:
+        kpoints = None
+
+    atoms = header['atoms'].copy()
+    atoms.set_cell(cell)
+    atoms.set_scaled_positions(scpos)
+    atoms.calc = SinglePointDFTCalculator(atoms, ibzkpts=ibz_kpts, **results)
+    atoms.calc.name = 'vasp'
+    atoms.calc.kpts = kpoints
+    atoms.calc.parameters = header['parameters']
+    return atoms
+
+
+def index_vasp_xml(filename='vasprun.xml'):
+    """Find the byte offsets of the ionic steps in a vasprun.xml file.
+
+    The offsets can be passed to read_vasp_xml() to start reading
+    from any ionic step, e.g. to continue reading a file that is still
+    being written.  The file is only searched for the <calculation>
+    tags, which is much faster than parsing it."""
+    marker = b'<calculation>'
+    offsets = []
+    pos = 0
+    tail = b''
+    openandclose = isinstance(filename, (str, PurePath))
+    fd = open(filename, 'rb') if openandclose else filename
+    try:
+        while True:
+            data = fd.read(2**20)
+            if not data:
+                return offsets
+            buf = tail + data
+            i = buf.find(marker)
+            while i >= 0:
+                offsets.append(pos - len(tail) + i)
+                i = buf.find(marker, i + 1)
+            tail = buf[1 - len(marker):]
+            pos += len(data)
+    finally:
+        if openandclose:
+            fd.close()
 
 
 @writer
@@ -2,8 +2,8 @@
 Module for parsing OUTCAR files.
 """
 from abc import ABC, abstractmethod
-from typing import (Dict, Any, Sequence, TextIO, Iterator, Optional, Union,
-                    List)
+from typing import (Dict, Any, Sequence, TextIO, BinaryIO, Iterator, Optional,
+                    Union, List, Set)
 import re
 from warnings import warn
 from pathlib import Path, PurePath
@@ -100,6 +100,11 @@ class SimpleProperty(VaspPropertyParser, ABC):
 class VaspChunkPropertyParser(VaspPropertyParser, ABC):
     """Base class for parsing a chunk of the OUTCAR.
     The base assumption is that only a chunk of lines is passed"""
+    # Names of the results produced by the parser, used for skipping
+    # parsers when only some properties are requested.  An empty tuple
+    # means that the parser is always run.
+    PROPERTIES = ()  # type: Sequence[str]
+
     def __init__(self, header: _HEADER = None):
         super().__init__()
         header = header or {}
@@ -279,6 +284,7 @@ class KpointHeader(SimpleVaspHeaderParser):
 class Stress(SimpleVaspChunkParser):
     """Process the stress from an OUTCAR"""
     LINE_DELIMITER = 'in kB '
+    PROPERTIES = ('stress',)
 
     def parse(self, cursor: _CURSOR, lines: _CHUNK) -> _RESULT:
         line = self.get_line(cursor, lines)
@@ -296,6 +302,7 @@ class Stress(SimpleVaspChunkParser):
 
 class Cell(SimpleVaspChunkParser):
     LINE_DELIMITER = 'direct lattice vectors'
+    PROPERTIES = ('cell',)
 
     def parse(self, cursor: _CURSOR, lines: _CHUNK) -> _RESULT:
         nskip = 1
@@ -311,6 +318,7 @@ class PositionsAndForces(SimpleVaspChunkParser):
     """Positions and forces are written in the same block.
     We parse both simultaneously"""
     LINE_DELIMITER = 'POSITION          '
+    PROPERTIES = ('positions', 'forces')
 
     def parse(self, cursor: _CURSOR, lines: _CHUNK) -> _RESULT:
         nskip = 2
@@ -327,6 +335,8 @@ class PositionsAndForces(SimpleVaspChunkParser):
 
 
 class Magmom(VaspChunkPropertyParser):
+    PROPERTIES = ('magmom',)
+
     def has_property(self, cursor: _CURSOR, lines: _CHUNK) -> bool:
         """ We need to check for two separate delimiter strings,
         to ensure we are at the right place """
@@ -362,6 +372,7 @@ class Magmoms(SimpleVaspChunkParser):
     
     non-collinear spin is (currently) not supported"""
     LINE_DELIMITER = 'magnetization (x)'
+    PROPERTIES = ('magmoms',)
 
     def parse(self, cursor: _CURSOR, lines: _CHUNK) -> _RESULT:
         # Magnetization for collinear
@@ -378,6 +389,7 @@ class Magmoms(SimpleVaspChunkParser):
 
 class EFermi(SimpleVaspChunkParser):
     LINE_DELIMITER = 'E-fermi :'
+    PROPERTIES = ('efermi',)
 
     def parse(self, cursor: _CURSOR, lines: _CHUNK) -> _RESULT:
         line = self.get_line(cursor, lines)
@@ -388,6 +400,7 @@ class EFermi(SimpleVaspChunkParser):
 
 class Energy(SimpleVaspChunkParser):
     LINE_DELIMITER = _OUTCAR_SCF_DELIM
+    PROPERTIES = ('free_energy', 'energy')
 
     def parse(self, cursor: _CURSOR, lines: _CHUNK) -> _RESULT:
         nskip = 2
@@ -404,6 +417,8 @@ class Energy(SimpleVaspChunkParser):
 
 
 class Kpoints(VaspChunkPropertyParser):
+    PROPERTIES = ('kpts',)
+
     def has_property(self, cursor: _CURSOR, lines: _CHUNK) -> bool:
         line = lines[cursor]
         # Example line:
@@ -578,12 +593,28 @@ class HeaderParser(TypeParser, ABC):
 
 
 class OutcarChunkParser(ChunkParser):
-    """Class for parsing a chunk of an OUTCAR."""
+    """Class for parsing a chunk of an OUTCAR.
+
+    If a list of properties (e.g. ['energy', 'forces']) is given, only
+    the parsers needed for these properties and for the atoms
+    themselves are run, and only these properties are stored."""
+    REQUIRED = ('positions', 'cell')
+
     def __init__(self,
                  header: _HEADER = None,
-                 parsers: Sequence[VaspChunkPropertyParser] = None):
+                 parsers: Sequence[VaspChunkPropertyParser] = None,
+                 properties: Sequence[str] = None):
         global default_chunk_parsers
         parsers = parsers or default_chunk_parsers.make_parsers()
+        wanted: Optional[Set[str]] = None
+        if properties is not None:
+            wanted = set(properties).union(self.REQUIRED)
+            parsers = [
+                parser for parser in parsers
+                if not parser.PROPERTIES or wanted.intersection(
+                    parser.PROPERTIES)
+            ]
+        self.properties = wanted
         super().__init__(parsers, header=header)
 
     def build(self, lines: _CHUNK) -> Atoms:
@@ -591,6 +622,11 @@ class OutcarChunkParser(ChunkParser):
         self.update_parser_headers()  # Ensure header is in sync
 
         results = self.parse(lines)
+        if self.properties is not None:
+            results = {
+                key: value
+                for key, value in results.items() if key in self.properties
+            }
         symbols = self.header['symbols']
         constraint = self.header.get('constraint', None)
 
@@ -739,8 +775,12 @@ def build_chunk(fd: TextIO) -> _CHUNK:
 
 def outcarchunks(fd: TextIO,
                  chunk_parser: ChunkParser = None,
-                 header_parser: HeaderParser = None) -> Iterator[OUTCARChunk]:
-    """Function to build chunks of OUTCAR from a file stream"""
+                 header_parser: HeaderParser = None,
+                 offset: int = None) -> Iterator[OUTCARChunk]:
+    """Function to build chunks of OUTCAR from a file stream
+
+    If offset (see index_outcar()) is given, the chunks are read from
+    that position in the file after the header has been parsed."""
     name = Path(fd.name)
     workdir = name.parent
 
@@ -754,6 +794,9 @@ def outcarchunks(fd: TextIO,
 
     chunk_parser = chunk_parser or OutcarChunkParser()
 
+    if offset is not None:
+        fd.seek(offset)
+
     while True:
         try:
             lines = build_chunk(fd)
@@ -763,6 +806,28 @@ def outcarchunks(fd: TextIO,
         yield OUTCARChunk(lines, header, parser=chunk_parser)
 
 
+def index_outcar(fd: BinaryIO) -> List[int]:
+    """Find the byte offsets of the complete ionic steps in an OUTCAR.
+
+    The lines are only searched for the delimiters used by
+    outcarchunks(), so this is much faster than parsing the file.
+    fd must be opened in binary mode."""
+    scf_delim = _OUTCAR_SCF_DELIM.encode()
+    for line in iter(fd.readline, b''):
+        if b'Iteration' in line:
+            break
+    offsets: List[int] = []
+    start = fd.tell()
+    for line in iter(fd.readline, b''):
+        if scf_delim in line:
+            for _ in range(4):
+                if not fd.readline():
+                    return offsets
+            offsets.append(start)
+            start = fd.tell()
+    return offsets
+
+
 # Create the default chunk parsers
 default_chunk_parsers = DefaultParsersContainer(
     Cell,
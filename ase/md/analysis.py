@@ -1,9 +1,67 @@
 # flake8: noqa
+from itertools import islice
+
 import numpy as np
 
+
+def autocorrelation(x):
+    """Autocorrelation of x along the first (time) axis averaged over all time origins.
+
+    Uses the Wiener-Khinchin theorem, i.e. O(T log T) for T frames.  Each
+    remaining axis is treated as an independent component.
+
+    Returns array with same shape as x where element m is the mean of x[k] * x[k + m].
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    f = np.fft.rfft(x, n=2 * n, axis=0)
+    acf = np.fft.irfft(f * f.conj(), n=2 * n, axis=0)[:n]
+    return acf / (n - np.arange(n)).reshape((-1,) + (1,) * (x.ndim - 1))
+
+
+def msd_fft(x):
+    """Squared displacement of x along the first (time) axis averaged over all time origins.
+
+    This is the FFT algorithm of Kneller et al. (nMoldyn), which costs
+    O(T log T) for T frames instead of O(T^2).  Each remaining axis is
+    treated as an independent component, so x of shape (T, natoms, 3)
+    gives the mean square displacement of each atom along x, y and z.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    d = x**2
+    cs = np.cumsum(d, axis=0)
+    shape = (-1,) + (1,) * (x.ndim - 1)
+    # sum_{k < n - m} d[k] + sum_{k >= m} d[k]:
+    s1 = cs[::-1] + cs[-1] - np.concatenate([np.zeros_like(cs[:1]), cs[:-1]])
+    s1 /= (n - np.arange(n)).reshape(shape)
+    return s1 - 2 * autocorrelation(x)
+
+
+def unwrap_positions(positions, cell, pbc=True):
+    """Unwrap a trajectory of positions across periodic boundaries.
+
+    positions: (T, N, 3) array.  cell: (3, 3) or (T, 3, 3) array.
+    Displacements between consecutive frames are mapped to the shortest
+    vector, so no atom may move more than half a cell per frame.
+    """
+    positions = np.asarray(positions, dtype=float)
+    pbc = np.broadcast_to(pbc, 3)
+    if not pbc.any():
+        return positions.copy()
+    cell = np.asarray(cell, dtype=float)
+    if cell.ndim == 2:
+        cell = np.broadcast_to(cell, (len(positions), 3, 3))
+    scaled = np.linalg.solve(cell.transpose(0, 2, 1), positions.transpose(0, 2, 1)).transpose(0, 2, 1)
+    steps = np.diff(scaled, axis=0)
+    steps[..., pbc] -= np.round(steps[..., pbc])
+    scaled[1:] = scaled[0] + np.cumsum(steps, axis=0)
+    return scaled @ cell
+
+
 class DiffusionCoefficient:
 
-    def __init__(self, traj, timestep, atom_indices=None, molecule=False):
+    def __init__(self, traj, timestep, atom_indices=None, molecule=False, unwrap=False):
         """
 
         This class calculates the Diffusion Coefficient for the given Trajectory using the Einstein Equation:
@@ -26,11 +84,15 @@ class DiffusionCoefficient:
                 The indices of atoms whose Diffusion Coefficient is to be calculated explicitly
             molecule (Boolean)
                 Indicate if we are studying a molecule instead of atoms, therefore use centre of mass in calculations
+            unwrap (Boolean)
+                Unwrap positions across periodic boundaries before computing displacements.
+                Needed if the positions in the trajectory have been wrapped into the cell.
  
         """
 
         self.traj = traj
         self.timestep = timestep
+        self.unwrap = unwrap
 
         # Condition used if user wants to calculate diffusion coefficients for specific atoms or all atoms
         self.atom_indices = atom_indices
@@ -46,6 +108,13 @@ class DiffusionCoefficient:
             self.types_of_atoms = sorted(set(traj[0].symbols[self.atom_indices]))
             self.no_of_atoms = [traj[0].get_chemical_symbols().count(symbol) for symbol in self.types_of_atoms]
 
+        # Species index of each selected atom
+        if self.is_molecule:
+            self._species = np.zeros(1, dtype=int)
+        else:
+            self._species = np.array([self.types_of_atoms.index(traj[0].symbols[atom_no])
+                                      for atom_no in self.atom_indices])
+
         # Dummy initialisation for important results data object
         self._slopes = []
 
@@ -106,7 +175,48 @@ class DiffusionCoefficient:
 
         self.cont_xyz_segment_ensemble_average = 0
 
-    def calculate(self, ignore_n_images=0, number_of_segments=1):
+    def _get_trajectory_array(self, ignore_n_images, getter):
+        """
+
+        Private function that collects an array of shape (images, selected atoms, 3) in one pass over the trajectory.
+        For molecules, the selected atoms are replaced by their centre.
+
+        """
+        data = np.array([getter(atoms)[self.atom_indices] for atoms in islice(self.traj, ignore_n_images, None)])
+        if self.is_molecule:
+            data = data.mean(axis=1, keepdims=True)
+        return data
+
+    def _get_positions(self, ignore_n_images):
+        """
+
+        Private function that returns (unwrapped) positions of the selected atoms or molecule for all images.
+
+        """
+        if not self.unwrap:
+            return self._get_trajectory_array(ignore_n_images, lambda atoms: atoms.positions)
+
+        positions = []
+        cells = []
+        for atoms in islice(self.traj, ignore_n_images, None):
+            positions.append(atoms.positions)
+            cells.append(atoms.get_cell(complete=True))
+        positions = unwrap_positions(positions, cells, atoms.pbc)[:, self.atom_indices]
+        if self.is_molecule:
+            positions = positions.mean(axis=1, keepdims=True)
+        return positions
+
+    def _species_sum(self, data):
+        """
+
+        Private function that sums data of shape (images, selected atoms, 3) over the atoms of each species.
+        Returns array of shape (species, 3, images).
+
+        """
+        return np.array([data[:, self._species == sym_index].sum(axis=1).T
+                         for sym_index in range(self.no_of_types_of_atoms)])
+
+    def calculate(self, ignore_n_images=0, number_of_segments=1, all_origins=False):
         """
         
         Calculate the diffusion coefficients, using the previously supplied data. The user can break the data into segments and 
@@ -118,55 +228,81 @@ class DiffusionCoefficient:
                 Number of images you want to ignore from the start of the trajectory, e.g. during equilibration
             number_of_segments (Int): 
                 Divides the given trajectory in to segments to allow statistical analysis
+            all_origins (Boolean):
+                Average the mean square displacement over all time origins within each segment instead of
+                measuring it from the first image only.  Uses the FFT algorithm, see :func:`msd_fft`.
 
         """
 
         # Setup all the arrays we need to store information
         self._initialise_arrays(ignore_n_images, number_of_segments)
 
+        # Read all positions once, shape (images, selected atoms, 3)
+        positions = self._get_positions(ignore_n_images)
+
         for segment_no in range(self.no_of_segments):
             start = segment_no*self.len_segments  
             end = start + self.len_segments
-            seg = self.traj[ignore_n_images+start:ignore_n_images+end]
-
-            # If we are considering a molecular system, work out the COM for the starting structure
-            if self.is_molecule:
-                com_orig = np.zeros(3)
-                for atom_no in self.atom_indices:
-                    com_orig += seg[0].positions[atom_no] / len(self.atom_indices)
-
-            # For each image, calculate displacement.
-            # I spent some time deciding if this should run from 0 or 1, as the displacement will be zero for 
-            # t = 0, but this is a data point that needs fitting too and so should be included
-            for image_no in range(0,len(seg)): 
-                # This object collects the xyz displacements for all atom species in the image
-                xyz_disp = np.zeros((self.no_of_types_of_atoms,3))
-                
-                # Calculating for each atom individually, grouping by species type (e.g. solid state)
-                if not self.is_molecule:
-                    # For each atom, work out displacement from start coordinate and collect information with like atoms
-                    for atom_no in self.atom_indices:
-                        sym_index = self.types_of_atoms.index(seg[image_no].symbols[atom_no])
-                        xyz_disp[sym_index] += np.square(seg[image_no].positions[atom_no] - seg[0].positions[atom_no])
-        
-                else: # Calculating for group of atoms (molecule) and work out squared displacement
-                    com_disp = np.zeros(3)
-                    for atom_no in self.atom_indices:
-                        com_disp += seg[image_no].positions[atom_no] / len(self.atom_indices)
-                    xyz_disp[0] += np.square(com_disp - com_orig)
-
-                # For each atom species or molecule, use xyz_disp to calculate the average data                      
-                for sym_index in range(self.no_of_types_of_atoms):
-                    # Normalise by degrees of freedom and average overall atoms for each axes over entire segment                         
-                    denominator = (2*self.no_of_atoms[sym_index])
-                    for xyz in range(3):
-                        self.xyz_segment_ensemble_average[segment_no][sym_index][xyz][image_no] = (xyz_disp[sym_index][xyz]/denominator)
+            seg = positions[start:end]
+
+            # Squared displacement for each image, atom and axis.
+            # Displacement is zero for t = 0, but this is a data point that needs fitting too and so is included
+            if all_origins:
+                sq_disp = msd_fft(seg)
+            else:
+                sq_disp = (seg - seg[0])**2
+
+            # Normalise by degrees of freedom and average over all atoms of each species
+            denominator = 2 * np.array(self.no_of_atoms)[:, np.newaxis, np.newaxis]
+            self.xyz_segment_ensemble_average[segment_no] = self._species_sum(sq_disp) / denominator
 
             # We've collected all the data for this entire segment, so now to fit the data.
             for sym_index in range(self.no_of_types_of_atoms):    
                 self.slopes[sym_index][segment_no], self.intercepts[sym_index][segment_no] = self._fit_data(self.timesteps[start:end], 
                                                                                                             self.xyz_segment_ensemble_average[segment_no][sym_index])
 
+    def get_velocity_autocorrelation(self, ignore_n_images=0):
+        """
+
+        Velocity autocorrelation function <v(0).v(t)> for each species (or the molecule), averaged over atoms
+        and all time origins using FFT.  The images must contain momenta.
+
+        Parameters:
+            ignore_n_images (Int):
+                Number of images you want to ignore from the start of the trajectory, e.g. during equilibration
+
+        Returns times (in ASE time units) and an array of shape (species, images).
+
+        """
+        velocities = self._get_trajectory_array(ignore_n_images, lambda atoms: atoms.get_velocities())
+        vacf = self._species_sum(autocorrelation(velocities)).sum(axis=1)
+        counts = np.bincount(self._species, minlength=self.no_of_types_of_atoms)
+        times = np.arange(len(velocities)) * self.timestep
+        return times, vacf / counts[:, np.newaxis]
+
+    def get_green_kubo_diffusion_coefficients(self, ignore_n_images=0, tmax=None):
+        """
+
+        Diffusion coefficients for each species (in alphabetical order) from the Green-Kubo relation
+
+        ..math:: D = \\frac{1}{3} \\int_0^{t_{max}} \\left \\langle v(0) \\cdot v(t) \\right \\rangle dt
+
+        Parameters:
+            ignore_n_images (Int):
+                Number of images you want to ignore from the start of the trajectory, e.g. during equilibration
+            tmax (Float):
+                Upper integration limit in ASE time units.  Default is half the trajectory length, since the
+                correlation function is noisy at long times where few time origins contribute.
+
+        Units are the same as for :meth:`get_diffusion_coefficients`.
+
+        """
+        times, vacf = self.get_velocity_autocorrelation(ignore_n_images)
+        if tmax is None:
+            tmax = times[-1] / 2
+        n = np.searchsorted(times, tmax, side='right')
+        return list(np.trapz(vacf[:, :n], times[:n], axis=1) / 3)
+
     def _fit_data(self, x, y):
         """
         Private function that returns slope and intercept for linear fit to mean square diffusion data
@@ -0,0 +1,479 @@
+"""Streaming analysis of trajectories.
+
+The classes in this module consume frames one at a time, e.g. from
+:func:`ase.io.iread` or a :class:`~ase.io.trajectory.TrajectoryReader`,
+and accumulate statistics without keeping the frames in memory.  The
+memory needed is independent of the number of frames.
+
+Example::
+
+    from ase.io import iread
+    from ase.md.streaming import (StreamingAnalysis, RDFAccumulator,
+                                  MSDAccumulator)
+
+    rdf = RDFAccumulator(rmax=6.0, nbins=120)
+    msd = MSDAccumulator(window=200)
+    StreamingAnalysis([rdf, msd]).run(iread('md.traj'))
+    g, r = rdf.get()
+    lags, msd_t = msd.get()
+"""
+
+import copy
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from ase.data import atomic_numbers
+from ase.ga.utilities import get_rdf
+from ase.neighborlist import natural_cutoffs, neighbor_list
+
+
+__all__ = ['StreamingAnalysis', 'RDFAccumulator', 'MSDAccumulator',
+           'VACFAccumulator', 'BondAccumulator', 'AngleAccumulator',
+           'CoordinationAccumulator']
+
+
+def _number(symbol):
+    if isinstance(symbol, str):
+        return atomic_numbers[symbol]
+    return int(symbol)
+
+
+class Accumulator:
+    """Base class for quantities accumulated over a stream of frames.
+
+    Subclasses implement :meth:`reset`, :meth:`update` and, if the frames
+    can be processed independently of each other (``framewise = True``),
+    :meth:`merge`.  Only framewise accumulators can be distributed over
+    worker processes."""
+
+    framewise = True
+
+    def reset(self):
+        """Clear all accumulated data."""
+        raise NotImplementedError
+
+    def update(self, atoms):
+        """Add a single frame."""
+        raise NotImplementedError
+
+    def merge(self, other):
+        """Add the data accumulated by *other* to this accumulator."""
+        raise NotImplementedError
+
+    def empty_copy(self):
+        """Return a copy with the same settings but no accumulated data."""
+        new = copy.copy(self)
+        new.reset()
+        return new
+
+
+class _HistogramAccumulator(Accumulator):
+    """Histogram of a per-frame sample of values in [0, vmax]."""
+
+    def __init__(self, vmax, nbins):
+        self.vmax = vmax
+        self.nbins = nbins
+        self.reset()
+
+    def reset(self):
+        self.counts = np.zeros(self.nbins, dtype=int)
+        self.n = 0
+        self.total = 0.0
+        self.total2 = 0.0
+
+    def _add_values(self, values):
+        hist, _ = np.histogram(values, bins=self.nbins,
+                               range=(0.0, self.vmax))
+        self.counts += hist
+        self.n += len(values)
+        self.total += values.sum()
+        self.total2 += (values**2).sum()
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.n += other.n
+        self.total += other.total
+        self.total2 += other.total2
+
+    @property
+    def mean(self):
+        """Mean of all values."""
+        return self.total / self.n
+
+    @property
+    def std(self):
+        """Standard deviation of all values."""
+        return np.sqrt(max(self.total2 / self.n - self.mean**2, 0.0))
+
+    def get(self):
+        """Return histogram counts and bin centers."""
+        dv = self.vmax / self.nbins
+        return self.counts.copy(), (np.arange(self.nbins) + 0.5) * dv
+
+
+class RDFAccumulator(Accumulator):
+    """Radial distribution function averaged over frames.
+
+    The result equals the average of :func:`ase.ga.utilities.get_rdf`
+    over the frames.  All periodic images within *rmax* are counted.
+
+    Parameters:
+
+    rmax: float
+        Maximum distance.
+    nbins: int
+        Number of bins.
+    elements: tuple of two atomic numbers or symbols
+        If given, the partial RDF between these two elements is computed.
+    """
+
+    def __init__(self, rmax, nbins, elements=None):
+        self.rmax = rmax
+        self.nbins = nbins
+        if elements is not None:
+            elements = tuple(_number(Z) for Z in elements)
+        self.elements = elements
+        self.reset()
+
+    def reset(self):
+        self.rdf = np.zeros(self.nbins)
+        self.nframes = 0
+
+    def update(self, atoms):
+        self.rdf += get_rdf(atoms, self.rmax, self.nbins,
+                            elements=self.elements, no_dists=True)
+        self.nframes += 1
+
+    def merge(self, other):
+        self.rdf += other.rdf
+        self.nframes += other.nframes
+
+    def get(self):
+        """Return RDF and the corresponding distances."""
+        dr = self.rmax / self.nbins
+        r = (np.arange(1, self.nbins + 1) - 0.5) * dr
+        return self.rdf / self.nframes, r
+
+
+class _CorrelationAccumulator(Accumulator):
+    """Time correlation over all time origins within a window.
+
+    The last *window* frames are kept in a ring buffer, so the memory
+    needed is proportional to the window and not to the trajectory
+    length."""
+
+    framewise = False
+
+    def __init__(self, window, indices=None):
+        self.window = window
+        self.indices = indices
+        self.reset()
+
+    def reset(self):
+        self.buffer = None
+        self.nframes = 0
+        self.sums = np.zeros((self.window, 3))
+        self.counts = np.zeros(self.window, dtype=int)
+
+    def _select(self, array):
+        if self.indices is None:
+            return array
+        return array[self.indices]
+
+    def _add(self, values):
+        if self.buffer is None:
+            self.buffer = np.empty((self.window,) + values.shape)
+        t = self.nframes
+        self.buffer[t % self.window] = values
+        nlags = min(t + 1, self.window)
+        lags = np.arange(nlags)
+        origins = self.buffer[(t - lags) % self.window]
+        self.sums[:nlags] += self._correlate(origins, values).sum(axis=1)
+        self.counts[:nlags] += len(values)
+        self.nframes += 1
+
+    def get(self, per_axis=False):
+        """Return lags (in frames) and correlation function.
+
+        The correlation function is averaged over atoms and time origins.
+        If *per_axis* is True, the x, y and z contributions are returned
+        separately as an array of shape (window, 3)."""
+        nlags = min(self.nframes, self.window)
+        values = self.sums[:nlags] / self.counts[:nlags, np.newaxis]
+        if not per_axis:
+            values = values.sum(axis=1)
+        return np.arange(nlags), values
+
+
+class MSDAccumulator(_CorrelationAccumulator):
+    """Mean square displacement averaged over atoms and time origins.
+
+    Positions are unwrapped across periodic boundaries by assuming that
+    no atom moves more than half a cell between consecutive frames.
+
+    Parameters:
+
+    window: int
+        Maximum lag (in frames) plus one.
+    indices: list of int
+        Atoms to include.  Default is all atoms.
+    unwrap: bool
+        Whether to unwrap positions across periodic boundaries.
+    """
+
+    def __init__(self, window, indices=None, unwrap=True):
+        self.unwrap = unwrap
+        _CorrelationAccumulator.__init__(self, window, indices)
+
+    def reset(self):
+        _CorrelationAccumulator.reset(self)
+        self.previous = None
+        self.unwrapped = None
+
+    def update(self, atoms):
+        positions = atoms.get_positions()
+        if self.previous is None:
+            self.unwrapped = positions.copy()
+        else:
+            delta = positions - self.previous
+            if self.unwrap and atoms.pbc.any():
+                cell = atoms.get_cell(complete=True)
+                scaled = np.linalg.solve(cell.T, delta.T).T
+                pbc = atoms.pbc
+                scaled[:, pbc] -= np.round(scaled[:, pbc])
+                delta = scaled @ cell
+            self.unwrapped += delta
+        self.previous = positions
+        self._add(self._select(self.unwrapped))
+
+    def _correlate(self, origins, values):
+        return (values - origins)**2
+
+
+class VACFAccumulator(_CorrelationAccumulator):
+    """Velocity autocorrelation function averaged over atoms and origins.
+
+    Parameters:
+
+    window: int
+        Maximum lag (in frames) plus one.
+    indices: list of int
+        Atoms to include.  Default is all atoms.
+    """
+
+    def update(self, atoms):
+        self._add(self._select(atoms.get_velocities()))
+
+    def _correlate(self, origins, values):
+        return origins * values
+
+
+class BondAccumulator(_HistogramAccumulator):
+    """Distribution of bond lengths between elements A and B.
+
+    Two atoms are bonded if their distance is smaller than the sum of
+    their cutoff radii.
+
+    Parameters:
+
+    A, B: str or int
+        The two elements.
+    rmax: float
+        Upper limit of the histogram.
+    nbins: int
+        Number of histogram bins.
+    cutoffs: list of float, dict or float
+        Cutoffs as understood by :func:`ase.neighborlist.neighbor_list`.
+        Default is :func:`ase.neighborlist.natural_cutoffs`.
+    """
+
+    def __init__(self, A, B, rmax=4.0, nbins=200, cutoffs=None):
+        self.A = _number(A)
+        self.B = _number(B)
+        self.cutoffs = cutoffs
+        _HistogramAccumulator.__init__(self, rmax, nbins)
+
+    def update(self, atoms):
+        cutoffs = self.cutoffs
+        if cutoffs is None:
+            cutoffs = natural_cutoffs(atoms)
+        i, j, d = neighbor_list('ijd', atoms, cutoffs)
+        numbers = atoms.numbers
+        mask = (numbers[i] == self.A) & (numbers[j] == self.B)
+        if self.A == self.B:
+            mask &= i < j
+        self._add_values(d[mask])
+
+
+class AngleAccumulator(_HistogramAccumulator):
+    """Distribution of A-B-C bond angles in degrees with B in the middle.
+
+    Parameters:
+
+    A, B, C: str or int
+        The three elements.
+    nbins: int
+        Number of histogram bins between 0 and 180 degrees.
+    cutoffs: list of float, dict or float
+        Cutoffs as understood by :func:`ase.neighborlist.neighbor_list`.
+        Default is :func:`ase.neighborlist.natural_cutoffs`.
+    """
+
+    def __init__(self, A, B, C, nbins=180, cutoffs=None):
+        self.A = _number(A)
+        self.B = _number(B)
+        self.C = _number(C)
+        self.cutoffs = cutoffs
+        _HistogramAccumulator.__init__(self, 180.0, nbins)
+
+    def update(self, atoms):
+        cutoffs = self.cutoffs
+        if cutoffs is None:
+            cutoffs = natural_cutoffs(atoms)
+        i, j, D = neighbor_list('ijD', atoms, cutoffs)
+        numbers = atoms.numbers
+        mask = numbers[i] == self.B
+        i, j, D = i[mask], j[mask], D[mask]
+
+        # Pair every bond p of a central atom with every bond q of the
+        # same atom (i is sorted, so bonds of one atom are contiguous):
+        counts = np.bincount(i, minlength=len(atoms))
+        first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        p = np.repeat(np.arange(len(i)), counts[i])
+        q = first[i[p]] + (np.arange(len(p)) -
+                           np.repeat(np.cumsum(counts[i]) - counts[i],
+                                     counts[i]))
+        mask = (numbers[j[p]] == self.A) & (numbers[j[q]] == self.C)
+        if self.A == self.C:
+            mask &= p < q
+        else:
+            mask &= p != q
+        p, q = p[mask], q[mask]
+
+        v1 = D[p]
+        v2 = D[q]
+        cos = (v1 * v2).sum(1) / (np.linalg.norm(v1, axis=1) *
+                                  np.linalg.norm(v2, axis=1))
+        self._add_values(np.degrees(np.arccos(np.clip(cos, -1.0, 1.0))))
+
+
+class CoordinationAccumulator(Accumulator):
+    """Coordination number statistics per element.
+
+    Parameters:
+
+    cutoffs: list of float, dict or float
+        Cutoffs as understood by :func:`ase.neighborlist.neighbor_list`.
+        Default is :func:`ase.neighborlist.natural_cutoffs`.
+    maxcn: int
+        Largest coordination number in the histograms.  Larger
+        coordination numbers are counted in the last bin.
+    """
+
+    def __init__(self, cutoffs=None, maxcn=16):
+        self.cutoffs = cutoffs
+        self.maxcn = maxcn
+        self.reset()
+
+    def reset(self):
+        self.histograms = {}
+
+    def update(self, atoms):
+        cutoffs = self.cutoffs
+        if cutoffs is None:
+            cutoffs = natural_cutoffs(atoms)
+        i = neighbor_list('i', atoms, cutoffs)
+        cn = np.minimum(np.bincount(i, minlength=len(atoms)), self.maxcn)
+        for Z in np.unique(atoms.numbers):
+            hist = np.bincount(cn[atoms.numbers == Z],
+                               minlength=self.maxcn + 1)
+            if Z in self.histograms:
+                self.histograms[Z] += hist
+            else:
+                self.histograms[Z] = hist
+
+    def merge(self, other):
+        for Z, hist in other.histograms.items():
+            if Z in self.histograms:
+                self.histograms[Z] += hist
+            else:
+                self.histograms[Z] = hist.copy()
+
+    def get(self, element):
+        """Return histogram of coordination numbers of *element*."""
+        return self.histograms[_number(element)].copy()
+
+    def mean(self, element):
+        """Return the mean coordination number of *element*."""
+        hist = self.histograms[_number(element)]
+        return (hist * np.arange(len(hist))).sum() / hist.sum()
+
+
+def _accumulate_chunk(accumulators, images):
+    for atoms in images:
+        for acc in accumulators:
+            acc.update(atoms)
+    return accumulators
+
+
+class StreamingAnalysis:
+    """Feed a stream of frames to a set of accumulators.
+
+    Parameters:
+
+    accumulators: list
+        Accumulator objects, e.g. :class:`RDFAccumulator`.
+    chunksize: int
+        Number of frames sent to a worker process at a time.
+    """
+
+    def __init__(self, accumulators, chunksize=64):
+        self.accumulators = list(accumulators)
+        self.chunksize = chunksize
+
+    def run(self, images, processes=None):
+        """Process all frames of *images*.
+
+        *images* can be any iterable of Atoms objects such as the
+        generator returned by :func:`ase.io.iread`.  If *processes* is
+        given, chunks of frames are distributed over that many worker
+        processes for all accumulators that process frames independently.
+        Time correlations are always accumulated in this process.  At most
+        a few chunks per worker are in memory at any time."""
+
+        if processes is None:
+            for atoms in images:
+                for acc in self.accumulators:
+                    acc.update(atoms)
+            return self
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        ordered = [acc for acc in self.accumulators if not acc.framewise]
+        framewise = [acc for acc in self.accumulators if acc.framewise]
+
+        def collect(future):
+            for acc, result in zip(framewise, future.result()):
+                acc.merge(result)
+
+        images = iter(images)
+        with ProcessPoolExecutor(processes) as pool:
+            pending = deque()
+            while True:
+                chunk = list(islice(images, self.chunksize))
+                if not chunk:
+                    break
+                for atoms in chunk:
+                    for acc in ordered:
+                        acc.update(atoms)
+                if framewise:
+                    blanks = [acc.empty_copy() for acc in framewise]
+                    pending.append(pool.submit(_accumulate_chunk,
+                                               blanks, chunk))
+                while len(pending) > 2 * processes:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+        return self
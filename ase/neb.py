@@ -16,7 +16,7 @@ from ase.calculators.singlepoint import SinglePointCalculator
 from ase.optimize import MDMin
 from ase.optimize.optimize import Optimizer
 from ase.optimize.sciopt import OptimizerConvergenceError
-from ase.geometry import find_mic
+from ase.geometry import find_mic, MIC
 from ase.utils import lazyproperty, deprecated
 from ase.utils.forcecurve import fit_images
 from ase.optimize.precon import Precon, PreconImages
@@ -24,19 +24,22 @@ from ase.optimize.ode import ode12r
 
 
 class Spring:
-    def __init__(self, atoms1, atoms2, energy1, energy2, k):
+    def __init__(self, atoms1, atoms2, energy1, energy2, k, mic=None):
         self.atoms1 = atoms1
         self.atoms2 = atoms2
         self.energy1 = energy1
         self.energy2 = energy2
         self.k = k
+        self.mic = mic
 
     def _find_mic(self):
         pos1 = self.atoms1.get_positions()
         pos2 = self.atoms2.get_positions()
         # XXX If we want variable cells we will need to edit this.
-        mic, _ = find_mic(pos2 - pos1, self.atoms1.cell, self.atoms1.pbc)
-        return mic
+        mic = self.mic
+        if mic is None:
+            mic = MIC(self.atoms1.cell, self.atoms1.pbc)
+        return mic(pos2 - pos1)[0]
 
     @lazyproperty
     def t(self):
@@ -56,7 +59,7 @@ class NEBState:
     def spring(self, i):
         return Spring(self.images[i], self.images[i + 1],
                       self.energies[i], self.energies[i + 1],
-                      self.neb.k[i])
+                      self.neb.k[i], self.neb.mic)
 
     @lazyproperty
     def imax(self):
@@ -304,11 +307,25 @@ class BaseNEB:
         self.real_forces = None  # ndarray of shape (nimages, natom, 3)
         self.energies = None  # ndarray of shape (nimages,)
         self.residuals = None  # ndarray of shape (nimages,)
+        self._mic = None
 
     @property
     def natoms(self):
         return len(self.images[0])
 
+    @property
+    def mic(self):
+        """Minimum image convention object for the cell of the images.
+
+        All images share the same cell, so the reduced cell is only
+        recomputed if the cell or the boundary conditions change."""
+        atoms = self.images[0]
+        if (self._mic is None or
+            np.any(self._mic.cell.array != atoms.cell.array) or
+                np.any(self._mic.pbc != atoms.pbc)):
+            self._mic = MIC(atoms.cell, atoms.pbc)
+        return self._mic
+
     @property
     def nimages(self):
         return len(self.images)
@@ -334,9 +334,7 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
     # Initialized empty neighbor list buffers.
     first_at_neightuple_nn = []
     secnd_at_neightuple_nn = []
-    cell_shift_vector_x_n = []
-    cell_shift_vector_y_n = []
-    cell_shift_vector_z_n = []
+    cell_shift_vector_nn = []
 
     # This is the main neighbor list search. We loop over neighboring bins and
     # then construct all possible pairs of atoms between two bins, assuming
@@ -370,39 +368,38 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
                 _secnd_at_neightuple_n = \
                     atoms_in_bin_ba[neighbin_b][:, atom_pairs_pn[1]]
 
-                # Shift vectors.
-                _cell_shift_vector_x_n = \
-                    np.resize(shiftx_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftx_xyz.size)).T
-                _cell_shift_vector_y_n = \
-                    np.resize(shifty_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shifty_xyz.size)).T
-                _cell_shift_vector_z_n = \
-                    np.resize(shiftz_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftz_xyz.size)).T
-
                 # We have created too many pairs because we assumed each bin
                 # has exactly max_natoms_per_bin atoms. Remove all surperfluous
                 # pairs. Those are pairs that involve an atom with index -1.
                 mask = np.logical_and(_first_at_neightuple_n != -1,
                                       _secnd_at_neightuple_n != -1)
                 if mask.sum() > 0:
-                    first_at_neightuple_nn += [_first_at_neightuple_n[mask]]
-                    secnd_at_neightuple_nn += [_secnd_at_neightuple_n[mask]]
-                    cell_shift_vector_x_n += [_cell_shift_vector_x_n[mask]]
-                    cell_shift_vector_y_n += [_cell_shift_vector_y_n[mask]]
-                    cell_shift_vector_z_n += [_cell_shift_vector_z_n[mask]]
+                    _first_n = _first_at_neightuple_n[mask]
+                    _secnd_n = _secnd_at_neightuple_n[mask]
+                    # Shift vectors from the bin of each pair, plus the
+                    # global cell shift.
+                    _bin_n = np.nonzero(mask)[0]
+                    _cell_shift_vector_n = np.transpose(
+                        [shiftx_xyz.ravel()[_bin_n],
+                         shifty_xyz.ravel()[_bin_n],
+                         shiftz_xyz.ravel()[_bin_n]]) + \
+                        cell_shift_ic[_first_n] - cell_shift_ic[_secnd_n]
+                    # Most of these pairs are beyond the cutoff.  Remove
+                    # them right away so the memory used is proportional
+                    # to the number of neighbors.
+                    _distance_vector_nc = positions[_secnd_n] - \
+                        positions[_first_n] + _cell_shift_vector_n.dot(cell)
+                    mask = np.sqrt(np.sum(_distance_vector_nc *
+                                          _distance_vector_nc,
+                                          axis=1)) < max_cutoff
+                    first_at_neightuple_nn += [_first_n[mask]]
+                    secnd_at_neightuple_nn += [_secnd_n[mask]]
+                    cell_shift_vector_nn += [_cell_shift_vector_n[mask]]
 
     # Flatten overall neighbor list.
     first_at_neightuple_n = np.concatenate(first_at_neightuple_nn)
     secnd_at_neightuple_n = np.concatenate(secnd_at_neightuple_nn)
-    cell_shift_vector_n = np.transpose([np.concatenate(cell_shift_vector_x_n),
-                                        np.concatenate(cell_shift_vector_y_n),
-                                        np.concatenate(cell_shift_vector_z_n)])
-
-    # Add global cell shift to shift vectors
-    cell_shift_vector_n += cell_shift_ic[first_at_neightuple_n] - \
-        cell_shift_ic[secnd_at_neightuple_n]
+    cell_shift_vector_n = np.concatenate(cell_shift_vector_nn)
 
     # Remove all self-pairs that do not cross the cell boundary.
     if not self_interaction:
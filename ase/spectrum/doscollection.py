@@ -1,6 +1,6 @@
 import collections
 from functools import reduce, singledispatch
-from typing import (Any, Dict, Iterable, List, Optional,
+from typing import (Any, Dict, Iterable, List, Optional, Set, Sized, Tuple,
                     overload, Sequence, TypeVar, Union)
 
 import numpy as np
@@ -152,7 +152,7 @@ class DOSCollection(collections.abc.Sequence):
                    for row_weights, row_info in zip(weights, info))
 
     @staticmethod
-    def _check_weights_and_info(weights: Sequence[Sequence[float]],
+    def _check_weights_and_info(weights: Sized,
                                 info: Union[Sequence[Info], None],
                                 ) -> Sequence[Info]:
         if info is None:
@@ -430,8 +430,8 @@ class GridDOSCollection(DOSCollection):
 
     @classmethod
     def from_data(cls,
-                  energies: Sequence[float],
-                  weights: Sequence[Sequence[float]],
+                  energies: Union[Sequence[float], np.ndarray],
+                  weights: Union[Sequence[Sequence[float]], np.ndarray],
                   info: Sequence[Info] = None) -> 'GridDOSCollection':
         """Create a GridDOSCollection from data with a common set of energies
 
@@ -605,3 +605,268 @@ class GridDOSCollection(DOSCollection):
 
         ax.set_xlim(left=min(energies), right=max(energies))
         ax.set_ylim(bottom=0)
+
+
+class StackedDOSCollection(DOSCollection):
+    """Collection of RawDOSData sharing one set of raw energies
+
+    This is a compact container for large projected DOS, e.g. with a
+    row of weights for every atom, orbital and spin. The energies are
+    stored once and the weights as a single 2-D array (which may be a
+    scipy.sparse matrix if most weights are zero).
+
+    The items of the collection are sums of rows of the weights array,
+    so select(), select_not(), sum_by() and slicing only manipulate
+    lists of row indices; no weights are copied or summed until the
+    data is sampled. sample_grid() broadens all items at once by
+    binning the raw energies on the grid and convolving with the
+    broadening kernel using FFT.
+
+    Args:
+        energies: raw energy values shared by all rows
+        weights: 2-D array (or scipy.sparse matrix) with a row of weights
+            for each data series
+        info: sequence of info dicts corresponding to weights rows
+    """
+    def __init__(self,
+                 energies: Sequence[float],
+                 weights: Any,
+                 info: Sequence[Info] = None) -> None:
+        self._energies = np.asarray(energies, dtype=float)
+        if not hasattr(weights, 'tocsr'):
+            weights = np.asarray(weights, dtype=float)
+        if len(weights.shape) != 2:
+            raise IndexError("Weights must be a 2-D array or nested sequence")
+        if weights.shape[1] != len(self._energies):
+            raise IndexError("Length of weights rows must equal size of x")
+
+        info = self._check_weights_and_info(range(weights.shape[0]), info)
+        self._weights = weights
+        self._rows = [np.array([i]) for i in range(weights.shape[0])]
+        self._info = list(info)
+
+    @classmethod
+    def from_data(cls,
+                  energies: Sequence[float],
+                  weights: Sequence[Sequence[float]],
+                  info: Sequence[Info] = None) -> 'StackedDOSCollection':
+        """Create a StackedDOSCollection from data sharing a common set of
+        energies (same as calling the class)"""
+        return cls(energies, weights, info)
+
+    def _new(self,
+             rows: List[np.ndarray],
+             info: List[Info]) -> 'StackedDOSCollection':
+        """New collection of sums of rows, sharing the arrays of self"""
+        new = type(self).__new__(type(self))
+        new._energies = self._energies
+        new._weights = self._weights
+        new._rows = rows
+        new._info = info
+        return new
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, item):  # noqa F811
+        if isinstance(item, int):
+            return RawDOSData(self._energies,
+                              self._summed_weights([self._rows[item]])[0],
+                              info=self._info[item])
+        elif isinstance(item, slice):
+            return self._new(self._rows[item], self._info[item])
+        else:
+            raise TypeError("index in DOSCollection must be an integer or "
+                            "slice")
+
+    def get_energies(self) -> np.ndarray:
+        return self._energies.copy()
+
+    def get_all_weights(self) -> np.ndarray:
+        """Weights of all items as a dense 2-D array"""
+        return self._summed_weights(self._rows)
+
+    def _summing_matrix(self, rows: Sequence[np.ndarray]):
+        """Sparse matrix summing the rows of self._weights for each item"""
+        from scipy import sparse
+        lengths = [len(r) for r in rows]
+        indices = (np.concatenate(rows) if rows
+                   else np.zeros(0, dtype=int))
+        return sparse.csr_matrix(
+            (np.ones(len(indices)), indices,
+             np.concatenate([[0], np.cumsum(lengths, dtype=int)])),
+            shape=(len(rows), self._weights.shape[0]))
+
+    def _summed_weights(self, rows: Sequence[np.ndarray], bins=None):
+        """Weights summed for each item, optionally multiplied by the
+        (sparse) binning matrix bins, as a dense array"""
+        summing = self._summing_matrix(rows)
+        if bins is None:
+            weights = summing @ self._weights
+        elif len(rows) <= self._weights.shape[0]:
+            weights = (summing @ self._weights) @ bins
+        else:
+            weights = summing @ (self._weights @ bins)
+        if hasattr(weights, 'toarray'):
+            weights = weights.toarray()
+        return np.asarray(weights)
+
+    def _sample(self,
+                energies: Union[Sequence[float], np.ndarray],
+                width: float = 0.1,
+                smearing: str = 'Gauss') -> np.ndarray:
+        if len(self) == 0:
+            raise IndexError("No data to sample")
+        DOSData._check_positive_width(width)
+        return DOSData._sample_weights(self._energies,
+                                       self.get_all_weights(),
+                                       energies, width, smearing)
+
+    def sample_grid(self,
+                    npts: int,
+                    xmin: float = None,
+                    xmax: float = None,
+                    padding: float = 3,
+                    width: float = 0.1,
+                    smearing: str = 'Gauss',
+                    cutoff: float = 8.,
+                    ) -> 'GridDOSCollection':
+        """Sample the DOS data on an evenly-spaced energy grid
+
+        The raw energies are distributed over the two nearest grid
+        points (with linear weights) and all items are convolved with
+        the broadening kernel at once using FFT. The result agrees with
+        the other DOSCollections up to a relative error of the order of
+        (grid spacing / width)**2.
+
+        Args:
+            npts: Number of sampled points
+            xmin: Minimum sampled energy value; if unspecified, a default is
+                chosen
+            xmax: Maximum sampled energy value; if unspecified, a default is
+                chosen
+            padding: If xmin/xmax is unspecified, default value will be padded
+                by padding * width to avoid cutting off peaks.
+            width: Width of broadening kernel
+            smearing: selection of broadening kernel (only "Gauss" is currently
+                supported)
+            cutoff: The kernel is truncated at cutoff * width
+
+        Returns:
+            (energy values, sampled DOS)
+        """
+        if len(self) == 0:
+            raise IndexError("No data to sample")
+        DOSData._check_positive_width(width)
+
+        if xmin is None:
+            xmin = self._energies.min() - (padding * width)
+        if xmax is None:
+            xmax = self._energies.max() + (padding * width)
+        energies = np.linspace(xmin, xmax, npts)
+        if npts < 2:
+            return GridDOSCollection.from_data(
+                energies, self._sample(energies, width, smearing),
+                info=self._info)
+
+        from scipy import sparse
+        from scipy.signal import fftconvolve
+
+        spacing = energies[1] - energies[0]
+        nkernel = int(np.ceil(cutoff * width / spacing))
+        kernel = DOSData._delta(np.arange(-nkernel, nkernel + 1) * spacing,
+                                0., width, smearing=smearing)
+
+        # Bin the raw energies on the grid, extended by the range of the
+        # kernel so that peaks just outside the grid are included:
+        nbins = npts + 2 * nkernel
+        x = (self._energies - xmin) / spacing + nkernel
+        lower = np.floor(x).astype(int)
+        upper_weight = x - lower
+        rows = np.repeat(np.arange(len(x)), 2)
+        columns = np.stack([lower, lower + 1], axis=1).ravel()
+        values = np.stack([1 - upper_weight, upper_weight], axis=1).ravel()
+        inside = (columns >= 0) & (columns < nbins)
+        bins = sparse.csr_matrix((values[inside],
+                                  (rows[inside], columns[inside])),
+                                 shape=(len(x), nbins))
+
+        binned = self._summed_weights(self._rows, bins)
+        weights = fftconvolve(binned, kernel[np.newaxis], mode='same',
+                              axes=1)[:, nkernel:nkernel + npts]
+
+        return GridDOSCollection.from_data(energies, weights, info=self._info)
+
+    def select(self, **info_selection: str) -> 'StackedDOSCollection':
+        """Narrow StackedDOSCollection to items with specified info
+
+        See DOSCollection.select(); the weights are not copied."""
+        return self._select(info_selection, negative=False)
+
+    def select_not(self, **info_selection: str) -> 'StackedDOSCollection':
+        """Narrow StackedDOSCollection to items without specified info
+
+        See DOSCollection.select_not(); the weights are not copied."""
+        return self._select(info_selection, negative=True)
+
+    def _select(self, info_selection: Dict[str, str],
+                negative: bool) -> 'StackedDOSCollection':
+        query = set(info_selection.items())
+        matches = [i for i, info in enumerate(self._info)
+                   if query.issubset(set(info.items())) != negative]
+        return self._new([self._rows[i] for i in matches],
+                         [self._info[i] for i in matches])
+
+    def sum_all(self) -> RawDOSData:
+        """Sum all the DOSData contained in this Collection
+
+        Unlike for a generic DOSCollection, the energies are not repeated
+        for each item: the result has the shared energies and the summed
+        weights."""
+        if len(self) == 0:
+            raise IndexError("No data to sum")
+        return self.sum_by()[0]
+
+    def sum_by(self, *info_keys: str) -> 'StackedDOSCollection':
+        """Return a StackedDOSCollection with some data summed by common
+        attributes
+
+        See DOSCollection.sum_by(); only the lists of rows are combined."""
+        def _matching_info_tuples(info: Info):
+            matched_keys = set(info_keys) & set(info)
+            return tuple(sorted([(key, info[key]) for key in matched_keys]))
+
+        unique_combos = sorted(set(map(_matching_info_tuples, self._info)))
+
+        rows = []
+        infos = []
+        for combo in unique_combos:
+            selection = self.select(**dict(combo))
+            rows.append(np.concatenate(selection._rows))
+            common: Set[Tuple[str, str]] = set(selection._info[0].items())
+            for info in selection._info[1:]:
+                common &= set(info.items())
+            infos.append(dict(common))
+        return self._new(rows, infos)
+
+    def __add__(self, other: Union['DOSCollection', DOSData]
+                ) -> 'StackedDOSCollection':
+        """Join two StackedDOSCollection objects with the same energies"""
+        if not isinstance(other, StackedDOSCollection):
+            raise TypeError("StackedDOSCollection can only be joined to "
+                            "another StackedDOSCollection with '+'.")
+        if (other._energies.shape != self._energies.shape
+                or not np.allclose(other._energies, self._energies)):
+            raise ValueError("Only StackedDOSCollection objects with the "
+                             "same energies can be joined.")
+        if hasattr(self._weights, 'tocsr') or hasattr(other._weights, 'tocsr'):
+            from scipy import sparse
+            weights = sparse.vstack([self._weights, other._weights],
+                                    format='csr')
+        else:
+            weights = np.concatenate([self._weights, other._weights])
+        new = self._new(self._rows + [r + self._weights.shape[0]
+                                      for r in other._rows],
+                        self._info + other._info)
+        new._weights = weights
+        return new
@@ -61,13 +61,34 @@ class DOSData(metaclass=ABCMeta):
         """
 
         self._check_positive_width(width)
-        weights_grid = np.zeros(len(energies), float)
-        weights = self.get_weights()
-        energies = np.asarray(energies, float)
+        return self._sample_weights(np.asarray(self.get_energies()),
+                                    np.asarray(self.get_weights())[np.newaxis],
+                                    energies, width, smearing)[0]
+
+    @classmethod
+    def _sample_weights(cls,
+                        raw_energies: np.ndarray,
+                        weights: np.ndarray,
+                        energies: Union[Sequence[float], np.ndarray],
+                        width: float,
+                        smearing: str = 'Gauss',
+                        chunksize: int = 2**20) -> np.ndarray:
+        """Broaden rows of weights sharing the same raw energies
+
+        The delta functions are evaluated in blocks of at most about
+        chunksize values.
 
-        for i, raw_energy in enumerate(self.get_energies()):
-            delta = self._delta(energies, raw_energy, width, smearing=smearing)
-            weights_grid += weights[i] * delta
+        Returns:
+            Array with a row of sampled values for each row of weights
+        """
+        x = np.asarray(energies, float)
+        weights_grid = np.zeros((weights.shape[0], len(x)))
+        step = max(1, chunksize // max(1, len(x)))
+        for start in range(0, len(raw_energies), step):
+            delta = cls._delta(x[np.newaxis],
+                               raw_energies[start:start + step, np.newaxis],
+                               width, smearing=smearing)
+            weights_grid += weights[:, start:start + step] @ delta
         return weights_grid
 
     def _almost_equals(self, other: Any) -> bool:
@@ -82,7 +103,7 @@ class DOSData(metaclass=ABCMeta):
 
     @staticmethod
     def _delta(x: np.ndarray,
-               x0: float,
+               x0: Union[float, np.ndarray],
                width: float,
                smearing: str = 'Gauss') -> np.ndarray:
         """Return a delta-function centered at 'x0'.
@@ -345,8 +366,8 @@ class GridDOSData(GeneralDOSData):
 
     """
     def __init__(self,
-                 energies: Sequence[float],
-                 weights: Sequence[float],
+                 energies: Union[Sequence[float], np.ndarray],
+                 weights: Union[Sequence[float], np.ndarray],
                  info: Info = None) -> None:
         n_entries = len(energies)
         if not np.allclose(energies,
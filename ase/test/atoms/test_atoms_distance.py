@@ -69,3 +69,46 @@ def test_antisymmetry():
 
     for i, j in itertools.combinations(range(len(atoms)), 2):
         assert (vmin[i, j] == -vmin[j, i]).all()
+
+
+def test_all_distances_cutoff():
+    import numpy as np
+    from ase.build import bulk, molecule
+
+    for atoms in [bulk('Cu', 'fcc', a=3.6).repeat((2, 3, 2)),
+                  bulk('Ti', 'hcp', a=2.9, c=4.6)]:
+        atoms.rattle(0.05, seed=1)
+        dense = atoms.get_all_distances(mic=True)
+        # Cutoff larger than half the cell is mapped to the shortest image
+        for cutoff in [2.9, 4.0]:
+            sparse = atoms.get_all_distances(mic=True, cutoff=cutoff)
+            mask = dense < cutoff
+            np.fill_diagonal(mask, False)
+            assert (sparse.toarray() != 0).sum() == mask.sum()
+            assert np.allclose(sparse.toarray()[mask], dense[mask])
+
+    mol = molecule('C60')
+    dense = mol.get_all_distances()
+    sparse = mol.get_all_distances(cutoff=3.0).toarray()
+    mask = (dense < 3.0) & (dense > 0)
+    assert np.allclose(sparse[mask], dense[mask])
+    assert not sparse[~mask].any()
+
+
+def test_get_distances_chunks():
+    import numpy as np
+    from ase.build import bulk
+    from ase.geometry import get_distances
+    from ase.geometry.geometry import _chunked_find_mic
+
+    atoms = bulk('Al', 'fcc', a=4.0, orthorhombic=True).repeat(2)
+    atoms.rattle(0.1, seed=2)
+    atoms.cell[0, 1] = 1.5  # triclinic
+    D = atoms.positions[:, np.newaxis] - atoms.positions
+    D = D.reshape(-1, 3)
+    D1, d1 = _chunked_find_mic(D, atoms.cell, atoms.pbc, chunksize=7)
+    D2, d2 = _chunked_find_mic(D, atoms.cell, atoms.pbc)
+    assert np.allclose(D1, D2)
+    assert np.allclose(d1, d2)
+    assert np.allclose(get_distances(atoms.positions, cell=atoms.cell,
+                                     pbc=True)[1].ravel(), d2)
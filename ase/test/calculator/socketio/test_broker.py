@@ -0,0 +1,121 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.calculators.socketio import (PySocketIOClient, SocketBroker,
+                                      SocketBrokerCalculator)
+
+
+def relax(atoms, unixsocket, nsteps, results):
+    rng = np.random.RandomState(len(results))
+    energies = []
+    with SocketBrokerCalculator(unixsocket, timeout=60.0) as calc:
+        atoms.calc = calc
+        for i in range(nsteps):
+            atoms.positions += rng.rand(len(atoms), 3) * 0.05
+            energies.append((atoms.copy(), atoms.get_potential_energy(),
+                             atoms.get_forces(), atoms.get_stress()))
+    results.append(energies)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='only posix')
+def test_broker():
+    atoms = bulk('Cu', cubic=True)
+    unixsocket = 'ase-broker-{}'.format(os.getpid())
+    with SocketBroker(unixsocket, PySocketIOClient(EMT), atoms,
+                      nworkers=2, timeout=60.0,
+                      max_calculations=3) as broker:
+        server = threading.Thread(target=broker.serve)
+        server.start()
+        try:
+            results = []
+            clients = [threading.Thread(target=relax,
+                                        args=(atoms.copy(), unixsocket,
+                                              4, results))
+                       for _ in range(3)]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+        finally:
+            broker.stop()
+            server.join()
+
+    assert len(results) == 3
+    for energies in results:
+        for image, energy, forces, stress in energies:
+            image.calc = EMT()
+            assert energy == pytest.approx(image.get_potential_energy())
+            assert forces == pytest.approx(image.get_forces(), abs=1e-10)
+            assert stress == pytest.approx(image.get_stress(), abs=1e-10)
+
+    stats = broker.client_statistics
+    assert len(stats) == 3
+    assert all(s['ncalculations'] == 4 for s in stats.values())
+    # Engines are restarted after three calculations each:
+    workers = broker.worker_statistics
+    assert sum(w['ncalculations'] for w in workers) == 12
+    assert max(w['ncalculations'] for w in workers) <= 3
+    assert len(workers) >= 4
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='only posix')
+def test_broker_closed_in_same_batch():
+    """A socket closed by an earlier handler of the same select()
+    batch is skipped."""
+    import selectors
+    import socket
+    unixsocket = 'ase-broker-batch-{}'.format(os.getpid())
+    with SocketBroker(unixsocket) as broker:
+        pairs = [socket.socketpair() for _ in range(2)]
+        handled = []
+
+        def handle(sock):
+            handled.append(sock)
+            for a, b in pairs:
+                if a is not sock and a.fileno() != -1:
+                    broker.selector.unregister(a)
+                    a.close()
+            broker.stop()
+
+        for a, b in pairs:
+            broker.selector.register(a, selectors.EVENT_READ, handle)
+            b.sendall(b'x')
+        broker.serve()
+        for a, b in pairs:
+            a.close()
+            b.close()
+    assert len(handled) == 1
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='only posix')
+def test_broker_partial_message():
+    """A client that stops in the middle of a message is dropped after
+    client_timeout and its socket is closed."""
+    import socket
+    import time
+    from ase.calculators.socketio import actualunixsocketname
+    unixsocket = 'ase-broker-partial-{}'.format(os.getpid())
+    with SocketBroker(unixsocket, client_timeout=0.2,
+                      poll_interval=0.1) as broker:
+        server = threading.Thread(target=broker.serve)
+        server.start()
+        try:
+            with socket.socket(socket.AF_UNIX) as sock:
+                sock.settimeout(10.0)
+                sock.connect(actualunixsocketname(unixsocket))
+                sock.sendall(b'POS')
+                # The broker closes its end of the connection:
+                assert sock.recv(1) == b''
+            deadline = time.time() + 10.0
+            while broker.clients and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            broker.stop()
+            server.join()
+        assert not broker.clients
+        assert len(broker.client_statistics) == 1
@@ -0,0 +1,86 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.calculators.socketio import SocketClient, SocketIOCalculator
+
+
+def run_client(atoms, unixsocket):
+    atoms.calc = EMT()
+    client = SocketClient(unixsocket=unixsocket, timeout=20.0)
+    client.run(atoms, use_stress=True)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='only posix')
+@pytest.mark.parametrize('nclients', [1, 3])
+def test_calculate_images(nclients):
+    atoms = bulk('Au', cubic=True)
+    images = []
+    rng = np.random.RandomState(17)
+    for i in range(5):
+        image = atoms.copy()
+        image.positions += rng.rand(len(atoms), 3) * 0.1
+        image.cell *= 1 + 0.01 * i
+        images.append(image)
+
+    unixsocket = 'ase-multiple-clients-{}'.format(os.getpid())
+    with SocketIOCalculator(unixsocket=unixsocket, timeout=20.0,
+                            nclients=nclients) as calc:
+        threads = [threading.Thread(target=run_client,
+                                    args=(atoms.copy(), unixsocket))
+                   for _ in range(nclients)]
+        for thread in threads:
+            thread.start()
+        results = calc.calculate_images(images)
+        assert len(calc.server.protocols) == nclients
+
+        # The clients can still be used one at a time:
+        atoms.calc = calc
+        atoms.get_forces()
+    for thread in threads:
+        thread.join()
+
+    assert atoms.get_potential_energy() == pytest.approx(
+        EMT().get_potential_energy(atoms))
+    for image, r in zip(images, results):
+        image.calc = EMT()
+        assert r['energy'] == pytest.approx(image.get_potential_energy())
+        assert r['forces'] == pytest.approx(image.get_forces(), abs=1e-10)
+        assert r['stress'] == pytest.approx(image.get_stress(), abs=1e-10)
+
+
+class ShortWrites:
+    """Socket sending at most a few bytes per sendmsg() call."""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def sendall(self, data):
+        self.sock.sendall(data)
+
+    def sendmsg(self, buffers):
+        data = b''.join(bytes(b) for b in buffers)[:7]
+        return self.sock.send(data)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='only posix')
+def test_partial_sends():
+    import socket
+    from ase.calculators.socketio import IPIProtocol
+    a, b = socket.socketpair()
+    with a, b:
+        sender = IPIProtocol(ShortWrites(a))
+        receiver = IPIProtocol(b)
+        rng = np.random.RandomState(3)
+        cell = rng.rand(3, 3)
+        positions = rng.rand(5, 3)
+        sender.sendposdata(cell, np.linalg.inv(cell), positions)
+        assert receiver.recvmsg() == 'POSDATA'
+        cell1, icell1, positions1 = receiver.recvposdata()
+        assert cell1 == pytest.approx(cell)
+        assert icell1 == pytest.approx(np.linalg.inv(cell))
+        assert positions1 == pytest.approx(positions)
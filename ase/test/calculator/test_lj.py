@@ -130,3 +130,18 @@ def test_bulk_stress():
     pressure = sum(stress[:3]) / 3
 
     assert pressure == reference_pressure
+
+
+def test_neighbor_list_reuse():
+    # moving atoms within the skin reuses the pair list
+    atoms = bulk("Ar", cubic=True) * 2
+    atoms.calc = LennardJones(sigma=3.4, epsilon=0.01, rc=8.0)
+    atoms.get_forces()
+    atoms.rattle(0.05)
+    forces = atoms.get_forces()
+    assert atoms.calc.nl.nl.nupdates == 1
+
+    reference = LennardJones(sigma=3.4, epsilon=0.01, rc=8.0)
+    assert forces == pytest.approx(reference.get_forces(atoms), abs=1e-12)
+    assert atoms.get_stresses() == pytest.approx(
+        reference.get_stresses(atoms), abs=1e-12)
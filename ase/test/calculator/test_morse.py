@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 from scipy.optimize import check_grad
 
 from ase import Atoms
@@ -41,3 +42,16 @@ def test_forces():
     forces = atoms.get_forces()
     numerical_forces = atoms.calc.calculate_numerical_forces(atoms, d=1e-5)
     assert np.abs(forces - numerical_forces).max() < 1e-5
+
+
+def test_stress():
+    atoms = bulk('Cu', cubic=True) * (2, 1, 1)
+    atoms.calc = MorsePotential(epsilon=1.0, r0=2.55)
+    atoms.rattle(0.1)
+    atoms.set_cell(atoms.cell * [1.01, 0.99, 1.0], scale_atoms=True)
+    stress = atoms.get_stress()
+    numerical_stress = atoms.calc.calculate_numerical_stress(atoms, d=1e-5)
+    assert np.abs(stress - numerical_stress).max() < 1e-5
+    assert atoms.get_stresses().sum(axis=0) == pytest.approx(stress)
+    assert (atoms.get_potential_energies().sum() ==
+            pytest.approx(atoms.get_potential_energy()))
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from ase.build import bulk, fcc111
+from ase.dft.kpoints import (get_ibz_kpoints, get_symmetry_rotations,
+                             monkhorst_pack, monkhorst_pack_interpolate)
+from ase.spacegroup import Spacegroup
+
+
+def free_electron_energies(cell, kpts):
+    kpts_kv = (kpts[:, np.newaxis] + np.indices((3, 3, 3)).reshape((3, -1)).T
+               - 1) @ cell.reciprocal()
+    return np.sort((kpts_kv**2).sum(2), axis=1)[:, :4]
+
+
+@pytest.mark.parametrize('atoms, size, nrot, nibz', [
+    (bulk('Cu'), (4, 4, 4), 48, 10),
+    (bulk('Si'), (8, 8, 8), 48, 60),
+    (bulk('Mg'), (6, 6, 4), 24, None),
+    (bulk('Fe', cubic=True), (8, 8, 8), 48, 20),
+    (fcc111('Al', (1, 1, 3), vacuum=5.0), (8, 8, 1), 12, None)])
+def test_ibz(atoms, size, nrot, nibz):
+    rotations = get_symmetry_rotations(atoms)
+    assert len(rotations) == nrot
+    ibzk, weights, bz2ibz = get_ibz_kpoints(atoms, size)
+    if nibz is not None:
+        assert len(ibzk) == nibz
+    assert weights.sum() == pytest.approx(1)
+    assert np.bincount(bz2ibz) == pytest.approx(weights * np.prod(size))
+
+    # Equivalent k-points have the same (free electron) energies:
+    kpts = monkhorst_pack(size)
+    eps_bz = free_electron_energies(atoms.cell, kpts)
+    eps_ibz = free_electron_energies(atoms.cell, ibzk)
+    assert eps_ibz[bz2ibz] == pytest.approx(eps_bz)
+
+
+def test_ibz_options():
+    atoms = bulk('Cu')
+    ibzk, weights, bz2ibz = get_ibz_kpoints(atoms, (4, 4, 4),
+                                            time_reversal=False)
+    assert len(ibzk) == 10  # inversion symmetry
+    ibzk, weights, bz2ibz = get_ibz_kpoints(atoms.cell, (4, 4, 4),
+                                            offset=(0.125, 0.125, 0.125))
+    assert len(ibzk) < 64 and weights.sum() == pytest.approx(1)
+
+    # Standard cell of the space group:
+    atoms = bulk('Cu', cubic=True)
+    ibzk, weights, bz2ibz = get_ibz_kpoints(
+        atoms, (4, 4, 4), rotations=Spacegroup(225).get_rotations())
+    ref = get_ibz_kpoints(atoms, (4, 4, 4))
+    assert (bz2ibz == ref[2]).all()
+
+    # No symmetry:
+    ibzk, weights, bz2ibz = get_ibz_kpoints(atoms, (3, 3, 3),
+                                            rotations=np.eye(3, dtype=int),
+                                            time_reversal=False)
+    assert len(ibzk) == 27
+
+
+def test_ibz_cache():
+    atoms = bulk('Al')
+    result = get_ibz_kpoints(atoms, (6, 6, 6))
+    result[1][:] = 0.0  # must not modify the cached arrays
+    again = get_ibz_kpoints(atoms, (6, 6, 6))
+    assert again[1].sum() == pytest.approx(1)
+    atoms.cell[0, 0] += 0.1
+    assert len(get_ibz_kpoints(atoms, (6, 6, 6))[0]) > len(again[0])
+
+
+def test_ibz_interpolate():
+    atoms = bulk('Cu')
+    size = (6, 6, 6)
+    ibzk, weights, bz2ibz = get_ibz_kpoints(atoms, size)
+    eps_ibz = free_electron_energies(atoms.cell, ibzk)
+    path = atoms.cell.bandpath('GXW', npoints=10).kpts
+    eps = monkhorst_pack_interpolate(path, eps_ibz,
+                                     atoms.cell.reciprocal(), bz2ibz, size)
+    ref = monkhorst_pack_interpolate(
+        path, free_electron_energies(atoms.cell, monkhorst_pack(size)),
+        atoms.cell.reciprocal(), np.arange(np.prod(size)), size)
+    assert eps == pytest.approx(ref)
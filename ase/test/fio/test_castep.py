@@ -0,0 +1,109 @@
+"""Reading CASTEP .geom and .md files."""
+import io
+
+import numpy as np
+import pytest
+
+from ase.io import read
+from ase.io.castep import (read_castep_geom, read_castep_md,
+                           units_CODATA2002 as units)
+
+
+def block(rows, tag):
+    return ''.join(' ' * 18 + ''.join('{:>27.16E}'.format(x) for x in row)
+                   + '  <-- {}\n'.format(tag) for row in rows)
+
+
+def atom_block(rows, tag):
+    return ''.join(' {:<2s}{:>14d}'.format('Si' if i % 2 else 'O', i // 2 + 1)
+                   + ''.join('{:>27.16E}'.format(x) for x in row)
+                   + '  <-- {}\n'.format(tag) for i, row in enumerate(rows))
+
+
+def geom_text(nsteps, natoms=3):
+    rng = np.random.RandomState(42)
+    text = ' BEGIN header\n  \n END header\n  \n'
+    for step in range(nsteps):
+        text += '{:>40d}{:>20s}  <-- c\n'.format(step, 'F   F   F   T')
+        text += '{:>35.16E}{:>27.16E}  <-- E\n'.format(-100 - step, -100)
+        text += block(np.eye(3) * 10 + rng.rand(3, 3) * 0.1, 'h')
+        text += block(rng.rand(3, 3) * 1e-3, 'S')
+        text += atom_block(rng.rand(natoms, 3) * 10, 'R')
+        text += atom_block(rng.rand(natoms, 3) - 0.5, 'F')
+        text += ' \n'
+    return text
+
+
+def md_text(nsteps, natoms=3):
+    rng = np.random.RandomState(42)
+    text = ' BEGIN header\n \n END header\n \n'
+    for step in range(nsteps):
+        text += '{:>38.16E}\n'.format(step * 40.0)
+        text += block([[-100 - step, -99.9, 0.01]], 'E')
+        text += block([[2e-3 * (step + 1)]], 'T')
+        text += block([[1e-4]], 'P')
+        text += block(np.eye(3) * 10 + rng.rand(3, 3), 'h')
+        text += block(rng.rand(3, 3) * 1e-5, 'hv')
+        text += block(rng.rand(3, 3) * 1e-4, 'S')
+        text += atom_block(rng.rand(natoms, 3) * 10, 'R')
+        text += atom_block(rng.rand(natoms, 3) * 1e-3, 'V')
+        text += atom_block(rng.rand(natoms, 3) - 0.5, 'F')
+        text += '\n'
+    return text
+
+
+def compare_images(images, refs):
+    assert len(images) == len(refs)
+    for atoms, ref in zip(images, refs):
+        assert atoms.get_chemical_symbols() == ref.get_chemical_symbols()
+        assert atoms.positions == pytest.approx(ref.positions)
+        assert atoms.cell[:] == pytest.approx(ref.cell[:])
+        assert atoms.get_velocities() == pytest.approx(ref.get_velocities())
+        for key, value in ref.calc.results.items():
+            assert atoms.calc.results[key] == pytest.approx(value)
+
+
+@pytest.mark.parametrize('format, text, reader', [
+    ('castep-geom', geom_text(8), read_castep_geom),
+    ('castep-md', md_text(8), read_castep_md)], ids=['geom', 'md'])
+@pytest.mark.parametrize('index', [-1, -3, 0, 5, '-3:', '-4:-1', '2::3',
+                                   '::-2', ':'])
+def test_index(format, text, reader, index):
+    with open('castep.out', 'w') as fd:
+        fd.write(text)
+    refs = reader(io.StringIO(text))
+    assert len(refs) == 8
+    energies = [atoms.get_potential_energy() for atoms in refs]
+    assert energies == pytest.approx(-(100 + np.arange(8)) * units['Eh'])
+
+    images = read('castep.out', index=index, format=format)
+    if isinstance(index, str):
+        refs = refs[slice(*[int(x) if x else None
+                            for x in index.split(':')])]
+    else:
+        refs, images = [refs[index]], [images]
+    compare_images(images, refs)
+
+
+@pytest.mark.parametrize('format, text', [
+    ('castep-geom', geom_text(3)),
+    ('castep-md', md_text(3))], ids=['geom', 'md'])
+def test_incomplete_step(format, text):
+    """The last step is skipped if it was not completely written."""
+    with open('castep.out', 'w') as fd:
+        fd.write(text[:-200])
+    refs = read(io.StringIO(text), index=':', format=format)
+    images = read('castep.out', index=':', format=format)
+    compare_images(images, refs[:2])
+    compare_images([read('castep.out', format=format)], refs[1:2])
+
+
+def test_md_scalars():
+    text = md_text(4)
+    data, images = read_castep_md(io.StringIO(text), index=slice(-2, None),
+                                  return_scalars=True)
+    times, energies, temperatures, pressures = data
+    assert len(times) == 4 and len(images) == 2
+    assert times[1] == pytest.approx(40.0 * units['t0'] * 1e15)
+    assert temperatures[3] == pytest.approx(8e-3 * units['Eh'] / units['kB'])
+    compare_images(images, read_castep_md(io.StringIO(text))[2:])
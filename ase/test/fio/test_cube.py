@@ -0,0 +1,67 @@
+import io
+
+import numpy as np
+import pytest
+
+from ase.build import molecule
+from ase.io.cube import read_cube, read_cube_data, read_cube_values, write_cube
+
+
+@pytest.fixture
+def atoms():
+    atoms = molecule('H2O')
+    atoms.center(vacuum=2.0)
+    return atoms
+
+
+@pytest.fixture
+def data():
+    return np.random.RandomState(42).uniform(-1, 1, (5, 6, 7))
+
+
+def test_cube_roundtrip(atoms, data):
+    fd = io.StringIO()
+    write_cube(fd, atoms, data, chunksize=11)
+    fd.seek(0)
+    dct = read_cube(fd)
+    assert dct['data'] == pytest.approx(data, rel=1e-6)
+    assert dct['atoms'].positions == pytest.approx(atoms.positions, abs=1e-5)
+
+    # Complex data is written as absolute values:
+    fd = io.StringIO()
+    write_cube(fd, atoms, data * 1j, chunksize=11)
+    fd.seek(0)
+    assert read_cube(fd)['data'] == pytest.approx(abs(data), rel=1e-6)
+
+
+@pytest.mark.parametrize('chunksize', [1, 7, 100, 2**22])
+def test_cube_values_chunks(data, chunksize):
+    text = ' ' + '\n'.join(' '.join('{:e}'.format(x) for x in row)
+                           for row in data.reshape(-1, 3))
+    values = read_cube_values(io.StringIO(text), data.shape,
+                              chunksize=chunksize)
+    assert values == pytest.approx(data, rel=1e-6)
+
+    with pytest.raises(ValueError):
+        read_cube_values(io.StringIO(text + ' 1.0'), data.shape)
+    with pytest.raises(ValueError):
+        read_cube_values(io.StringIO(text[:-20]), data.shape)
+    with pytest.raises(ValueError):
+        read_cube_values(io.StringIO(text[:20] + 'x' + text[20:]),
+                         data.shape)
+
+
+def test_cube_out(atoms, data, tmp_path):
+    path = tmp_path / 'data.cube'
+    with open(path, 'w') as fd:
+        write_cube(fd, atoms, data)
+
+    out = np.lib.format.open_memmap(tmp_path / 'data.npy', mode='w+',
+                                    shape=data.shape)
+    values, _ = read_cube_data(str(path), out=out)
+    assert np.shares_memory(values, out)
+    out.flush()
+    assert np.load(tmp_path / 'data.npy') == pytest.approx(data, rel=1e-6)
+
+    with pytest.raises(ValueError):
+        read_cube_data(str(path), out=np.empty((7, 6, 5)))
@@ -6,11 +6,15 @@ Implemented:
 
 """
 
+import io as pyio
+
 import numpy as np
+import pytest
 
 from ase import io
 from ase import build
-from ase.io.espresso import parse_position_line
+from ase import units
+from ase.io.espresso import parse_position_line, read_espresso_out
 
 from pytest import approx
 
@@ -372,3 +376,86 @@ def test_pw_input_write():
     bulk.write('espresso_test.pwi')
     readback = io.read('espresso_test.pwi')
     assert np.allclose(bulk.positions, readback.positions)
+
+
+pw_output_kpts = """
+     number of k points=     2  Marzari-Vanderbilt smearing, width (Ry)=  0.0100
+                       cart. coord. in units 2pi/alat
+        k(    1) = (   0.0000000   0.0000000   0.0000000), wk =   0.2500000
+        k(    2) = (   0.5000000   0.0000000   0.0000000), wk =   1.7500000
+"""
+
+pw_output_bands = """\
+          k = 0.0000 0.0000 0.0000 (  1000 PWs)   bands (ev):
+
+    -1.0000   2.0000   3.0000
+
+          k = 0.5000 0.0000 0.0000 (  1000 PWs)   bands (ev):
+
+    -0.5000   2.5000   3.5000
+"""
+
+
+def relax_output(nsteps):
+    """pw_output_text with k-points, bands and nsteps relaxation steps."""
+    positions = "0.5050000   0.0000000  )\n"
+    text = pw_output_text.replace(positions, positions + pw_output_kpts)
+    text = text.replace("     Number of k-points >= 100: set verbosity='high' "
+                        "to print the bands.\n", pw_output_bands)
+    start = text.index('CELL_PARAMETERS')
+    stop = text.index('Begin final coordinates')
+    return text[:start] + nsteps * text[start:stop] + text[stop:]
+
+
+def compare_images(images, refs):
+    assert len(images) == len(refs)
+    for atoms, ref in zip(images, refs):
+        assert atoms.positions == approx(ref.positions)
+        assert atoms.cell[:] == approx(ref.cell[:])
+        assert atoms.calc.results.keys() == ref.calc.results.keys()
+        for key, value in ref.calc.results.items():
+            assert atoms.calc.results[key] == approx(value)
+        if ref.calc.kpts is not None:
+            assert (atoms.calc.get_eigenvalues(1, 0)
+                    == approx(ref.calc.get_eigenvalues(1, 0)))
+
+
+@pytest.mark.parametrize('index', [-1, -2, 0, 3, '-3:', '-4:-1', '1::2',
+                                   '::-2', ':'])
+@pytest.mark.parametrize('results_required', [True, False])
+def test_pw_output_index(index, results_required):
+    """Configurations found from the end match those read in order."""
+    # Two concatenated runs
+    text = relax_output(3) + relax_output(2)
+    with open('pw_output.pwo', 'w') as fd:
+        fd.write(text)
+    refs = list(read_espresso_out(pyio.StringIO(text), index=slice(None),
+                                  results_required=results_required))
+    assert len(refs) == (7 if results_required else 9)
+    calc = refs[6].calc
+    assert calc.get_eigenvalues(1, 0) == approx([-0.5, 2.5, 3.5])
+    assert calc.get_ibz_k_points() == approx(np.array([[0, 0, 0],
+                                                      [0.5, 0, 0]]))
+    images = io.read('pw_output.pwo', index=index,
+                     results_required=results_required)
+    if isinstance(index, str):
+        refs = refs[io.formats.string2index(index)]
+    else:
+        refs, images = [refs[index]], [images]
+    compare_images(images, refs)
+
+
+def test_pw_output_last():
+    """Only the last configuration is parsed for index=-1."""
+    text = relax_output(3)
+    # Corrupt the energy of the second configuration
+    energy = '-509.83806077 Ry'
+    text = text.replace(energy, '***** Ry', 1)
+    with open('pw_output.pwo', 'w') as fd:
+        fd.write(text)
+    atoms = io.read('pw_output.pwo')
+    assert atoms.get_potential_energy() == approx(-509.83806077 * units.Ry)
+    images = io.iread('pw_output.pwo', index=':')
+    next(images)
+    with pytest.raises(ValueError):
+        next(images)
@@ -1,7 +1,7 @@
 import numpy as np
 import pytest
 
-from ase.io.formats import ioformats, match_magic
+from ase.io.formats import ioformats, match_magic, string2index
 
 # some of the possible bound parameters
 bounds_parameters = [
@@ -126,3 +126,139 @@ def test_lammpsdump_bounds(fmt, lammpsdump, bounds, expected):
     atoms = fmt.parse_atoms(lammpsdump(bounds=bounds))
     assert pytest.approx(atoms.cell.lengths()) == [4., 5., 20.]
     assert np.all(atoms.get_pbc() == expected)
+
+
+def write_text_dump(fd, nframes, natoms=4):
+    for step in range(nframes):
+        fd.write(f"ITEM: TIMESTEP\n{step}\n"
+                 f"ITEM: NUMBER OF ATOMS\n{natoms}\n"
+                 "ITEM: BOX BOUNDS pp pp pp\n"
+                 f"0.0 {10 + step}\n0.0 10.0\n0.0 10.0\n"
+                 "ITEM: ATOMS id type x y z fx fy fz\n")
+        for i in range(natoms):
+            fd.write(f"{natoms - i} 1 {step} {i} 0.5 0.1 0.2 0.3\n")
+
+
+def write_binary_dump(fd, nframes, natoms=4, new_format=False):
+    import struct
+    for step in range(nframes):
+        if new_format:
+            magic = b"DUMPATOM"
+            fd.write(struct.pack("=q", -len(magic)) + magic)
+            fd.write(struct.pack("=ii", 1, 1))
+        fd.write(struct.pack("=qqi", step, natoms, 0))
+        fd.write(struct.pack("=6i", *[0] * 6))
+        fd.write(struct.pack("=6d", 0.0, 10 + step, 0.0, 10.0, 0.0, 10.0))
+        fd.write(struct.pack("=i", 11))
+        data = np.zeros((natoms, 11))
+        data[:, 0] = np.arange(natoms, 0, -1)
+        data[:, 1] = 1
+        data[:, 2] = step
+        data[:, 3] = np.arange(natoms)
+        data[:, 4] = 0.5
+        # Two chunks of per-atom data:
+        fd.write(struct.pack("=i", 2))
+        for chunk in [data[:1], data[1:]]:
+            fd.write(struct.pack("=i", chunk.size))
+            fd.write(chunk.tobytes())
+
+
+def check_frames(images, steps):
+    assert len(images) == len(steps)
+    for atoms, step in zip(images, steps):
+        assert atoms.cell[0, 0] == pytest.approx(10 + step)
+        assert atoms.positions[:, 0] == pytest.approx(step)
+        # Sorted by id:
+        assert atoms.positions[:, 1] == pytest.approx([3, 2, 1, 0])
+
+
+@pytest.fixture
+def textdump(tmp_path):
+    path = tmp_path / "dump.lammpstrj"
+    with open(path, "w") as fd:
+        write_text_dump(fd, 7)
+    return path
+
+
+@pytest.mark.parametrize("index, steps", [
+    (-1, [6]),
+    (2, [2]),
+    (":", range(7)),
+    ("1:5:2", [1, 3]),
+    ("-3:", [4, 5, 6]),
+    ("::-2", [6, 4, 2, 0]),
+])
+def test_lammpsdump_text_index(textdump, index, steps):
+    from ase.io import iread, read
+    images = read(textdump, index, format="lammps-dump-text")
+    if not isinstance(images, list):
+        images = [images]
+    check_frames(images, steps)
+    images = list(iread(textdump, index, format="lammps-dump-text"))
+    check_frames(images, steps)
+    assert images[0].get_forces()[0] == pytest.approx([0.1, 0.2, 0.3])
+
+
+def test_lammpsdump_text_streaming(textdump):
+    from io import StringIO
+    from ase.io.lammpsrun import (index_lammps_dump_text,
+                                  iread_lammps_dump_text,
+                                  read_lammps_dump_text)
+    with open(textdump) as fd:
+        offsets = index_lammps_dump_text(fd)
+        assert len(offsets) == 7
+        # The file is read on demand:
+        images = iread_lammps_dump_text(fd)
+        check_frames([next(images)], [0])
+        check_frames([next(images)], [1])
+
+        atoms = read_lammps_dump_text(fd, index=5, offsets=offsets)
+        check_frames([atoms], [5])
+        check_frames(list(iread_lammps_dump_text(fd, slice(-2, None),
+                                                 offsets=offsets)), [5, 6])
+
+    # Streams that cannot seek:
+    class Stream(StringIO):
+        def seekable(self):
+            return False
+
+    text = textdump.read_text()
+    check_frames([read_lammps_dump_text(Stream(text))], [6])
+    check_frames(list(read_lammps_dump_text(Stream(text), slice(2, 4))),
+                 [2, 3])
+    check_frames([read_lammps_dump_text(Stream(text), index=-2)], [5])
+    for index in ['-3:-1', '-1:-4:-1', '::-2', '2:-1', '-2:']:
+        check_frames(list(read_lammps_dump_text(Stream(text), index)),
+                     list(range(7))[string2index(index)])
+
+    # Incomplete timestep at the end:
+    check_frames([read_lammps_dump_text(StringIO(text[:-20]))], [5])
+    with pytest.raises(IndexError):
+        read_lammps_dump_text(StringIO(text), index=7)
+
+
+@pytest.mark.parametrize("new_format", [False, True])
+def test_lammpsdump_binary(tmp_path, new_format):
+    from ase.io.lammpsrun import (index_lammps_dump_binary,
+                                  iread_lammps_dump_binary,
+                                  read_lammps_dump,
+                                  read_lammps_dump_binary)
+    path = tmp_path / "dump.bin"
+    with open(path, "wb") as fd:
+        write_binary_dump(fd, 5, new_format=new_format)
+    check_frames([read_lammps_dump(str(path))], [4])
+    check_frames(read_lammps_dump(str(path), index=slice(1, 3)), [1, 2])
+
+    with open(path, "rb") as fd:
+        offsets = index_lammps_dump_binary(fd)
+        assert len(offsets) == 5
+        check_frames(list(iread_lammps_dump_binary(fd, "::2")), [0, 2, 4])
+        fd.seek(0)
+        check_frames([read_lammps_dump_binary(fd, 3, offsets=offsets)], [3])
+
+    # Incomplete timestep at the end:
+    data = path.read_bytes()
+    path.write_bytes(data[:-8])
+    with open(path, "rb") as fd:
+        assert len(index_lammps_dump_binary(fd)) == 4
+        check_frames(list(iread_lammps_dump_binary(fd, "-2:")), [2, 3])
@@ -324,3 +324,63 @@ def test_vasp_parameters(vasprun, calculation):
                      ('isym', 0), ('symprec', 1e-05)])
 
     assert atoms.calc.parameters == expected_parameters
+
+
+@pytest.fixture()
+def trajectory(vasprun, calculation):
+    """Complete vasprun.xml with five ionic steps."""
+    records = []
+    for i in range(5):
+        record, _ = calculation(test_case_index=1)
+        records.append(record.replace('-3.00000000', '{:.8f}'.format(-i))
+                       + ' </calculation>\n')
+    return vasprun + ''.join(records) + '</modeling>\n'
+
+
+@pytest.mark.parametrize('index, energies', [
+    (-1, [-4]),
+    (1, [-1]),
+    (':', [0, -1, -2, -3, -4]),
+    ('1::2', [-1, -3]),
+    (':2', [0, -1]),
+    ('-2:', [-3, -4]),
+    ('::-2', [-4, -2, 0]),
+    (':-3', [0, -1]),
+    (-2, [-3]),
+    ('-3:-1', [-2, -3]),
+    ('-1:-4:-1', [-4, -3, -2]),
+    (slice(0, 0), []),
+    ('2:1', []),
+])
+def test_vasp_xml_index(trajectory, index, energies):
+    images = read(StringIO(trajectory), index=index, format='vasp-xml')
+    if not isinstance(images, list):
+        images = [images]
+    assert [atoms.get_potential_energy(force_consistent=True)
+            for atoms in images] == pytest.approx(energies)
+
+
+def test_vasp_xml_properties(trajectory):
+    from ase.calculators.calculator import PropertyNotImplementedError
+    atoms = read(StringIO(trajectory), format='vasp-xml',
+                 properties=['free_energy', 'forces'])
+    assert atoms.get_potential_energy(force_consistent=True) == -4
+    assert atoms.get_forces() == pytest.approx(np.full((2, 3), np.pi))
+    with pytest.raises(PropertyNotImplementedError):
+        atoms.get_stress()
+
+
+def test_vasp_xml_offset(trajectory, tmp_path):
+    from ase.io.vasp import index_vasp_xml, read_vasp_xml
+    path = tmp_path / 'vasprun.xml'
+    path.write_text(trajectory)
+    offsets = index_vasp_xml(path)
+    assert len(offsets) == 5
+
+    images = list(read_vasp_xml(str(path), index=slice(None),
+                                offset=offsets[3]))
+    assert [atoms.get_potential_energy(force_consistent=True)
+            for atoms in images] == pytest.approx([-3, -4])
+    with open(path) as fd:
+        atoms, = read_vasp_xml(fd, offset=offsets[1], index=0)
+    assert atoms.get_potential_energy(force_consistent=True) == -1
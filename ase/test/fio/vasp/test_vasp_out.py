@@ -83,3 +83,29 @@ def test_read_vasp_multiple_times(outcar):
     print(result1)
     print(result2)
     assert len(compare_atoms(result1, result2)) == 0
+
+
+def test_vasp_out_properties_and_offset(outcar, tmp_path):
+    from ase.io.vasp import index_vasp_out, read_vasp_out
+    # Make an OUTCAR with three identical ionic steps:
+    data = outcar.read_bytes()
+    start, = index_vasp_out(outcar)
+    path = tmp_path / 'OUTCAR'
+    path.write_bytes(data[:start] + 3 * data[start:])
+    offsets = index_vasp_out(path)
+    assert len(offsets) == 3
+    ref = read(outcar)
+
+    images = read_vasp_out(path, index=':', properties=['energy'])
+    assert len(images) == 3
+    for atoms in images:
+        assert set(atoms.calc.results) == {'energy'}
+        assert atoms.get_potential_energy() == ref.get_potential_energy()
+        assert atoms.positions == pytest.approx(ref.positions)
+
+    images = list(iread(path, index=':', format='vasp-out',
+                        offset=offsets[1], properties=['forces', 'kpts']))
+    assert len(images) == 2
+    assert set(images[0].calc.results) == {'forces'}
+    assert images[0].get_forces() == pytest.approx(ref.get_forces())
+    assert len(images[0].calc.kpts) == len(ref.calc.kpts)
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from ase.build import molecule
+from ase.calculators.ff import ForceField, get_limits
+from ase.utils import ff
+from ase.utils.ff import Morse, Bond, Angle, Dihedral, VdW, Coulomb
+
+
+@pytest.fixture
+def atoms():
+    atoms = molecule('C60')
+    atoms.set_cell([[12.0, 0.0, 0.0], [2.0, 11.0, 0.0], [1.0, 1.0, 13.0]])
+    atoms.rattle(0.1, seed=2)
+    return atoms
+
+
+@pytest.fixture
+def terms(atoms):
+    rng = np.random.RandomState(3)
+
+    def pick(n):
+        return [int(i) for i in rng.choice(len(atoms), n, replace=False)]
+
+    terms = dict(morses=[], bonds=[], angles=[], dihedrals=[], vdws=[],
+                 coulombs=[])
+    for m in range(30):
+        terms['morses'].append(Morse(*pick(2), D=2.0, alpha=1.5, r0=1.4))
+        terms['bonds'].append(Bond(*pick(2), k=3.0, b0=1.5))
+        terms['angles'].append(Angle(*pick(3), k=2.0, a0=2.0,
+                                     cos=bool(m % 2)))
+        d0 = None if m % 3 == 0 else 0.7
+        n = 3 if m % 3 == 2 else None
+        terms['dihedrals'].append(Dihedral(*pick(4), k=0.5, d0=d0, n=n))
+        terms['vdws'].append(VdW(*pick(2), epsilonij=0.01, rminij=3.4))
+        terms['coulombs'].append(Coulomb(*pick(2), chargei=0.3,
+                                         chargej=-0.2))
+    return terms
+
+
+def test_batched_terms(atoms, terms):
+    """Energy and forces agree with a sum over the single-term functions."""
+    energy = 0.0
+    forces = np.zeros(3 * len(atoms))
+    for name in terms:
+        value = getattr(ff, 'get_{}_potential_value'.format(name[:-1]))
+        gradient = getattr(ff, 'get_{}_potential_gradient'.format(name[:-1]))
+        for term in terms[name]:
+            energy += value(atoms, term)[-1]
+            indices = gradient(atoms, term)
+            for gb, ge, lb, le in get_limits(indices[:-1]):
+                forces[gb:ge] -= indices[-1][lb:le]
+
+    atoms.calc = ForceField(**terms)
+    assert atoms.get_potential_energy() == pytest.approx(energy, rel=1e-12)
+    assert atoms.get_forces() == pytest.approx(forces.reshape(-1, 3),
+                                               rel=1e-10, abs=1e-10)
+    assert 'hessian' not in atoms.calc.results
+
+
+def test_hessian(atoms, terms):
+    """Hessian is only computed on request and matches the forces."""
+    del terms['dihedrals']
+    atoms.calc = ForceField(**terms)
+    atoms.get_forces()
+    assert 'hessian' not in atoms.calc.results
+    hessian = atoms.calc.get_hessian(atoms)
+
+    eps = 1e-5
+    numerical = np.empty_like(hessian)
+    for a in range(len(atoms)):
+        for c in range(3):
+            displaced = atoms.copy()
+            displaced.calc = ForceField(**terms)
+            displaced.positions[a, c] += eps
+            fplus = displaced.get_forces().ravel()
+            displaced.positions[a, c] -= 2 * eps
+            fminus = displaced.get_forces().ravel()
+            numerical[3 * a + c] = (fminus - fplus) / (2 * eps)
+    assert hessian == pytest.approx(numerical, rel=1e-6, abs=1e-7)
+
+
+def test_changed_terms(atoms, terms):
+    """Changes to the lists of terms are picked up."""
+    bonds = terms['bonds']
+    calc = ForceField(bonds=bonds[:10])
+    atoms.calc = calc
+    e10 = atoms.get_potential_energy()
+
+    calc.bonds.extend(bonds[10:20])
+    e20 = atoms.get_potential_energy()
+    assert e20 == pytest.approx(ForceField(bonds=bonds[:20])
+                                .get_potential_energy(atoms))
+    assert e20 != pytest.approx(e10)
+
+    calc.bonds[0] = Bond(0, 1, k=5.0, b0=1.0)
+    e = ForceField(bonds=calc.bonds).get_potential_energy(atoms)
+    assert atoms.get_potential_energy() == pytest.approx(e)
+
+    # A new term may reuse the memory of a deleted one:
+    del calc.bonds[0]
+    calc.bonds.append(Bond(0, 2, k=5.0, b0=0.5))
+    e = ForceField(bonds=calc.bonds).get_potential_energy(atoms)
+    assert atoms.get_potential_energy() == pytest.approx(e)
+
+    # Changed parameters need a new topology:
+    calc.bonds[0].k = 7.0
+    calc.topology = None
+    calc.reset()
+    e = ForceField(bonds=calc.bonds).get_potential_energy(atoms)
+    assert atoms.get_potential_energy() == pytest.approx(e)
@@ -27,3 +27,38 @@ def test_tipnp():
         dF = dimer.calc.calculate_numerical_forces(dimer) - F
         print(dF)
         assert abs(dF).max() < 2e-6
+
+
+def test_tipnp_triclinic():
+    """Test water box in a triclinic cell against the orthorhombic one."""
+    import numpy as np
+    import pytest
+
+    from ase import Atoms
+    from ase.calculators.tip3p import TIP3P, rOH, angleHOH
+    from ase.calculators.tip4p import TIP4P
+
+    a = angleHOH * np.pi / 180
+    water = np.array([[0, 0, 0], [rOH, 0, 0],
+                      [rOH * np.cos(a), rOH * np.sin(a), 0]])
+    rng = np.random.RandomState(42)
+    positions = []
+    for x in range(3):
+        for y in range(3):
+            for z in range(3):
+                rotation, _ = np.linalg.qr(rng.randn(3, 3))
+                positions.extend(water @ rotation + 4.0 * np.array([x, y, z]) +
+                                 rng.rand(3))
+    atoms = Atoms('OH2' * 27, positions, cell=[12.0] * 3, pbc=True)
+    skewed = atoms.copy()
+    skewed.set_cell([[12, 0, 0], [12, 12, 0], [0, 0, 12]])
+
+    for TIPnP in [TIP3P, TIP4P]:
+        atoms.calc = TIPnP(rc=4.0, width=1.0)
+        skewed.calc = TIPnP(rc=4.0, width=1.0)
+        energy = atoms.get_potential_energy()
+        assert skewed.get_potential_energy() == pytest.approx(energy)
+        F = skewed.get_forces()
+        assert F == pytest.approx(atoms.get_forces(), abs=1e-10)
+        dF = skewed.calc.calculate_numerical_forces(skewed) - F
+        assert abs(dF).max() < 2e-6
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from ase import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.ga import set_raw_score
+from ase.ga.data import PrepareDB, DataConnection
+from ase.ga.ofp_comparator import OFPComparator
+from ase.ga.population import Population
+from ase.ga.standard_comparators import (InteratomicDistanceComparator,
+                                         EnergyComparator,
+                                         RawScoreComparator,
+                                         SequentialComparator,
+                                         get_looks_like_matrix)
+
+
+@pytest.fixture
+def clusters():
+    rng = np.random.RandomState(17)
+    base = Atoms('Ag4Au2', positions=rng.uniform(0, 5, (6, 3)),
+                 cell=[12, 12, 12], pbc=False)
+    images = []
+    for i in range(8):
+        a = base.copy()
+        # Pairs of nearly identical structures with distinct energies:
+        a.rattle(0.5 * (i // 2), seed=i // 2)
+        a.rattle(0.001, seed=100 + i)
+        a.calc = SinglePointCalculator(a, energy=-0.01 * i)
+        set_raw_score(a, 0.01 * i)
+        a.info['data'] = {}
+        images.append(a)
+    return images
+
+
+def copy(a):
+    b = a.copy()
+    b.calc = SinglePointCalculator(b, energy=a.get_potential_energy())
+    return b
+
+
+class PairwiseComparator:
+    """Comparator without a looks_like_matrix method."""
+    def __init__(self, comparator):
+        self.comparator = comparator
+
+    def looks_like(self, a1, a2):
+        return self.comparator.looks_like(a1, a2)
+
+
+def pairwise(comp, images, others):
+    return np.array([[comp.looks_like(a, b) for b in others]
+                     for a in images])
+
+
+@pytest.mark.parametrize('comp', [
+    OFPComparator(dE=0.05, cos_dist_max=5e-3, pbc=False, rcut=8.0,
+                  chunksize=3),
+    InteratomicDistanceComparator(pair_cor_cum_diff=0.015, dE=0.05,
+                                  chunksize=3),
+    SequentialComparator([EnergyComparator(dE=0.025),
+                          RawScoreComparator(dist=0.015),
+                          OFPComparator(pbc=False, rcut=8.0)],
+                         [0, 1, 1])])
+def test_looks_like_matrix(clusters, comp):
+    M = comp.looks_like_matrix(clusters)
+    assert M.dtype == bool
+    assert (M == pairwise(comp, clusters, clusters)).all()
+    # Some, but not all pairs look alike:
+    assert M.diagonal().all()
+    assert 0 < M.sum() - len(M) < M.size - len(M)
+
+    M = get_looks_like_matrix(comp, clusters[:3], clusters[2:])
+    assert (M == pairwise(comp, clusters[:3], clusters[2:])).all()
+
+
+def test_ofp_distance_matrix(clusters):
+    comp = OFPComparator(pbc=False, rcut=8.0)
+    D = comp.get_distance_matrix(clusters)
+    ref = [[comp._compare_structure(a, b) for b in clusters]
+           for a in clusters]
+    assert D == pytest.approx(np.array(ref), abs=1e-12)
+
+
+def test_fingerprint_store(clusters, tmp_path):
+    db_file = tmp_path / 'gadb.db'
+    db = PrepareDB(db_file, population_size=4)
+    for a in clusters:
+        db.add_relaxed_candidate(a)
+    dc = DataConnection(db_file)
+
+    comp = OFPComparator(pbc=False, rcut=8.0, data_connection=dc)
+    ref = comp.looks_like_matrix(dc.get_all_relaxed_candidates())
+    assert len(comp.fingerprints) == len(clusters)
+
+    # A new comparator finds the fingerprints in the database:
+    comp = OFPComparator(pbc=False, rcut=8.0, data_connection=dc)
+    comp.get_fingerprint_vector = None
+    cands = dc.get_all_relaxed_candidates()
+    assert (comp.looks_like_matrix(cands) == ref).all()
+
+    # ... but only if they were calculated with the same settings:
+    comp = OFPComparator(pbc=False, rcut=7.0, data_connection=dc)
+    comp.get_fingerprint_vector = None
+    with pytest.raises(TypeError):
+        comp.looks_like_matrix(cands)
+
+
+@pytest.mark.parametrize('comp', [
+    OFPComparator(dE=0.05, pbc=False, rcut=8.0),
+    InteratomicDistanceComparator(dE=0.05)])
+def test_population(clusters, tmp_path, comp):
+    pops = []
+    for i, c in enumerate([comp, PairwiseComparator(comp)]):
+        db_file = tmp_path / 'gadb{}.db'.format(i)
+        db = PrepareDB(db_file, population_size=3)
+        for a in clusters[:6]:
+            db.add_relaxed_candidate(copy(a))
+
+        dc = DataConnection(db_file)
+        pop = Population(dc, 3, comparator=c)
+        for a in clusters[6:]:
+            dc.add_relaxed_candidate(copy(a))
+        pop.update()
+        pops.append([(a.info['confid'], a.info['looks_like'])
+                     for a in pop.pop])
+    assert pops[0] == pops[1]
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from ase.build import fcc111
+from ase.calculators.emt import EMT
+from ase.constraints import FixAtoms
+from ase.ga import set_raw_score
+from ase.ga.data import PrepareDB, DataConnection
+from ase.ga.population import Population
+from ase.ga.standard_comparators import InteratomicDistanceComparator
+from ase.ga.standardmutations import RattleMutation
+from ase.ga.startgenerator import StartGenerator
+from ase.ga.steadystaterun import SteadyStateRun
+from ase.ga.utilities import closest_distances_generator
+from ase.optimize import BFGS
+
+
+def relax(a):
+    a.calc = EMT()
+    with BFGS(a, logfile=None) as dyn:
+        dyn.run(fmax=0.1, steps=20)
+    set_raw_score(a, -a.get_potential_energy())
+    return a
+
+
+def broken_relax(a):
+    if a.info['confid'] % 2:
+        raise RuntimeError('SCF did not converge')
+    return relax(a)
+
+
+@pytest.fixture
+def dc(tmp_path):
+    rng = np.random.RandomState(1)
+    slab = fcc111('Au', size=(2, 2, 1), vacuum=6.0, orthogonal=True)
+    slab.set_constraint(FixAtoms(mask=len(slab) * [True]))
+    pos = slab.get_positions()
+    cell = slab.get_cell()
+    p0 = np.array([0., 0., max(pos[:, 2]) + 2.])
+    v3 = cell[2, :]
+    v3[2] = 3.
+    atom_numbers = 2 * [79]
+    blmin = closest_distances_generator([79], ratio_of_covalent_radii=0.7)
+    sg = StartGenerator(slab, atom_numbers, blmin,
+                        box_to_place_in=[p0, [cell[0] * 0.8,
+                                              cell[1] * 0.8, v3]],
+                        rng=rng)
+
+    db_file = tmp_path / 'gadb.db'
+    db = PrepareDB(db_file, simulation_cell=slab,
+                   stoichiometry=atom_numbers, population_size=3)
+    for i in range(3):
+        db.add_unrelaxed_candidate(sg.get_new_candidate())
+    dc = DataConnection(db_file)
+    dc.rng = rng
+    dc.blmin = blmin
+    return dc
+
+
+def make_generator(dc, population):
+    mutation = RattleMutation(dc.blmin, 2, rng=dc.rng)
+
+    def generate_candidate():
+        if not population.pop:
+            population.update()
+        a1 = population.pop[dc.rng.randint(len(population.pop))]
+        a2, desc = mutation.get_new_individual([a1])
+        if a2 is not None:
+            dc.add_unrelaxed_candidate(a2, description=desc)
+        return a2
+    return generate_candidate
+
+
+def test_steady_state_threads(dc):
+    population = Population(dc, 3, InteratomicDistanceComparator(n_top=2))
+    with ThreadPoolExecutor(2) as executor:
+        with SteadyStateRun(dc, relax, make_generator(dc, population),
+                            population=population, n_simul=2,
+                            executor=executor) as run:
+            run.run(3)
+            # The starting population is relaxed first:
+            assert dc.get_number_of_unrelaxed_candidates() == 0
+            run.run(4)
+            assert run.get_number_of_jobs_running() == 0
+
+    assert len(dc.get_all_relaxed_candidates()) == 7
+    assert len(population.pop) == 3
+    stats = run.get_statistics()
+    assert stats['relaxed'] == 7
+    assert stats['failed'] == 0
+    assert stats['candidates_per_hour'] > 0
+    assert 0 <= stats['idle_fraction'] <= 1
+    assert stats['mean_relax_time'] > 0
+
+
+def test_steady_state_processes(dc):
+    population = Population(dc, 3, InteratomicDistanceComparator(n_top=2))
+    with SteadyStateRun(dc, broken_relax, make_generator(dc, population),
+                        population=population, n_simul=2) as run:
+        run.run(6)
+
+    stats = run.get_statistics()
+    assert stats['relaxed'] + stats['failed'] == 6
+    assert stats['failed'] == len(run.errors) > 0
+    assert len(dc.get_all_relaxed_candidates()) == stats['relaxed']
+    for a in dc.get_all_relaxed_candidates():
+        assert a.get_potential_energy() == pytest.approx(
+            -a.info['key_value_pairs']['raw_score'])
@@ -42,3 +42,33 @@ def test_utilities():
     rdf = get_rdf(bulk, 4.2, 5)[0]
     calc_rdf = [0., 0., 1.43905094, 0.36948605, 1.34468694]
     assert all(abs(rdf - calc_rdf) < eps)
+
+
+def test_rdf_neighborlist():
+    from ase.build import bulk
+    atoms = bulk('NaCl', 'rocksalt', a=5.64, cubic=True).repeat(2)
+    atoms.rattle(0.05, seed=3)
+    rmax = 5.5
+    nbins = 40
+
+    # Neighbor list and distance matrix agree when rmax < half cell
+    dm = atoms.get_all_distances(mic=True)
+    for elements in [None, (11, 17), (17, 17)]:
+        rdf = get_rdf(atoms, rmax, nbins, elements=elements, no_dists=True)
+        ref = get_rdf(atoms, rmax, nbins, distance_matrix=dm,
+                      elements=elements, no_dists=True)
+        assert np.allclose(rdf, ref)
+
+    # rmax may exceed half the cell: the small cell gives the same rdf
+    # as a supercell
+    small = bulk('Cu', cubic=True)
+    rdf = get_rdf(small, 6.0, 30, no_dists=True)
+    ref = get_rdf(small.repeat(4), 6.0, 30, no_dists=True)
+    assert np.allclose(rdf, ref)
+
+    # Average over images
+    images = [atoms, small.repeat(4)]
+    avg = get_rdf(images, rmax, nbins, no_dists=True)
+    assert np.allclose(avg, (get_rdf(atoms, rmax, nbins, no_dists=True) +
+                             get_rdf(images[1], rmax, nbins,
+                                     no_dists=True)) / 2)
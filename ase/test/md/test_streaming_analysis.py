@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from ase.build import bulk, molecule
+from ase.ga.utilities import get_rdf
+from ase.geometry.analysis import Analysis
+from ase.io import Trajectory, iread
+from ase.md.analysis import DiffusionCoefficient
+from ase.md.streaming import (StreamingAnalysis, RDFAccumulator,
+                              MSDAccumulator, VACFAccumulator,
+                              BondAccumulator, AngleAccumulator,
+                              CoordinationAccumulator)
+from ase.neighborlist import natural_cutoffs
+
+
+@pytest.fixture
+def images():
+    rng = np.random.RandomState(42)
+    atoms = bulk('NaCl', 'rocksalt', a=5.64, cubic=True).repeat(2)
+    images = []
+    for i in range(6):
+        frame = atoms.copy()
+        frame.rattle(0.1, seed=i)
+        frame.set_momenta(rng.normal(size=(len(frame), 3)))
+        images.append(frame)
+    return images
+
+
+@pytest.mark.parametrize('elements', [None, (11, 17), ('Cl', 'Cl')])
+def test_rdf(images, elements):
+    rdf = RDFAccumulator(5.0, 50, elements=elements)
+    StreamingAnalysis([rdf]).run(iter(images))
+    g, r = rdf.get()
+    if elements is not None:
+        elements = [rdf.elements[0], rdf.elements[1]]
+    ref = np.mean([get_rdf(atoms, 5.0, 50, elements=elements)[0]
+                   for atoms in images], axis=0)
+    assert r == pytest.approx(get_rdf(images[0], 5.0, 50)[1])
+    assert g == pytest.approx(ref)
+
+
+def test_msd(images):
+    msd = MSDAccumulator(window=len(images))
+    StreamingAnalysis([msd]).run(images)
+    lags, values = msd.get(per_axis=True)
+
+    # Single time origin must agree with DiffusionCoefficient:
+    dc = DiffusionCoefficient(images, 1.0)
+    dc.calculate()
+    counts = np.array(dc.no_of_atoms)[:, np.newaxis, np.newaxis]
+    ref = (dc.xyz_segment_ensemble_average[0] * 2 * counts).sum(axis=0)
+    assert values[-1] == pytest.approx(ref[:, -1] / len(images[0]))
+
+    # Lag 1 is averaged over all time origins:
+    pos = np.array([atoms.positions for atoms in images])
+    ref1 = ((pos[1:] - pos[:-1])**2).sum(axis=2).mean()
+    assert lags[1] == 1
+    assert values[1].sum() == pytest.approx(ref1)
+
+
+def test_msd_unwrap():
+    atoms = molecule('H2', cell=[4, 4, 4], pbc=True)
+    frames = []
+    for step in range(10):
+        frame = atoms.copy()
+        frame.positions += [0.5 * step, 0, 0]
+        frame.wrap()
+        frames.append(frame)
+    msd = MSDAccumulator(window=10)
+    StreamingAnalysis([msd]).run(frames)
+    lags, values = msd.get()
+    assert values == pytest.approx((0.5 * lags)**2)
+
+
+def test_vacf(images):
+    vacf = VACFAccumulator(window=3)
+    StreamingAnalysis([vacf]).run(images)
+    lags, values = vacf.get()
+    v = np.array([atoms.get_velocities() for atoms in images])
+    assert values[0] == pytest.approx((v**2).sum(axis=2).mean())
+    assert values[2] == pytest.approx((v[2:] * v[:-2]).sum(axis=2).mean())
+
+
+def test_bonds_and_angles():
+    mol = molecule('CH3CH2OH')
+    frames = [mol.copy() for i in range(3)]
+    for i, frame in enumerate(frames):
+        frame.rattle(0.02, seed=i)
+
+    cutoffs = natural_cutoffs(mol, mult=1.2)
+    ana = Analysis(frames, cutoffs=cutoffs, skin=0.0)
+    bonds = BondAccumulator('C', 'H', rmax=2.0, cutoffs=cutoffs)
+    angles = AngleAccumulator('H', 'C', 'H', cutoffs=cutoffs)
+    StreamingAnalysis([bonds, angles]).run(frames)
+
+    ref = np.concatenate([ana.get_bond_value(i, b)
+                          for i in range(len(frames))
+                          for b in ana.get_bonds('C', 'H')[0]], axis=None)
+    assert bonds.n == len(ref)
+    assert bonds.mean == pytest.approx(ref.mean())
+    assert bonds.std == pytest.approx(ref.std())
+
+    ref = np.array([ana.get_angle_value(i, a)
+                    for i in range(len(frames))
+                    for a in ana.get_angles('H', 'C', 'H')[0]])
+    assert angles.n == len(ref)
+    assert angles.mean == pytest.approx(ref.mean())
+
+
+def test_coordination():
+    atoms = bulk('Cu', cubic=True).repeat(2)
+    cn = CoordinationAccumulator(cutoffs=3.0)
+    StreamingAnalysis([cn]).run([atoms, atoms])
+    assert cn.mean('Cu') == 12
+    assert cn.get('Cu')[12] == 2 * len(atoms)
+
+
+def test_parallel(images, tmp_path):
+    fname = str(tmp_path / 'md.traj')
+    with Trajectory(fname, 'w') as traj:
+        for atoms in images:
+            traj.write(atoms)
+
+    def accumulators():
+        return [RDFAccumulator(5.0, 50), MSDAccumulator(window=4),
+                CoordinationAccumulator(cutoffs=3.0)]
+
+    serial = accumulators()
+    StreamingAnalysis(serial).run(iread(fname))
+    parallel = accumulators()
+    StreamingAnalysis(parallel, chunksize=2).run(iread(fname), processes=2)
+
+    assert parallel[0].get()[0] == pytest.approx(serial[0].get()[0])
+    assert parallel[1].get()[1] == pytest.approx(serial[1].get()[1])
+    assert parallel[2].mean('Na') == serial[2].mean('Na')
@@ -4,7 +4,8 @@ from typing import Iterable
 import numpy as np
 from ase.spectrum.doscollection import (DOSCollection,
                                         GridDOSCollection,
-                                        RawDOSCollection)
+                                        RawDOSCollection,
+                                        StackedDOSCollection)
 from ase.spectrum.dosdata import DOSData, RawDOSData, GridDOSData
 
 
@@ -404,3 +405,96 @@ class TestGridDOSCollection:
                            griddoscollection[0].get_energies())
         assert np.allclose(ax.get_lines()[1].get_ydata(),
                            griddoscollection[1].get_weights())
+
+
+class TestStackedDOSCollection:
+    @pytest.fixture
+    def energies(self):
+        return np.random.RandomState(1).uniform(-3, 3, 40)
+
+    @pytest.fixture
+    def weights(self):
+        weights = np.random.RandomState(2).uniform(size=(6, 40))
+        weights[3] = 0.
+        return weights
+
+    @pytest.fixture
+    def info(self):
+        return [{'symbol': symbol, 'index': str(i // 2), 'spin': str(i % 2)}
+                for i, symbol in enumerate('HHOOHH')]
+
+    @pytest.fixture(params=['dense', 'sparse'])
+    def stacked(self, request, energies, weights, info):
+        if request.param == 'sparse':
+            from scipy import sparse
+            weights = sparse.csr_matrix(weights)
+        return StackedDOSCollection(energies, weights, info)
+
+    @pytest.fixture
+    def reference(self, energies, weights, info):
+        return DOSCollection.from_data(energies, weights, info)
+
+    def test_sequence(self, stacked, reference):
+        assert len(stacked) == 6
+        for data, ref in zip(stacked, reference):
+            assert data._almost_equals(ref)
+        assert stacked[-1]._almost_equals(reference[-1])
+        assert len(stacked[1:4]) == 3
+        assert stacked[1:4][0]._almost_equals(reference[1])
+        with pytest.raises(IndexError):
+            stacked[6]
+        with pytest.raises(TypeError):
+            stacked['hello']
+
+    @pytest.mark.parametrize('query', [{'symbol': 'H'},
+                                       {'symbol': 'H', 'spin': '1'},
+                                       {'symbol': 'C'}])
+    def test_select(self, stacked, reference, query):
+        for negative in [False, True]:
+            method = 'select_not' if negative else 'select'
+            selected = getattr(stacked, method)(**query)
+            ref = getattr(reference, method)(**query)
+            assert isinstance(selected, StackedDOSCollection)
+            assert selected._weights is stacked._weights
+            assert len(selected) == len(ref)
+            for data, ref_data in zip(selected, ref):
+                assert data._almost_equals(ref_data)
+
+    @pytest.mark.parametrize('keys', [(), ('symbol',), ('symbol', 'spin'),
+                                      ('spin', 'nothing')])
+    def test_sum_by(self, stacked, reference, keys):
+        summed = stacked.sum_by(*keys)
+        ref = reference.sum_by(*keys)
+        assert len(summed) == len(ref)
+        grid = np.linspace(-4, 4, 50)
+        for data, ref_data in zip(summed, ref):
+            assert data.info == ref_data.info
+            assert data._sample(grid) == pytest.approx(ref_data._sample(grid))
+
+        total = stacked.total()
+        assert total.info == {'label': 'Total'}
+        assert total.get_weights() == pytest.approx(
+            reference.total().get_weights().reshape((6, 40)).sum(axis=0))
+
+    @pytest.mark.parametrize('options', [{'npts': 400, 'width': 0.2},
+                                         {'npts': 300, 'width': 0.3,
+                                          'xmin': -1, 'xmax': 1}])
+    def test_sample_grid(self, stacked, reference, options):
+        dos = stacked.sum_by('symbol').sample_grid(**options)
+        ref = reference.sum_by('symbol').sample_grid(**options)
+        assert isinstance(dos, GridDOSCollection)
+        assert dos.get_energies() == pytest.approx(ref.get_energies())
+        weights = ref.get_all_weights()
+        assert dos.get_all_weights() == pytest.approx(
+            weights, abs=1e-3 * weights.max())
+        assert stacked._sample([0.5, 1.]) == pytest.approx(
+            reference._sample([0.5, 1.]))
+
+    def test_addition(self, stacked, reference, energies):
+        joined = stacked + stacked[2:]
+        assert len(joined) == 10
+        assert joined[7]._almost_equals(reference[3])
+        with pytest.raises(ValueError):
+            stacked + StackedDOSCollection(energies[:3], [[1., 2., 3.]])
+        with pytest.raises(TypeError):
+            stacked + reference
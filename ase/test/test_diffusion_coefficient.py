@@ -1,3 +1,5 @@
+import numpy as np
+
 from ase.md.analysis import DiffusionCoefficient
 from ase.atoms import Atoms
 from ase.units import fs as fs_conversion
@@ -49,3 +51,50 @@ def test_co_molecule():
     ans = dc_co.get_diffusion_coefficients()[0][0]
 
     assert(abs(ans - ans_orig) < eps)
+
+
+def test_msd_fft():
+    from ase.md.analysis import msd_fft, autocorrelation
+    rng = np.random.RandomState(17)
+    x = rng.normal(size=(50, 4, 3)).cumsum(axis=0)
+    msd = np.array([((x[lag:] - x[:len(x) - lag])**2).mean(axis=0)
+                    for lag in range(len(x))])
+    assert np.allclose(msd_fft(x), msd)
+    acf = np.array([(x[lag:] * x[:len(x) - lag]).mean(axis=0)
+                    for lag in range(len(x))])
+    assert np.allclose(autocorrelation(x), acf)
+
+
+def test_all_origins_and_unwrap():
+    # Ballistic motion in a periodic cell with wrapped positions
+    he = Atoms('He2', positions=[(0, 0, 0), (1, 1, 1)], cell=[3, 3, 3],
+               pbc=True)
+    traj = []
+    for i in range(20):
+        atoms = he.copy()
+        atoms.positions += [0.4 * i, 0, 0]
+        atoms.wrap()
+        traj.append(atoms)
+
+    dc = DiffusionCoefficient(traj, timestep, unwrap=True)
+    dc.calculate(all_origins=True)
+    msd_x = dc.xyz_segment_ensemble_average[0][0][0] * 2
+    assert np.allclose(msd_x, (0.4 * np.arange(20))**2)
+
+    dc = DiffusionCoefficient(traj, timestep)
+    dc.calculate()
+    assert not np.allclose(dc.xyz_segment_ensemble_average[0][0][0] * 2,
+                           (0.4 * np.arange(20))**2)
+
+
+def test_green_kubo():
+    atoms = Atoms('Ar3', positions=np.zeros((3, 3)))
+    atoms.set_velocities([(0.1, 0, 0), (0, 0.2, 0), (0, 0, -0.3)])
+    traj = [atoms.copy() for i in range(11)]
+
+    dc = DiffusionCoefficient(traj, timestep)
+    times, vacf = dc.get_velocity_autocorrelation()
+    v2 = (0.1**2 + 0.2**2 + 0.3**2) / 3
+    assert np.allclose(vacf, v2)
+    D = dc.get_green_kubo_diffusion_coefficients(tmax=10 * timestep)
+    assert abs(D[0] - v2 * 10 * timestep / 3) < eps
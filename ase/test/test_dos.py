@@ -44,3 +44,46 @@ def test_dos():
             plt.plot(energies, ref)
             plt.show()
         dims += 1
+
+
+def test_dos_vectorized():
+    """Compare vectorized tetrahedron code to lti_dos1()."""
+    import numpy as np
+    from ase.dft.dos import (linear_tetrahedron_integration as lti,
+                             lti_dos, lti_dos1, lti_dos_processes,
+                             lti_dos_tetrahedra)
+    from ase.parallel import DummyMPI
+
+    rng = np.random.RandomState(7)
+    E = rng.normal(size=(50, 4))
+    W = rng.uniform(size=(50, 4, 2))
+    E[:5, 1] = E[:5, 0]  # degenerate corners
+    energies = np.linspace(-2, 2, 101)
+    ref = np.zeros((2, 101))
+    for e, w in zip(E, W):
+        lti_dos1(e, w, energies, ref)
+    dos = np.zeros((2, 101))
+    lti_dos_tetrahedra(E, W, energies, dos, maxpoints=64)
+    assert abs(dos - ref).max() < 1e-12
+
+    cell = [[1, 0, 0], [0.5, 1, 0], [0, 0, 2]]
+    eigs = rng.normal(size=(4, 5, 3, 3))
+    weights = rng.uniform(size=(4, 5, 3, 3, 2))
+    dos = lti(cell, eigs, energies)
+    total, pdos = lti(cell, eigs, energies, weights, total=True)
+    assert abs(total - dos).max() < 1e-12
+    assert abs(pdos - lti(cell, eigs, energies, weights)).max() < 1e-12
+    assert abs(lti(cell, eigs, energies, weights, processes=2)
+               - pdos).max() < 1e-12
+    total, pdos = lti(cell, eigs, energies, total=True)
+    assert abs(total - dos).max() < 1e-12
+    assert abs(pdos - dos).max() < 1e-12
+
+    # Small chunks in a process pool:
+    simplices = np.array([[[0, 0, 0], [1, 0, 0], [1, 1, 0], [1, 1, 1]]] * 6)
+    ref = np.empty((2, 101))
+    lti_dos(simplices, eigs, weights, energies, ref, DummyMPI())
+    dos = np.empty((2, 101))
+    lti_dos_processes(simplices, eigs, weights, energies, dos, DummyMPI(),
+                      processes=2, chunksize=7)
+    assert abs(dos - ref).max() < 1e-12
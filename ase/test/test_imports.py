@@ -1,4 +1,7 @@
+import os
+import sys
 from pathlib import Path
+from subprocess import run, PIPE
 from importlib import import_module
 from numpy import VisibleDeprecationWarning
 import pytest
@@ -72,3 +75,45 @@ def test_imports():
         except ImportError as err:
             if err.name not in ignore_imports and 'deprecated' not in str(err):
                 raise
+
+
+# Modules which must not be loaded by importing the package, and the
+# maximum number of ASE modules it may load.  The budgets have a little
+# slack; if a change needs more, make the new imports lazy instead.
+import_budgets = [
+    ('ase', {'ase.atoms', 'ase.io', 'scipy'}, 10),
+    ('ase.io', {'ase.atoms', 'ase.io.formats', 'ase.io.trajectory'}, 10),
+    ('ase.build', {'ase.build.supercells', 'ase.io', 'scipy'}, 35),
+    ('ase.calculators', {'ase.calculators.calculator', 'ase.atoms'}, 10),
+    ('ase.cli.main', {'ase.atoms', 'ase.io', 'ase.db'}, 12)]
+
+
+@pytest.mark.parametrize('module, unwanted, budget', import_budgets)
+def test_import_budget(module, unwanted, budget):
+    """Check with python -X importtime what importing a package loads.
+
+    We run the test in a subprocess so that we have a clean Python
+    interpreter."""
+    env = dict(os.environ,
+               PYTHONPATH=str(Path(ase.__file__).parent.parent))
+    proc = run([sys.executable, '-X', 'importtime', '-c',
+                'import ' + module],
+               stderr=PIPE, universal_newlines=True, env=env, check=True)
+    imported = {line.split('|')[-1].strip()
+                for line in proc.stderr.splitlines()
+                if line.startswith('import time:')}
+    assert module in imported
+    assert not imported & unwanted
+    assert len({name for name in imported
+                if name.split('.')[0] == 'ase'}) <= budget
+
+
+def test_lazy_attributes():
+    import ase.io
+    import ase.build
+    assert ase.io.read is ase.io.formats.read
+    assert ase.io.trajectory.Trajectory is ase.io.Trajectory
+    assert ase.build.make_supercell.__module__ == 'ase.build.supercells'
+    assert 'read' in dir(ase.io)
+    with pytest.raises(AttributeError):
+        ase.io.no_such_thing
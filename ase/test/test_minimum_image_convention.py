@@ -65,3 +65,43 @@ def test_numpy_array():
                               pbc=True)
 
     find_mic(atoms.positions, np.array(atoms.cell), pbc=True)
+
+
+@pytest.mark.parametrize('pbc', [True, (1, 1, 0), False])
+def test_cached_mic(pbc):
+    from ase.geometry import MIC, get_distances
+    from ase.geometry.geometry import general_find_mic
+    from ase.utils import pbc2pbc
+    rng = np.random.RandomState(4)
+    cell = np.array([[4.0, 0.0, 0.0],
+                     [3.7, 1.2, 0.0],
+                     [-1.5, 0.4, 5.0]])
+    v = rng.uniform(-12, 12, size=(1000, 3))
+
+    mic = MIC(cell, pbc, chunksize=77)
+    vmin, vlen = mic(v)
+    ref, reflen = find_mic(v, cell, pbc)
+    assert_allclose(vlen, reflen)
+    if np.any(pbc):
+        _, genlen = general_find_mic(v, cell, pbc2pbc(pbc))
+        assert_allclose(vlen, genlen)
+    assert_allclose(np.linalg.norm(vmin, axis=1), vlen)
+
+    # Single vector and reuse through the functional interface:
+    assert_allclose(mic(v[0])[1], vlen[0])
+    assert_allclose(find_mic(v, mic)[1], vlen)
+    assert_allclose(get_distances(v[:5], v[5:9], cell=mic)[1],
+                    get_distances(v[:5], v[5:9], cell=cell, pbc=pbc)[1])
+
+
+def test_neb_reuses_mic():
+    from ase.build import bulk
+    from ase.neb import NEB
+    atoms = bulk('Cu', cubic=True)
+    images = [atoms.copy() for i in range(3)]
+    neb = NEB(images)
+    mic = neb.mic
+    assert neb.mic is mic
+    for image in images:
+        image.set_cell(image.cell * 1.01, scale_atoms=True)
+    assert neb.mic is not mic
@@ -23,3 +23,53 @@ def test_stm(testdir):
     x, y = stm.linescan(42, c, [0, 0], [2, 2])
     assert abs(x[-1] - 2 * 2**0.5) < 1e-13
     assert abs(y[-1] - y[0]) < 1e-13
+
+
+def test_stm_many(testdir):
+    import numpy as np
+    from ase.dft.stm import find_height
+
+    atoms = make_test_dft_calculation()
+    stm = STM(atoms, [0, 1, 2])
+    biases = [-1.0, 1.0]
+    currents = [stm.get_averaged_current(b, z)
+                for b in biases for z in [3.5, 4.5]]
+    x, y, h = stm.scan_many(biases, currents, repeat=(2, 1))
+    assert h.shape == (2, 4) + x.shape
+
+    nz = stm.ldos.shape[2]
+    dz = stm.cell[2, 2] / nz
+    for i, bias in enumerate(biases):
+        stm.calculate_ldos(bias)
+        for j, c in enumerate(currents):
+            ref = [find_height(a, c, dz) for a in stm.ldos.reshape((-1, nz))]
+            ref = np.tile(np.reshape(ref, stm.ldos.shape[:2]), (2, 1))
+            assert abs(h[i, j] - ref).max() < 1e-12
+            assert abs(stm.scan(bias, c, repeat=(2, 1))[2] - ref).max() == 0
+
+    x, y, h2 = stm.scan_many(biases, currents, repeat=(2, 1), processes=2)
+    assert abs(h - h2).max() == 0
+
+    # Both LDOS arrays are cached; a tiny cache keeps nothing:
+    assert list(stm.cache) == biases
+    stm.cache_size = 1e-6
+    stm.calculate_ldos(0.5)
+    assert list(stm.cache) == []
+
+    positions = [(0.1, 0.2, 3.0), (1.0, 1.5, 4.0)]
+    I = stm.pointcurrents(biases, positions)
+    for i, bias in enumerate(biases):
+        for j, p in enumerate(positions):
+            assert I[i, j] == stm.pointcurrent(bias, *p)
+
+    # With a tiny cache the LDOS arrays are calculated one at a time:
+    calculate_ldos = stm._calculate_ldos
+    batches = []
+
+    def calculate_and_count(biases):
+        batches.append(len(biases))
+        return calculate_ldos(biases)
+
+    stm._calculate_ldos = calculate_and_count
+    stm.sts(0.1, 0.2, 3.0, -1.0, 1.0, 0.5)
+    assert batches == [1] * 5
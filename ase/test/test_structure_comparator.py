@@ -300,3 +300,59 @@ def test_supercell_w_periodic_atom_removed(comparator):
 
     assert comparator.compare(a0, a5)
     assert comparator.compare(a5, a0) == comparator.compare(a0, a5)
+
+
+@pytest.mark.parametrize('scale_volume', [False, True])
+def test_deduplicate(scale_volume):
+    rng = np.random.RandomState(7)
+    images = []
+    for a in [3.9, 4.0, 4.05, 4.1]:
+        for name, kwargs in [('fcc', {}), ('bcc', {}),
+                             ('fcc', {'cubic': True})]:
+            atoms = bulk('Al', name, a=a, **kwargs)
+            if len(atoms) == 1:
+                atoms = atoms * (2, 2, 2)
+            images.append(atoms)
+            rotated = atoms.copy()
+            rotated.rotate(rng.uniform(0, 360), rng.normal(size=3),
+                           rotate_cell=True)
+            images.append(rotated)
+    mixed = bulk('Al', cubic=True)
+    mixed.symbols[:2] = 'Cu'
+    images.append(mixed)
+    for i in range(3):
+        atoms = mixed.copy()
+        atoms.rattle(0.02 * i, seed=i)
+        images.append(atoms)
+        atoms = atoms.copy()
+        atoms.symbols[[0, 2]] = atoms.symbols[[2, 0]]
+        images.append(atoms)
+
+    comp = SymmetryEquivalenceCheck(scale_volume=scale_volume)
+    unique = comp.deduplicate(images)
+
+    # Reference: compare every structure with all kept ones.
+    ref = []
+    for atoms in images:
+        if not any(comp.compare(atoms.copy(), b) for b in ref):
+            ref.append(atoms)
+    assert [id(a) for a in unique] == [id(a) for a in ref]
+    assert 2 < len(unique) < len(images)
+
+    matches = comp.find_matches(images[0], images)
+    assert matches == [i for i, b in enumerate(images)
+                       if comp.compare(images[0].copy(), b)]
+    assert 0 in matches
+
+
+def test_find_matches_at_tolerance():
+    # Volumes just inside and just outside the tolerance:
+    comp = SymmetryEquivalenceCheck(vol_tol=0.5, stol=0.2)
+    atoms = bulk('Cu', cubic=True)
+    v = atoms.get_volume()
+    candidates = []
+    for dv in [-0.6, -0.49, 0.0, 0.49, 0.6]:
+        c = atoms.copy()
+        c.set_cell(c.cell * ((v + dv) / v)**(1 / 3), scale_atoms=True)
+        candidates.append(c)
+    assert comp.find_matches(atoms, candidates) == [1, 2, 3]
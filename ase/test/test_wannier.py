@@ -6,8 +6,10 @@ from ase.build import molecule
 from ase.io.cube import read_cube
 from ase.lattice import CUB, FCC, BCC, TET, BCT, ORC, ORCF, ORCI, ORCC, HEX, \
     RHL, MCL, MCLC, TRI, OBL, HEX2D, RECT, CRECT, SQR, LINE
+from ase import Atoms
 from ase.dft.wannier import gram_schmidt, lowdin, random_orthogonal_matrix, \
-    neighbor_k_search, calculate_weights, steepest_descent, md_min, \
+    neighbor_k_search, neighbor_k_table, calculate_weights, \
+    steepest_descent, md_min, conjugate_gradient, \
     rotation_from_projection, Wannier
 
 
@@ -102,6 +104,35 @@ class Paraboloid:
         return np.sum(self.pos**2) + self.shift
 
 
+class DummyCalculator:
+    """Random localization matrices on a Monkhorst-Pack grid."""
+
+    def __init__(self, kpts=(2, 2, 1), nbands=6, seed=0):
+        self.kpt_kc = monkhorst_pack(kpts)
+        self.nbands = nbands
+        self.rng = np.random.RandomState(seed)
+        self.Z = {}
+
+    def get_bz_k_points(self):
+        return self.kpt_kc.copy()
+
+    get_ibz_k_points = get_bz_k_points
+
+    def get_atoms(self):
+        return Atoms('H', cell=[3, 3, 4], pbc=True)
+
+    def get_number_of_bands(self):
+        return self.nbands
+
+    def get_wannier_localization_matrix(self, nbands, dirG, kpoint,
+                                        nextkpoint, G_I, spin):
+        key = (tuple(dirG), kpoint)
+        if key not in self.Z:
+            self.Z[key] = (0.9 * random_orthogonal_matrix(nbands, self.rng) +
+                           0.1 * self.rng.rand(nbands, nbands))
+        return self.Z[key]
+
+
 def orthonormality_error(matrix):
     return np.abs(dagger(matrix) @ matrix - np.eye(len(matrix))).max()
 
@@ -155,6 +186,16 @@ def test_neighbor_k_search():
             assert np.linalg.norm(kpt_kc[kk] - k_c - Gdir_c + k0) < tol
 
 
+def test_neighbor_k_table():
+    kpt_kc = monkhorst_pack((4, 3, 2))
+    for G_c in [[0.25, 0, 0], [0, 1 / 3, 0], [0, 0, 0.5], [0.25, 1 / 3, 0]]:
+        k1_k, k0_kc = neighbor_k_table(kpt_kc, G_c)
+        for k, k_c in enumerate(kpt_kc):
+            k1, k0_c = neighbor_k_search(k_c, G_c, kpt_kc)
+            assert k1_k[k] == k1
+            assert (k0_kc[k] == k0_c).all()
+
+
 @pytest.mark.parametrize('lat', bravais_lattices())
 def test_calculate_weights(lat):
     # Equation from Berghold et al. PRB v61 n15 (2000)
@@ -187,6 +228,22 @@ def test_md_min():
     assert func.get_functional_value() == pytest.approx(1, abs=1e-5)
 
 
+def test_conjugate_gradient():
+    class Concave(Paraboloid):
+        def get_gradients(self):
+            return -2 * self.pos
+
+        def step(self, dF, updaterot=True, updatecoeff=True):
+            self.pos += dF
+
+        def get_functional_value(self):
+            return self.shift - np.sum(abs(self.pos)**2)
+
+    func = Concave(pos=np.array([10, -3, 2], dtype=complex), shift=1.)
+    conjugate_gradient(func=func, step=0.1, tolerance=1e-8, verbose=False)
+    assert func.get_functional_value() == pytest.approx(1, abs=1e-5)
+
+
 def test_rotation_from_projection(rng):
     proj_nw = rng.rand(6, 4)
     assert orthonormality_error(proj_nw[:int(min(proj_nw.shape))]) > 1
@@ -467,3 +524,43 @@ def test_get_gradients(wan, rng):
     f2 = wanf.get_functional_value()
     assert (np.abs((f2 - f1) / step).ravel() -
             np.abs(wanf.get_gradients())).max() < 1e-4
+
+
+@pytest.fixture
+def dummy_wan():
+    calc = DummyCalculator(kpts=(2, 2, 2), nbands=6)
+    return Wannier(nwannier=4, fixedstates=[2, 3] * 4, calc=calc,
+                   initialwannier='random', rng=np.random.RandomState(1))
+
+
+def test_dummy_gradients(dummy_wan):
+    wanf = dummy_wan
+    Nk = wanf.Nk
+    nrot = Nk * wanf.nwannier**2
+    G = wanf.get_gradients()
+    f0 = wanf.get_functional_value()
+    U_kww = wanf.U_kww.copy()
+    C_kul = [C.copy() for C in wanf.C_kul]
+    for part, factor in [(slice(0, nrot), 1), (slice(nrot, None), 2)]:
+        dX = np.zeros_like(G)
+        dX[part] = G[part]
+        wanf.step(1e-7 * dX)
+        slope = (wanf.get_functional_value() - f0) / 1e-7
+        assert slope == pytest.approx(factor * np.vdot(G, dX).real / Nk,
+                                      rel=1e-4)
+        wanf.U_kww[:] = U_kww
+        wanf.C_kul = [C.copy() for C in C_kul]
+        wanf.update()
+
+
+def test_localize_optimizers(dummy_wan):
+    values = []
+    for optimizer in ['md_min', 'conjugate_gradient']:
+        dummy_wan.initialize(initialwannier='bloch')
+        f0 = dummy_wan.get_functional_value()
+        dummy_wan.localize(tolerance=1e-8, optimizer=optimizer)
+        values.append(dummy_wan.get_functional_value())
+        assert values[-1] > f0
+    assert values[1] == pytest.approx(values[0], rel=1e-4)
+    with pytest.raises(ValueError):
+        dummy_wan.localize(optimizer='newton')
@@ -47,3 +47,34 @@ def test_saxs_and_files(testdir, figure, xrd):
     ax = figure.add_subplot(111)
     xrd.plot_pattern(ax=ax, filename='pattern.png')
     assert Path('pattern.png').exists()
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_histogram(xrd, processes):
+    hist = XrDebye(atoms=xrd.atoms, wavelength=wavelengths['CuKa1'],
+                   damping=0.04, method='Iwasa', alpha=1.01,
+                   binwidth=1e-3, processes=processes)
+    r, counts = hist.get_distance_histogram()['Ag', 'Ag']
+    n = len(xrd.atoms)
+    assert counts.sum() == n * (n - 1) // 2
+    assert r.min() == pytest.approx(4.09 / np.sqrt(2))
+
+    for x, mode in [([15, 30, 50], 'XRD'), ([0.021, 0.09, 0.53], 'SAXS')]:
+        expected = xrd.calc_pattern(x=np.array(x), mode=mode)
+        obtained = hist.calc_pattern(x=np.array(x), mode=mode)
+        assert np.allclose(obtained, expected, rtol=1e-4)
+    assert hist.get(0.09) == pytest.approx(xrd.get(0.09), rel=1e-4)
+
+
+def test_histogram_two_elements():
+    atoms = FaceCenteredCubic('Cu', [(1, 0, 0), (1, 1, 0), (1, 1, 1)],
+                              [3, 4, 3], 3.6)
+    atoms.symbols[::3] = 'Au'
+    s = np.linspace(0.05, 0.6, 7)
+    exact = XrDebye(atoms, wavelength=wavelengths['CuKa1'], method=None)
+    hist = XrDebye(atoms, wavelength=wavelengths['CuKa1'], method=None,
+                   binwidth=1e-3)
+    assert set(hist.get_distance_histogram()) == {('Au', 'Au'), ('Au', 'Cu'),
+                                                  ('Cu', 'Cu')}
+    expected = [exact.get(x) for x in s]
+    assert np.allclose(hist.get_intensities(s), expected, rtol=1e-4)
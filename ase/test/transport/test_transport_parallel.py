@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from ase.parallel import world
+from ase.transport.calculators import TransportCalculator
+
+
+def reference(tcalc):
+    """Transmission etc. from full inverses of the Green function."""
+    tcalc.initialize()
+    gf = tcalc.greenfunction
+    T_e, t_ne, dos_e, pdos_ne = [], [], [], []
+    for energy in tcalc.energies:
+        G_mm = np.linalg.inv(gf.retarded(energy, inverse=True))
+        lambda1_mm = tcalc.selfenergies[0].get_lambda(energy)
+        lambda2_mm = tcalc.selfenergies[1].get_lambda(energy)
+        T_mm = G_mm @ lambda1_mm @ G_mm.T.conj() @ lambda2_mm
+        t_n = np.sort(np.linalg.eigvals(T_mm).real)
+        T_e.append(t_n.sum())
+        t_ne.append(t_n[-2:])
+        S = gf.S
+        dos_e.append(-(G_mm @ S).imag.trace() / np.pi)
+        SGS = S @ G_mm @ S
+        pdos_ne.append(-(SGS.diagonal() / S.diagonal()).imag[[1, 4]] / np.pi)
+    return (np.array(T_e), np.array(t_ne).T, np.array(dos_e),
+            np.array(pdos_ne).T)
+
+
+@pytest.fixture
+def tcalc():
+    rng = np.random.RandomState(3)
+    h1 = np.diag([-1.0] * 3, 1) + np.diag([0.2] * 2, 2)
+    h1 = h1 + h1.T
+    n = 8
+    h = rng.normal(0, 0.5, (n, n))
+    h = h + h.T
+    h[:2, :2] = h1[:2, :2]
+    h[-2:, -2:] = h1[:2, :2]
+    s = np.identity(n) + 0.05 * np.diag(rng.uniform(size=n - 1), 1)
+    s = s + s.T - np.identity(n)
+    return TransportCalculator(h=h, s=s, h1=h1, eta=0.02, eigenchannels=2,
+                               dos=True, pdos=[1, 4],
+                               energies=np.linspace(-3, 3, 13))
+
+
+def test_against_inverse(tcalc):
+    T_e = tcalc.get_transmission()
+    results = [T_e, tcalc.get_eigenchannels(), tcalc.get_dos(),
+               tcalc.get_pdos()]
+    for x, ref in zip(results, reference(tcalc)):
+        assert x == pytest.approx(ref, abs=1e-10)
+    assert T_e.max() > 0.1
+
+
+def test_processes(tcalc):
+    if world.size > 1:
+        pytest.skip('Uses a process pool')
+    T_e = tcalc.get_transmission().copy()
+    eig_ne = tcalc.get_eigenchannels().copy()
+    tcalc.selfenergies[0].cache.clear()
+
+    tcalc.set(processes=2, energies=tcalc.energies)
+    assert tcalc.get_transmission() == pytest.approx(T_e, abs=1e-12)
+    assert tcalc.get_eigenchannels() == pytest.approx(eig_ne, abs=1e-12)
+    # The self-energies calculated by the workers are kept:
+    assert len(tcalc.selfenergies[0].cache) == len(tcalc.energies)
+
+
+def test_comm(tcalc):
+    T_e = tcalc.get_transmission().copy()
+    tcalc.set(comm=world, energies=tcalc.energies)
+    assert tcalc.get_transmission() == pytest.approx(T_e, abs=1e-12)
+
+
+def test_selfenergy_cache(tcalc):
+    tcalc.initialize()
+    lead = tcalc.selfenergies[0]
+    sigma = lead.retarded(0.5).copy()
+    assert len(lead.cache) == 1
+
+    # sigma(e, bias) = sigma(e - bias, 0):
+    lead.set_bias(0.25)
+    assert lead.retarded(0.75) == pytest.approx(sigma, abs=1e-14)
+    assert len(lead.cache) == 1
+    assert not np.allclose(lead.retarded(0.5), sigma)
+    assert len(lead.cache) == 2
+
+    # Changing the coupling in place invalidates the cache:
+    lead.set_bias(0.0)
+    lead.h_im *= 0.5
+    assert lead.retarded(0.5) == pytest.approx(0.25 * sigma, abs=1e-12)
+    assert len(lead.cache) == 1
@@ -8,6 +8,62 @@ from ase.transport.tools import subdiagonalize, cutcoupling, dagger,\
 from ase.units import kB
 
 
+def calculate_energies(greenfunction, energies, nchan=0, dos=False,
+                       pdos=[], return_caches=False):
+    """Calculate the transmission etc. at the given energies.
+
+    The first two self-energies of the Green function must be the lead
+    self-energies.  Only the blocks of the Green function coupling the
+    two leads are calculated, from a single LU factorization per
+    energy which is reused for the (projected) density of states.
+
+    Returns a dictionary with the arrays T_e and, if requested,
+    eigenchannels_ne, dos_e and pdos_ne.  With return_caches=True, the
+    self-energy caches of the leads are also returned, so that they
+    can be reused by another process."""
+    nepts = len(energies)
+    lead1, lead2 = greenfunction.selfenergies[:2]
+    results = {'T_e': np.empty(nepts)}
+    if nchan > 0:
+        results['eigenchannels_ne'] = np.empty((nchan, nepts))
+    if dos:
+        results['dos_e'] = np.empty(nepts)
+    if pdos != []:
+        results['pdos_ne'] = np.empty((len(pdos), nepts))
+
+    for e, energy in enumerate(energies):
+        idx1 = lead1.get_coupling_indices()
+        idx2 = lead2.get_coupling_indices()
+        lambda1_ii = lead1.get_lambda_block(energy)
+        lambda2_jj = lead2.get_lambda_block(energy)
+        # Nonzero eigenvalues of G.lambda1.G^d.lambda2 are those of
+        # G_ji.lambda1_ii.G_ji^d.lambda2_jj:
+        g_ji = greenfunction.get_columns(energy, idx1)[idx2]
+        T_jj = np.dot(np.dot(g_ji, lambda1_ii), dagger(g_ji))
+        T_jj = np.dot(T_jj, lambda2_jj)
+        if nchan > 0:
+            t_n = linalg.eigvals(T_jj).real
+            results['T_e'][e] = np.sum(t_n)
+            # The remaining eigenvalues of the full matrix are zero:
+            t_n = np.sort(np.concatenate([t_n, np.zeros(nchan)]))
+            results['eigenchannels_ne'][:, e] = t_n[-nchan:]
+        else:
+            results['T_e'][e] = np.trace(T_jj).real
+
+        if dos:
+            results['dos_e'][e] = greenfunction.dos(energy)
+
+        if pdos != []:
+            results['pdos_ne'][:, e] = np.take(greenfunction.pdos(energy),
+                                               pdos)
+
+    if return_caches:
+        caches = [getattr(selfenergy, 'cache', None)
+                  for selfenergy in greenfunction.selfenergies]
+        return results, caches
+    return results
+
+
 class TransportCalculator:
     """Determine transport properties of a device sandwiched between
     two semi-infinite leads using a Green function method.
@@ -67,6 +123,13 @@ class TransportCalculator:
             The total density of states of the central region.
         box: XXX
             YYY
+        processes : {None, int}, optional
+            Distribute the energy points over a pool of this many
+            processes.
+        comm : {None, communicator}, optional
+            Distribute the energy points over the ranks of this MPI
+            communicator (e.g. ase.parallel.world).  All ranks get
+            the full results.
 
         If hc1/hc2 are None, they are assumed to be identical to
         the coupling matrix elements between neareste neighbor
@@ -103,7 +166,9 @@ class TransportCalculator:
                                  'logfile': None,
                                  'eigenchannels': 0,
                                  'dos': False,
-                                 'pdos': []}
+                                 'pdos': [],
+                                 'processes': None,
+                                 'comm': None}
 
         self.initialized = False  # Changed Hamiltonians?
         self.uptodate = False  # Changed energy grid?
@@ -119,6 +184,8 @@ class TransportCalculator:
                 break
             elif key in ['energies', 'eigenchannels', 'dos', 'pdos']:
                 self.uptodate = False
+            elif key in ['processes', 'comm']:
+                pass
             elif key not in self.input_parameters:
                 raise KeyError('%r not a vaild keyword' % key)
 
@@ -250,37 +317,56 @@ class TransportCalculator:
         nepts = len(self.energies)
         nchan = p['eigenchannels']
         pdos = p['pdos']
-        self.T_e = np.empty(nepts)
+        # The Hamiltonian may have been modified in place:
+        self.greenfunction.energy = None
+
+        comm = p['comm']
+        processes = p['processes']
+        if comm is not None and comm.size > 1:
+            results = calculate_energies(self.greenfunction,
+                                         self.energies[comm.rank::comm.size],
+                                         nchan, p['dos'], pdos)
+            for key, values in results.items():
+                array = np.zeros(values.shape[:-1] + (nepts,))
+                array[..., comm.rank::comm.size] = values
+                comm.sum(array)
+                results[key] = array
+        elif processes is not None and processes > 1 and nepts > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            chunks = np.array_split(np.arange(nepts),
+                                    min(processes, nepts))
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                futures = [executor.submit(calculate_energies,
+                                           self.greenfunction,
+                                           self.energies[chunk],
+                                           nchan, p['dos'], pdos, True)
+                           for chunk in chunks]
+                parts = [future.result() for future in futures]
+            results = {}
+            for key in parts[0][0]:
+                results[key] = np.concatenate([part[key]
+                                               for part, caches in parts],
+                                              axis=-1)
+            # Keep the lead self-energies calculated by the workers:
+            for part, caches in parts:
+                for selfenergy, cache in zip(self.selfenergies, caches):
+                    if cache:
+                        selfenergy.cache.update(cache)
+        else:
+            results = calculate_energies(self.greenfunction, self.energies,
+                                         nchan, p['dos'], pdos)
+
+        self.T_e = results['T_e']
         if p['dos']:
-            self.dos_e = np.empty(nepts)
+            self.dos_e = results['dos_e']
         if pdos != []:
-            self.pdos_ne = np.empty((len(pdos), nepts))
+            self.pdos_ne = results['pdos_ne']
         if nchan > 0:
-            self.eigenchannels_ne = np.empty((nchan, nepts))
-
-        for e, energy in enumerate(self.energies):
-            Ginv_mm = self.greenfunction.retarded(energy, inverse=True)
-            lambda1_mm = self.selfenergies[0].get_lambda(energy)
-            lambda2_mm = self.selfenergies[1].get_lambda(energy)
-            a_mm = linalg.solve(Ginv_mm, lambda1_mm)
-            b_mm = linalg.solve(dagger(Ginv_mm), lambda2_mm)
-            T_mm = np.dot(a_mm, b_mm)
-            if nchan > 0:
-                t_n = linalg.eigvals(T_mm).real
-                self.eigenchannels_ne[:, e] = np.sort(t_n)[-nchan:]
-                self.T_e[e] = np.sum(t_n)
-            else:
-                self.T_e[e] = np.trace(T_mm).real
-
-            print(energy, self.T_e[e], file=self.log)
-            self.log.flush()
-
-            if p['dos']:
-                self.dos_e[e] = self.greenfunction.dos(energy)
+            self.eigenchannels_ne = results['eigenchannels_ne']
 
-            if pdos != []:
-                self.pdos_ne[:, e] = np.take(self.greenfunction.pdos(energy),
-                                             pdos)
+        for energy, T in zip(self.energies, self.T_e):
+            print(energy, T, file=self.log)
+        self.log.flush()
 
         self.uptodate = True
 
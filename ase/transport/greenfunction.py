@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.linalg import lu_factor, lu_solve
 
 
 class GreenFunction:
@@ -11,6 +12,7 @@ class GreenFunction:
         self.eta = eta
         self.energy = None
         self.Ginv = np.empty(H.shape, complex)
+        self.lu = None
 
     def retarded(self, energy, inverse=False):
         """Get retarded Green function at specified energy.
@@ -19,6 +21,7 @@ class GreenFunction:
         """
         if energy != self.energy:
             self.energy = energy
+            self.lu = None
             z = energy + self.eta * 1.j
 
             if self.S is None:
@@ -42,12 +45,28 @@ class GreenFunction:
         ginv = energy * self.S - self.H - sigma 
         return np.linalg.inv(ginv)
 
+    def factorize(self, energy):
+        """LU factorization of the inverse Green function.
+
+        The factorization is kept until the energy changes, so that
+        several products with G^r(e) only cost a back substitution."""
+        Ginv = self.retarded(energy, inverse=True)
+        if self.lu is None:
+            self.lu = lu_factor(Ginv)
+        return self.lu
+
     def apply_retarded(self, energy, X):
         """Apply retarded Green function to X.
         
         Returns the matrix product G^r(e) . X
         """
-        return np.linalg.solve(self.retarded(energy, inverse=True), X)
+        return lu_solve(self.factorize(energy), X)
+
+    def get_columns(self, energy, indices):
+        """Return the columns of G^r(e) given by indices."""
+        X = np.zeros((len(self.H), len(indices)), complex)
+        X[indices, np.arange(len(indices))] = 1.0
+        return self.apply_retarded(energy, X)
 
     def dos(self, energy):
         """Total density of states -1/pi Im(Tr(GS))"""
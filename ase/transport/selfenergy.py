@@ -4,7 +4,7 @@ import numpy as np
 class LeadSelfEnergy:
     conv = 1e-8  # Convergence criteria for surface Green function
     
-    def __init__(self, hs_dii, hs_dij, hs_dim, eta=1e-4):
+    def __init__(self, hs_dii, hs_dij, hs_dim, eta=1e-4, cachesize=4096):
         self.h_ii, self.s_ii = hs_dii  # onsite principal layer
         self.h_ij, self.s_ij = hs_dij  # coupling between principal layers
         self.h_im, self.s_im = hs_dim  # coupling to the central region
@@ -13,21 +13,64 @@ class LeadSelfEnergy:
         self.energy = None
         self.bias = 0
         self.sigma_mm = np.empty((self.nbf, self.nbf), complex)
+
+        # The self-energy only depends on energy - bias, and is only
+        # non-zero in the block of basis functions coupled to the lead.
+        # Those blocks are cached for up to cachesize shifted energies,
+        # so that they can be reused for other biases.
+        self.cachesize = cachesize
+        self.cache = {}
+        self._coupling = None
     
     def retarded(self, energy):
         """Return self-energy (sigma) evaluated at specified energy."""
-        if energy != self.energy:
+        if energy != self.energy or not self._coupling_unchanged():
             self.energy = energy
-            z = energy - self.bias + self.eta * 1.j           
-            tau_im = z * self.s_im - self.h_im
-            a_im = np.linalg.solve(self.get_sgfinv(energy), tau_im)
-            tau_mi = z * self.s_im.T.conj() - self.h_im.T.conj()
-            self.sigma_mm[:] = np.dot(tau_mi, a_im)
+            idx = self.get_coupling_indices()
+            self.sigma_mm[:] = 0.0
+            self.sigma_mm[np.ix_(idx, idx)] = self.get_sigma_block(energy)
 
         return self.sigma_mm
 
+    def get_coupling_indices(self):
+        """Indices of the basis functions of the central region that
+        couple to the lead."""
+        if not self._coupling_unchanged():
+            coupled = (abs(self.h_im).sum(axis=0) +
+                       abs(self.s_im).sum(axis=0)) > 0
+            self._coupling = (self.h_im.copy(), self.s_im.copy(),
+                              np.nonzero(coupled)[0])
+            self.cache.clear()
+        return self._coupling[2]
+
+    def _coupling_unchanged(self):
+        # The coupling matrices may be modified in place (e.g. by
+        # TransportCalculator.subdiagonalize_bfs):
+        return (self._coupling is not None and
+                np.array_equal(self._coupling[0], self.h_im) and
+                np.array_equal(self._coupling[1], self.s_im))
+
+    def get_sigma_block(self, energy):
+        """Return the non-zero block of the self-energy, in the basis
+        functions given by get_coupling_indices()."""
+        idx = self.get_coupling_indices()
+        key = round(energy - self.bias, 12)
+        sigma = self.cache.get(key)
+        if sigma is None:
+            z = energy - self.bias + self.eta * 1.j
+            tau_im = z * self.s_im[:, idx] - self.h_im[:, idx]
+            a_im = np.linalg.solve(self.get_sgfinv(energy), tau_im)
+            tau_mi = (z * self.s_im[:, idx].T.conj() -
+                      self.h_im[:, idx].T.conj())
+            sigma = np.dot(tau_mi, a_im)
+            if len(self.cache) >= self.cachesize:
+                self.cache.pop(next(iter(self.cache)))
+            self.cache[key] = sigma
+        return sigma
+
     def set_bias(self, bias):
         self.bias = bias
+        self.energy = None
 
     def get_lambda(self, energy):
         """Return the lambda (aka Gamma) defined by i(S-S^d).
@@ -37,6 +80,12 @@ class LeadSelfEnergy:
         """
         sigma_mm = self.retarded(energy)
         return 1.j * (sigma_mm - sigma_mm.T.conj())
+
+    def get_lambda_block(self, energy):
+        """Return the non-zero block of lambda, in the basis functions
+        given by get_coupling_indices()."""
+        sigma = self.get_sigma_block(energy)
+        return 1.j * (sigma - sigma.T.conj())
         
     def get_sgfinv(self, energy):
         """The inverse of the retarded surface Green function""" 
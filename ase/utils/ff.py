@@ -908,3 +908,209 @@ def rel_pos_pbc(atoms, i, j):
     f = np.floor(np.dot(g, d.T) + 0.5)
     d -= np.dot(atoms.get_cell().T, f).T
     return d
+
+def compile_terms(terms, indices, parameters):
+    """
+    Collect atom indices and parameters of a list of terms into arrays,
+    so that all terms of one type can be evaluated at once.
+    Parameters that are None become NaN.
+    """
+    compiled = {'indices': np.array([[getattr(term, name) for name in indices]
+                                     for term in terms],
+                                    dtype=int).reshape(-1, len(indices))}
+    for name in parameters:
+        values = [getattr(term, name) for term in terms]
+        compiled[name] = np.array([np.nan if value is None else value
+                                   for value in values], dtype=float)
+    return compiled
+
+def compile_morses(morses):
+    return compile_terms(morses, ['atomi', 'atomj'], ['D', 'alpha', 'r0'])
+
+def compile_bonds(bonds):
+    return compile_terms(bonds, ['atomi', 'atomj'], ['k', 'b0'])
+
+def compile_angles(angles):
+    return compile_terms(angles, ['atomi', 'atomj', 'atomk'],
+                         ['k', 'a0', 'cos'])
+
+def compile_dihedrals(dihedrals):
+    return compile_terms(dihedrals, ['atomi', 'atomj', 'atomk', 'atoml'],
+                         ['k', 'd0', 'n'])
+
+def compile_vdws(vdws):
+    return compile_terms(vdws, ['atomi', 'atomj'], ['Aij', 'Bij'])
+
+def compile_coulombs(coulombs):
+    return compile_terms(coulombs, ['atomi', 'atomj'], ['chargeij'])
+
+def get_morse_potential_values_and_gradients(atoms, morses):
+    """
+    Energies, shape (n,), and gradients, shape (n, 2, 3), of all
+    Morse terms compiled with compile_morses
+    """
+    i, j = morses['indices'].T
+
+    rij = rel_pos_pbc(atoms, i, j)
+    dij = linalg.norm(rij, axis=1)
+    eij = rij/dij[:, None]
+
+    exp = np.exp(-morses['alpha']*(dij-morses['r0']))
+
+    v = morses['D']*(1.0-exp)**2
+
+    gr = (2.0*morses['D']*morses['alpha']*exp*(1.0-exp))[:, None]*eij
+
+    return v, np.stack((gr, -gr), axis=1)
+
+def get_bond_potential_values_and_gradients(atoms, bonds):
+    """
+    Energies, shape (n,), and gradients, shape (n, 2, 3), of all
+    bond terms compiled with compile_bonds
+    """
+    i, j = bonds['indices'].T
+
+    rij = rel_pos_pbc(atoms, i, j)
+    dij = linalg.norm(rij, axis=1)
+    eij = rij/dij[:, None]
+
+    v = 0.5*bonds['k']*(dij-bonds['b0'])**2
+
+    gr = (bonds['k']*(dij-bonds['b0']))[:, None]*eij
+
+    return v, np.stack((gr, -gr), axis=1)
+
+def get_angle_potential_values_and_gradients(atoms, angles):
+    """
+    Energies, shape (n,), and gradients, shape (n, 3, 3), of all
+    angle terms compiled with compile_angles
+    """
+    i, j, k = angles['indices'].T
+    cos = angles['cos'].astype(bool)
+
+    rij = rel_pos_pbc(atoms, i, j)
+    dij = linalg.norm(rij, axis=1)
+    eij = rij/dij[:, None]
+    rkj = rel_pos_pbc(atoms, k, j)
+    dkj = linalg.norm(rkj, axis=1)
+    ekj = rkj/dkj[:, None]
+    eijekj = np.einsum('ij,ij->i', eij, ekj)
+
+    a = np.arccos(np.clip(eijekj, -1.0, 1.0))
+
+    da = a-angles['a0']
+    da = da - np.around(da / np.pi) * np.pi
+    da[cos] = np.cos(a[cos])-np.cos(angles['a0'][cos])
+
+    v = 0.5*angles['k']*da**2
+
+    sina = np.sin(a)
+    factor = angles['k']*da
+    factor[~cos] *= -1.0
+    noncos = ~cos & (np.abs(sina) > 0.001)
+    factor[noncos] /= sina[noncos]
+    factor[~cos & ~noncos] = 0.0
+
+    gri = (factor/dij)[:, None]*(ekj-eijekj[:, None]*eij)
+    grk = (factor/dkj)[:, None]*(eij-eijekj[:, None]*ekj)
+
+    return v, np.stack((gri, -gri-grk, grk), axis=1)
+
+def get_dihedral_potential_values_and_gradients(atoms, dihedrals):
+    """
+    Energies, shape (n,), and gradients, shape (n, 4, 3), of all
+    dihedral terms compiled with compile_dihedrals
+    """
+    i, j, k, l = dihedrals['indices'].T
+    kd = dihedrals['k']
+    d0 = dihedrals['d0']
+    n = dihedrals['n']
+
+    rij = rel_pos_pbc(atoms, i, j)
+    rkj = rel_pos_pbc(atoms, k, j)
+    dkj = linalg.norm(rkj, axis=1)
+    dkj2 = dkj*dkj
+    rkl = rel_pos_pbc(atoms, k, l)
+
+    rijrkj = np.einsum('ij,ij->i', rij, rkj)
+    rkjrkl = np.einsum('ij,ij->i', rkj, rkl)
+
+    rmj = np.cross(rij, rkj)
+    dmj = linalg.norm(rmj, axis=1)
+    dmj2 = dmj*dmj
+    emj = rmj/dmj[:, None]
+    rnk = np.cross(rkj, rkl)
+    dnk = linalg.norm(rnk, axis=1)
+    dnk2 = dnk*dnk
+    enk = rnk/dnk[:, None]
+    emjenk = np.clip(np.einsum('ij,ij->i', emj, enk), -1.0, 1.0)
+
+    d = ( np.sign(np.einsum('ij,ij->i', rkj, np.cross(rmj, rnk)))
+          *np.arccos(emjenk) )
+
+    periodic = np.isnan(d0)
+    harmonic = ~periodic & np.isnan(n)
+    cosine = ~periodic & ~harmonic
+
+    v = np.empty(len(d))
+    factor = np.empty(len(d))
+
+    v[periodic] = 0.5*kd[periodic]*(1.0 - np.cos(2.0 * d[periodic]))
+    factor[periodic] = kd[periodic]*np.sin(2.0 * d[periodic])
+
+    dd = d[harmonic]-d0[harmonic]
+    dd = dd - np.around(dd / np.pi / 2.0) * np.pi * 2.0
+    v[harmonic] = 0.5*kd[harmonic]*dd**2
+    factor[harmonic] = kd[harmonic]*dd
+
+    phase = n[cosine]*d[cosine] - d0[cosine]
+    v[cosine] = kd[cosine]*(1.0 + np.cos(phase))
+    factor[cosine] = -kd[cosine]*n[cosine]*np.sin(phase)
+
+    dddri = (dkj/dmj2)[:, None]*rmj
+    dddrl = (-dkj/dnk2)[:, None]*rnk
+
+    gx = np.empty((len(d), 4, 3))
+    gx[:, 0] = dddri
+    gx[:, 1] = ( (rijrkj/dkj2-1.0)[:, None]*dddri
+                 -(rkjrkl/dkj2)[:, None]*dddrl )
+    gx[:, 2] = ( (rkjrkl/dkj2-1.0)[:, None]*dddrl
+                 -(rijrkj/dkj2)[:, None]*dddri )
+    gx[:, 3] = dddrl
+    gx *= factor[:, None, None]
+
+    return v, gx
+
+def get_vdw_potential_values_and_gradients(atoms, vdws):
+    """
+    Energies, shape (n,), and gradients, shape (n, 2, 3), of all
+    van der Waals terms compiled with compile_vdws
+    """
+    i, j = vdws['indices'].T
+
+    rij = rel_pos_pbc(atoms, i, j)
+    dij = linalg.norm(rij, axis=1)
+    eij = rij/dij[:, None]
+
+    v = vdws['Aij']/dij**12 - vdws['Bij']/dij**6
+
+    gr = (-12.0*vdws['Aij']/dij**13+6.0*vdws['Bij']/dij**7)[:, None]*eij
+
+    return v, np.stack((gr, -gr), axis=1)
+
+def get_coulomb_potential_values_and_gradients(atoms, coulombs):
+    """
+    Energies, shape (n,), and gradients, shape (n, 2, 3), of all
+    Coulomb terms compiled with compile_coulombs
+    """
+    i, j = coulombs['indices'].T
+
+    rij = rel_pos_pbc(atoms, i, j)
+    dij = linalg.norm(rij, axis=1)
+    eij = rij/dij[:, None]
+
+    v = coulombs['chargeij']/dij
+
+    gr = (-coulombs['chargeij']/dij/dij)[:, None]*eij
+
+    return v, np.stack((gr, -gr), axis=1)
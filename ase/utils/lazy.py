@@ -0,0 +1,42 @@
+"""Lazy loading of the public objects of a package (PEP 562).
+
+A package lists where its public objects are defined::
+
+    from ase.utils.lazy import lazy_attributes
+
+    __getattr__, __dir__ = lazy_attributes(__name__, {
+        'read': 'ase.io.formats',
+        'Trajectory': 'ase.io.trajectory'})
+
+and the defining module is only imported the first time the object is
+used, e.g. by ``from ase.io import read``.  Submodules of the package
+are imported on first use too, so that ``ase.io.trajectory`` works after
+``import ase.io``.
+"""
+import sys
+from importlib import import_module
+from importlib.util import find_spec
+
+
+def lazy_attributes(package, attributes):
+    """Return __getattr__() and __dir__() functions for the package.
+
+    attributes maps the names of the objects to the names of the modules
+    defining them."""
+
+    def __getattr__(name):
+        if name in attributes:
+            value = getattr(import_module(attributes[name]), name)
+        elif not name.startswith('_') and find_spec(package + '.' + name):
+            value = import_module(package + '.' + name)
+        else:
+            raise AttributeError('module {!r} has no attribute {!r}'
+                                 .format(package, name))
+        # Next time the attribute is found without calling __getattr__()
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(attributes))
+
+    return __getattr__, __dir__
@@ -7,7 +7,7 @@ import numpy as np
 from scipy.spatial import cKDTree as KDTree
 
 from ase import Atom, Atoms
-from ase.build.tools import niggli_reduce
+from ase.build.tools import niggli_reduce, niggli_reduce_cell
 
 
 def normalize(cell):
@@ -92,6 +92,11 @@ class SymmetryEquivalenceCheck:
     >>> comp.compare(s1, s2_list)
     True
 
+    Remove duplicates from a list of structures
+
+    >>> len(comp.deduplicate(s2_list + s2_list))
+    5
+
     """
 
     def __init__(self, angle_tol=1.0, ltol=0.05, stol=0.05, vol_tol=0.1,
@@ -327,6 +332,48 @@ class SymmetryEquivalenceCheck:
                 translations = old_translations
         return False
 
+    def find_matches(self, atoms, candidates):
+        """Find the candidates that are equivalent to atoms.
+
+        Only the candidates that have the same composition and whose
+        Niggli cells have the same angles and volume as atoms (within
+        the tolerances) are compared in full, since compare() would
+        return False for all others.
+
+        Returns the list of indices i for which
+        ``compare(atoms, candidates[i])`` is True.
+        """
+        index = _InvariantIndex(self)
+        for i, candidate in enumerate(candidates):
+            index.add(i, candidate)
+        return [i for i in index.query(atoms)
+                if self.compare(atoms.copy(), candidates[i])]
+
+    def deduplicate(self, images):
+        """Remove symmetry equivalent structures from a list.
+
+        The structures are processed in order and a structure is kept
+        if it is not equivalent to any structure kept before it. The
+        full comparison is only done for pairs with the same
+        composition and the same Niggli cell angles and volume (within
+        the tolerances), which are found by hashing these invariants,
+        so the cost grows close to linearly with the number of
+        structures unless many of them are similar. The result is the
+        same as comparing every structure to all kept ones.
+
+        Returns the list of unique structures.
+        """
+        index = _InvariantIndex(self)
+        unique = []
+        for atoms in images:
+            for i in index.query(atoms):
+                if self.compare(atoms.copy(), unique[i]):
+                    break
+            else:
+                index.add(len(unique), atoms)
+                unique.append(atoms)
+        return unique
+
     def _set_least_frequent_element(self, atoms):
         """Save the atomic number of the least frequent element."""
         elem1 = self._get_element_count(atoms)
@@ -615,3 +662,62 @@ class SymmetryEquivalenceCheck:
             cell=cell,
             pbc=True)
         return atoms
+
+
+class _InvariantIndex:
+    """Index of structures bucketed by invariants that must agree for
+    SymmetryEquivalenceCheck.compare() to return True.
+
+    The invariants are the number of atoms, the composition, the sorted
+    angles of the Niggli cell and (unless the volumes are scaled) the
+    volume. The continuous ones are put on a grid with spacings slightly
+    larger than the tolerances, so that two equivalent structures always
+    lie in the same or in neighbouring grid cells."""
+
+    # Padding of the tolerances covering round-off differences between
+    # the invariants computed here and in compare():
+    eps = 1e-6
+
+    def __init__(self, comparator):
+        self.comparator = comparator
+        self.angle_tol = comparator.angle_tol + self.eps
+        self.vol_tol = comparator.vol_tol + self.eps
+        self.use_volume = not comparator.scale_volume
+        self.buckets = {}
+        self.values = {}
+
+    def _get_invariants(self, atoms):
+        if self.comparator.to_primitive:
+            atoms = self.comparator._reduce_to_primitive(atoms)
+        cell = niggli_reduce_cell(atoms.cell)[0]
+        composition = tuple(sorted(Counter(atoms.numbers).items()))
+        values = np.sort(self.comparator._get_angles(np.array(cell)))
+        tol = [self.angle_tol] * 3
+        if self.use_volume:
+            values = np.append(values, abs(np.linalg.det(cell)))
+            tol.append(self.vol_tol)
+        cell_index = np.floor(values / tol).astype(int)
+        return (len(atoms), composition), values, cell_index
+
+    def add(self, i, atoms):
+        key, values, cell_index = self._get_invariants(atoms)
+        self.values[i] = values
+        bucket = key + tuple(cell_index)
+        self.buckets.setdefault(bucket, []).append(i)
+
+    def query(self, atoms):
+        """Return the sorted indices of all structures in the index that
+        might be equivalent to atoms."""
+        key, values, cell_index = self._get_invariants(atoms)
+        tol = np.array([self.angle_tol] * 3 + [self.vol_tol])[:len(values)]
+        found = []
+        for offset in product([-1, 0, 1], repeat=len(cell_index)):
+            bucket = key + tuple(cell_index + offset)
+            for i in self.buckets.get(bucket, []):
+                d = np.abs(self.values[i] - values)
+                # compare() checks the angles with atol (<=) and the
+                # volume with a strict inequality; the padding makes
+                # both inclusive here.
+                if np.all(d <= tol):
+                    found.append(i)
+        return sorted(found)